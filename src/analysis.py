@@ -25,14 +25,25 @@
 from commons import *
 
 # Cython imports
-cimport('from communication import communicate_ghosts, get_buffer')
-cimport('from graphics import get_output_declarations, plot_powerspec')
+cimport('from communication import communicate_ghosts, domain_subdivisions, get_buffer')
+cimport('from graphics import augment_filename, get_output_declarations, plot_powerspec')
+cimport(
+    'from interactions import        '
+    '    component_component,        '
+    '    domain_domain_communication, '
+    '    domain_domain_tile_indices,  '
+    '    particle_particle,           '
+)
 cimport('from linear import get_linear_powerspec')
 cimport(
-    'from mesh import          '
-    '    diff_domaingrid,      '
-    '    fourier_loop,         '
-    '    interpolate_upstream, '
+    'from mesh import         '
+    '    diff_domaingrid,     '
+    '    fft,                 '
+    '    fourier_loop,        '
+    '    free_fftw_slab,      '
+    '    get_density_key,     '
+    '    get_fftw_slab,       '
+    '    interpolate_density, '
 )
 
 
@@ -45,6 +56,7 @@ cimport(
     # Locals
     declaration=object,  # PowerspecDeclaration
     declarations=list,
+    slab='double[:, :, ::1]',
     returns='void',
 )
 def powerspec(components, filename):
@@ -56,13 +68,26 @@ def powerspec(components, filename):
         # components in this power spectrum declaration.
         # The result is stored in declaration.power.
         # Only the master process holds the full power spectrum.
-        compute_powerspec(declaration)
+        slab = compute_powerspec(declaration)
+        # If specified, also compute the bispectrum from the same
+        # density. The result is stored in declaration.bispec and
+        # declaration.bispec_reduced.
+        # Only the master process holds the bispectrum.
+        compute_bispec(declaration, slab)
         # If specified, also compute the linear power spectrum.
         # The result is stored in declaration.power_linear.
         # Only the master process holds the linear power spectrum.
         compute_powerspec_linear(declaration)
+        # If specified, also compute the cross power spectra between
+        # each pair of components. The result is stored in
+        # declaration.power_cross.
+        # Only the master process holds the cross power spectra.
+        compute_powerspec_cross(declaration)
     # Dump power spectra to collective data file
     save_powerspec(declarations, filename)
+    # Dump cross power spectra and bispectra to individual data files
+    save_powerspec_cross(declarations, filename)
+    save_bispec(declarations, filename)
     # Dump power spectra to individual image files
     plot_powerspec(declarations, filename)
 
@@ -72,17 +97,27 @@ def powerspec(components, filename):
     # Arguments
     components=list,
     # Locals
+    bispec='double[::1]',
+    bispec_k_centers='double[::1]',
+    bispec_n_triangles='double[::1]',
+    bispec_reduced='double[::1]',
+    bispec_shell_indices='Py_ssize_t[::1]',
+    bispec_triangles='Py_ssize_t[:, ::1]',
     cache_key=tuple,
     declaration=object,  # PowerspecDeclaration
     declarations=list,
+    do_cross='bint',
     index='Py_ssize_t',
     k2_max='Py_ssize_t',
     k_bin_centers='double[::1]',
     k_bin_indices='Py_ssize_t[::1]',
+    n_components='Py_ssize_t',
     n_modes='Py_ssize_t[::1]',
     n_modes_max='Py_ssize_t',
     power='double[::1]',
+    power_cross='double[:, ::1]',
     power_linear='double[::1]',
+    slab_bin_indices='int[::1]',
     returns=list,
 )
 def get_powerspec_declarations(components):
@@ -102,7 +137,9 @@ def get_powerspec_declarations(components):
     # Add missing declaration fields
     for index, declaration in enumerate(declarations):
         # Get bin information
-        k2_max, k_bin_indices, k_bin_centers, n_modes, n_modes_max = get_powerspec_bins(
+        (
+            k2_max, k_bin_indices, k_bin_centers, n_modes, n_modes_max, slab_bin_indices,
+        ) = get_powerspec_bins(
             declaration.gridsize,
             declaration.k_max,
             declaration.binsize,
@@ -110,15 +147,47 @@ def get_powerspec_declarations(components):
         # Allocate arrays for storing the power
         power = empty(bcast(k_bin_centers.shape[0] if master else None), dtype=C2np['double'])
         power_linear = (asarray(power).copy() if declaration.do_linear else None)
+        # Allocate array for storing the cross power between each pair
+        # of components, which requires at least two components.
+        n_components = len(declaration.components)
+        do_cross = (declaration.do_cross and n_components > 1)
+        power_cross = None
+        if do_cross:
+            power_cross = empty(
+                (n_components*(n_components - 1)//2, power.shape[0]),
+                dtype=C2np['double'],
+            )
+        # Get bispectrum shells and triangle configurations
+        # and allocate arrays for storing the bispectrum.
+        bispec_shell_indices = bispec_k_centers = bispec_triangles = None
+        bispec = bispec_reduced = bispec_n_triangles = None
+        if declaration.do_bispec:
+            bispec_shell_indices, bispec_k_centers, bispec_triangles = get_bispec_bins(
+                declaration.gridsize,
+                k2_max,
+                declaration.bispec_bins,
+            )
+            bispec = empty(bispec_triangles.shape[0], dtype=C2np['double'])
+            bispec_reduced = asarray(bispec).copy()
+            bispec_n_triangles = asarray(bispec).copy()
         # Replace old declaration with a new, fully populated one
         declaration = declaration._replace(
+            do_cross=do_cross,
             k2_max=k2_max,
             k_bin_indices=k_bin_indices,
+            slab_bin_indices=slab_bin_indices,
             k_bin_centers=k_bin_centers,
             n_modes=n_modes,
             n_modes_max=n_modes_max,
             power=power,
             power_linear=power_linear,
+            power_cross=power_cross,
+            bispec_shell_indices=bispec_shell_indices,
+            bispec_k_centers=bispec_k_centers,
+            bispec_triangles=bispec_triangles,
+            bispec_n_triangles=bispec_n_triangles,
+            bispec=bispec,
+            bispec_reduced=bispec_reduced,
         )
         declarations[index] = declaration
     # Store declarations in cache and return
@@ -129,18 +198,55 @@ cython.declare(powerspec_declarations_cache=dict)
 powerspec_declarations_cache = {}
 # Create the PowerspecDeclaration type
 fields = (
-    'components', 'do_data', 'do_linear', 'do_plot', 'gridsize',
+    'components', 'do_data', 'do_linear', 'do_plot', 'do_cross', 'do_bispec', 'gridsize',
     'interpolation', 'deconvolve', 'interlace',
-    'k2_max', 'k_max', 'binsize', 'tophat', 'significant_figures',
-    'k_bin_indices', 'k_bin_centers', 'n_modes', 'n_modes_max', 'power', 'power_linear',
+    'k2_max', 'k_max', 'binsize', 'tophat', 'significant_figures', 'bispec_bins',
+    'k_bin_indices', 'slab_bin_indices', 'k_bin_centers', 'n_modes', 'n_modes_max',
+    'power', 'power_linear', 'power_cross',
+    'bispec_shell_indices', 'bispec_k_centers', 'bispec_triangles', 'bispec_n_triangles',
+    'bispec', 'bispec_reduced',
 )
 PowerspecDeclaration = collections.namedtuple(
     'PowerspecDeclaration', fields, defaults=[None]*len(fields),
 )
 
+# Function returning the keys of the densities needed for the power
+# spectra (including cross power spectra and bispectra) of a power
+# spectrum declaration, see plan_shared_density_slabs().
+@cython.pheader(
+    # Arguments
+    declaration=object,  # PowerspecDeclaration
+    # Locals
+    component='Component',
+    keys=list,
+    returns=list,
+)
+def get_powerspec_density_keys(declaration):
+    keys = []
+    if declaration.do_data or declaration.do_plot or declaration.do_bispec:
+        keys.append(get_density_key(
+            declaration.components,
+            [component.powerspec_upstream_gridsize for component in declaration.components],
+            declaration.gridsize,
+            declaration.interpolation,
+            declaration.deconvolve,
+            declaration.interlace,
+        ))
+    if declaration.do_cross:
+        for component in declaration.components:
+            keys.append(get_density_key(
+                [component],
+                [component.powerspec_upstream_gridsize],
+                declaration.gridsize,
+                declaration.interpolation,
+                declaration.deconvolve,
+                declaration.interlace,
+            ))
+    return keys
+
 # Function for constructing arrays k_bin_indices, k_bin_centers and
 # n_modes, describing the binning of power spectra.
-@cython.header(
+@cython.pheader(
     # Arguments
     gridsize='Py_ssize_t',
     k_max=object,  # double or str
@@ -169,6 +275,7 @@ PowerspecDeclaration = collections.namedtuple(
     n_modes_max='Py_ssize_t',
     nyquist='Py_ssize_t',
     powerspec_bins=tuple,
+    slab_bin_indices='int[::1]',
     θ='double',
     returns=tuple,
 )
@@ -184,6 +291,17 @@ def get_powerspec_bins(gridsize, k_max, binsize):
     - n_modes: Array mapping bin index to number of modes, i.e.
         n = n_modes[bin_index]
       This array lives on the master process only.
+    - n_modes_max: The largest value in n_modes.
+    - slab_bin_indices: Array mapping each complex element of the local
+      Fourier space slab to bin index, i.e.
+        k_bin_index = slab_bin_indices[index//2]
+      with index as yielded by fourier_loop(). Elements not to be
+      included in the power spectrum (the origin, the Nyquist planes,
+      redundant points in the z DC plane and points beyond k2_max)
+      are marked with a bin index of -1. This array is local to each
+      process and is used by tally_power(). It is stored using 32-bit
+      ints, keeping its memory footprint at a quarter of that of
+      the slab.
     """
     # Look up in the cache
     cache_key = (gridsize, k_max, tuple(binsize.items()))
@@ -227,9 +345,12 @@ def get_powerspec_bins(gridsize, k_max, binsize):
             dist_right = k_bin_centers[index] - k_magnitude
             index -= (dist_left <= dist_right)
         k_bin_indices[k2] = index
-    # Loop as if over 3D Fourier slabs, tallying up the multiplicity
-    # (number of modes) for each k².
+    # Loop over the local 3D Fourier slab, tallying up the multiplicity
+    # (number of modes) for each k². At the same time we record the k²
+    # of each visited element of the slab, which are later mapped
+    # to bin indices.
     n_modes_fine = zeros(k_bin_indices.shape[0], dtype=C2np['Py_ssize_t'])
+    slab_bin_indices = -ones((gridsize//nprocs)*gridsize*(nyquist + 1), dtype=C2np['int'])
     for index, ki, kj, kk, factor, θ in fourier_loop(
         gridsize,
         sparse=True,
@@ -238,6 +359,7 @@ def get_powerspec_bins(gridsize, k_max, binsize):
     ):
         k2 = ℤ[ℤ[ℤ[kj**2] + ki**2] + kk**2]
         n_modes_fine[k2] += 1
+        slab_bin_indices[index//2] = k2
     # Sum n_modes_fine into the master process
     Reduce(
         sendbuf=(MPI.IN_PLACE if master else n_modes_fine),
@@ -251,6 +373,7 @@ def get_powerspec_bins(gridsize, k_max, binsize):
         # Updated values of k_bin_indices are received from the master.
         # This is the only data known to the slaves.
         Bcast(k_bin_indices)
+        map_slab_bin_indices(slab_bin_indices, k_bin_indices)
         k_bin_centers = n_modes = None
         powerspec_bins_cache[cache_key] = (
             k2_max,
@@ -258,6 +381,7 @@ def get_powerspec_bins(gridsize, k_max, binsize):
             k_bin_centers,
             n_modes,
             n_modes_max,
+            slab_bin_indices,
         )
         return powerspec_bins_cache[cache_key]
     # Redefine k_bin_centers so that each element is the mean of all the
@@ -294,6 +418,7 @@ def get_powerspec_bins(gridsize, k_max, binsize):
             k_bin_index_prev = k_bin_index
     # The final values of k_bin_indices should be known to all processes
     Bcast(k_bin_indices)
+    map_slab_bin_indices(slab_bin_indices, k_bin_indices)
     # Remove bins with mode count 0
     mask = (asarray(n_modes) > 0)
     n_modes = asarray(n_modes)[mask]
@@ -305,6 +430,7 @@ def get_powerspec_bins(gridsize, k_max, binsize):
         k_bin_centers,
         n_modes,
         n_modes_max,
+        slab_bin_indices,
     )
     powerspec_bins_cache[cache_key] = powerspec_bins
     return powerspec_bins
@@ -312,6 +438,99 @@ def get_powerspec_bins(gridsize, k_max, binsize):
 cython.declare(powerspec_bins_cache=dict)
 powerspec_bins_cache = {}
 
+# Function for mapping the k² values (grid units) of the elements of
+# the local slab to bin indices, in-place.
+@cython.header(
+    # Arguments
+    slab_bin_indices='int[::1]',
+    k_bin_indices='Py_ssize_t[::1]',
+    # Locals
+    k2='Py_ssize_t',
+    ℓ='Py_ssize_t',
+    returns='void',
+)
+def map_slab_bin_indices(slab_bin_indices, k_bin_indices):
+    for ℓ in range(slab_bin_indices.shape[0]):
+        k2 = slab_bin_indices[ℓ]
+        if k2 != -1:
+            slab_bin_indices[ℓ] = k_bin_indices[k2]
+
+# Function for tallying up the (cross) power between a Fourier space
+# slab and any number of other slabs into power spectrum bins.
+@cython.pheader(
+    # Arguments
+    slab_bin_indices='int[::1]',
+    slab='double[:, :, ::1]',
+    slabs_other=list,
+    powers=list,
+    # Locals
+    k_bin_index='Py_ssize_t',
+    n_others='Py_ssize_t',
+    other_index='Py_ssize_t',
+    power='double[::1]',
+    power_ptr='double*',
+    row='Py_ssize_t',
+    row_size='Py_ssize_t',
+    slab_bin_indices_ptr='int*',
+    slab_other='double[:, :, ::1]',
+    slab_other_ptr='double*',
+    slab_ptr='double*',
+    ℓ='Py_ssize_t',
+    ℓ_bgn='Py_ssize_t',
+    returns='void',
+)
+def tally_power(slab_bin_indices, slab, slabs_other, powers):
+    """For each slab in slabs_other, the real part of the product of
+    slab and the complex conjugate of the other slab is added to the
+    bins of the corresponding power array in powers, with the bin
+    indices given by slab_bin_indices as obtained from
+    get_powerspec_bins(). Passing slab itself within slabs_other results
+    in the auto power. Rather than using fourier_loop(), all (complex)
+    elements of a given slab row are processed in one go, using the
+    precomputed bin indices. Each row is processed for all of the other
+    slabs before moving on, so that each row of slab is read from
+    memory only once.
+    """
+    global slabs_other_ptrs, powers_ptrs, tally_power_size
+    # Gather pointers to the other slabs and the power arrays
+    n_others = len(slabs_other)
+    if n_others > tally_power_size:
+        tally_power_size = n_others
+        slabs_other_ptrs = realloc(slabs_other_ptrs, tally_power_size*sizeof('double*'))
+        powers_ptrs = realloc(powers_ptrs, tally_power_size*sizeof('double*'))
+    for other_index in range(n_others):
+        slab_other = slabs_other[other_index]
+        slabs_other_ptrs[other_index] = cython.address(slab_other[:, :, :])
+        power = powers[other_index]
+        powers_ptrs[other_index] = cython.address(power[:])
+    slab_ptr = cython.address(slab[:, :, :])
+    slab_bin_indices_ptr = cython.address(slab_bin_indices[:])
+    # Loop over the rows of the slab, each containing row_size
+    # complex elements (including the padding).
+    row_size = slab.shape[2]//2
+    for row in range(ℤ[slab.shape[0]*slab.shape[1]]):
+        ℓ_bgn = row*row_size
+        for other_index in range(n_others):
+            slab_other_ptr = slabs_other_ptrs[other_index]
+            power_ptr = powers_ptrs[other_index]
+            for ℓ in range(ℓ_bgn, ℓ_bgn + row_size):
+                k_bin_index = slab_bin_indices_ptr[ℓ]
+                if k_bin_index == -1:
+                    continue
+                power_ptr[k_bin_index] += (
+                      slab_ptr[2*ℓ    ]*slab_other_ptr[2*ℓ    ]
+                    + slab_ptr[2*ℓ + 1]*slab_other_ptr[2*ℓ + 1]
+                )
+# Pointer arrays used by the tally_power() function
+cython.declare(
+    slabs_other_ptrs='double**',
+    powers_ptrs='double**',
+    tally_power_size='Py_ssize_t',
+)
+tally_power_size = 1
+slabs_other_ptrs = malloc(tally_power_size*sizeof('double*'))
+powers_ptrs = malloc(tally_power_size*sizeof('double*'))
+
 # Helper function to get_powerspec_bins()
 def construct_k_bin_centers(k_min, k_max, binsize, gridsize, nyquist):
     import scipy.interpolate
@@ -374,6 +593,93 @@ def construct_k_bin_centers(k_min, k_max, binsize, gridsize, nyquist):
         )
     return k_bin_centers
 
+# Function for constructing the k shells and triangle configurations
+# used for bispectra.
+@cython.header(
+    # Arguments
+    gridsize='Py_ssize_t',
+    k2_max='Py_ssize_t',
+    n_shells='Py_ssize_t',
+    # Locals
+    bispec_bins=tuple,
+    cache_key=tuple,
+    k2='Py_ssize_t',
+    k_magnitude='double',
+    k_shell_centers='double[::1]',
+    k_shell_max='double',
+    shell_index='Py_ssize_t',
+    shell_index_1='Py_ssize_t',
+    shell_index_2='Py_ssize_t',
+    shell_index_3='Py_ssize_t',
+    shell_indices='Py_ssize_t[::1]',
+    triangles='Py_ssize_t[:, ::1]',
+    Δk='double',
+    returns=tuple,
+)
+def get_bispec_bins(gridsize, k2_max, n_shells):
+    """The k space up to k2_max (grid units) is split into n_shells
+    spherical shells of equal width. The returned objects are:
+    - shell_indices: Array mapping k² (grid units) to shell index, i.e.
+        shell_index = shell_indices[k2]
+      with a value of -1 for k² outside of all shells.
+    - k_shell_centers: Array mapping shell index to the |k⃗| at the
+      centre of the shell.
+    - triangles: Array of shape (n_triangles, 3) listing the shell
+      indices (shell_index_1 ≥ shell_index_2 ≥ shell_index_3) of all
+      shell triplets from which closed triangles might be formed.
+    All processes will have a copy of these arrays.
+    """
+    # Look up in the cache
+    cache_key = (gridsize, k2_max, n_shells)
+    bispec_bins = bispec_bins_cache.get(cache_key)
+    if bispec_bins:
+        return bispec_bins
+    # The triangles k⃗₁ + k⃗₂ + k⃗₃ = 0 are found through products
+    # of real space fields, which only respects this condition modulo
+    # the grid size. To avoid such aliased triangles, we restrict the
+    # shells to lie within 2/3 of the Nyquist mode.
+    k_shell_max = pairmin(sqrt(k2_max), 2./3.*(gridsize//2))
+    if n_shells > k_shell_max:
+        masterwarn(
+            f'Cannot use {n_shells} bispectrum shells with a grid size of {gridsize} '
+            f'and k_max = {ℝ[2*π/boxsize]*sqrt(k2_max)} {unit_length}⁻¹, '
+            f'as this leaves shells thinner than the fundamental mode. '
+            f'Using {int(k_shell_max)} shells instead.'
+        )
+        n_shells = int(k_shell_max)
+        if n_shells == 0:
+            abort(f'Cannot compute bispectrum using a grid size of only {gridsize}')
+    Δk = k_shell_max/n_shells
+    # Construct array mapping k2 (grid units) to shell index
+    shell_indices = -ones(1 + k2_max, dtype=C2np['Py_ssize_t'])
+    for k2 in range(1, shell_indices.shape[0]):
+        k_magnitude = sqrt(k2)
+        if k_magnitude > k_shell_max:
+            break
+        shell_index = int(k_magnitude/Δk)
+        shell_indices[k2] = pairmin(shell_index, n_shells - 1)
+    # The |k⃗| at the shell centres (physical)
+    k_shell_centers = (arange(n_shells, dtype=C2np['double']) + 0.5)*ℝ[2*π/boxsize]*Δk
+    # Find all triplets of shells which may form closed triangles,
+    # |k⃗₁| ≤ |k⃗₂| + |k⃗₃|, given the extent of the shells.
+    triangles = asarray(
+        [
+            (shell_index_1, shell_index_2, shell_index_3)
+            for shell_index_1 in range(n_shells)
+            for shell_index_2 in range(shell_index_1 + 1)
+            for shell_index_3 in range(shell_index_2 + 1)
+            if shell_index_1 <= shell_index_2 + shell_index_3 + 1
+        ],
+        dtype=C2np['Py_ssize_t'],
+    )
+    # Cache and return result
+    bispec_bins = (shell_indices, k_shell_centers, triangles)
+    bispec_bins_cache[cache_key] = bispec_bins
+    return bispec_bins
+# Cache used by the get_bispec_bins() function
+cython.declare(bispec_bins_cache=dict)
+bispec_bins_cache = {}
+
 # Function which given a power spectrum declaration correctly populated
 # with all fields will compute its power spectrum.
 @cython.header(
@@ -385,43 +691,35 @@ def construct_k_bin_centers(k_min, k_max, binsize, gridsize, nyquist):
     components=list,
     components_str=str,
     deconvolve='bint',
-    factor='double',
     gridsize='Py_ssize_t',
     gridsizes_upstream=list,
-    im='double',
-    index='Py_ssize_t',
     interlace='bint',
     interpolation='int',
-    k2='Py_ssize_t',
-    k2_max='Py_ssize_t',
-    k_bin_indices='Py_ssize_t[::1]',
-    k_bin_indices_ptr='Py_ssize_t*',
     k_bin_index='Py_ssize_t',
-    ki='Py_ssize_t',
-    kj='Py_ssize_t',
-    kk='Py_ssize_t',
     n_modes='Py_ssize_t[::1]',
     n_modes_ptr='Py_ssize_t*',
     normalization='double',
     power='double[::1]',
-    power_ijk='double',
     power_ptr='double*',
-    re='double',
     slab='double[:, :, ::1]',
-    slab_ptr='double*',
-    θ='double',
-    returns='void',
+    slab_bin_indices='int[::1]',
+    returns='double[:, :, ::1]',
 )
 def compute_powerspec(declaration):
+    """The global Fourier space density slab used for the computation
+    is returned, for possible further use by compute_bispec().
+    """
+    # The auto power spectrum is not needed
+    # if only linear and/or cross power spectra are to be produced.
+    if not (declaration.do_data or declaration.do_plot or declaration.do_bispec):
+        return None
     # Extract some variables from the power spectrum declaration
     components    = declaration.components
     gridsize      = declaration.gridsize
     interpolation = declaration.interpolation
     deconvolve    = declaration.deconvolve
     interlace     = declaration.interlace
-    k2_max        = declaration.k2_max
-    k_bin_indices = declaration.k_bin_indices
-    k_bin_indices_ptr = cython.address(k_bin_indices[:])
+    slab_bin_indices = declaration.slab_bin_indices
     n_modes = declaration.n_modes
     if master:
         n_modes_ptr = cython.address(n_modes[:])
@@ -441,29 +739,13 @@ def compute_powerspec(declaration):
         component.powerspec_upstream_gridsize
         for component in components
     ]
-    slab = interpolate_upstream(
-        components, gridsizes_upstream, gridsize, 'ρ', interpolation,
-        deconvolve=deconvolve, interlace=interlace, output_space='Fourier',
+    slab = interpolate_density(
+        components, gridsizes_upstream, gridsize, interpolation, deconvolve, interlace,
     )
     # Nullify the reused power array
     power[:] = 0
-    # Loop over the slabs,
-    # tallying up the power in the different k² bins.
-    slab_ptr = cython.address(slab[:, :, :])
-    for index, ki, kj, kk, factor, θ in fourier_loop(
-        gridsize,
-        sparse=True,
-        skip_origin=True,
-        k2_max=k2_max,
-    ):
-        k2 = ℤ[ℤ[ℤ[kj**2] + ki**2] + kk**2]
-        # Compute the power at this k²
-        re = slab_ptr[index    ]
-        im = slab_ptr[index + 1]
-        power_ijk = re**2 + im**2
-        # Add power at this k² to the corresponding bin
-        k_bin_index = k_bin_indices_ptr[k2]
-        power_ptr[k_bin_index] += power_ijk
+    # Tally up the power in the different k² bins
+    tally_power(slab_bin_indices, slab, [slab], [power])
     # Sum power into the master process
     Reduce(
         sendbuf=(MPI.IN_PLACE if master else power),
@@ -472,7 +754,7 @@ def compute_powerspec(declaration):
     )
     # The master process now holds all the information needed
     if not master:
-        return
+        return slab
     # We need to transform power from being the sum to being the
     # mean, by dividing by n_modes.
     # To completely remove the current normalization of the power, we
@@ -495,6 +777,289 @@ def compute_powerspec(declaration):
         power_ptr[k_bin_index] *= normalization/n_modes_ptr[k_bin_index]
     # Done with the main power spectrum computation
     masterprint('done')
+    return slab
+
+# Function which given a power spectrum declaration correctly populated
+# with all fields, together with the global Fourier space density slab
+# as returned by compute_powerspec(), will compute its bispectrum.
+@cython.header(
+    # Arguments
+    declaration=object,  # PowerspecDeclaration
+    slab='double[:, :, ::1]',
+    # Locals
+    bispec='double[::1]',
+    bispec_n_triangles='double[::1]',
+    bispec_reduced='double[::1]',
+    component='Component',
+    components=list,
+    components_str=str,
+    fields=list,
+    gridsize='Py_ssize_t',
+    k2_max='Py_ssize_t',
+    n_shells='Py_ssize_t',
+    normalization='double',
+    power_1='double',
+    power_2='double',
+    power_3='double',
+    shell_index='Py_ssize_t',
+    shell_indices='Py_ssize_t[::1]',
+    shell_modes='double[::1]',
+    shell_power='double[::1]',
+    sums='double[::1]',
+    sums_unit='double[::1]',
+    triangle_index='Py_ssize_t',
+    triangles='Py_ssize_t[:, ::1]',
+    ρ_bar='double',
+    returns='void',
+)
+def compute_bispec(declaration, slab):
+    if not declaration.do_bispec:
+        return
+    # Extract some variables from the power spectrum declaration
+    components         = declaration.components
+    gridsize           = declaration.gridsize
+    k2_max             = declaration.k2_max
+    shell_indices      = declaration.bispec_shell_indices
+    n_shells           = declaration.bispec_k_centers.shape[0]
+    triangles          = declaration.bispec_triangles
+    bispec             = declaration.bispec
+    bispec_reduced     = declaration.bispec_reduced
+    bispec_n_triangles = declaration.bispec_n_triangles
+    # Begin progress message
+    if len(components) == 1:
+        component = components[0]
+        masterprint(f'Computing bispectrum of {component.name} ...')
+    else:
+        components_str = ', '.join([component.name for component in components])
+        masterprint(f'Computing bispectrum of {{{components_str}}} ...')
+    # The bispectrum is estimated as
+    #   B(k₁, k₂, k₃) = V²/ρ_bar³ ∑ₓ ρ₁(x⃗)ρ₂(x⃗)ρ₃(x⃗)/∑ₓ I₁(x⃗)I₂(x⃗)I₃(x⃗),
+    # with ρₙ(x⃗) the density filtered to only contain the modes within
+    # the k shell n and Iₙ(x⃗) the similarly filtered unit field. The
+    # sums over ∏Iₙ count the number of closed triangles within each
+    # triplet of shells, which depend on the binning only.
+    sums_unit = get_bispec_triangle_counts(gridsize, k2_max, shell_indices, n_shells, triangles)
+    fields, shell_power, shell_modes = get_bispec_shell_fields(
+        slab, gridsize, k2_max, shell_indices, n_shells,
+    )
+    sums = sum_bispec_triangles(fields, triangles)
+    free_bispec_shell_fields(gridsize, n_shells)
+    # The master process now holds all the information needed
+    if not master:
+        return
+    # Normalize the bispectrum and the power within each shell,
+    # the latter being used for the reduced bispectrum
+    #   Q(k₁, k₂, k₃) = B(k₁, k₂, k₃)/(P(k₁)P(k₂) + P(k₂)P(k₃) + P(k₃)P(k₁)).
+    # See compute_powerspec() for the normalization of the power.
+    ρ_bar = get_mean_density(components)
+    normalization = ℝ[boxsize**3]/ρ_bar**2
+    for shell_index in range(n_shells):
+        if shell_modes[shell_index] > 0:
+            shell_power[shell_index] *= normalization/shell_modes[shell_index]
+    normalization = ℝ[boxsize**6]/ρ_bar**3
+    for triangle_index in range(triangles.shape[0]):
+        bispec_n_triangles[triangle_index] = sums_unit[triangle_index]/float(gridsize)**3
+        if sums_unit[triangle_index] < 0.5*float(gridsize)**3:
+            # No closed triangles within this triplet of shells
+            bispec[triangle_index] = NaN
+            bispec_reduced[triangle_index] = NaN
+            continue
+        bispec[triangle_index] = (
+            normalization*sums[triangle_index]/sums_unit[triangle_index]
+        )
+        power_1 = shell_power[triangles[triangle_index, 0]]
+        power_2 = shell_power[triangles[triangle_index, 1]]
+        power_3 = shell_power[triangles[triangle_index, 2]]
+        bispec_reduced[triangle_index] = bispec[triangle_index]/(
+            power_1*power_2 + power_2*power_3 + power_3*power_1
+        )
+    # Done with the bispectrum computation
+    masterprint('done')
+
+# Function returning the sums over real space of products of shell
+# filtered unit fields, needed for normalizing bispectra.
+@cython.header(
+    # Arguments
+    gridsize='Py_ssize_t',
+    k2_max='Py_ssize_t',
+    shell_indices='Py_ssize_t[::1]',
+    n_shells='Py_ssize_t',
+    triangles='Py_ssize_t[:, ::1]',
+    # Locals
+    cache_key=tuple,
+    fields=list,
+    sums_unit='double[::1]',
+    returns='double[::1]',
+)
+def get_bispec_triangle_counts(gridsize, k2_max, shell_indices, n_shells, triangles):
+    # Look up in the cache
+    cache_key = (gridsize, k2_max, n_shells)
+    sums_unit = bispec_triangle_counts_cache.get(cache_key)
+    if sums_unit is not None:
+        return sums_unit
+    # Construct shell filtered unit fields and sum up their products
+    fields = get_bispec_shell_fields(None, gridsize, k2_max, shell_indices, n_shells)[0]
+    sums_unit = sum_bispec_triangles(fields, triangles)
+    free_bispec_shell_fields(gridsize, n_shells)
+    # Cache and return result
+    bispec_triangle_counts_cache[cache_key] = sums_unit
+    return sums_unit
+# Cache used by the get_bispec_triangle_counts() function
+cython.declare(bispec_triangle_counts_cache=dict)
+bispec_triangle_counts_cache = {}
+
+# Function for constructing real space fields containing only the modes
+# of a Fourier space slab within each k shell.
+@cython.header(
+    # Arguments
+    slab='double[:, :, ::1]',
+    gridsize='Py_ssize_t',
+    k2_max='Py_ssize_t',
+    shell_indices='Py_ssize_t[::1]',
+    n_shells='Py_ssize_t',
+    # Locals
+    factor='double',
+    field='double[:, :, ::1]',
+    field_ptr='double*',
+    fields=list,
+    im='double',
+    index='Py_ssize_t',
+    k2='Py_ssize_t',
+    ki='Py_ssize_t',
+    kj='Py_ssize_t',
+    kk='Py_ssize_t',
+    re='double',
+    shell_index='Py_ssize_t',
+    shell_indices_ptr='Py_ssize_t*',
+    shell_modes='double[::1]',
+    shell_power='double[::1]',
+    slab_ptr='double*',
+    unit='bint',
+    θ='double',
+    returns=tuple,
+)
+def get_bispec_shell_fields(slab, gridsize, k2_max, shell_indices, n_shells):
+    """If no slab is passed, the fields are constructed from unit modes.
+    The returned tuple contains the list of real space fields, one for
+    each shell, as well as the summed power and the number of modes
+    within each shell, the latter two residing on the master only.
+    The fields are stored in separate slab buffers, which should be
+    freed using free_bispec_shell_fields() once no longer needed.
+    """
+    unit = (slab is None)
+    if not unit:
+        slab_ptr = cython.address(slab[:, :, :])
+    shell_indices_ptr = cython.address(shell_indices[:])
+    shell_power = zeros(n_shells, dtype=C2np['double'])
+    shell_modes = zeros(n_shells, dtype=C2np['double'])
+    fields = []
+    for shell_index in range(n_shells):
+        field = get_fftw_slab(gridsize, f'slab_bispec_{shell_index}', nullify=True)
+        field_ptr = cython.address(field[:, :, :])
+        # Copy over the modes within the shell. We loop over the
+        # complete slab (no sparse iteration), ensuring that the copied
+        # modes satisfy the symmetry of a Fourier transformed real field.
+        for index, ki, kj, kk, factor, θ in fourier_loop(
+            gridsize,
+            skip_origin=True,
+            k2_max=k2_max,
+        ):
+            k2 = ℤ[ℤ[ℤ[kj**2] + ki**2] + kk**2]
+            if shell_indices_ptr[k2] != shell_index:
+                continue
+            if unit:
+                field_ptr[index] = 1
+                continue
+            re = slab_ptr[index    ]
+            im = slab_ptr[index + 1]
+            field_ptr[index    ] = re
+            field_ptr[index + 1] = im
+            shell_power[shell_index] += re**2 + im**2
+            shell_modes[shell_index] += 1
+        # Transform the shell filtered field to real space
+        fft(field, 'backward')
+        fields.append(field)
+    # Sum power and modes into the master process
+    if not unit:
+        Reduce(
+            sendbuf=(MPI.IN_PLACE if master else shell_power),
+            recvbuf=(shell_power  if master else None),
+            op=MPI.SUM,
+        )
+        Reduce(
+            sendbuf=(MPI.IN_PLACE if master else shell_modes),
+            recvbuf=(shell_modes  if master else None),
+            op=MPI.SUM,
+        )
+    return fields, shell_power, shell_modes
+
+# Function for freeing the slab buffers holding the real space fields
+# constructed by get_bispec_shell_fields().
+@cython.header(
+    # Arguments
+    gridsize='Py_ssize_t',
+    n_shells='Py_ssize_t',
+    # Locals
+    shell_index='Py_ssize_t',
+    returns='void',
+)
+def free_bispec_shell_fields(gridsize, n_shells):
+    for shell_index in range(n_shells):
+        free_fftw_slab(gridsize, f'slab_bispec_{shell_index}')
+
+# Function for summing up the products of shell filtered real space
+# fields for each triangle configuration.
+@cython.header(
+    # Arguments
+    fields=list,
+    triangles='Py_ssize_t[:, ::1]',
+    # Locals
+    field_1='double[:, :, ::1]',
+    field_1_ptr='double*',
+    field_2='double[:, :, ::1]',
+    field_2_ptr='double*',
+    field_3='double[:, :, ::1]',
+    field_3_ptr='double*',
+    gridsize='Py_ssize_t',
+    i='Py_ssize_t',
+    index='Py_ssize_t',
+    j='Py_ssize_t',
+    k='Py_ssize_t',
+    sums='double[::1]',
+    tally='double',
+    triangle_index='Py_ssize_t',
+    returns='double[::1]',
+)
+def sum_bispec_triangles(fields, triangles):
+    """The sums are only returned on the master process"""
+    sums = zeros(triangles.shape[0], dtype=C2np['double'])
+    for triangle_index in range(triangles.shape[0]):
+        field_1 = fields[triangles[triangle_index, 0]]
+        field_2 = fields[triangles[triangle_index, 1]]
+        field_3 = fields[triangles[triangle_index, 2]]
+        field_1_ptr = cython.address(field_1[:, :, :])
+        field_2_ptr = cython.address(field_2[:, :, :])
+        field_3_ptr = cython.address(field_3[:, :, :])
+        gridsize = field_1.shape[1]
+        # Loop over the local real space slab, skipping the padding
+        tally = 0
+        for i in range(ℤ[field_1.shape[0]]):
+            for j in range(gridsize):
+                index = (i*gridsize + j)*ℤ[field_1.shape[2]]
+                for k in range(gridsize):
+                    tally += (
+                          field_1_ptr[index + k]
+                        * field_2_ptr[index + k]
+                        * field_3_ptr[index + k]
+                    )
+        sums[triangle_index] = tally
+    # Sum into the master process
+    Reduce(
+        sendbuf=(MPI.IN_PLACE if master else sums),
+        recvbuf=(sums         if master else None),
+        op=MPI.SUM,
+    )
+    return sums
 
 # Function which given a power spectrum declaration correctly populated
 # with all fields will compute its linear CLASS power spectrum.
@@ -529,6 +1094,117 @@ def compute_powerspec_linear(declaration):
     # Done with the linear power spectrum computation
     masterprint('done')
 
+# Function which given a power spectrum declaration correctly populated
+# with all fields will compute the cross power spectra between each
+# pair of its components.
+@cython.header(
+    # Arguments
+    declaration=object,  # PowerspecDeclaration
+    # Locals
+    component='Component',
+    component_index='Py_ssize_t',
+    component_index_other='Py_ssize_t',
+    components=list,
+    components_str=str,
+    deconvolve='bint',
+    gridsize='Py_ssize_t',
+    interlace='bint',
+    interpolation='int',
+    k_bin_index='Py_ssize_t',
+    n_modes='Py_ssize_t[::1]',
+    normalization='double',
+    pair_index='Py_ssize_t',
+    pairs=list,
+    power_cross='double[:, ::1]',
+    slab='double[:, :, ::1]',
+    slab_bin_indices='int[::1]',
+    slabs=list,
+    returns='void',
+)
+def compute_powerspec_cross(declaration):
+    if not declaration.do_cross:
+        return
+    # Extract some variables from the power spectrum declaration
+    components    = declaration.components
+    gridsize      = declaration.gridsize
+    interpolation = declaration.interpolation
+    deconvolve    = declaration.deconvolve
+    interlace     = declaration.interlace
+    slab_bin_indices = declaration.slab_bin_indices
+    n_modes       = declaration.n_modes
+    power_cross   = declaration.power_cross
+    # Begin progress message
+    components_str = ', '.join([component.name for component in components])
+    masterprint(f'Computing cross power spectra of {{{components_str}}} ...')
+    # Nullify the reused cross power array
+    power_cross[...] = 0
+    # Interpolate the physical density of each component in turn,
+    # tallying up the cross power with all of the previous components
+    # in the different k² bins in a single sweep. The cross power is
+    # given by the real part of ρ₁ρ₂*. As the global slabs are reused
+    # for each interpolation, a copy is kept of all but the
+    # last density.
+    pairs = list(itertools.combinations(range(len(components)), 2))
+    slabs = []
+    for component_index in range(len(components)):
+        component = components[component_index]
+        slab = interpolate_density(
+            [component],
+            [component.powerspec_upstream_gridsize],
+            gridsize, interpolation, deconvolve, interlace,
+        )
+        tally_power(
+            slab_bin_indices,
+            slab,
+            slabs,
+            [
+                power_cross[pairs.index((component_index_other, component_index))]
+                for component_index_other in range(component_index)
+            ],
+        )
+        if component_index < len(components) - 1:
+            slabs.append(asarray(slab).copy())
+    # Sum cross power into the master process
+    Reduce(
+        sendbuf=(MPI.IN_PLACE if master else power_cross),
+        recvbuf=(power_cross  if master else None),
+        op=MPI.SUM,
+    )
+    # The master process now holds all the information needed
+    if not master:
+        return
+    # Normalize as in compute_powerspec(), though now using the product
+    # of the mean densities of the two components.
+    for pair_index in range(len(pairs)):
+        component_index_other, component_index = pairs[pair_index]
+        normalization = ℝ[boxsize**3]/(
+              get_mean_density([components[component_index_other]])
+            * get_mean_density([components[component_index]])
+        )
+        for k_bin_index in range(power_cross.shape[1]):
+            power_cross[pair_index, k_bin_index] *= normalization/n_modes[k_bin_index]
+    # Done with the cross power spectra computation
+    masterprint('done')
+
+# Function returning the mean physical density
+#   ρ_bar = a**(-3(1 + w_eff))*ϱ_bar,
+# summed over the passed components.
+@cython.header(
+    # Arguments
+    components=list,
+    # Locals
+    a='double',
+    component='Component',
+    ρ_bar='double',
+    returns='double',
+)
+def get_mean_density(components):
+    a = universals.a
+    ρ_bar = 0
+    for component in components:
+        ρ_bar += a**(-3*(1 + component.w_eff(a=a)))*component.ϱ_bar
+    return ρ_bar
+
 # Function for saving already computed power spectra
 # to a single text file.
 @cython.header(
@@ -573,16 +1249,7 @@ def save_powerspec(declarations, filename):
         declaration.significant_figures
         for declaration in declarations
     ])
-    topline = unicode(
-        f'Power {spectrum_plural} from CO𝘕CEPT job {jobid} at t = '
-        + f'{{:.{header_significant_figures}g}} '.format(universals.t)
-        + f'{unit_time}'
-        + (
-            f', a = ' + f'{{:.{header_significant_figures}g}}'.format(universals.a)
-            if enable_Hubble else ''
-        )
-        + '.'
-    )
+    topline = get_powerspec_topline(f'Power {spectrum_plural}', header_significant_figures)
     # The output data consists of a "k" column and a "modes" column for
     # each group, along with a "power" column for each power spectrum
     # and possibly another "power" if the linear power spectrum should
@@ -648,6 +1315,227 @@ def save_powerspec(declarations, filename):
     )
     masterprint('done')
 
+# Function for saving already computed cross power spectra,
+# one text file for each power spectrum declaration.
+@cython.header(
+    # Arguments
+    declarations=list,
+    filename=str,
+    # Locals
+    component='Component',
+    components=list,
+    data='double[:, ::1]',
+    declaration=object,  # PowerspecDeclaration
+    filename_cross=str,
+    headings=list,
+    pairs=list,
+    returns='void',
+)
+def save_powerspec_cross(declarations, filename):
+    if not master:
+        return
+    for declaration in declarations:
+        if not declaration.do_cross:
+            continue
+        components = declaration.components
+        filename_cross = augment_filename(
+            filename,
+            'cross_' + '_'.join([component.name.replace(' ', '-') for component in components]),
+        )
+        masterprint(f'Saving cross power spectra to "{filename_cross}" ...')
+        # The output data consists of a "k" column, a "modes" column
+        # and a "power" column for each pair of components.
+        pairs = list(itertools.combinations(range(len(components)), 2))
+        headings = [
+            unicode(f'k [{unit_length}⁻¹]'),
+            'modes',
+            *[
+                unicode(f'power {component_indices[0]}×{component_indices[1]} [{unit_length}³]')
+                for component_indices in pairs
+            ],
+        ]
+        data = empty((declaration.k_bin_centers.shape[0], len(headings)), dtype=C2np['double'])
+        asarray(data)[:, 0] = declaration.k_bin_centers
+        asarray(data)[:, 1] = declaration.n_modes
+        asarray(data)[:, 2:] = asarray(declaration.power_cross).T
+        save_powerspec_table(
+            filename_cross,
+            get_powerspec_topline('Cross power spectra', declaration.significant_figures),
+            get_component_mapping(components),
+            headings,
+            data,
+            declaration.significant_figures,
+            {1},
+        )
+        masterprint('done')
+
+# Function for saving already computed bispectra,
+# one text file for each power spectrum declaration.
+@cython.header(
+    # Arguments
+    declarations=list,
+    filename=str,
+    # Locals
+    component='Component',
+    components=list,
+    data='double[:, ::1]',
+    declaration=object,  # PowerspecDeclaration
+    dim='int',
+    filename_bispec=str,
+    headings=list,
+    k_shell_centers='double[::1]',
+    triangle_index='Py_ssize_t',
+    triangles='Py_ssize_t[:, ::1]',
+    Δk='double',
+    returns='void',
+)
+def save_bispec(declarations, filename):
+    if not master:
+        return
+    for declaration in declarations:
+        if not declaration.do_bispec:
+            continue
+        components = declaration.components
+        filename_bispec = augment_filename(
+            filename,
+            'bispec_' + '_'.join([component.name.replace(' ', '-') for component in components]),
+        )
+        masterprint(f'Saving bispectrum to "{filename_bispec}" ...')
+        # The output data consists of a "k" column for each of the three
+        # shells of a triangle configuration, a "triangles" column
+        # holding the number of triangles within the shells, a
+        # "bispectrum" column and a "reduced bispectrum" column.
+        k_shell_centers = declaration.bispec_k_centers
+        triangles = declaration.bispec_triangles
+        headings = [
+            *[unicode(f'k{unicode_subscript(str(dim + 1))} [{unit_length}⁻¹]') for dim in range(3)],
+            'triangles',
+            unicode(f'bispectrum [{unit_length}⁶]'),
+            'reduced bispectrum',
+        ]
+        data = empty((triangles.shape[0], len(headings)), dtype=C2np['double'])
+        for triangle_index in range(triangles.shape[0]):
+            for dim in range(3):
+                data[triangle_index, dim] = k_shell_centers[triangles[triangle_index, dim]]
+        asarray(data)[:, 3] = np.round(declaration.bispec_n_triangles)
+        asarray(data)[:, 4] = declaration.bispec
+        asarray(data)[:, 5] = declaration.bispec_reduced
+        # The first shell begins at k = 0
+        Δk = 2*k_shell_centers[0]
+        save_powerspec_table(
+            filename_bispec,
+            get_powerspec_topline('Bispectrum', declaration.significant_figures),
+            [
+                *get_component_mapping(components),
+                unicode(
+                    f'The k shells have a width of {{:.{declaration.significant_figures}g}} '
+                    .format(Δk) + f'{unit_length}⁻¹. No shot noise has been subtracted.'
+                ),
+                '',
+            ],
+            headings,
+            data,
+            declaration.significant_figures,
+            {3},
+        )
+        masterprint('done')
+
+# Function returning the top line of the header of power spectrum
+# data files, stating general information.
+@cython.header(
+    # Arguments
+    description=str,
+    significant_figures='int',
+    returns=str,
+)
+def get_powerspec_topline(description, significant_figures):
+    return unicode(
+        f'{description} from CO𝘕CEPT job {jobid} at t = '
+        + f'{{:.{significant_figures}g}} '.format(universals.t)
+        + f'{unit_time}'
+        + (
+            f', a = ' + f'{{:.{significant_figures}g}}'.format(universals.a)
+            if enable_Hubble else ''
+        )
+        + '.'
+    )
+
+# Function returning header lines mapping each of the passed components
+# to a number, for use within power spectrum data files.
+@cython.header(
+    # Arguments
+    components=list,
+    # Locals
+    component='Component',
+    i='Py_ssize_t',
+    lines=list,
+    longest_name_size='Py_ssize_t',
+    returns=list,
+)
+def get_component_mapping(components):
+    longest_name_size = np.max([len(component.name) for component in components])
+    lines = ['', 'Below, the following component mapping is used:']
+    for i, component in enumerate(components):
+        lines.append(f'  {{:<{longest_name_size + 1}}} {i}'.format(f'{component.name}:'))
+    lines.append('')
+    return lines
+
+# Function for saving tabulated power spectrum statistics other than
+# the auto power spectra, as well as halo catalogues, to a text file,
+# with aligned column headings.
+@cython.header(
+    # Arguments
+    filename=str,
+    topline=str,
+    header_lines=list,
+    headings=list,
+    data='double[:, ::1]',
+    significant_figures='int',
+    integer_columns=set,
+    # Locals
+    col='Py_ssize_t',
+    columns_heading=list,
+    delimiter=str,
+    extra_spacing='Py_ssize_t',
+    fmt=list,
+    heading=str,
+    n_chars_nonsignificant='Py_ssize_t',
+    width='Py_ssize_t',
+    width_float='Py_ssize_t',
+    returns='void',
+)
+def save_powerspec_table(
+    filename, topline, header_lines, headings, data, significant_figures, integer_columns,
+):
+    n_chars_nonsignificant = len(f'{1e+100:.1e}') - 2
+    width_float = significant_figures + n_chars_nonsignificant
+    columns_heading = []
+    fmt = []
+    for col, heading in enumerate(headings):
+        # The first column heading is shifted by the comment
+        # character and space of the header.
+        if col in integer_columns:
+            width = pairmax(
+                len(str(int(np.max(data[:, col], initial=0)))),
+                len(heading) + 2*(col == 0),
+            )
+            fmt.append(f'%{width}u')
+        else:
+            width = pairmax(width_float, len(heading) + 2*(col == 0))
+            fmt.append(f'%-{width}.{significant_figures - 1}e')
+        extra_spacing = width - len(heading) - 2*(col == 0)
+        columns_heading.append(
+            ' '*(extra_spacing//2) + heading + ' '*(extra_spacing - extra_spacing//2)
+        )
+    delimiter = ' '*2
+    np.savetxt(
+        filename,
+        data,
+        fmt=fmt,
+        delimiter=delimiter,
+        header='\n'.join([topline, *header_lines, delimiter.join(columns_heading)]),
+    )
+
 # Pure Python function for generating the header for a power spectrum
 # data file, given a list of power spectrum declarations.
 def get_powerspec_header(declarations):
@@ -946,6 +1834,911 @@ def compute_powerspec_σ(declaration, linear=False):
 cython.declare(σ2_integrand_arr=object)
 σ2_integrand_arr = empty(1, dtype=C2np['double'])
 
+# Function for computing the real-space two-point correlation function
+# of the (particle) components selected by corrfunc_select,
+# saving it to a text file for each.
+@cython.pheader(
+    # Arguments
+    components=list,
+    filename=str,
+    # Locals
+    bins='Py_ssize_t',
+    component='Component',
+    components_selected=list,
+    counts='Py_ssize_t[::1]',
+    data='double[:, ::1]',
+    domain_size_min='double',
+    filename_component=str,
+    headings=list,
+    pairs_random=object,  # np.ndarray
+    r_edges=object,  # np.ndarray
+    rmax='double',
+    rmin='double',
+    significant_figures='int',
+    returns='void',
+)
+def corrfunc(components, filename):
+    # Do not compute any correlation functions if corrfunc_select
+    # does not contain any True values.
+    if not any(corrfunc_select.values()):
+        return
+    components_selected = [
+        component
+        for component in components
+        if component.representation == 'particles' and is_selected(component, corrfunc_select)
+    ]
+    if not components_selected:
+        return
+    rmin = corrfunc_options['rmin']
+    rmax = corrfunc_options['rmax']
+    bins = corrfunc_options['bins']
+    # Unless specified by the user, the tile size
+    # used for the pair counting is set to rmax. As three tiles are
+    # needed across each domain, rmax cannot exceed a third of
+    # a domain.
+    domain_size_min = np.min(boxsize/asarray(domain_subdivisions))
+    if rmax > domain_size_min/3:
+        abort(
+            f'corrfunc_options["rmax"] = {rmax} {unit_length} exceeds a third of '
+            f'the smallest domain size ({domain_size_min} {unit_length}). '
+            f'Either lower rmax or run with fewer processes.'
+        )
+    if shortrange_params['corrfunc']['tilesize'] == -1:
+        shortrange_params['corrfunc']['tilesize'] = rmax
+    if rmax > shortrange_params['corrfunc']['tilesize']:
+        abort(
+            f'corrfunc_options["rmax"] = {rmax} {unit_length} exceeds '
+            f'shortrange_params["corrfunc"]["tilesize"] = '
+            f'{shortrange_params["corrfunc"]["tilesize"]} {unit_length}'
+        )
+    # Logarithmic bins in pair separation
+    r_edges = logspace(log10(rmin), log10(rmax), bins + 1)
+    for component in components_selected:
+        counts = count_pairs(component)
+        if not master:
+            continue
+        # With the particles of a periodic box, the expected number of
+        # pairs within a separation bin is known analytically, and so
+        # the correlation function is found using the natural estimator
+        # ξ = DD/RR - 1, with DD the counted and RR the expected number
+        # of pairs.
+        pairs_random = (
+            0.5*component.N*(component.N - 1)
+            *(4*π/3)*np.diff(r_edges**3)/boxsize**3
+        )
+        data = empty((bins, 3), dtype=C2np['double'])
+        asarray(data)[:, 0] = np.sqrt(r_edges[:bins]*r_edges[1:])
+        asarray(data)[:, 1] = counts
+        asarray(data)[:, 2] = asarray(counts)/pairs_random - 1
+        filename_component = augment_filename(filename, component.name.replace(' ', '-'))
+        masterprint(f'Saving correlation function to "{filename_component}" ...')
+        significant_figures = 6
+        headings = [f'r [{unit_length}]', 'pairs', unicode('ξ')]
+        save_powerspec_table(
+            filename_component,
+            get_powerspec_topline(
+                f'Two-point correlation function of {component.name}', significant_figures,
+            ),
+            [
+                (
+                    f'Pairs counted within {bins} logarithmic bins between '
+                    f'{rmin} {unit_length} and {rmax} {unit_length}, '
+                    f'for {component.N} particles.'
+                ),
+                '',
+            ],
+            headings,
+            data,
+            significant_figures,
+            {1},
+        )
+        masterprint('done')
+
+# Function for counting up all pairs of particles within a component
+# within logarithmic bins in separation, as specified by
+# corrfunc_options. The pairs are counted at the tile level using the
+# short-range interaction machinery, registered as the 'corrfunc'
+# interaction. The pair counts are returned on the master process.
+@cython.pheader(
+    # Arguments
+    component='Component',
+    # Locals
+    lowest_active_rung='signed char',
+    returns='Py_ssize_t[::1]',
+)
+def count_pairs(component):
+    global corrfunc_counts
+    masterprint(f'Counting particle pairs of {component.name} ...')
+    corrfunc_counts = zeros(corrfunc_options['bins'], dtype=C2np['Py_ssize_t'])
+    # As all particles should be counted regardless of their rung,
+    # every populated rung is temporarily marked as active.
+    lowest_active_rung = component.lowest_active_rung
+    component.lowest_active_rung = component.lowest_populated_rung
+    component_component(
+        'corrfunc', [component], [component], corrfunc_pairwise, {}, 'tile',
+    )
+    component.lowest_active_rung = lowest_active_rung
+    # Sum up the pair counts into the master process
+    Reduce(
+        sendbuf=(MPI.IN_PLACE if master else corrfunc_counts),
+        recvbuf=(corrfunc_counts if master else None),
+        op=MPI.SUM,
+    )
+    masterprint('done')
+    return corrfunc_counts
+# Global pair counts used by the above function
+cython.declare(corrfunc_counts='Py_ssize_t[::1]')
+corrfunc_counts = None
+cython.declare(corrfunc_factors='double*')
+corrfunc_factors = malloc(N_rungs*sizeof('double'))  # required by particle_particle() but not used
+
+# Function implementing pair counting as a pairwise
+# short-range interaction.
+@cython.header(
+    # Arguments
+    interaction_name=str,
+    receiver='Component',
+    supplier='Component',
+    ᔑdt_rungs=dict,
+    rank_supplier='int',
+    only_supply='bint',
+    pairing_level=str,
+    tile_indices_receiver='Py_ssize_t[::1]',
+    tile_indices_supplier_paired='Py_ssize_t**',
+    tile_indices_supplier_paired_N='Py_ssize_t*',
+    extra_args=dict,
+    # Locals
+    apply_to_i='bint',
+    apply_to_j='bint',
+    bin_index='Py_ssize_t',
+    bins='Py_ssize_t',
+    bins_per_log='double',
+    counts_ptr='Py_ssize_t*',
+    factor_i='double',
+    indexᵖ_j='Py_ssize_t',
+    indexˣ_i='Py_ssize_t',
+    indexˣ_j='Py_ssize_t',
+    log_rmin='double',
+    particle_particle_t_begin='double',
+    periodic_offset_x='double',
+    periodic_offset_y='double',
+    periodic_offset_z='double',
+    r2='double',
+    rmax='double',
+    rmax2='double',
+    rmin='double',
+    rmin2='double',
+    rung_index_i='signed char',
+    rung_index_s='signed char',
+    subtile_contain_jumping_s='bint',
+    subtiling_r='Tiling',
+    x_ji='double',
+    y_ji='double',
+    z_ji='double',
+    returns='void',
+)
+def corrfunc_pairwise(
+    interaction_name, receiver, supplier, ᔑdt_rungs, rank_supplier, only_supply, pairing_level,
+    tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
+    extra_args,
+):
+    rmin = corrfunc_options['rmin']
+    rmax = corrfunc_options['rmax']
+    bins = corrfunc_options['bins']
+    rmin2 = rmin**2
+    rmax2 = rmax**2
+    log_rmin = log(rmin)
+    bins_per_log = bins/log(rmax/rmin)
+    counts_ptr = cython.address(corrfunc_counts[:])
+    # Loop over all (receiver, supplier) particle pairs (i, j).
+    # With all rungs active and only_supply False,
+    # each pair is visited exactly once.
+    for indexˣ_i, indexᵖ_j, indexˣ_j, rung_index_i, rung_index_s, x_ji, y_ji, z_ji, periodic_offset_x, periodic_offset_y, periodic_offset_z, apply_to_i, apply_to_j, factor_i, subtile_contain_jumping_s, particle_particle_t_begin, subtiling_r in particle_particle(
+        receiver, supplier, pairing_level,
+        tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
+        rank_supplier, interaction_name, only_supply, corrfunc_factors, forcerange=rmax,
+    ):
+        # Translate coordinates so that they
+        # correspond to the nearest image.
+        with unswitch(6):
+            if periodic_offset_x or periodic_offset_y or periodic_offset_z:
+                x_ji += periodic_offset_x
+                y_ji += periodic_offset_y
+                z_ji += periodic_offset_z
+        r2 = x_ji**2 + y_ji**2 + z_ji**2
+        if r2 < rmin2 or r2 >= rmax2:
+            continue
+        bin_index = int((0.5*log(r2) - log_rmin)*bins_per_log)
+        if bin_index >= bins:
+            # Rounding error at the upper edge
+            bin_index = bins - 1
+        counts_ptr[bin_index] += 1
+
+# Function for finding friends-of-friends halos within the
+# (particle) components selected by halos_select,
+# saving a halo catalogue for each.
+@cython.header(
+    # Arguments
+    components=list,
+    filename=str,
+    # Locals
+    component='Component',
+    returns='void',
+)
+def halos(components, filename):
+    for component in get_halo_components(components, halos_select):
+        save_halos(component, get_halo_catalogue(component), filename)
+
+# Function for computing the halo mass function of the
+# (particle) components selected by hmf_select,
+# saving it to a text file for each.
+@cython.pheader(
+    # Arguments
+    components=list,
+    filename=str,
+    # Locals
+    bins_N='Py_ssize_t',
+    catalogue='double[:, ::1]',
+    component='Component',
+    counts=object,  # np.ndarray
+    data='double[:, ::1]',
+    headings=list,
+    mass_edges=object,  # np.ndarray
+    mass_min='double',
+    significant_figures='int',
+    returns='void',
+)
+def hmf(components, filename):
+    for component in get_halo_components(components, hmf_select):
+        catalogue = get_halo_catalogue(component)
+        if not master:
+            continue
+        # Logarithmic mass bins, starting at the smallest possible
+        # halo mass and extending to include the most massive halo.
+        mass_min = halo_options['min members']*get_halo_particle_mass(component)
+        bins_N = 0
+        if catalogue.shape[0] > 0:
+            bins_N = pairmax(1, int(ceil(
+                log10(catalogue[0, 0]/mass_min*(1 + machine_ϵ))
+                *halo_options['bins per decade']
+            )))
+        mass_edges = mass_min*10**(
+            arange(bins_N + 1, dtype=C2np['double'])/halo_options['bins per decade']
+        )
+        counts = np.histogram(asarray(catalogue)[:, 0], bins=mass_edges)[0]
+        # Tabulate the bin centres, the number of halos in each bin,
+        # the differential mass function dn/dlog₁₀M and the
+        # cumulative mass function n(>M) at the lower bin edges.
+        data = empty((bins_N, 4), dtype=C2np['double'])
+        asarray(data)[:, 0] = np.sqrt(mass_edges[:bins_N]*mass_edges[1:])
+        asarray(data)[:, 1] = counts
+        asarray(data)[:, 2] = counts*(halo_options['bins per decade']/boxsize**3)
+        asarray(data)[:, 3] = np.cumsum(counts[::-1])[::-1]/boxsize**3
+        filename_component = augment_filename(filename, component.name.replace(' ', '-'))
+        masterprint(f'Saving halo mass function to "{filename_component}" ...')
+        significant_figures = 6
+        headings = [
+            f'mass [{unit_mass}]',
+            'halos',
+            unicode(f'dn/dlog₁₀M [{unit_length}⁻³]'),
+            unicode(f'n(>M) [{unit_length}⁻³]'),
+        ]
+        save_powerspec_table(
+            filename_component,
+            get_powerspec_topline(
+                f'Friends-of-friends halo mass function of {component.name}',
+                significant_figures,
+            ),
+            get_halo_header_lines(catalogue),
+            headings,
+            data,
+            significant_figures,
+            {1},
+        )
+        masterprint('done')
+
+# Function returning the (particle) components selected for halo
+# finding by the passed selection. The first time this is called,
+# the tile size used for friends-of-friends linking is set up.
+@cython.header(
+    # Arguments
+    components=list,
+    select=dict,
+    # Locals
+    component='Component',
+    components_fof=list,
+    linking_length_max='double',
+    spacing_min='double',
+    returns=list,
+)
+def get_halo_components(components, select):
+    if not any(select.values()):
+        return []
+    # Unless specified by the user, the tile size of the
+    # friends-of-friends tiling is set to three mean interparticle
+    # spacings of the most finely resolved component, though at least
+    # the largest linking length and at most a third of a domain,
+    # as three tiles are needed across each domain. All components
+    # that are to be searched for halos at some point are considered.
+    if shortrange_params['fof']['tilesize'] == -1:
+        components_fof = [
+            component
+            for component in components
+            if component.representation == 'particles' and (
+                is_selected(component, halos_select) or is_selected(component, hmf_select)
+            )
+        ]
+        linking_length_max = 0
+        spacing_min = ထ
+        for component in components_fof:
+            linking_length_max = pairmax(linking_length_max, get_linking_length(component))
+            spacing_min = pairmin(spacing_min, boxsize/cbrt(component.N))
+        shortrange_params['fof']['tilesize'] = pairmax(
+            linking_length_max,
+            pairmin(3*spacing_min, np.min(boxsize/asarray(domain_subdivisions))/3),
+        )
+    return [
+        component
+        for component in components
+        if component.representation == 'particles' and is_selected(component, select)
+    ]
+
+# Function returning the halo catalogue of a component at the current
+# time, as computed by find_halos(). Catalogues are cached so that the
+# halos are only found once when several halo outputs are produced at
+# the same time.
+@cython.header(
+    # Arguments
+    component='Component',
+    # Locals
+    catalogue='double[:, ::1]',
+    returns='double[:, ::1]',
+)
+def get_halo_catalogue(component):
+    global halo_catalogues_time
+    if halo_catalogues_time != universals.t:
+        halo_catalogues_cache.clear()
+        halo_catalogues_time = universals.t
+    catalogue = halo_catalogues_cache.get(component)
+    if catalogue is None:
+        catalogue = find_halos(component)
+        halo_catalogues_cache[component] = catalogue
+    return catalogue
+# Cache used by the above function
+cython.declare(halo_catalogues_cache=dict, halo_catalogues_time='double')
+halo_catalogues_cache = {}
+halo_catalogues_time = -1
+
+# Function returning the particle mass of a component at the current
+# time, taking possible decay into account.
+@cython.header(
+    # Arguments
+    component='Component',
+    returns='double',
+)
+def get_halo_particle_mass(component):
+    return universals.a**(-3*component.w_eff(a=universals.a))*component.mass
+
+# Function returning the header lines of halo output files
+@cython.header(
+    # Arguments
+    catalogue='double[:, ::1]',
+    returns=list,
+)
+def get_halo_header_lines(catalogue):
+    return [
+        (
+            f'Linking length: {halo_options["linking length"]} times the mean '
+            f'interparticle spacing. Minimum number of members: '
+            f'{halo_options["min members"]}. Halos found: {catalogue.shape[0]}.'
+        ),
+        '',
+    ]
+
+# Function returning the comoving friends-of-friends linking length
+# of a component, given as a fraction of the mean
+# interparticle spacing.
+@cython.header(
+    # Arguments
+    component='Component',
+    returns='double',
+)
+def get_linking_length(component):
+    return halo_options['linking length']*boxsize/cbrt(component.N)
+
+# Function for finding friends-of-friends halos of a particle component.
+# The particles are linked at the tile level using the short-range
+# interaction machinery, registered as the 'fof' interaction.
+# Groups spanning several domains are joined up afterwards.
+# The halo catalogue is returned on the master process, with each row
+# storing the mass, member count, position and (peculiar) velocity of
+# a halo. The halos are sorted according to decreasing member count.
+@cython.pheader(
+    # Arguments
+    component='Component',
+    # Locals
+    N_local='Py_ssize_t',
+    catalogue='double[:, ::1]',
+    count='Py_ssize_t',
+    counts='Py_ssize_t[::1]',
+    dim='int',
+    group_index='Py_ssize_t',
+    group_indices='Py_ssize_t[::1]',
+    groups_N='Py_ssize_t',
+    halo_index='Py_ssize_t',
+    indexᵖ='Py_ssize_t',
+    indexˣ='Py_ssize_t',
+    label='Py_ssize_t',
+    label_offset='Py_ssize_t',
+    label_roots=dict,
+    linking_length='double',
+    lowest_active_rung='signed char',
+    mass='double',
+    min_members='Py_ssize_t',
+    mom='double*',
+    partial_index='Py_ssize_t',
+    partials='double[:, ::1]',
+    partials_all=list,
+    pos='double*',
+    root='Py_ssize_t',
+    rootˣ='Py_ssize_t',
+    sums='double[:, ::1]',
+    Δpos='double',
+    returns='double[:, ::1]',
+)
+def find_halos(component):
+    global fof_domain_pair_nr, fof_links_N, fof_parent, fof_parent_size
+    masterprint(f'Finding halos of {component.name} ...')
+    N_local = component.N_local
+    pos = component.pos
+    mom = component.mom
+    linking_length = get_linking_length(component)
+    if linking_length > shortrange_params['fof']['tilesize']:
+        abort(
+            f'The linking length of {component.name} ({linking_length} {unit_length}) '
+            f'exceeds shortrange_params["fof"]["tilesize"] = '
+            f'{shortrange_params["fof"]["tilesize"]} {unit_length}'
+        )
+    # Each particle starts out in a group of its own
+    if fof_parent_size < N_local:
+        fof_parent_size = N_local
+        fof_parent = realloc(fof_parent, fof_parent_size*sizeof('Py_ssize_t'))
+    for indexᵖ in range(N_local):
+        fof_parent[indexᵖ] = indexᵖ
+    # Link up all particle pairs closer than the linking length.
+    # Pairs of local particles are joined up directly, while links to
+    # particles of other domains are recorded by link_fof().
+    # As all particles should be considered regardless of their rung,
+    # every populated rung is temporarily marked as active.
+    fof_links_N = 0
+    fof_domain_pair_nr = 0
+    lowest_active_rung = component.lowest_active_rung
+    component.lowest_active_rung = component.lowest_populated_rung
+    component_component(
+        'fof', [component], [component], link_fof, {}, 'tile',
+        {'linking length': linking_length},
+    )
+    component.lowest_active_rung = lowest_active_rung
+    # Let each particle point directly to the root of its local group
+    for indexᵖ in range(N_local):
+        fof_parent[indexᵖ] = find_fof_root(indexᵖ)
+    # The global label of a local group is the index of its root
+    # particle, offset by the number of particles on lower ranks.
+    label_offset = sum(allgather(N_local)[:rank])
+    # Join up groups across domains
+    label_roots = join_fof_groups(component, label_offset)
+    # Count up the members of each local group
+    counts = zeros(N_local, dtype=C2np['Py_ssize_t'])
+    for indexᵖ in range(N_local):
+        counts[fof_parent[indexᵖ]] += 1
+    # Only local groups large enough to be halos on their own or
+    # which are to be joined with groups on other domains are kept.
+    # These are enumerated by group_indices.
+    min_members = halo_options['min members']
+    group_indices = empty(N_local, dtype=C2np['Py_ssize_t'])
+    groups_N = 0
+    for indexᵖ in range(N_local):
+        group_indices[indexᵖ] = -1
+        if fof_parent[indexᵖ] != indexᵖ:
+            continue
+        if counts[indexᵖ] < min_members and (label_offset + indexᵖ) not in label_roots:
+            continue
+        group_indices[indexᵖ] = groups_N
+        groups_N += 1
+    # Sum up positions (relative to the root particle, taking the
+    # periodicity into account) and momenta of the kept groups.
+    sums = zeros((groups_N, 6), dtype=C2np['double'])
+    for indexᵖ in range(N_local):
+        root = fof_parent[indexᵖ]
+        group_index = group_indices[root]
+        if group_index == -1:
+            continue
+        indexˣ = 3*indexᵖ
+        rootˣ = 3*root
+        for dim in range(3):
+            Δpos = pos[indexˣ + dim] - pos[rootˣ + dim]
+            if Δpos > ℝ[0.5*boxsize]:
+                Δpos -= boxsize
+            elif Δpos < ℝ[-0.5*boxsize]:
+                Δpos += boxsize
+            sums[group_index, dim] += Δpos
+            sums[group_index, 3 + dim] += mom[indexˣ + dim]
+    # Store the partial halo information of the kept local groups
+    # as rows of label, member count, mean position and total momentum.
+    partials = empty((groups_N, 8), dtype=C2np['double'])
+    for indexᵖ in range(N_local):
+        group_index = group_indices[indexᵖ]
+        if group_index == -1:
+            continue
+        label = label_offset + indexᵖ
+        count = counts[indexᵖ]
+        partials[group_index, 0] = label_roots.get(label, label)
+        partials[group_index, 1] = count
+        for dim in range(3):
+            partials[group_index, 2 + dim] = (
+                pos[3*indexᵖ + dim] + sums[group_index, dim]*ℝ[1/count]
+            )
+            partials[group_index, 5 + dim] = sums[group_index, 3 + dim]
+    # Combine the partial halos on the master process.
+    # The catalogue is left empty on the slave processes.
+    partials_all = gather(asarray(partials))
+    if not master:
+        return empty((0, 8), dtype=C2np['double'])
+    partials = np.concatenate(partials_all)
+    partials = partials[np.argsort(partials[:, 0], kind='stable')]
+    catalogue = empty((partials.shape[0], 8), dtype=C2np['double'])
+    halo_index = -1
+    label = -1
+    for partial_index in range(partials.shape[0]):
+        if partials[partial_index, 0] != label:
+            # New halo, positioned relative
+            # to its first partial halo.
+            label = int(partials[partial_index, 0])
+            halo_index += 1
+            catalogue[halo_index, 1] = partials[partial_index, 1]
+            for dim in range(3):
+                catalogue[halo_index, 2 + dim] = (
+                    partials[partial_index, 1]*partials[partial_index, 2 + dim]
+                )
+                catalogue[halo_index, 5 + dim] = partials[partial_index, 5 + dim]
+            continue
+        # Add partial halo to existing halo
+        count = int(partials[partial_index, 1])
+        for dim in range(3):
+            Δpos = (
+                partials[partial_index, 2 + dim]
+                - catalogue[halo_index, 2 + dim]/catalogue[halo_index, 1]
+            )
+            if Δpos > ℝ[0.5*boxsize]:
+                Δpos -= boxsize
+            elif Δpos < ℝ[-0.5*boxsize]:
+                Δpos += boxsize
+            catalogue[halo_index, 2 + dim] += count*(
+                catalogue[halo_index, 2 + dim]/catalogue[halo_index, 1] + Δpos
+            )
+            catalogue[halo_index, 5 + dim] += partials[partial_index, 5 + dim]
+        catalogue[halo_index, 1] += count
+    catalogue = catalogue[:halo_index + 1]
+    # Only keep halos with enough members
+    catalogue = asarray(catalogue)[asarray(catalogue)[:, 1] >= min_members]
+    # Convert to masses, mean positions (within the box) and
+    # mean peculiar velocities. With mom = a²mẋ, the peculiar velocity
+    # is u = aẋ = mom/(a*m). The particle mass at time a is
+    # a**(-3*w_eff)*mass in the case of decaying particles.
+    mass = get_halo_particle_mass(component)
+    for halo_index in range(catalogue.shape[0]):
+        count = int(catalogue[halo_index, 1])
+        catalogue[halo_index, 0] = count*mass
+        for dim in range(3):
+            catalogue[halo_index, 2 + dim] = mod(catalogue[halo_index, 2 + dim]/count, boxsize)
+            catalogue[halo_index, 5 + dim] *= ℝ[1/(universals.a*mass)]/count
+    catalogue = asarray(catalogue)[np.argsort(-asarray(catalogue)[:, 1], kind='stable')]
+    masterprint('done')
+    return catalogue
+# Global arrays and counters used by the
+# friends-of-friends halo finder.
+cython.declare(
+    fof_domain_pair_nr='Py_ssize_t',
+    fof_factors='double*',
+    fof_links='Py_ssize_t*',
+    fof_links_N='Py_ssize_t',
+    fof_links_size='Py_ssize_t',
+    fof_parent='Py_ssize_t*',
+    fof_parent_size='Py_ssize_t',
+)
+fof_domain_pair_nr = 0
+fof_factors = malloc(N_rungs*sizeof('double'))  # required by particle_particle() but not used
+fof_links_N = 0
+fof_links_size = 1
+fof_links = malloc(3*fof_links_size*sizeof('Py_ssize_t'))
+fof_parent_size = 1
+fof_parent = malloc(fof_parent_size*sizeof('Py_ssize_t'))
+
+# Function for finding the root of the local friends-of-friends group
+# of a particle, compressing the path to the root along the way.
+@cython.header(
+    # Arguments
+    indexᵖ='Py_ssize_t',
+    returns='Py_ssize_t',
+)
+def find_fof_root(indexᵖ):
+    while fof_parent[indexᵖ] != indexᵖ:
+        fof_parent[indexᵖ] = fof_parent[fof_parent[indexᵖ]]
+        indexᵖ = fof_parent[indexᵖ]
+    return indexᵖ
+
+# Function implementing friends-of-friends linking as a pairwise
+# short-range interaction. Pairs of local particles have their groups
+# joined directly. Links to particles received from other processes
+# are recorded in fof_links as (local particle index, received particle
+# index, domain pair number) and resolved by join_fof_groups().
+@cython.header(
+    # Arguments
+    interaction_name=str,
+    receiver='Component',
+    supplier='Component',
+    ᔑdt_rungs=dict,
+    rank_supplier='int',
+    only_supply='bint',
+    pairing_level=str,
+    tile_indices_receiver='Py_ssize_t[::1]',
+    tile_indices_supplier_paired='Py_ssize_t**',
+    tile_indices_supplier_paired_N='Py_ssize_t*',
+    extra_args=dict,
+    # Locals
+    apply_to_i='bint',
+    apply_to_j='bint',
+    factor_i='double',
+    indexᵖ_i='Py_ssize_t',
+    indexᵖ_j='Py_ssize_t',
+    indexˣ_i='Py_ssize_t',
+    indexˣ_j='Py_ssize_t',
+    link_index='Py_ssize_t',
+    linking_length='double',
+    linking_length2='double',
+    local='bint',
+    particle_particle_t_begin='double',
+    periodic_offset_x='double',
+    periodic_offset_y='double',
+    periodic_offset_z='double',
+    root_i='Py_ssize_t',
+    root_j='Py_ssize_t',
+    rung_index_i='signed char',
+    rung_index_s='signed char',
+    subtile_contain_jumping_s='bint',
+    subtiling_r='Tiling',
+    x_ji='double',
+    y_ji='double',
+    z_ji='double',
+    returns='void',
+)
+def link_fof(
+    interaction_name, receiver, supplier, ᔑdt_rungs, rank_supplier, only_supply, pairing_level,
+    tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
+    extra_args,
+):
+    global fof_domain_pair_nr, fof_links, fof_links_N, fof_links_size
+    linking_length = extra_args['linking length']
+    linking_length2 = linking_length**2
+    # The supplier is the local component itself
+    # when paired with the local domain.
+    local = (rank_supplier == rank)
+    # Loop over all (receiver, supplier) particle pairs (i, j)
+    for indexˣ_i, indexᵖ_j, indexˣ_j, rung_index_i, rung_index_s, x_ji, y_ji, z_ji, periodic_offset_x, periodic_offset_y, periodic_offset_z, apply_to_i, apply_to_j, factor_i, subtile_contain_jumping_s, particle_particle_t_begin, subtiling_r in particle_particle(
+        receiver, supplier, pairing_level,
+        tile_indices_receiver, tile_indices_supplier_paired, tile_indices_supplier_paired_N,
+        rank_supplier, interaction_name, only_supply, fof_factors, forcerange=linking_length,
+    ):
+        # Translate coordinates so that they
+        # correspond to the nearest image.
+        with unswitch(6):
+            if periodic_offset_x or periodic_offset_y or periodic_offset_z:
+                x_ji += periodic_offset_x
+                y_ji += periodic_offset_y
+                z_ji += periodic_offset_z
+        # Only link particles within the linking length
+        if x_ji**2 + y_ji**2 + z_ji**2 > linking_length2:
+            continue
+        indexᵖ_i = indexˣ_i//3
+        with unswitch(8):
+            if local:
+                # Join the groups of the two particles,
+                # using the lower root index as the new root.
+                root_i = find_fof_root(indexᵖ_i)
+                root_j = find_fof_root(indexᵖ_j)
+                if root_i < root_j:
+                    fof_parent[root_j] = root_i
+                elif root_j < root_i:
+                    fof_parent[root_i] = root_j
+            else:
+                # Record link to particle of another domain
+                if fof_links_N == fof_links_size:
+                    fof_links_size *= 2
+                    fof_links = realloc(fof_links, 3*fof_links_size*sizeof('Py_ssize_t'))
+                link_index = 3*fof_links_N
+                fof_links[link_index + 0] = indexᵖ_i
+                fof_links[link_index + 1] = indexᵖ_j
+                fof_links[link_index + 2] = fof_domain_pair_nr
+                fof_links_N += 1
+    # This function is called once for each domain pair,
+    # in the order given by domain_domain_communication().
+    fof_domain_pair_nr += 1
+
+# Function for joining up friends-of-friends groups spanning multiple
+# domains, after linking has been carried out. Each recorded link to a
+# particle of another domain is sent back to the process owning that
+# particle, which then knows the groups of both linked particles.
+# All resulting links between groups are collected on the master,
+# where the groups are joined. The returned dict maps the global labels
+# of all groups taking part in such joins to the label of the joined
+# group, which is the lowest of the labels.
+@cython.header(
+    # Arguments
+    component='Component',
+    label_offset='Py_ssize_t',
+    # Locals
+    domain_pair_nr='Py_ssize_t',
+    edges=set,
+    edges_all=list,
+    indicesᵖ_sent='Py_ssize_t[::1]',
+    label_a='Py_ssize_t',
+    label_b='Py_ssize_t',
+    label_roots=dict,
+    labels=object,  # np.ndarray
+    links=object,  # np.ndarray
+    links_pair=object,  # np.ndarray
+    parents=object,  # np.ndarray
+    rank_recv='int',
+    rank_send='int',
+    ranks_recv='int[::1]',
+    ranks_send='int[::1]',
+    received=tuple,
+    root_a='Py_ssize_t',
+    root_b='Py_ssize_t',
+    returns=dict,
+)
+def join_fof_groups(component, label_offset):
+    parents = asarray(cast(fof_parent, 'Py_ssize_t[:component.N_local]'))
+    links = asarray(cast(fof_links, 'Py_ssize_t[:3*fof_links_N]')).reshape((fof_links_N, 3))
+    # Translate the recorded links into edges between groups,
+    # for each domain pair in turn.
+    edges = set()
+    ranks_send, ranks_recv = domain_domain_communication('tile', False)
+    for domain_pair_nr in range(ranks_send.shape[0]):
+        rank_send = ranks_send[domain_pair_nr]
+        rank_recv = ranks_recv[domain_pair_nr]
+        if rank_send == rank:
+            # Local domain pair, with links already taken care of
+            continue
+        # Send the indices of the linked particles (as received from
+        # rank_recv) together with the labels of the local groups they
+        # link to back to rank_recv, while receiving the same
+        # information from rank_send, about particles originally sent
+        # to rank_send by this process.
+        links_pair = links[links[:, 2] == domain_pair_nr]
+        received = sendrecv(
+            (links_pair[:, 1].copy(), label_offset + parents[links_pair[:, 0]]),
+            dest=rank_recv, source=rank_send,
+        )
+        # Look up the local groups of the particles sent to rank_send
+        indicesᵖ_sent = get_fof_sent_indices(component, domain_pair_nr)
+        labels = label_offset + parents[asarray(indicesᵖ_sent)[received[0]]]
+        edges.update(zip(received[1].tolist(), labels.tolist()))
+    # Join the linked groups on the master process
+    edges_all = gather(edges)
+    label_roots = {}
+    if master:
+        for edges in edges_all:
+            for label_a, label_b in edges:
+                root_a = find_label_root(label_roots, label_a)
+                root_b = find_label_root(label_roots, label_b)
+                if root_a < root_b:
+                    label_roots[root_b] = root_a
+                elif root_b < root_a:
+                    label_roots[root_a] = root_b
+                else:
+                    label_roots[root_a] = root_a
+        for label_a in list(label_roots):
+            label_roots[label_a] = find_label_root(label_roots, label_a)
+    return bcast(label_roots)
+
+# Function for finding the root label of a label,
+# given a dict mapping labels to parent labels.
+@cython.header(
+    # Arguments
+    label_roots=dict,
+    label='Py_ssize_t',
+    # Locals
+    label_parent='Py_ssize_t',
+    returns='Py_ssize_t',
+)
+def find_label_root(label_roots, label):
+    while True:
+        label_parent = label_roots.get(label, label)
+        if label_parent == label:
+            return label
+        label_roots[label] = label_roots.get(label_parent, label_parent)
+        label = label_parent
+
+# Function returning the indices of the local particles in the order
+# in which they were sent to another process during the domain pairing
+# with number domain_pair_nr, as carried out by sendrecv_component()
+# during friends-of-friends linking.
+@cython.header(
+    # Arguments
+    component='Component',
+    domain_pair_nr='Py_ssize_t',
+    # Locals
+    count='Py_ssize_t',
+    indicesᵖ='Py_ssize_t[::1]',
+    rung='Py_ssize_t*',
+    rung_N='Py_ssize_t',
+    rung_index='signed char',
+    rung_particle_index='Py_ssize_t',
+    rungs_N='Py_ssize_t*',
+    tile='Py_ssize_t**',
+    tile_index='Py_ssize_t',
+    tile_indices_supplier='Py_ssize_t[::1]',
+    tiling='Tiling',
+    returns='Py_ssize_t[::1]',
+)
+def get_fof_sent_indices(component, domain_pair_nr):
+    tile_indices_supplier = domain_domain_tile_indices(
+        'fof', component, False, domain_pair_nr,
+    )[1, :]
+    tiling = component.tilings['fof (tiles)']
+    indicesᵖ = empty(component.N_local, dtype=C2np['Py_ssize_t'])
+    count = 0
+    for tile_index in range(tile_indices_supplier.shape[0]):
+        tile_index = tile_indices_supplier[tile_index]
+        tile    = tiling.tiles        [tile_index]
+        rungs_N = tiling.tiles_rungs_N[tile_index]
+        for rung_index in range(
+            component.lowest_populated_rung, component.highest_populated_rung + 1,
+        ):
+            rung   = tile   [rung_index]
+            rung_N = rungs_N[rung_index]
+            for rung_particle_index in range(rung_N):
+                indicesᵖ[count] = rung[rung_particle_index]
+                count += 1
+    return indicesᵖ[:count]
+
+# Function for saving a halo catalogue to a text file
+@cython.header(
+    # Arguments
+    component='Component',
+    catalogue='double[:, ::1]',
+    filename=str,
+    # Locals
+    headings=list,
+    significant_figures='int',
+    returns='void',
+)
+def save_halos(component, catalogue, filename):
+    if not master:
+        return
+    filename = augment_filename(filename, component.name.replace(' ', '-'))
+    masterprint(f'Saving halo catalogue to "{filename}" ...')
+    significant_figures = 6
+    headings = [
+        f'mass [{unit_mass}]',
+        'members',
+        *[f'{dim} [{unit_length}]' for dim in 'xyz'],
+        *[unicode(f'u{dim} [{unit_length} {unit_time}⁻¹]') for dim in 'xyz'],
+    ]
+    save_powerspec_table(
+        filename,
+        get_powerspec_topline(
+            f'Friends-of-friends halo catalogue of {component.name}', significant_figures,
+        ),
+        get_halo_header_lines(catalogue),
+        headings,
+        catalogue,
+        significant_figures,
+        {1},
+    )
+    masterprint('done')
+
 # Function which can measure different quantities of a passed component
 @cython.header(
     # Arguments
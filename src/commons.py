@@ -2315,13 +2315,25 @@ cython.declare(
     output_bases=dict,
     output_times=dict,
     autosave_interval='double',
+    autosave_deltas='Py_ssize_t',
+    autosave_delta_bits='int',
     snapshot_select=dict,
+    snapshot_load_selection=dict,
     powerspec_select=dict,
     render2D_select=dict,
     render3D_select=dict,
+    halos_select=dict,
+    hmf_select=dict,
+    corrfunc_select=dict,
+    lightcone_select=dict,
+    lightcone_options=dict,
     snapshot_type=str,
     gadget_snapshot_params=dict,
+    concept_snapshot_params=dict,
     snapshot_wrap='bint',
+    snapshot_async='bint',
+    snapshot_domain_local='bint',
+    initial_conditions_streaming='bint',
     life_output_order=tuple,
     class_plot_perturbations='bint',
     class_extra_background=set,
@@ -2333,6 +2345,8 @@ cython.declare(
     shortrange_params=dict,
     powerspec_options=dict,
     k_modes_per_decade=dict,
+    halo_options=dict,
+    corrfunc_options=dict,
     # Cosmology
     H0='double',
     Ωb='double',
@@ -2394,7 +2408,7 @@ cython.declare(
 # Input/output
 initial_conditions = user_params.get('initial_conditions', '')
 user_params['initial_conditions'] = initial_conditions
-output_kinds = ('snapshot', 'powerspec', 'render2D', 'render3D')
+output_kinds = ('snapshot', 'powerspec', 'render2D', 'render3D', 'halos', 'hmf', 'corrfunc')
 if isinstance(user_params.get('output_dirs'), str):
     output_dirs = {
         kind: user_params['output_dirs']
@@ -2410,11 +2424,14 @@ for kind in output_kinds:
 output_dirs['autosave'] = str(output_dirs.get('autosave', ''))
 if not output_dirs['autosave']:
     output_dirs['autosave'] = path['ic_dir'] + '/autosave'
+output_dirs['lightcone'] = str(output_dirs.get('lightcone', path['output_dir']))
+if not output_dirs['lightcone']:
+    output_dirs['lightcone'] = path['output_dir']
 output_dirs = {key: sensible_path(path) for key, path in output_dirs.items()}
 user_params['output_dirs'] = output_dirs
 output_bases = dict(user_params.get('output_bases', {}))
 replace_ellipsis(output_bases)
-for kind in output_kinds:
+for kind in output_kinds + ('lightcone', ):
     output_bases[kind] = str(output_bases.get(kind, kind))
 user_params['output_bases'] = output_bases
 output_times = dict(user_params.get('output_times', {}))
@@ -2422,6 +2439,12 @@ replace_ellipsis(output_times)
 user_params['output_times'] = output_times
 autosave_interval = float(user_params.get('autosave_interval', ထ))
 user_params['autosave_interval'] = autosave_interval
+autosave_deltas = int(user_params.get('autosave_deltas', 0))
+user_params['autosave_deltas'] = autosave_deltas
+autosave_delta_bits = int(user_params.get('autosave_delta_bits', 16))
+if autosave_delta_bits not in (8, 16, 32):
+    abort(f'autosave_delta_bits must be one of 8, 16 or 32, but got {autosave_delta_bits}')
+user_params['autosave_delta_bits'] = autosave_delta_bits
 snapshot_select = {}
 if 'snapshot_select' in user_params:
     if isinstance(user_params['snapshot_select'], dict):
@@ -2444,6 +2467,22 @@ for key in ('save', 'load'):
     for key2, val2 in snapshot_select[key].items():
         snapshot_select[key][key2] = bool(val2)
 user_params['snapshot_select'] = snapshot_select
+snapshot_load_selection = dict(user_params.get('snapshot_load_selection', {}))
+replace_ellipsis(snapshot_load_selection)
+for key, val in snapshot_load_selection.items():
+    if not val:
+        continue
+    val = dict(val)
+    for key2 in val:
+        if key2 not in {'fraction', 'region', 'center', 'radius'}:
+            abort(f'Unknown item "{key2}" in snapshot_load_selection[{key!r}]')
+    if ('center' in val) != ('radius' in val):
+        abort(
+            f'Both or none of "center" and "radius" must be given '
+            f'in snapshot_load_selection[{key!r}]'
+        )
+    snapshot_load_selection[key] = val
+user_params['snapshot_load_selection'] = snapshot_load_selection
 if 'powerspec_select' in user_params:
     if isinstance(user_params['powerspec_select'], dict):
         powerspec_select = user_params['powerspec_select']
@@ -2460,18 +2499,27 @@ for key, val in powerspec_select.copy().items():
         val.setdefault('data', False)
         val.setdefault('linear', False)
         val.setdefault('plot', False)
+        val.setdefault('cross', False)
+        val.setdefault('bispec', False)
     else:
-        powerspec_select[key] = {'data': bool(val), 'linear': bool(val), 'plot': bool(val)}
+        # The (expensive) cross spectra and bispectra
+        # are only computed when explicitly selected.
+        powerspec_select[key] = {
+            'data': bool(val), 'linear': bool(val), 'plot': bool(val),
+            'cross': False, 'bispec': False,
+        }
 user_params['powerspec_select'] = powerspec_select
 if 'render2D_select' in user_params:
     if isinstance(user_params['render2D_select'], dict):
         render2D_select = user_params['render2D_select']
     else:
         render2D_select = {'default': user_params['render2D_select']}
-    render2D_select.setdefault('default', {'data': False, 'image': False, 'terminal image': False})
+    render2D_select.setdefault(
+        'default', {'data': False, 'image': False, 'terminal image': False, 'video': False},
+    )
 else:
     render2D_select = {
-        'default': {'data': True, 'image': True, 'terminal image': True},
+        'default': {'data': True, 'image': True, 'terminal image': True, 'video': False},
     }
 replace_ellipsis(render2D_select)
 for key, val in render2D_select.copy().items():
@@ -2479,8 +2527,13 @@ for key, val in render2D_select.copy().items():
         val.setdefault('data', False)
         val.setdefault('image', False)
         val.setdefault('terminal image', False)
+        val.setdefault('video', False)
     else:
-        render2D_select[key] = {'data': bool(val), 'image': bool(val), 'terminal image': bool(val)}
+        # The video is only produced when explicitly selected
+        render2D_select[key] = {
+            'data': bool(val), 'image': bool(val), 'terminal image': bool(val),
+            'video': False,
+        }
 user_params['render2D_select'] = render2D_select
 render3D_select = {'all': True}
 if user_params.get('render3D_select'):
@@ -2490,6 +2543,38 @@ if user_params.get('render3D_select'):
     else:
         render3D_select = {'all': user_params['render3D_select']}
 user_params['render3D_select'] = render3D_select
+halos_select = {'all': True}
+if user_params.get('halos_select'):
+    if isinstance(user_params['halos_select'], dict):
+        halos_select = user_params['halos_select']
+        replace_ellipsis(halos_select)
+    else:
+        halos_select = {'all': user_params['halos_select']}
+user_params['halos_select'] = halos_select
+hmf_select = {'all': True}
+if user_params.get('hmf_select'):
+    if isinstance(user_params['hmf_select'], dict):
+        hmf_select = user_params['hmf_select']
+        replace_ellipsis(hmf_select)
+    else:
+        hmf_select = {'all': user_params['hmf_select']}
+user_params['hmf_select'] = hmf_select
+corrfunc_select = {'all': True}
+if user_params.get('corrfunc_select'):
+    if isinstance(user_params['corrfunc_select'], dict):
+        corrfunc_select = user_params['corrfunc_select']
+        replace_ellipsis(corrfunc_select)
+    else:
+        corrfunc_select = {'all': user_params['corrfunc_select']}
+user_params['corrfunc_select'] = corrfunc_select
+lightcone_select = {'all': False}
+if user_params.get('lightcone_select'):
+    if isinstance(user_params['lightcone_select'], dict):
+        lightcone_select = user_params['lightcone_select']
+        replace_ellipsis(lightcone_select)
+    else:
+        lightcone_select = {'all': user_params['lightcone_select']}
+user_params['lightcone_select'] = lightcone_select
 snapshot_type = (str(user_params.get('snapshot_type', 'concept'))
     .replace(unicode('𝘕'), 'N').replace(asciify('𝘕'), 'N')
     .replace(' ', '').replace('-', '')
@@ -2603,7 +2688,82 @@ for key, val in gadget_snapshot_params_defaults['units'].items():
 gadget_snapshot_params['units'] = gadget_snapshot_params_units
 gadget_snapshot_params['settle'] = int(gadget_snapshot_params['settle'])%2
 user_params['gadget_snapshot_params'] = gadget_snapshot_params
+concept_snapshot_params_defaults = {
+    'compression'      : None,
+    'compression level': 4,
+    'shuffle'          : True,
+    'chunk size'       : 2**16,
+    'dataformat': {
+        'pos': 64,
+        'mom': 64,
+    },
+    'pos quantisation' : 0,
+}
+concept_snapshot_params = dict(user_params.get('concept_snapshot_params', {}))
+for key, val in concept_snapshot_params.copy().items():
+    key_transformed = (
+        str(key).lower().replace(' ', '').replace('_', '').replace('-', '')
+        .replace('quantization', 'quantisation')
+    )
+    for key_default in concept_snapshot_params_defaults.keys():
+        if key_transformed == key_default.replace(' ', ''):
+            concept_snapshot_params[key_default] = concept_snapshot_params.pop(key)
+            break
+    else:
+        abort(f'Unknown key "{key}" in concept_snapshot_params')
+for key, val in concept_snapshot_params_defaults.items():
+    concept_snapshot_params.setdefault(key, val)
+if str(concept_snapshot_params['compression']).lower() in {'', 'none', 'false'}:
+    concept_snapshot_params['compression'] = None
+else:
+    concept_snapshot_params['compression'] = (
+        str(concept_snapshot_params['compression']).lower()
+    )
+    if concept_snapshot_params['compression'] not in {'gzip', 'lzf', 'lz4', 'zstd'}:
+        abort(
+            f'Unrecognised concept_snapshot_params["compression"] = '
+            f'"{concept_snapshot_params["compression"]}" ∉ {{"gzip", "lzf", "lz4", "zstd"}}'
+        )
+concept_snapshot_params['compression level'] = int(
+    concept_snapshot_params['compression level']
+)
+concept_snapshot_params['shuffle'] = bool(concept_snapshot_params['shuffle'])
+concept_snapshot_params['chunk size'] = int(concept_snapshot_params['chunk size'])
+if concept_snapshot_params['chunk size'] < 1:
+    abort(
+        f'concept_snapshot_params["chunk size"] = '
+        f'{concept_snapshot_params["chunk size"]} but must be positive'
+    )
+concept_snapshot_params_dataformat = {}
+for key, val in concept_snapshot_params['dataformat'].items():
+    key = str(key).lower()
+    if key not in concept_snapshot_params_defaults['dataformat']:
+        abort(f'Unknown variable "{key}" listed in concept_snapshot_params["dataformat"]')
+    concept_snapshot_params_dataformat[key] = val
+replace_ellipsis(concept_snapshot_params_dataformat)
+for key, val in concept_snapshot_params_defaults['dataformat'].items():
+    concept_snapshot_params_dataformat.setdefault(key, val)
+for key, val in concept_snapshot_params_dataformat.items():
+    if int(val) not in (32, 64):
+        abort(
+            f'concept_snapshot_params["dataformat"]["{key}"] = {val} but must be 32 or 64'
+        )
+    concept_snapshot_params_dataformat[key] = int(val)
+concept_snapshot_params['dataformat'] = concept_snapshot_params_dataformat
+concept_snapshot_params['pos quantisation'] = int(concept_snapshot_params['pos quantisation'])
+if not 0 <= concept_snapshot_params['pos quantisation'] <= 32:
+    abort(
+        f'concept_snapshot_params["pos quantisation"] = '
+        f'{concept_snapshot_params["pos quantisation"]} but must be between 0 and 32'
+    )
+user_params['concept_snapshot_params'] = concept_snapshot_params
 snapshot_wrap = bool(user_params.get('snapshot_wrap', False))
+snapshot_async = bool(user_params.get('snapshot_async', False))
+user_params['snapshot_async'] = snapshot_async
+snapshot_domain_local = bool(user_params.get('snapshot_domain_local', False))
+user_params['snapshot_domain_local'] = snapshot_domain_local
+initial_conditions_streaming = bool(user_params.get('initial_conditions_streaming', False))
+user_params['initial_conditions_streaming'] = initial_conditions_streaming
 life_output_order = tuple(user_params.get('life_output_order', ()))
 life_output_order = tuple([act.lower() for act in life_output_order])
 life_output_order = tuple([
@@ -2927,6 +3087,14 @@ shortrange_params_defaults = {
         'subtiling': 'automatic',
         'tablesize': 2**12,
     },
+    'fof': {
+        'tilesize' : -1,  # determined from the linking length
+        'subtiling': (3, 3, 3),
+    },
+    'corrfunc': {
+        'tilesize' : -1,  # determined from corrfunc_options['rmax']
+        'subtiling': (3, 3, 3),
+    },
 }
 for force, d in shortrange_params_defaults.items():
     shortrange_params.setdefault(force, d)
@@ -3043,6 +3211,9 @@ powerspec_options_defaults = {
     'significant figures': {
         'default': 8,
     },
+    'bispec bins': {
+        'default': 8,
+    },
 }
 powerspec_options = dict(user_params.get('powerspec_options', {}))
 for key, val in powerspec_options.items():
@@ -3072,6 +3243,9 @@ d = powerspec_options['k_max']
 for key, val in d.copy().items():
     if isinstance(val, str):
         d[key] = val.replace('Nyquist', 'nyquist')
+d = powerspec_options['bispec bins']
+for key, val in d.copy().items():
+    d[key] = int(round(val))
 d = powerspec_options['binsize']
 for key, val in d.copy().items():
     if not isinstance(val, dict):
@@ -3101,6 +3275,98 @@ else:
 if len(k_modes_per_decade) == 1:
     k_modes_per_decade.update({(key + 1): val for key, val in k_modes_per_decade.items()})
 user_params['k_modes_per_decade'] = k_modes_per_decade
+halo_options_defaults = {
+    'linking length' : 0.2,
+    'min members'    : 20,
+    'bins per decade': 5,
+}
+halo_options = dict(user_params.get('halo_options', {}))
+for key in halo_options:
+    if key not in halo_options_defaults:
+        abort(f'halo_options["{key}"] not implemented')
+for key, val in halo_options_defaults.items():
+    halo_options.setdefault(key, val)
+halo_options['linking length'] = float(halo_options['linking length'])
+halo_options['min members'] = int(round(halo_options['min members']))
+halo_options['bins per decade'] = float(halo_options['bins per decade'])
+if halo_options['linking length'] <= 0:
+    abort(f'halo_options["linking length"] = {halo_options["linking length"]} must be positive')
+if halo_options['bins per decade'] <= 0:
+    abort(
+        f'halo_options["bins per decade"] = {halo_options["bins per decade"]} '
+        f'must be positive'
+    )
+user_params['halo_options'] = halo_options
+corrfunc_options_defaults = {
+    'rmin': '1e-3*boxsize',
+    'rmax': '0.05*boxsize',
+    'bins': 20,
+}
+corrfunc_options = dict(user_params.get('corrfunc_options', {}))
+for key in corrfunc_options:
+    if key not in corrfunc_options_defaults:
+        abort(f'corrfunc_options["{key}"] not implemented')
+for key, val in corrfunc_options_defaults.items():
+    corrfunc_options.setdefault(key, val)
+for key in ('rmin', 'rmax'):
+    val = corrfunc_options[key]
+    if isinstance(val, str):
+        val = eval_unit(val.replace('boxsize', str(boxsize)))
+    corrfunc_options[key] = float(val)
+corrfunc_options['bins'] = int(round(corrfunc_options['bins']))
+if not 0 < corrfunc_options['rmin'] < corrfunc_options['rmax']:
+    abort(
+        f'corrfunc_options must satisfy 0 < rmin < rmax, but got '
+        f'rmin = {corrfunc_options["rmin"]} and rmax = {corrfunc_options["rmax"]}'
+    )
+if corrfunc_options['bins'] < 1:
+    abort(f'corrfunc_options["bins"] = {corrfunc_options["bins"]} must be at least 1')
+user_params['corrfunc_options'] = corrfunc_options
+lightcone_options_defaults = {
+    'observer'   : ('0.5*boxsize', '0.5*boxsize', '0.5*boxsize'),
+    'a observer' : 1,
+    'chi max'    : '0.5*boxsize',
+    'buffer size': 2**16,
+    'nside'      : 0,
+    'map shells' : 1,
+}
+lightcone_options = dict(user_params.get('lightcone_options', {}))
+for key in lightcone_options:
+    if key not in lightcone_options_defaults:
+        abort(f'lightcone_options["{key}"] not implemented')
+for key, val in lightcone_options_defaults.items():
+    lightcone_options.setdefault(key, val)
+lightcone_options['observer'] = tuple([
+    float(eval_unit(val.replace('boxsize', str(boxsize))) if isinstance(val, str) else val)
+    for val in any2list(lightcone_options['observer'])
+])
+if len(lightcone_options['observer']) != 3:
+    abort(f'lightcone_options["observer"] = {lightcone_options["observer"]} must have length 3')
+lightcone_options['a observer'] = float(lightcone_options['a observer'])
+val = lightcone_options['chi max']
+if isinstance(val, str):
+    val = eval_unit(val.replace('boxsize', str(boxsize)))
+lightcone_options['chi max'] = float(val)
+for key in ('buffer size', 'nside', 'map shells'):
+    lightcone_options[key] = int(round(lightcone_options[key]))
+if lightcone_options['buffer size'] < 1:
+    abort(
+        f'lightcone_options["buffer size"] = {lightcone_options["buffer size"]} '
+        f'must be at least 1'
+    )
+if lightcone_options['nside'] < 0 or (
+    lightcone_options['nside'] & (lightcone_options['nside'] - 1)
+):
+    abort(
+        f'lightcone_options["nside"] = {lightcone_options["nside"]} '
+        f'must be 0 (no maps) or a power of 2'
+    )
+if lightcone_options['map shells'] < 1:
+    abort(
+        f'lightcone_options["map shells"] = {lightcone_options["map shells"]} '
+        f'must be at least 1'
+    )
+user_params['lightcone_options'] = lightcone_options
 # Cosmology
 H0 = float(user_params.get('H0', 67*units.km/(units.s*units.Mpc)))
 user_params['H0'] = H0
@@ -3464,6 +3730,9 @@ render2D_options_defaults = {
     'interlace': {
         'default': False,
     },
+    'direct deposit': {
+        'default': False,
+    },
     'axis': {
         'default': 'z',
     },
@@ -3476,6 +3745,9 @@ render2D_options_defaults = {
     'enhance': {
         'default': True,
     },
+    'video encoder': {
+        'default': '',
+    },
 }
 render2D_options = dict(user_params.get('render2D_options', {}))
 for key, val in render2D_options.items():
@@ -3513,6 +3785,9 @@ for key, val in d.copy().items():
     if len(val) == 1:
         val = (0, val[0])
     d[key] = (np.min(val), np.max(val))
+d = render2D_options['video encoder']
+for key, val in d.copy().items():
+    d[key] = str(val or '')
 for key in render2D_options:
     if key not in render2D_options_defaults:
         abort(f'render2D_options["{key}"] not implemented')
@@ -3600,6 +3875,15 @@ cython.declare(
     render3D_dir=str,
     render3D_base=str,
     render3D_times=dict,
+    halos_dir=str,
+    halos_base=str,
+    halos_times=dict,
+    hmf_dir=str,
+    hmf_base=str,
+    hmf_times=dict,
+    corrfunc_dir=str,
+    corrfunc_base=str,
+    corrfunc_times=dict,
     autosave_dir=str,
     nghosts='int',
     ρ_crit='double',
@@ -3658,6 +3942,21 @@ render3D_base = output_bases['render3D']
 render3D_times = {
     time_param: output_times[time_param]['render3D'] for time_param in ('a', 't')
 }
+halos_dir = output_dirs['halos']
+halos_base = output_bases['halos']
+halos_times = {
+    time_param: output_times[time_param]['halos'] for time_param in ('a', 't')
+}
+hmf_dir = output_dirs['hmf']
+hmf_base = output_bases['hmf']
+hmf_times = {
+    time_param: output_times[time_param]['hmf'] for time_param in ('a', 't')
+}
+corrfunc_dir = output_dirs['corrfunc']
+corrfunc_base = output_bases['corrfunc']
+corrfunc_times = {
+    time_param: output_times[time_param]['corrfunc'] for time_param in ('a', 't')
+}
 autosave_dir = output_dirs['autosave']
 # We never include linear power spectra in power spectrum output
 # if the CLASS background is disabled.
@@ -4709,7 +5008,7 @@ np.save     = tryexcept_wrapper(np.save,     'np.save() failed')
 np.loadtxt  = tryexcept_wrapper(np.loadtxt,  'np.loadtxt() failed')
 np.savetxt  = tryexcept_wrapper(np.savetxt,  'np.savetxt() failed')
 # For h5py.File the monkey patch is more involved
-def open_hdf5(filename, raise_exception=False, **kwargs):
+def open_hdf5(filename, raise_exception=False, local=False, **kwargs):
     """This function is equivalent to just doing
     h5py.File(filename, **kwargs)
     except that it will not throw an exception if the file is
@@ -4719,7 +5018,8 @@ def open_hdf5(filename, raise_exception=False, **kwargs):
     become available.
     The function supports both collective and non-collective calls.
     It is an error to call non-collectively from any process but the
-    master mode.
+    master mode, unless local is True, signifying that the file is
+    opened independently by the calling process.
     """
     import h5py
     # Minimum and maximum time to wait between checks on the file
@@ -4727,14 +5027,16 @@ def open_hdf5(filename, raise_exception=False, **kwargs):
     sleep_time_max = 300
     # Determine if this is a collective call or not
     collective = (kwargs.get('driver') == 'mpio')
-    if not collective and not master:
+    if collective and local:
+        abort('A collective call to open_hdf5() cannot be local')
+    if not collective and not master and not local:
         abort(
             f'A non-collective call to open_hdf5() was performed on process {rank}, '
             f'which is not the master'
         )
-    # Let the master check if the file is available for opening
-    # in the mode given by **kwargs.
-    if master:
+    # Let the master (or the local process) check if the file is
+    # available for opening in the mode given by **kwargs.
+    if master or local:
         # As this check is done by the master only,
         # we must not open it using a collective driver.
         kwargs_noncollective = kwargs.copy()
@@ -4771,7 +5073,7 @@ def open_hdf5(filename, raise_exception=False, **kwargs):
         hdf5_file = h5py.File(filename, **kwargs)
     except OSError:
         # We did not make it. Try again.
-        return open_hdf5(filename, **kwargs)
+        return open_hdf5(filename, local=local, **kwargs)
     return hdf5_file
 
 
@@ -4787,10 +5089,10 @@ if snapshot_type not in ('concept', 'gadget'):
     abort(f'Unrecognised snapshot type "{snapshot_type}" ∉ {{"concept", "gadget"}}')
 # Abort on unrecognised output kinds
 for key in output_dirs:
-    if key not in (output_kinds + ('autosave',)):
+    if key not in (output_kinds + ('autosave', 'lightcone')):
         abort(f'Unrecognised output type "{key}"')
 for key in output_bases:
-    if key not in output_kinds:
+    if key not in (output_kinds + ('lightcone', )):
         abort(f'Unrecognised output type "{key}"')
 for d in output_times.values():
     for key in d:
@@ -4933,6 +5235,15 @@ render2D_times = {
 render3D_times = {
     time_param: output_times[time_param]['render3D'] for time_param in ('a', 't')
 }
+halos_times = {
+    time_param: output_times[time_param]['halos'] for time_param in ('a', 't')
+}
+hmf_times = {
+    time_param: output_times[time_param]['hmf'] for time_param in ('a', 't')
+}
+corrfunc_times = {
+    time_param: output_times[time_param]['corrfunc'] for time_param in ('a', 't')
+}
 # Warn about cosmological autosave interval
 if autosave_interval > 1*units.yr and autosave_interval != ထ:
     masterwarn(
@@ -66,6 +66,8 @@ def partition(size):
     data_mv='double[::1]',
     data_mvs=list,
     dim='int',
+    ids='Py_ssize_t*',
+    ids_mv='Py_ssize_t[::1]',
     indexᵖ='Py_ssize_t',
     indexᵖ_end_i='Py_ssize_t',
     indexᵖ_hole_bgn='Py_ssize_t',
@@ -138,6 +140,7 @@ def exchange(component, progress_msg=False):
       - mom
       - Δmom
       - rung_indices (if rungs are used by the component)
+      - ids (if IDs are used by the component)
     We do not communicate rung jumps, as it is expected that no such
     jumps are flagged when calling this function.
     The overall scheme for the particle exchange is this:
@@ -197,6 +200,7 @@ def exchange(component, progress_msg=False):
         Δmom                = component.Δmom
         rung_indices        = component.rung_indices
         rung_indices_jumped = component.rung_indices_jumped
+        ids                 = component.ids
         # Sweep over the particles from the left and right
         # simultaneously, matching a left non-local particle with a
         # right local particle and swapping them. Keep a tally of the
@@ -256,6 +260,9 @@ def exchange(component, progress_msg=False):
                             # upcoming jumps.
                             rung_indices_jumped[indexᵖ_left ] = rung_index_right
                             rung_indices_jumped[indexᵖ_right] = rung_index_left
+                    with unswitch(2):
+                        if component.use_ids:
+                            ids[indexᵖ_left], ids[indexᵖ_right] = ids[indexᵖ_right], ids[indexᵖ_left]
                     # Go to next left and right particles
                     indexᵖ_left  += 1
                     indexˣ_left  += 3
@@ -362,6 +369,9 @@ def exchange(component, progress_msg=False):
                         # indices as we cannot have upcoming jumps.
                         rung_indices_jumped[indexᵖ_i] = rung_index_i
                         rung_indices_jumped[indexᵖ_j] = rung_index_j
+                with unswitch(1):
+                    if component.use_ids:
+                        ids[indexᵖ_i], ids[indexᵖ_j] = ids[indexᵖ_j], ids[indexᵖ_i]
                 # The particle previous at i is now situated correctly,
                 # but the swapped in particle (the one previously at j)
                 # may now be incorrectly placed.
@@ -398,6 +408,9 @@ def exchange(component, progress_msg=False):
         rung_indices        = component.rung_indices
         rung_indices_mv     = component.rung_indices_mv
         rung_indices_jumped = component.rung_indices_jumped
+        # Extract particle IDs
+        ids    = component.ids
+        ids_mv = component.ids_mv
         # Particle data to be exchanged
         data_mvs = [pos_mv, mom_mv, Δmom_mv]
         # Exchange particles between processes
@@ -442,6 +455,15 @@ def exchange(component, progress_msg=False):
                         # Set the jumped rung index equal to
                         # the rung index, signalling no upcoming jump.
                         rung_indices_jumped[indexᵖ] = rung_index
+            # If using IDs we also exchange these
+            with unswitch(1):
+                if component.use_ids:
+                    Sendrecv(
+                        ids_mv[indexᵖ_send_bgn_ℓ:indexᵖ_send_end_ℓ],
+                        dest=rank_send,
+                        recvbuf=ids_mv[indexᵖ_recv_bgn_ℓ:],
+                        source=rank_recv,
+                    )
             # Update the start index for received data
             indexᵖ_recv_bgn_ℓ += n_particles_recv_ℓ
         # Move particles into the holes left by the sent particles
@@ -459,12 +481,15 @@ def exchange(component, progress_msg=False):
                 mom [indexˣ_hole + dim] = mom [indexˣ + dim]
             for dim in range(3):
                 Δmom[indexˣ_hole + dim] = Δmom[indexˣ + dim]
+            indexᵖ -= 1
             with unswitch(1):
                 if component.use_rungs:
-                    indexᵖ -= 1
                     rung_index = rung_indices[indexᵖ]
                     rung_indices       [indexᵖ_hole] = rung_index
                     rung_indices_jumped[indexᵖ_hole] = rung_index  # no jump
+            with unswitch(1):
+                if component.use_ids:
+                    ids[indexᵖ_hole] = ids[indexᵖ]
         # With the holes filled, update the N_local attribute
         component.N_local -= n_particles_send_tot
         component.N_local += n_particles_recv_tot
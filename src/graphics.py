@@ -36,10 +36,20 @@ cimport(
     'from mesh import              '
     '    domain_decompose,         '
     '    fft,                      '
-    '    interpolate_upstream,     '
+    '    interpolate_density,      '
     '    resize_grid,              '
+    '    set_weights_CIC,          '
+    '    set_weights_NGP,          '
+    '    set_weights_PCS,          '
+    '    set_weights_TSC,          '
+    '    weights_x,                '
+    '    weights_y,                '
+    '    weights_z,                '
 )
 
+# Pure Python imports
+import subprocess
+
 
 
 # Function for plotting an already computed power spectrum
@@ -380,7 +390,7 @@ def render2D(components, filename):
     # Count up number of 2D renders to be dumped to disk
     n_dumps = 0
     for declaration in declarations:
-        if declaration.do_data or declaration.do_image:
+        if declaration.do_data or declaration.do_image or declaration.do_video:
             n_dumps += 1
     # Compute 2D render for each declaration
     for declaration in declarations:
@@ -395,6 +405,8 @@ def render2D(components, filename):
         compute_render2D(declaration)
         # Save 2D render data to an HDF5 file on disk, if specified
         save_render2D_data(declaration, filename, n_dumps)
+        # Append 2D render as a frame to the video, if specified
+        save_render2D_video(declaration, filename, n_dumps)
         # Enhance the normal and terminal 2D render, if specified
         enhance_render2D(declaration)
         # Rescale the 2D render values so that they lie in [0, 1]
@@ -570,18 +582,19 @@ def get_render2D_declarations(components):
     # Return declarations without caching
     return declarations
 # Global memory chunks for storing projections (2D render data).
-# The 'image' and 'data' projection are not distinct.
+# The 'image', 'data' and 'video' projection are not distinct.
 cython.declare(projection_chunks=dict)
 projection_chunks = {
     'image'         : empty(1, dtype=C2np['double']),
     'terminal_image': empty(1, dtype=C2np['double']),
 }
 projection_chunks['data'] = projection_chunks['image']
+projection_chunks['video'] = projection_chunks['image']
 # Create the Render2DDeclaration type
 fields = (
-    'components', 'do_data', 'do_image', 'do_terminal_image', 'gridsize',
+    'components', 'do_data', 'do_image', 'do_terminal_image', 'do_video', 'gridsize',
     'terminal_resolution', 'interpolation', 'deconvolve', 'interlace',
-    'axis', 'extent', 'colormap', 'enhance',
+    'direct_deposit', 'axis', 'extent', 'colormap', 'enhance', 'video_encoder',
     'projections',
 )
 Render2DDeclaration = collections.namedtuple(
@@ -598,7 +611,9 @@ Render2DDeclaration = collections.namedtuple(
     component='Component',
     components=list,
     deconvolve='bint',
+    direct_deposit='bint',
     extent=tuple,
+    full_depth='bint',
     grid='double[:, :, ::1]',
     grid_terminal='double[:, :, ::1]',
     gridsize='Py_ssize_t',
@@ -626,40 +641,75 @@ def compute_render2D(declaration):
     axis          = declaration.axis
     extent        = declaration.extent
     projections   = declaration.projections
-    # Interpolate the components onto global Fourier slabs by first
-    # interpolating onto individual upstream grids, Fourier transforming
-    # these and adding them together.
-    # We choose to interpolate the physical density ρ.
-    gridsizes_upstream = [
-        component.render2D_upstream_gridsize
-        for component in components
-    ]
-    slab = interpolate_upstream(
-        components, gridsizes_upstream, gridsize, 'ρ', interpolation,
-        deconvolve=deconvolve, interlace=interlace, output_space='Fourier',
-    )
-    # If a terminal image is to be produced, construct a copy of the
-    # slab, resized appropriately. Obtain the result in real space.
-    if 'terminal_image' in projections:
-        grid_terminal = resize_grid(
-            slab, termsize,
-            input_space='Fourier', output_space='real',
-            output_grid_or_buffer_name='grid_terminal',
-            output_slab_or_buffer_name='slab_terminal',
-            inplace=False, do_ghost_communication=False,
+    # When depositing the particles directly onto the 2D projections,
+    # no 3D grid is constructed. This requires all components
+    # to be particle components.
+    direct_deposit = declaration.direct_deposit
+    if direct_deposit:
+        for component in components:
+            if component.representation != 'particles':
+                masterwarn(
+                    f'Cannot deposit {component.name} directly onto 2D render '
+                    f'as it is not a particle component'
+                )
+                direct_deposit = False
+                break
+    if direct_deposit:
+        # Get projected 2D grids for main 2D render data/image
+        # and terminal render.
+        for key, projection in projections.items():
+            if key in {'data', 'image', 'video'}:
+                deposit_render2D(components, projection, axis, extent, interpolation)
+                break
+        projection = projections.get('terminal_image')
+        if projection is not None:
+            deposit_render2D(components, projection, axis, extent, interpolation)
+    else:
+        # Interpolate the components onto global Fourier slabs by first
+        # interpolating onto individual upstream grids, Fourier
+        # transforming these and adding them together.
+        # We choose to interpolate the physical density ρ.
+        gridsizes_upstream = [
+            component.render2D_upstream_gridsize
+            for component in components
+        ]
+        slab = interpolate_density(
+            components, gridsizes_upstream, gridsize, interpolation, deconvolve, interlace,
         )
-    # Transform the slab to real space
-    fft(slab, 'backward')
-    grid = domain_decompose(slab, 'grid_global', do_ghost_communication=False)
-    # Get projected 2D grid for main 2D render data/image
-    for key, projection in projections.items():
-        if key in {'data', 'image'}:
-            project_render2D(grid, projection, axis, extent)
-            break
-    # Get projected 2D grid for terminal render
+        # If a terminal image is to be produced, construct a copy of
+        # the slab, resized appropriately. Obtain the result
+        # in real space.
+        if 'terminal_image' in projections:
+            grid_terminal = resize_grid(
+                slab, termsize,
+                input_space='Fourier', output_space='real',
+                output_grid_or_buffer_name='grid_terminal',
+                output_slab_or_buffer_name='slab_terminal',
+                inplace=False, do_ghost_communication=False,
+            )
+        # Get projected 2D grid for main 2D render data/image.
+        # When projecting through the entire box, the projection is
+        # obtained directly from the Fourier slab. Otherwise, the slab
+        # is transformed to real space and domain decomposed, after
+        # which the projection is carried out over the
+        # specified extent.
+        full_depth = isclose(extent[1] - extent[0], boxsize)
+        for key, projection in projections.items():
+            if key in {'data', 'image', 'video'}:
+                if full_depth:
+                    project_render2D_fourier(slab, projection, axis)
+                else:
+                    fft(slab, 'backward')
+                    grid = domain_decompose(slab, 'grid_global', do_ghost_communication=False)
+                    project_render2D(grid, projection, axis, extent)
+                break
+        # Get projected 2D grid for terminal render
+        projection = projections.get('terminal_image')
+        if projection is not None:
+            project_render2D(grid_terminal, projection, axis, extent)
+    # Finalise terminal render
     projection = projections.get('terminal_image')
     if projection is not None:
-        project_render2D(grid_terminal, projection, axis, extent)
         # Since each monospaced character cell in the terminal is
         # rectangular with about double the height compared to the
         # width, the terminal projection should only have half as many
@@ -696,8 +746,6 @@ def compute_render2D(declaration):
     frac_end='double',
     gridshape_local='Py_ssize_t[::1]',
     gridsize='Py_ssize_t',
-    i='Py_ssize_t',
-    i2='Py_ssize_t',
     indices_2D_bgn='Py_ssize_t[::1]',
     indices_2D_end='Py_ssize_t[::1]',
     indices_global_bgn='Py_ssize_t[::1]',
@@ -705,7 +753,6 @@ def compute_render2D(declaration):
     indices_local='Py_ssize_t[::1]',
     indices_local_bgn='Py_ssize_t[::1]',
     indices_local_end='Py_ssize_t[::1]',
-    j='Py_ssize_t',
     participate='bint',
     projection_arr=object,  # np.ndarray
     slices=list,
@@ -854,13 +901,31 @@ def project_render2D(grid, projection, axis, extent):
     # The values in the projection correspond to physical densities.
     # Convert to mass.
     projection_arr *= (universals.a*cellsize)**3
-    # Transpose the projection such that the first dimension (rows)
-    # correspond to the upward/downward direction and the second
-    # dimension (columns) correspond to the left/right direction.
-    # Also flip the upward/downward axis by flipping the rows.
-    # Together, this puts the projection into the proper state
-    # for saving it as an image.
-    # Transpose.
+    # Put the projection into the proper orientation
+    orient_render2D(projection)
+    return projection
+
+# Function for putting a 2D projection into the proper orientation
+# for saving it as an image.
+@cython.header(
+    # Arguments
+    projection='double[:, ::1]',
+    # Locals
+    gridsize='Py_ssize_t',
+    i='Py_ssize_t',
+    i2='Py_ssize_t',
+    j='Py_ssize_t',
+    returns='double[:, ::1]',
+)
+def orient_render2D(projection):
+    """The projection is transposed such that the first dimension (rows)
+    correspond to the upward/downward direction and the second
+    dimension (columns) correspond to the left/right direction.
+    Also the upward/downward axis is flipped by flipping the rows.
+    The passed 2D projection array will be mutated in-place.
+    """
+    gridsize = projection.shape[0]
+    # Transpose
     for i in range(gridsize):
         for j in range(i):
             projection[i, j], projection[j, i] = projection[j, i], projection[i, j]
@@ -871,38 +936,221 @@ def project_render2D(grid, projection, axis, extent):
             projection[i, j], projection[i2, j] = projection[i2, j], projection[i, j]
     return projection
 
+# Function for converting a global Fourier slab directly into a 2D
+# projection through the entire box, without transforming
+# the 3D grid back to real space.
+@cython.header(
+    # Arguments
+    slab='double[:, :, ::1]',
+    projection='double[:, ::1]',
+    axis=str,
+    # Locals
+    cellsize='double',
+    gridsize='Py_ssize_t',
+    plane=object,  # np.ndarray
+    plane_local=object,  # np.ndarray
+    projection_arr=object,  # np.ndarray
+    slab_arr=object,  # np.ndarray
+    returns='double[:, ::1]',
+)
+def project_render2D_fourier(slab, projection, axis):
+    """By the projection-slice theorem, the projection of the grid
+    along the given axis through the entire box is given by the 2D
+    inverse Fourier transform of the plane of the 3D Fourier grid
+    through the origin and normal to the axis. Only this plane is thus
+    needed, which is gathered onto the master process and transformed
+    there. As with project_render2D(), only the projection on the
+    master process will be complete.
+    """
+    gridsize = projection.shape[0]
+    cellsize = boxsize/gridsize
+    # The slabs are distributed along the j (y) dimension, which is the
+    # first dimension due to the transposition by the FFT. The second
+    # dimension is then the i (x) dimension, while the third dimension
+    # holds the real and imaginary parts of the kk ≥ 0 (z) modes.
+    slab_arr = asarray(slab)
+    if axis == 'x':
+        # Gather the ki = 0 plane, distributed along the j dimension
+        plane_local = np.ascontiguousarray(slab_arr[:, 0, :])
+        plane = (empty((gridsize, slab_arr.shape[2]), dtype=C2np['double']) if master else None)
+        Gather(plane_local, plane)
+        if master:
+            plane = plane[:, 0::2] + 1j*plane[:, 1::2]
+            projection_arr = np.fft.irfft2(plane, s=(gridsize, gridsize))
+    elif axis == 'y':
+        # The kj = 0 plane is stored entirely on the master process
+        if master:
+            plane = slab_arr[0, :, 0::2] + 1j*slab_arr[0, :, 1::2]
+            projection_arr = np.fft.irfft2(plane, s=(gridsize, gridsize))
+    else:  # axis == 'z'
+        # Gather the kk = 0 plane, distributed along the j dimension
+        plane_local = np.ascontiguousarray(slab_arr[:, :, 0:2])
+        plane = (empty((gridsize, gridsize, 2), dtype=C2np['double']) if master else None)
+        Gather(plane_local, plane)
+        if master:
+            plane = (plane[:, :, 0] + 1j*plane[:, :, 1]).T
+            projection_arr = np.fft.ifft2(plane).real
+    if not master:
+        return projection
+    # The NumPy inverse transforms are normalised by the number of
+    # grid points in the plane, whereas the sum along the axis brings
+    # in an additional factor of gridsize. The values in the projection
+    # correspond to physical densities, which we further convert
+    # to mass, as in project_render2D().
+    projection_arr *= gridsize**3*(universals.a*cellsize)**3
+    asarray(projection)[...] = projection_arr
+    # Put the projection into the proper orientation
+    orient_render2D(projection)
+    return projection
+
+# Function for depositing particle components directly onto
+# a 2D projection grid, without constructing a 3D grid.
+@cython.header(
+    # Arguments
+    components=list,
+    projection='double[:, ::1]',
+    axis=str,
+    extent=tuple,
+    interpolation='int',
+    # Locals
+    a='double',
+    cellsize_inv='double',
+    component='Component',
+    contribution='double',
+    dim_axis='int',
+    dim_x='int',
+    dim_y='int',
+    float_index_global_bgn='double',
+    float_index_global_end='double',
+    gridsize='Py_ssize_t',
+    i='Py_ssize_t',
+    index_axis='Py_ssize_t',
+    index_c='Py_ssize_t',
+    index_i='Py_ssize_t',
+    index_j='Py_ssize_t',
+    index_x='Py_ssize_t',
+    index_y='Py_ssize_t',
+    indexᵖ='Py_ssize_t',
+    j='Py_ssize_t',
+    n='Py_ssize_t',
+    overlap='double',
+    pos='double*',
+    shift='double',
+    weight='double',
+    weight_axis='double',
+    returns='double[:, ::1]',
+)
+def deposit_render2D(components, projection, axis, extent, interpolation):
+    """Each particle is interpolated onto the projection using the
+    given interpolation order within the plane, weighted by the
+    fraction of its interpolation kernel along the axis which falls
+    within the extent. This matches the result of interpolating onto
+    a 3D grid and then projecting the grid using project_render2D(),
+    though without deconvolution and interlacing. Only particles within
+    the extent (plus the kernel width) contribute, and the memory
+    needed is that of the 2D projection alone.
+    The passed 2D projection array will be mutated in-place.
+    Only the projection on the master process will be complete.
+    """
+    if not (1 <= interpolation <= 4):
+        abort(
+            f'deposit_render2D() called with interpolation = {interpolation} '
+            f'∉ {{1 (NGP), 2 (CIC), 3 (TSC), 4 (PCS)}}'
+        )
+    gridsize = projection.shape[0]
+    cellsize_inv = gridsize/boxsize
+    dim_axis = 'xyz'.index(axis)
+    dim_x, dim_y = {'x': (1, 2), 'y': (0, 2), 'z': (0, 1)}[axis]
+    # The extent in grid units
+    float_index_global_bgn = extent[0]*cellsize_inv
+    float_index_global_end = extent[1]*cellsize_inv
+    # Grid point n is located at n*cellsize for vertex centred grids and
+    # at (n + ½)*cellsize for cell centred grids. We further shift
+    # all coordinates by a whole box, ensuring positive values.
+    shift = gridsize - 0.5*cell_centered
+    a = universals.a
+    projection[...] = 0
+    for component in components:
+        # The contribution of each particle to the projection is its
+        # mass, corresponding to the physical density ρ summed along
+        # the axis and multiplied by the physical cell volume.
+        contribution = component.mass*a**(-3*component.w_eff(a=a))
+        pos = component.pos
+        for indexᵖ in range(component.N_local):
+            # Compute the fraction of the kernel along the axis
+            # which falls within the extent, wrapping periodically.
+            with unswitch:
+                if interpolation == 1:
+                    index_axis = set_weights_NGP(
+                        pos[3*indexᵖ + dim_axis]*cellsize_inv + shift, weights_z,
+                    )
+                elif interpolation == 2:
+                    index_axis = set_weights_CIC(
+                        pos[3*indexᵖ + dim_axis]*cellsize_inv + shift, weights_z,
+                    )
+                elif interpolation == 3:
+                    index_axis = set_weights_TSC(
+                        pos[3*indexᵖ + dim_axis]*cellsize_inv + shift, weights_z,
+                    )
+                else:  # interpolation == 4
+                    index_axis = set_weights_PCS(
+                        pos[3*indexᵖ + dim_axis]*cellsize_inv + shift, weights_z,
+                    )
+            weight_axis = 0
+            for n in range(interpolation):
+                index_c = mod(index_axis + n, gridsize)
+                overlap = (
+                    pairmin(index_c + 1, float_index_global_end)
+                    - pairmax(index_c, float_index_global_bgn)
+                )
+                if overlap > 0:
+                    weight_axis += overlap*weights_z[n]
+            if weight_axis == 0:
+                continue
+            # Deposit the particle onto the projection
+            with unswitch:
+                if interpolation == 1:
+                    index_x = set_weights_NGP(pos[3*indexᵖ + dim_x]*cellsize_inv + shift, weights_x)
+                    index_y = set_weights_NGP(pos[3*indexᵖ + dim_y]*cellsize_inv + shift, weights_y)
+                elif interpolation == 2:
+                    index_x = set_weights_CIC(pos[3*indexᵖ + dim_x]*cellsize_inv + shift, weights_x)
+                    index_y = set_weights_CIC(pos[3*indexᵖ + dim_y]*cellsize_inv + shift, weights_y)
+                elif interpolation == 3:
+                    index_x = set_weights_TSC(pos[3*indexᵖ + dim_x]*cellsize_inv + shift, weights_x)
+                    index_y = set_weights_TSC(pos[3*indexᵖ + dim_y]*cellsize_inv + shift, weights_y)
+                else:  # interpolation == 4
+                    index_x = set_weights_PCS(pos[3*indexᵖ + dim_x]*cellsize_inv + shift, weights_x)
+                    index_y = set_weights_PCS(pos[3*indexᵖ + dim_y]*cellsize_inv + shift, weights_y)
+            weight_axis *= contribution
+            for i in range(interpolation):
+                index_i = mod(index_x + i, gridsize)
+                weight = weight_axis*weights_x[i]
+                for j in range(interpolation):
+                    index_j = mod(index_y + j, gridsize)
+                    projection[index_i, index_j] += weight*weights_y[j]
+    # Sum up contributions from all processes into the master process,
+    # after which this process holds the full projection.
+    Reduce(
+        sendbuf=(MPI.IN_PLACE if master else projection),
+        recvbuf=(projection   if master else None),
+        op=MPI.SUM,
+    )
+    if not master:
+        return projection
+    # Put the projection into the proper orientation
+    orient_render2D(projection)
+    return projection
+
 # Function for enhancing the contrast of the 2D renders
 @cython.header(
     # Arguments
     declaration=object,  # Render2DDeclaration
     # Locals
-    bin_edges='double[::1]',
-    bins='Py_ssize_t[::1]',
-    color_truncation_factor_lower='double',
-    color_truncation_factor_upper='double',
-    shifting_factor='double',
     exponent='double',
-    exponent_lower='double',
-    exponent_max='double',
-    exponent_min='double',
-    exponent_tol='double',
-    exponent_upper='double',
-    index='Py_ssize_t',
-    index_center='Py_ssize_t',
-    index_max='Py_ssize_t',
-    index_min='Py_ssize_t',
     key=str,
-    n_bins='Py_ssize_t',
-    n_bins_fac='double',
-    n_bins_min='Py_ssize_t',
-    occupation='Py_ssize_t',
     projection='double[:, ::1]',
-    projection_ptr='double*',
-    size='Py_ssize_t',
-    value='double',
     vmax='double',
     vmin='double',
-    Σbins='Py_ssize_t',
     returns='void',
 )
 def enhance_render2D(declaration):
@@ -935,125 +1183,174 @@ def enhance_render2D(declaration):
         return
     if not declaration.enhance:
         return
-    # Numerical parameters
-    shifting_factor = 0.28
-    exponent_min = 1e-2
-    exponent_max = 1e+2
-    exponent_tol = 1e-3
-    n_bins_min = 25
-    n_bins_fac = 1e-2
-    color_truncation_factor_lower = 0.005
-    color_truncation_factor_upper = 0.0001
     # Enforce all pixel values to be between 0 and 1
     rescale_render2D(declaration)
     # Perform independent enhancements
     # of the 'image' and 'terminal_image'.
     for key, projection in declaration.projections.items():
-        if key == 'data':
+        if key in {'data', 'video'}:
             continue
         # The terminal image projection only contains data
         # in the upper half of the rows.
         if key == 'terminal_image':
             projection = projection[:projection.shape[0]//2, :]
-        # Completely homogeneous projections cannot be enhanced
-        vmin = np.min(projection)
-        vmax = np.max(projection)
-        if vmin == vmax:
-            continue
-        # Find a good value for the exponent using a binary search
-        size = projection.size
-        n_bins = pairmax(n_bins_min, cast(size*n_bins_fac, 'Py_ssize_t'))
-        exponent_lower = exponent_min
-        exponent_upper = exponent_max
-        exponent = 1
-        index_min = -4
-        index_max = -2
-        while True:
-            # Construct histogram over projection**exponent
-            bins, bin_edges = np.histogram(asarray(projection)**exponent, n_bins)
-            # Compute the sum of all bins. This is equal to the sum of
-            # values in the projection. However, we skip bins[0] since
-            # sometimes empty cells results in a large spike there.
-            Σbins = size - bins[0]
-            # Find the position of the centre of the histogram,
-            # defined by the sums of bins being the same on both
-            # sides of this centre. We again skip bins[0].
-            occupation = 0
-            for index in range(1, n_bins):
-                occupation += bins[index]
-                if occupation >= ℤ[Σbins//2]:
-                    index_center = index
-                    break
-            else:
-                # Something went wrong. Bail out.
-                masterwarn('Something went wrong during 2D render enhancement')
-                exponent = 1
-                break
-            if index_center < ℤ[n_bins*shifting_factor]:
-                # The exponent should be decreased
-                exponent_upper = exponent
-                index_min = index_center
-            elif index_center > ℤ[n_bins*shifting_factor]:
-                # The exponent should be increased
-                exponent_lower = exponent
-                index_max = index_center
-            else:
-                # Good choice of exponent found
-                break
-            # The current value of the exponent does not place the
-            # "centre" of the histogram at the desired location
-            # specified by shifting_factor.
-            # Check if the binary search has (almost) converged on
-            # some other value.
-            if index_max >= index_min and index_max - index_min <= 1:
-                break
-            # Check if the exponent is close
-            # to one of the extreme values.
-            if exponent/exponent_min < ℝ[1 + exponent_tol]:
-                exponent = exponent_min
-                break
-            elif exponent_max/exponent < ℝ[1 + exponent_tol]:
-                exponent = exponent_max
-                break
-            # Update the exponent. As the range of the exponent is
-            # large, the binary step is done in logarithmic space.
-            exponent = sqrt(exponent_lower*exponent_upper)
-        # Apply the enhancement
-        projection_ptr = cython.address(projection[:, :])
-        for index in range(size):
-            projection_ptr[index] **= exponent
-        bins, bin_edges = np.histogram(projection, n_bins)
+        exponent, vmin, vmax = get_render2D_enhancement(projection)
+        apply_render2D_enhancement(projection, exponent, vmin, vmax)
+
+# Function returning the exponent and colour limits with which to
+# enhance a projection with values in [0, 1], as described in
+# enhance_render2D(). The projection itself is left untouched.
+@cython.header(
+    # Arguments
+    projection='double[:, ::1]',
+    # Locals
+    bin_edges='double[::1]',
+    bins='Py_ssize_t[::1]',
+    color_truncation_factor_lower='double',
+    color_truncation_factor_upper='double',
+    shifting_factor='double',
+    exponent='double',
+    exponent_lower='double',
+    exponent_max='double',
+    exponent_min='double',
+    exponent_tol='double',
+    exponent_upper='double',
+    index='Py_ssize_t',
+    index_center='Py_ssize_t',
+    index_max='Py_ssize_t',
+    index_min='Py_ssize_t',
+    n_bins='Py_ssize_t',
+    n_bins_fac='double',
+    n_bins_min='Py_ssize_t',
+    occupation='Py_ssize_t',
+    size='Py_ssize_t',
+    vmax='double',
+    vmin='double',
+    Σbins='Py_ssize_t',
+    returns=tuple,
+)
+def get_render2D_enhancement(projection):
+    # Numerical parameters
+    shifting_factor = 0.28
+    exponent_min = 1e-2
+    exponent_max = 1e+2
+    exponent_tol = 1e-3
+    n_bins_min = 25
+    n_bins_fac = 1e-2
+    color_truncation_factor_lower = 0.005
+    color_truncation_factor_upper = 0.0001
+    # Completely homogeneous projections cannot be enhanced
+    vmin = np.min(projection)
+    vmax = np.max(projection)
+    if vmin == vmax:
+        return 1, vmin, vmax
+    # Find a good value for the exponent using a binary search
+    size = projection.size
+    n_bins = pairmax(n_bins_min, cast(size*n_bins_fac, 'Py_ssize_t'))
+    exponent_lower = exponent_min
+    exponent_upper = exponent_max
+    exponent = 1
+    index_min = -4
+    index_max = -2
+    while True:
+        # Construct histogram over projection**exponent
+        bins, bin_edges = np.histogram(asarray(projection)**exponent, n_bins)
+        # Compute the sum of all bins. This is equal to the sum of
+        # values in the projection. However, we skip bins[0] since
+        # sometimes empty cells results in a large spike there.
         Σbins = size - bins[0]
-        # To further enhance the projected image, we set the colour
-        # limits so as to truncate the colour space at both ends,
-        # saturating pixels with very little or very high intensity.
-        # The colour limits vmin and vmax are determined based on the
-        # color_truncation_factor_* parameters. These specify the
-        # accumulated fraction of Σbins at which the histogram should be
-        # truncated, for the lower and upper intensity ends.
-        # For projections with a lot of structure, the best results are
-        # obtained by giving the lower colour truncation quite a large
-        # value (this effectively removes the background), while giving
-        # the higher colour truncation a small value,
-        # so that small very overdense regions appear clearly.
+        # Find the position of the centre of the histogram,
+        # defined by the sums of bins being the same on both
+        # sides of this centre. We again skip bins[0].
         occupation = 0
         for index in range(1, n_bins):
             occupation += bins[index]
-            if occupation >= ℤ[color_truncation_factor_lower*Σbins]:
-                vmin = bin_edges[index - 1]
-                break
-        occupation = 0
-        for index in range(n_bins - 1, 0, -1):
-            occupation += bins[index]
-            if occupation >= ℤ[color_truncation_factor_upper*Σbins]:
-                vmax = bin_edges[index + 1]
+            if occupation >= ℤ[Σbins//2]:
+                index_center = index
                 break
-        # Apply colour limits
-        for index in range(size):
-            value = projection_ptr[index]
-            value = pairmax(value, vmin)
-            value = pairmin(value, vmax)
-            projection_ptr[index] = value
+        else:
+            # Something went wrong. Bail out.
+            masterwarn('Something went wrong during 2D render enhancement')
+            exponent = 1
+            break
+        if index_center < ℤ[n_bins*shifting_factor]:
+            # The exponent should be decreased
+            exponent_upper = exponent
+            index_min = index_center
+        elif index_center > ℤ[n_bins*shifting_factor]:
+            # The exponent should be increased
+            exponent_lower = exponent
+            index_max = index_center
+        else:
+            # Good choice of exponent found
+            break
+        # The current value of the exponent does not place the
+        # "centre" of the histogram at the desired location
+        # specified by shifting_factor.
+        # Check if the binary search has (almost) converged on
+        # some other value.
+        if index_max >= index_min and index_max - index_min <= 1:
+            break
+        # Check if the exponent is close
+        # to one of the extreme values.
+        if exponent/exponent_min < ℝ[1 + exponent_tol]:
+            exponent = exponent_min
+            break
+        elif exponent_max/exponent < ℝ[1 + exponent_tol]:
+            exponent = exponent_max
+            break
+        # Update the exponent. As the range of the exponent is
+        # large, the binary step is done in logarithmic space.
+        exponent = sqrt(exponent_lower*exponent_upper)
+    bins, bin_edges = np.histogram(asarray(projection)**exponent, n_bins)
+    Σbins = size - bins[0]
+    # To further enhance the projected image, we set the colour
+    # limits so as to truncate the colour space at both ends,
+    # saturating pixels with very little or very high intensity.
+    # The colour limits vmin and vmax are determined based on the
+    # color_truncation_factor_* parameters. These specify the
+    # accumulated fraction of Σbins at which the histogram should be
+    # truncated, for the lower and upper intensity ends.
+    # For projections with a lot of structure, the best results are
+    # obtained by giving the lower colour truncation quite a large
+    # value (this effectively removes the background), while giving
+    # the higher colour truncation a small value,
+    # so that small very overdense regions appear clearly.
+    occupation = 0
+    for index in range(1, n_bins):
+        occupation += bins[index]
+        if occupation >= ℤ[color_truncation_factor_lower*Σbins]:
+            vmin = bin_edges[index - 1]
+            break
+    occupation = 0
+    for index in range(n_bins - 1, 0, -1):
+        occupation += bins[index]
+        if occupation >= ℤ[color_truncation_factor_upper*Σbins]:
+            vmax = bin_edges[index + 1]
+            break
+    return exponent, vmin, vmax
+
+# Function for applying an enhancement as obtained from
+# get_render2D_enhancement() to a projection, in-place.
+@cython.header(
+    # Arguments
+    projection='double[:, ::1]',
+    exponent='double',
+    vmin='double',
+    vmax='double',
+    # Locals
+    index='Py_ssize_t',
+    projection_ptr='double*',
+    value='double',
+    returns='void',
+)
+def apply_render2D_enhancement(projection, exponent, vmin, vmax):
+    projection_ptr = cython.address(projection[:, :])
+    for index in range(projection.size):
+        value = projection_ptr[index]**exponent
+        value = pairmax(value, vmin)
+        value = pairmin(value, vmax)
+        projection_ptr[index] = value
 
 # Function for rescaling the values in the projections
 # so that they lie in [0, 1].
@@ -1073,7 +1370,7 @@ def rescale_render2D(declaration):
     if not master:
         return
     for key, projection in declaration.projections.items():
-        if key == 'data':
+        if key in {'data', 'video'}:
             continue
         # The terminal image projection only contains data
         # in the upper half of the rows.
@@ -1153,6 +1450,233 @@ def save_render2D_data(declaration, filename, n_dumps):
         dset[...] = projection
     masterprint('done')
 
+# Function for appending an already computed 2D render as a frame to a
+# video, stored as a single chunked HDF5 cube shared between all dumps.
+# The colour scaling (rescaling and enhancement) is carried out on the
+# fly, with the scaling parameters smoothed over consecutive frames
+# to avoid flickering. The resulting frames are stored as 8-bit values
+# in [0, 255], to be colourised using the colormap of the 2D render.
+# If a video encoder command is specified, the colourised frames are
+# additionally piped to this command. When restarting from an autosave,
+# an existing video is continued from the last frame prior to the
+# restart, with the smoothing of the scaling picking up from there.
+@cython.header(
+    # Arguments
+    declaration=object,  # Render2DDeclaration
+    filename=str,
+    n_dumps='int',
+    # Locals
+    colormap=object,  # matplotlib.colors.Colormap
+    command=str,
+    component='Component',
+    components=list,
+    components_str=str,
+    dataset_name=str,
+    exponent='double',
+    ext=str,
+    frame=object,  # np.ndarray
+    frame_stored=object,  # np.ndarray
+    frame_uint8=object,  # np.ndarray
+    frames_stored=object,  # np.ndarray
+    gridsize='Py_ssize_t',
+    hdf5_file=object,  # h5py.File
+    n_frames='Py_ssize_t',
+    scaling=object,  # np.ndarray
+    scaling_frame=object,  # np.ndarray
+    smoothing='double',
+    video=dict,
+    vmax='double',
+    vmin='double',
+    returns='void',
+)
+def save_render2D_video(declaration, filename, n_dumps):
+    if not master:
+        return
+    if not declaration.do_video:
+        return
+    # Weight of the previous scaling parameters when smoothing
+    smoothing = 0.5
+    # Extract some variables from the 2D render declaration
+    components = declaration.components
+    gridsize   = declaration.gridsize
+    frame      = asarray(declaration.projections['video']).copy()
+    # The video file is shared between all dumps. Its name is that of
+    # the 2D render with the time replaced by 'video'. The filename
+    # should reflect the components if multiple renders are dumped.
+    for ext in ('hdf5', 'png'):
+        filename = filename.removesuffix(f'.{ext}')
+    filename = os.path.join(
+        os.path.dirname(filename),
+        '_'.join(os.path.basename(filename).split('_')[:-1] + ['video']) + '.hdf5',
+    )
+    if n_dumps > 1:
+        filename = augment_filename(
+            filename,
+            '_'.join([component.name.replace(' ', '-') for component in components]),
+            '.hdf5',
+        )
+    masterprint(f'Appending frame to video "{filename}" ...')
+    video = render2D_videos.get(filename)
+    if video is None:
+        video = render2D_videos[filename] = {
+            'n_frames'        : 0,
+            'scaling'         : None,
+            'encoder'         : None,
+            'encoder_disabled': False,
+        }
+        # When restarting, continue the existing video. Frames from
+        # the time of the restart and onwards are discarded,
+        # as these are to be rendered anew.
+        if render2D_videos_t_restart != -1 and os.path.isfile(filename):
+            with open_hdf5(filename, mode='a') as hdf5_file:
+                n_frames = np.count_nonzero(hdf5_file['t'][...] < render2D_videos_t_restart)
+                for dataset_name in hdf5_file:
+                    hdf5_file[dataset_name].resize(n_frames, axis=0)
+                if n_frames > 0:
+                    video['scaling'] = hdf5_file['scaling'][n_frames - 1]
+            video['n_frames'] = n_frames
+    # The scaling parameters of this frame are
+    # [vmin_raw, vmax_raw, exponent, vmin, vmax], with the raw values
+    # used for rescaling the frame to [0, 1], followed by the
+    # enhancement. The exponent is smoothed in logarithmic space.
+    scaling_frame = asarray([np.min(frame), np.max(frame), 1, 0, 1], dtype=C2np['double'])
+    scaling = scaling_frame.copy()
+    if video['scaling'] is not None:
+        scaling[:2] = smoothing*video['scaling'][:2] + (1 - smoothing)*scaling_frame[:2]
+    # Rescale frame to [0, 1]
+    if scaling[0] != 0 and scaling[1] != 0 and isclose(scaling[0], scaling[1]):
+        frame[...] = 0.5
+    else:
+        frame -= scaling[0]
+        frame *= 1/(scaling[1] - scaling[0])
+        np.clip(frame, 0, 1, out=frame)
+    # Enhance frame
+    if declaration.enhance:
+        exponent, vmin, vmax = get_render2D_enhancement(frame)
+        scaling_frame[2:] = (exponent, vmin, vmax)
+        scaling[2:] = scaling_frame[2:]
+        if video['scaling'] is not None:
+            scaling[2] = exp(
+                smoothing*log(video['scaling'][2]) + (1 - smoothing)*log(scaling_frame[2])
+            )
+            scaling[3:] = smoothing*video['scaling'][3:] + (1 - smoothing)*scaling_frame[3:]
+        apply_render2D_enhancement(frame, scaling[2], scaling[3], scaling[4])
+        if scaling[4] > scaling[3]:
+            frame -= scaling[3]
+            frame *= 1/(scaling[4] - scaling[3])
+    video['scaling'] = scaling
+    frame_uint8 = np.round(frame*255).astype(C2np['unsigned char'])
+    # Append frame to the video file. The file is created
+    # (overwriting any existing file) at the first frame.
+    n_frames = video['n_frames']
+    with open_hdf5(filename, mode=('a' if n_frames else 'w')) as hdf5_file:
+        if n_frames == 0:
+            components_str = ', '.join([component.name for component in components])
+            if len(components) > 1:
+                components_str = f'{{{components_str}}}'
+            # Save used base unit
+            hdf5_file.attrs['unit time'  ] = unit_time
+            hdf5_file.attrs['unit length'] = unit_length
+            hdf5_file.attrs['unit mass'  ] = unit_mass
+            # Save attributes
+            hdf5_file.attrs['boxsize'   ] = boxsize
+            hdf5_file.attrs['components'] = components_str
+            hdf5_file.attrs['axis'      ] = declaration.axis
+            hdf5_file.attrs['extent'    ] = declaration.extent
+            hdf5_file.attrs['colormap'  ] = declaration.colormap
+            # Create resizable datasets, with each frame
+            # stored as a separate chunk.
+            hdf5_file.create_dataset(
+                'frames', (0, gridsize, gridsize), dtype=C2np['unsigned char'],
+                maxshape=(None, gridsize, gridsize), chunks=(1, gridsize, gridsize),
+                compression='gzip', compression_opts=1,
+            )
+            hdf5_file.create_dataset(
+                'scaling', (0, 5), dtype=C2np['double'], maxshape=(None, 5),
+            )
+            for dataset_name in (('a', 't') if enable_Hubble else ('t', )):
+                hdf5_file.create_dataset(
+                    dataset_name, (0, ), dtype=C2np['double'], maxshape=(None, ),
+                )
+        for dataset_name in hdf5_file:
+            hdf5_file[dataset_name].resize(n_frames + 1, axis=0)
+        hdf5_file['frames' ][n_frames] = frame_uint8
+        hdf5_file['scaling'][n_frames] = scaling
+        hdf5_file['t'      ][n_frames] = universals.t
+        if enable_Hubble:
+            hdf5_file['a'][n_frames] = universals.a
+    video['n_frames'] = n_frames + 1
+    # Pipe the colourised frame to the video encoder. When starting
+    # up the encoder for a continued video, the frames already stored
+    # are piped first. Should the encoder exit prematurely, no further
+    # frames are piped to it.
+    if declaration.video_encoder and not video['encoder_disabled']:
+        colormap = getattr(get_matplotlib().cm, declaration.colormap)
+        try:
+            if video['encoder'] is None:
+                command = declaration.video_encoder.format(
+                    width=gridsize, height=gridsize, filename=filename.removesuffix('.hdf5'),
+                )
+                video['encoder'] = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE)
+                if n_frames > 0:
+                    with open_hdf5(filename, mode='r') as hdf5_file:
+                        frames_stored = hdf5_file['frames'][:n_frames]
+                    for frame_stored in frames_stored:
+                        video['encoder'].stdin.write(
+                            np.round(colormap(frame_stored/255)[:, :, :3]*255)
+                            .astype(C2np['unsigned char']).tobytes()
+                        )
+            video['encoder'].stdin.write(
+                np.round(colormap(frame)[:, :, :3]*255).astype(C2np['unsigned char']).tobytes()
+            )
+        except BrokenPipeError:
+            masterwarn(
+                f'The video encoder of "{filename}" exited unexpectedly. '
+                f'No further frames will be piped to it.'
+            )
+            video['encoder'].wait()
+            video['encoder'] = None
+            video['encoder_disabled'] = True
+    masterprint('done')
+# Dict storing the state of the videos used by the above function
+cython.declare(render2D_videos=dict)
+render2D_videos = {}
+
+# Function for initialising 2D render videos at the beginning of the
+# simulation. When restarting from an autosave, the cosmic time of the
+# restart is recorded, so that existing videos can be continued.
+@cython.pheader(
+    # Arguments
+    restart='bint',
+    returns='void',
+)
+def init_render2D_videos(restart=False):
+    global render2D_videos_t_restart
+    render2D_videos_t_restart = (universals.t if restart else -1)
+# Cosmic time of the restart, used by save_render2D_video()
+cython.declare(render2D_videos_t_restart='double')
+render2D_videos_t_restart = -1
+
+# Function for closing down video encoders started by
+# save_render2D_video(), waiting for them to finish.
+@cython.pheader(
+    # Locals
+    video=dict,
+    returns='void',
+)
+def close_render2D_videos():
+    if not master:
+        return
+    for video in render2D_videos.values():
+        if video['encoder'] is None:
+            continue
+        try:
+            video['encoder'].stdin.close()
+        except BrokenPipeError:
+            masterwarn('A video encoder exited unexpectedly')
+        video['encoder'].wait()
+        video['encoder'] = None
+
 # Function for saving an already computed 2D render as an HDF5 file
 @cython.header(
     # Arguments
@@ -1197,6 +1721,19 @@ def save_render2D_image(declaration, filename, n_dumps):
     masterprint('done')
 
 # Function for augmenting a filename with a given text
+@cython.pheader(
+    # Arguments
+    filename=str,
+    text=str,
+    ext=str,
+    # Locals
+    baseext=str,
+    basename=str,
+    dirname=str,
+    time_param=str,
+    time_param_indices=object,  # collections.defaultdict
+    returns=str,
+)
 def augment_filename(filename, text, ext=''):
     """Example of use:
     augment_filename('/path/to/powerspec_a=1.0.png', 'matter', 'png')
@@ -1217,7 +1754,7 @@ def augment_filename(filename, text, ext=''):
     if time_param_indices['t'] == time_param_indices['a']:
         basename += f'_{text}'
     else:
-        time_param = sorted(time_param_indices.items(), key=lambda tup: tup[::-1])[-1][0]
+        time_param = ('t' if time_param_indices['t'] > time_param_indices['a'] else 'a')
         basename = (f'_{text}_{time_param}='
             .join(basename.rsplit(f'_{time_param}=', 1))
         )
@@ -1294,237 +1831,43 @@ def set_terminal_colormap(colormap):
         # bookkeeping inside fancyprint.
         print(statechange, end='')
 
-# Function for 3D renderings of the components
+# Function for 3D renderings of the components.
+# Each process rasterises its local particles (or fluid elements) into
+# a transmittance buffer by splatting them onto the image plane of an
+# orthographic camera. As all particles of a component share the same
+# colour, the alpha blending of overlapping particles is independent of
+# their order, and so the full render of a component is obtained
+# simply as the product of the transmittance buffers of all processes.
 @cython.header(
     # Arguments
     components=list,
     filename=str,
-    cleanup='bint',
-    tmp_dirname=str,
     # Locals
-    N_local='Py_ssize_t',
-    a_str=str,
-    artists_text=dict,
-    color='double[::1]',
     component='Component',
     component_dict=dict,
-    domain_start_i='Py_ssize_t',
-    domain_start_j='Py_ssize_t',
-    domain_start_k='Py_ssize_t',
-    figname=str,
     filename_component=str,
-    filename_component_alpha=str,
-    filename_component_alpha_part=str,
-    filenames_component_alpha=list,
-    filenames_component_alpha_part=list,
     filenames_components=list,
-    gridsize='Py_ssize_t',
-    i='Py_ssize_t',
-    index='Py_ssize_t',
-    indexᵖ='Py_ssize_t',
-    j='Py_ssize_t',
-    k='Py_ssize_t',
-    label_props=list,
-    label_spacing='double',
+    image='float[:, :, ::1]',
     name=str,
     names=tuple,
-    part='int',
-    posx='double*',
-    posx_mv='double[::1]',
-    posy='double*',
-    posy_mv='double[::1]',
-    posz='double*',
-    posz_mv='double[::1]',
-    render3D_dir=str,
-    rgbα='double[:, ::1]',
-    scatter_size='double',
-    size='Py_ssize_t',
-    size_i='Py_ssize_t',
-    size_j='Py_ssize_t',
-    size_k='Py_ssize_t',
-    t_str=str,
-    xi='double',
-    yj='double',
-    zk='double',
-    α='double',
-    α_factor='double',
-    α_homogeneous='double',
-    ϱ_noghosts='double[:, :, :]',
-    ϱbar_component='double',
+    transmittance='double[:, ::1]',
 )
-def render3D(components, filename, cleanup=True, tmp_dirname='.renders3D'):
-    global render3D_image
+def render3D(components, filename):
     # Do not 3D render anything if
     # render3D_select does not contain any True values.
     if not any(render3D_select.values()):
         return
-    # Fetch Matplotlib
-    matplotlib = get_matplotlib()
-    plt = matplotlib.pyplot
     # Attach missing extension to filename
     if not filename.endswith('.png'):
         filename += '.png'
-    # The directory for storing the temporary 3D renders
-    render3D_dir = '{}/{}'.format(os.path.dirname(filename), tmp_dirname)
-    # Initialise figures by building up render3D_dict, if this is the
-    # first time this function is called.
+    # Initialise the colours, α values and splat sizes by building
+    # up render3D_dict, if this is the first time this
+    # function is called.
     if not render3D_dict:
-        masterprint('Initialising 3D renders ...')
-        # Make cyclic default colours as when doing multiple plots in
-        # one figure. Make sure that none of the colours are identical
-        # to the background colour.
-        default_colors = itertools.cycle([
-            to_rgb(prop['color'])
-            for prop in matplotlib.rcParams['axes.prop_cycle']
-            if not all(to_rgb(prop['color']) == render3D_bgcolor)
-        ])
-        for component in components:
-            if not is_selected(component, render3D_select):
-                continue
-            # This component should be 3D rendered.
-            # Prepare a figure for the 3D render of the i'th component.
-            figname = f'render3D_{component.name}'
-            dpi = 100  # This only affects the font size relative to the figure
-            fig = plt.figure(figname, figsize=[render3D_resolution/dpi]*2, dpi=dpi)
-            ax = fig.add_subplot(projection='3d', facecolor=render3D_bgcolor)
-            # The colour and α (of a homogeneous column through the
-            # entire box) of this component.
-            if component.name.lower() in render3D_colors:
-                # This component is given a specific colour by the user
-                color, α_homogeneous = render3D_colors[component.name.lower()]
-            elif 'all' in render3D_colors:
-                # All components are given the same colour by the user
-                color, α_homogeneous = render3D_colors['all']
-            else:
-                # No colour specified for this particular component.
-                # Assign the next colour from the default cyclic colours.
-                color = next(default_colors)
-                α_homogeneous = 0.2
-            # The artist for the component
-            if component.representation == 'particles':
-                # The particle size on the figure
-                scatter_size, α = alpha_blend(component.N, α_homogeneous, fig)
-                # Apply size and alpha
-                artist_component = ax.scatter(
-                    0, 0, 0,
-                    alpha=α,
-                    c=np.expand_dims(color, 0),
-                    s=scatter_size,
-                    depthshade=False,
-                    lw=0,
-                )
-            elif component.representation == 'fluid':
-                # To 3D render fluid elements, their explicit positions
-                # are needed. In the following, these are computed and
-                # stored in the variables posx_mv, posy_mv and posz_mv.
-                size_i = component.shape_noghosts[0]
-                size_j = component.shape_noghosts[1]
-                size_k = component.shape_noghosts[2]
-                # Number of local fluid elements
-                size = size_i*size_j*size_k
-                # Allocate arrays for storing grid positions
-                posx_mv = empty(size, dtype='double')
-                posy_mv = empty(size, dtype='double')
-                posz_mv = empty(size, dtype='double')
-                posx = cython.address(posx_mv[:])
-                posy = cython.address(posy_mv[:])
-                posz = cython.address(posz_mv[:])
-                # Fill the arrays
-                gridsize = component.gridsize
-                domain_start_i = domain_layout_local_indices[0]*size_i
-                domain_start_j = domain_layout_local_indices[1]*size_j
-                domain_start_k = domain_layout_local_indices[2]*size_k
-                indexᵖ = 0
-                for i in range(size_i):
-                    xi = (ℝ[domain_start_i + 0.5*cell_centered] + i)*ℝ[boxsize/gridsize]
-                    for j in range(size_j):
-                        yj = (ℝ[domain_start_j + 0.5*cell_centered] + j)*ℝ[boxsize/gridsize]
-                        for k in range(size_k):
-                            zk = (ℝ[domain_start_k + 0.5*cell_centered] + k)*ℝ[boxsize/gridsize]
-                            posx[indexᵖ] = xi
-                            posy[indexᵖ] = yj
-                            posz[indexᵖ] = zk
-                            indexᵖ += 1
-                # 2D array with rgbα rows, one row for each
-                # fluid element. This is the only array which will be
-                # updated for each new 3D render, and only the α column
-                # will be updated.
-                rgbα = empty((size, 4), dtype=C2np['double'])
-                for i in range(size):
-                    for dim in range(3):
-                        rgbα[i, dim] = color[dim]
-                    rgbα[i, 3] = 1
-                # The particle (fluid element) size on the figure
-                scatter_size, α_factor = alpha_blend(gridsize**3, α_homogeneous, fig)
-                # Plot the fluid elements as a 3D scatter plot
-                artist_component = ax.scatter(
-                    asarray(posx_mv),
-                    asarray(posy_mv),
-                    asarray(posz_mv),
-                    c=asarray(rgbα),
-                    s=scatter_size,
-                    depthshade=False,
-                    lw=0,
-                )
-                # The set_facecolors method on the artist can be used
-                # to update the α values on the plot. This function is
-                # called internally by Matplotlib with wrong arguments,
-                # cancelling the α updates. For this reason, we
-                # replace this method with a dummy method, while
-                # keeping the original as _set_facecolors (though we
-                # do not use this, as we set the _facecolors attribute
-                # manually instead).
-                artist_component._set_facecolors = artist_component.set_facecolors
-                artist_component.set_facecolors = dummy_func
-            # The artists for the cosmic time and scale factor text
-            artists_text = {}
-            label_spacing = 0.07
-            label_props = [(label_spacing,     label_spacing, 'left'),
-                           (1 - label_spacing, label_spacing, 'right')]
-            artists_text['t'] = ax.text2D(
-                label_props[0][0],
-                label_props[0][1],
-                '',
-                fontsize=16,
-                horizontalalignment=label_props[0][2],
-                transform=ax.transAxes,
-            )
-            if enable_Hubble:
-                artists_text['a'] = ax.text2D(
-                    label_props[1][0],
-                    label_props[1][1],
-                    '',
-                    fontsize=16,
-                    horizontalalignment=label_props[1][2],
-                    transform=ax.transAxes,
-                )
-            # Configure axis options
-            ax.set_proj_type('ortho')
-            ax.set_xlim(0, boxsize)
-            ax.set_ylim(0, boxsize)
-            ax.set_zlim(0, boxsize)
-            ax.set_box_aspect((1, 1, 1), zoom=1.1)
-            ax.axis('off')  # Remove panes, gridlines, axes, ticks, etc.
-            plt.tight_layout(pad=-1)  # Extra tight layout, to prevent white frame
-            # Store the figure, axes and the component
-            # and text artists in the render3D_dict.
-            render3D_dict[component.name] = {
-                'fig'             : fig,
-                'ax'              : ax,
-                'artist_component': artist_component,
-                'artists_text'    : artists_text,
-                'α_factor'        : (α_factor if component.representation == 'fluid' else None),
-                'rgbα'            : (rgbα     if component.representation == 'fluid' else None),
-            }
-        masterprint('done')
+        init_render3D(components)
         # Return if no component is to be 3D rendered
         if not render3D_dict:
             return
-    # Create the temporary 3D render directory if necessary
-    if not (nprocs == 1 == len(render3D_dict)):
-        if master:
-            os.makedirs(render3D_dir, exist_ok=True)
-        Barrier()
     # Print out progress message
     names = tuple(render3D_dict.keys())
     if len(names) == 1:
@@ -1536,196 +1879,325 @@ def render3D(components, filename, cleanup=True, tmp_dirname='.renders3D'):
             filenames_components.append(f'"{filename_component}"')
         masterprint('3D rendering {} and saving to {} ...'
                     .format(', '.join(names), ', '.join(filenames_components)))
+    # Make render3D_image black and transparent
+    render3D_image[...] = 0
     # 3D render each component separately
     for component in components:
-        if component.name not in render3D_dict:
+        component_dict = render3D_dict.get(component.name)
+        if component_dict is None:
             continue
-        # Switch to the render3D figure
-        figname = 'render3D_{}'.format(component.name)
-        plt.figure(figname)
-        # Extract figure elements
-        component_dict   = render3D_dict[component.name]
-        fig              = component_dict['fig']
-        ax               = component_dict['ax']
-        artist_component = component_dict['artist_component']
-        artists_text     = component_dict['artists_text']
-        if component.representation == 'particles':
-            # Update particle positions on the figure
-            N_local = component.N_local
-            artist_component._offsets3d = (
-                component.posx[:N_local],
-                component.posy[:N_local],
-                component.posz[:N_local],
-            )
-        elif component.representation == 'fluid':
-            rgbα     = component_dict['rgbα']
-            α_factor = component_dict['α_factor']
-            # Measure the mean value of the ϱ grid
-            ϱ_noghosts = component.ϱ.grid_noghosts
-            ϱbar_component = allreduce(np.sum(ϱ_noghosts), op=MPI.SUM)/component.gridsize**3
-            # Update the α values in rgbα array based on the values of
-            # ϱ at each grid point. The rgb-values remain the same for
-            # all 3D renders of this component.
-            index = 0
-            for         i in range(ℤ[ϱ_noghosts.shape[0]]):
-                for     j in range(ℤ[ϱ_noghosts.shape[1]]):
-                    for k in range(ℤ[ϱ_noghosts.shape[2]]):
-                        α = ℝ[α_factor/ϱbar_component]*ϱ_noghosts[i, j, k]
-                        if α > 1:
-                            α = 1
-                        rgbα[index, 3] = α
-                        index += 1
-            # Apply the new α values to the artist.
-            # We do this by setting the attribute _facecolors,
-            # which is much faster than using the set_facecolors
-            # method.
-            artist_component._facecolors = asarray(rgbα)
-        # Print the current cosmic time and scale factor on the figure
-        if master:
-            t_str = a_str = ''
-            t_str = (
-                r'$t = {}\, \mathrm{{{}}}$'
-                .format(significant_figures(universals.t, 4, 'tex'), unit_time)
-            )
-            artists_text['t'].set_text(t_str)
-            if enable_Hubble:
-                a_str = '$a = {}$'.format(significant_figures(universals.a, 4, 'tex'))
-                artists_text['a'].set_text(a_str)
-            # Make the text colour black or white,
-            # dependent on the background colour.
-            for artist_text in artists_text.values():
-                if sum(render3D_bgcolor) < 1:
-                    artist_text.set_color('white')
-                else:
-                    artist_text.set_color('black')
-        # Save the 3D render
-        if nprocs == 1:
-            filename_component_alpha_part = (
-                '{}/{}_alpha.png'.format(render3D_dir, component.name.replace(' ', '-'))
-            )
-        else:
-            filename_component_alpha_part = (
-                '{}/{}_alpha_{}.png'.format(render3D_dir, component.name.replace(' ', '-'), rank)
+        # Rasterise the local part of the component
+        transmittance = rasterise_render3D(component, component_dict)
+        # Composite the partial renders of all processes
+        # into the full render on the master process.
+        Reduce(
+            sendbuf=(MPI.IN_PLACE if master else transmittance),
+            recvbuf=(transmittance if master else None),
+            op=MPI.PROD,
+        )
+        if not master:
+            continue
+        # Blend the render of this component into the total render,
+        # saving it separately as well if several components are
+        # being 3D rendered.
+        image = get_render3D_layer(transmittance, component_dict['color'])
+        blend(image)
+        if len(names) > 1:
+            add_background(image)
+            filename_component = augment_filename(
+                filename, component.name.replace(' ', '-'), '.png',
             )
-        if nprocs == 1 == len(render3D_dict):
-            # As this is the only 3D render which should be done, it can
-            # be saved directly in its final, non-transparent state.
-            plt.savefig(filename, transparent=False)
-            masterprint('done')
-        else:
-            # Save transparent 3D render
-            plt.savefig(filename_component_alpha_part, transparent=True)
-    # All 3D rendering done
-    Barrier()
-    # The partial 3D renders will now be combined into full 3D renders,
-    # stored in the 'render3D_image', variable. Partial 3D renders of
-    # the j'th component will be handled by the process with rank j.
-    if not (nprocs == 1 == len(render3D_dict)):
-        # Loop over components designated to each process
-        for i in range(1 + len(render3D_dict)//nprocs):
-            # Break out when there is no more work for this process
-            j = rank + nprocs*i
-            if j >= len(names):
-                break
-            name = names[j].replace(' ', '-')
-            if nprocs == 1:
-                # Simply load the already fully constructed image
-                filename_component_alpha = f'{render3D_dir}/{name}_alpha.png'
-                render3D_image = plt.imread(filename_component_alpha)
-            else:
-                # Create list of filenames for the partial 3D renders
-                filenames_component_alpha_part = [
-                    f'{render3D_dir}/{name}_alpha_{part}.png'
-                    for part in range(nprocs)
-                ]
-                # Read in the partial 3D renders and blend
-                # them together into the render3D_image variable.
-                blend(filenames_component_alpha_part)
-                # Save combined 3D render of the j'th component
-                # with transparency. These are then later combined into
-                # a 3D render containing all components.
-                if len(names) > 1:
-                    filename_component_alpha = f'{render3D_dir}/{name}_alpha.png'
-                    plt.imsave(filename_component_alpha, asarray(render3D_image))
-            # Add opaque background to render3D_image
-            add_background()
-            # Save combined 3D render of the j'th component
-            # without transparency.
-            filename_component = filename
-            if len(names) > 1:
-                filename_component = augment_filename(filename, name, '.png')
-            plt.imsave(filename_component, asarray(render3D_image))
-        Barrier()
-        masterprint('done')
-        # Finally, combine the full 3D renders of individual components
-        # into a total 3D render containing all components.
-        if master and len(names) > 1:
-            masterprint(f'Combining component 3D renders and saving to "{filename}" ...')
-            filenames_component_alpha = [
-                '{}/{}_alpha.png'.format(render3D_dir, name.replace(' ', '-'))
-                for name in names
-            ]
-            blend(filenames_component_alpha)
-            # Add opaque background to render3D_image and save it
-            add_background()
-            plt.imsave(filename, asarray(render3D_image))
-            masterprint('done')
-    # Remove the temporary directory, if cleanup is requested
-    if master and cleanup and not (nprocs == 1 == len(render3D_dict)):
-        shutil.rmtree(render3D_dir)
+            save_render3D_image(image, filename_component)
+    # Add opaque background to the total render and save it
+    if master:
+        add_background(render3D_image)
+        save_render3D_image(render3D_image, filename)
+    masterprint('done')
 # Declare global variables used in the render3D() function
 cython.declare(
     render3D_dict=dict,
     render3D_image='float[:, :, ::1]',
+    render3D_transmittance='double[:, ::1]',
 )
-# (Ordered) dictionary containing the figure, axes, component
-# artist and text artist for each component.
+# (Ordered) dictionary containing the colour, α value and splat radius
+# for each component.
 render3D_dict = {}
 # The array storing the 3D render
 render3D_image = empty((render3D_resolution, render3D_resolution, 4), dtype=C2np['float'])
-# Dummy function
-def dummy_func(*args, **kwargs):
-    return None
+# The array storing the transmittance (1 - α) of the 3D render
+# of a single component.
+render3D_transmittance = empty((render3D_resolution, render3D_resolution), dtype=C2np['double'])
 
-# Function which takes in a list of filenames of images and blend them
-# together into the global render3D_image array.
-@cython.header(# Arguments
-               filenames=list,
-               # Locals
-               alpha_A='float',
-               alpha_B='float',
-               alpha_tot='float',
-               i='int',
-               j='int',
-               rgb='int',
-               rgbα='int',
-               tmp_image='float[:, :, ::1]',
-               )
-def blend(filenames):
-    # Fetch Matplotlib
-    plt = get_matplotlib().pyplot
-    # Make render3D_image black and transparent
-    render3D_image[...] = 0
-    for filename in filenames:
-        tmp_image = plt.imread(filename)
-        for     i in range(render3D_resolution):
-            for j in range(render3D_resolution):
-                # Pixels with 0 alpha has (r, g, b) = (1, 1, 1)
-                # (this is a defect of plt.savefig).
-                # These should be disregarded completely.
-                alpha_A = tmp_image[i, j, 3]
-                if alpha_A != 0:
-                    # Combine render3D_image with tmp_image by
-                    # adding them together, using their alpha values
-                    # as weights.
-                    alpha_B = render3D_image[i, j, 3]
-                    alpha_tot = alpha_A + alpha_B - alpha_A*alpha_B
-                    for rgb in range(3):
-                        render3D_image[i, j, rgb] = (
-                            (alpha_A*tmp_image[i, j, rgb] + alpha_B*render3D_image[i, j, rgb])
-                            /alpha_tot
-                        )
-                    render3D_image[i, j, 3] = alpha_tot
+# Function for populating render3D_dict with the colour, α value and
+# splat radius (in pixels) of each component to be 3D rendered.
+@cython.header(
+    # Arguments
+    components=list,
+    # Locals
+    color=object,  # tuple or np.ndarray
+    component='Component',
+    coverage='double',
+    N='Py_ssize_t',
+    splat_radius='double',
+    α='double',
+    α_homogeneous='double',
+    returns='void',
+)
+def init_render3D(components):
+    matplotlib = get_matplotlib()
+    # Make cyclic default colours as when doing multiple plots in
+    # one figure. Make sure that none of the colours are identical
+    # to the background colour.
+    default_colors = itertools.cycle([
+        to_rgb(prop['color'])
+        for prop in matplotlib.rcParams['axes.prop_cycle']
+        if not all(to_rgb(prop['color']) == render3D_bgcolor)
+    ])
+    for component in components:
+        if not is_selected(component, render3D_select):
+            continue
+        # The colour and α (of a homogeneous column through the
+        # entire box) of this component.
+        if component.name.lower() in render3D_colors:
+            # This component is given a specific colour by the user
+            color, α_homogeneous = render3D_colors[component.name.lower()]
+        elif 'all' in render3D_colors:
+            # All components are given the same colour by the user
+            color, α_homogeneous = render3D_colors['all']
+        else:
+            # No colour specified for this particular component.
+            # Assign the next colour from the default cyclic colours.
+            color = next(default_colors)
+            α_homogeneous = 0.2
+        # The number of particles (fluid elements) to be rendered
+        if component.representation == 'particles':
+            N = component.N
+        elif component.representation == 'fluid':
+            N = component.gridsize**3
+        else:
+            abort(
+                f'Cannot 3D render {component.name} with representation '
+                f'"{component.representation}"'
+            )
+        # The splat radius and α of the particles (fluid elements).
+        # Splats smaller than a pixel are deposited onto a single
+        # pixel, with their α reduced by the fraction of the pixel
+        # they cover.
+        splat_radius, α = alpha_blend(N, α_homogeneous)
+        coverage = 1
+        if splat_radius < 1:
+            coverage = π*splat_radius**2
+        render3D_dict[component.name] = {
+            'color'       : asarray(color, dtype=C2np['double']),
+            'α'           : α,
+            'coverage'    : coverage,
+            'splat radius': splat_radius,
+        }
+
+# Function for rasterising the local particles (fluid elements) of a
+# component into the global render3D_transmittance buffer,
+# which is returned.
+@cython.header(
+    # Arguments
+    component='Component',
+    component_dict=dict,
+    # Locals
+    chunk_index='Py_ssize_t',
+    coverage='double',
+    domain_start_i='Py_ssize_t',
+    domain_start_j='Py_ssize_t',
+    domain_start_k='Py_ssize_t',
+    i='Py_ssize_t',
+    indexˣ='Py_ssize_t',
+    j='Py_ssize_t',
+    k='Py_ssize_t',
+    posxˣ='double*',
+    posyˣ='double*',
+    poszˣ='double*',
+    splat_radius='double',
+    transmittance='double[:, ::1]',
+    xi='double',
+    yj='double',
+    zk='double',
+    α='double',
+    α_factor='double',
+    ϱ_noghosts='double[:, :, :]',
+    ϱbar_component='double',
+    returns='double[:, ::1]',
+)
+def rasterise_render3D(component, component_dict):
+    transmittance = render3D_transmittance
+    transmittance[...] = 1
+    splat_radius = component_dict['splat radius']
+    coverage     = component_dict['coverage']
+    if component.representation == 'particles':
+        α = component_dict['α']*coverage
+        # As the partial renders of the processes are composited
+        # independently of which particles they hold, the particle
+        # data may be read in one chunk at a time without exchanging
+        # it, see Component.iterate_chunks().
+        for chunk_index in component.iterate_chunks():
+            posxˣ = component.posxˣ
+            posyˣ = component.posyˣ
+            poszˣ = component.poszˣ
+            for indexˣ in range(0, 3*component.N_local, 3):
+                splat_render3D(
+                    transmittance, posxˣ[indexˣ], posyˣ[indexˣ], poszˣ[indexˣ], α, splat_radius,
+                )
+    elif component.representation == 'fluid':
+        # Measure the mean value of the ϱ grid
+        ϱ_noghosts = component.ϱ.grid_noghosts
+        ϱbar_component = allreduce(np.sum(ϱ_noghosts), op=MPI.SUM)/component.gridsize**3
+        # The α value of each fluid element is set by the
+        # value of ϱ at the grid point.
+        α_factor = component_dict['α']/ϱbar_component
+        domain_start_i = domain_layout_local_indices[0]*ϱ_noghosts.shape[0]
+        domain_start_j = domain_layout_local_indices[1]*ϱ_noghosts.shape[1]
+        domain_start_k = domain_layout_local_indices[2]*ϱ_noghosts.shape[2]
+        for i in range(ℤ[ϱ_noghosts.shape[0]]):
+            xi = (ℝ[domain_start_i + 0.5*cell_centered] + i)*ℝ[boxsize/component.gridsize]
+            for j in range(ℤ[ϱ_noghosts.shape[1]]):
+                yj = (ℝ[domain_start_j + 0.5*cell_centered] + j)*ℝ[boxsize/component.gridsize]
+                for k in range(ℤ[ϱ_noghosts.shape[2]]):
+                    zk = (ℝ[domain_start_k + 0.5*cell_centered] + k)*ℝ[boxsize/component.gridsize]
+                    α = α_factor*ϱ_noghosts[i, j, k]
+                    if α > 1:
+                        α = 1
+                    splat_render3D(transmittance, xi, yj, zk, α*coverage, splat_radius)
+    return transmittance
+
+# Function for splatting a single particle (fluid element) at comoving
+# position (x, y, z) onto a transmittance buffer, using an
+# orthographic projection.
+@cython.header(
+    # Arguments
+    transmittance='double[:, ::1]',
+    x='double',
+    y='double',
+    z='double',
+    α='double',
+    splat_radius='double',
+    # Locals
+    i='Py_ssize_t',
+    i_max='Py_ssize_t',
+    i_min='Py_ssize_t',
+    j='Py_ssize_t',
+    j_max='Py_ssize_t',
+    j_min='Py_ssize_t',
+    u='double',
+    v='double',
+    Δv2='double',
+    returns='void',
+)
+def splat_render3D(transmittance, x, y, z, α, splat_radius):
+    # Image coordinates (in units of pixels) of the particle,
+    # with the centre of the box at the centre of the image.
+    x -= ℝ[0.5*boxsize]
+    y -= ℝ[0.5*boxsize]
+    z -= ℝ[0.5*boxsize]
+    u = ℝ[0.5*render3D_resolution] + render3D_scale*(
+        x*render3D_projection[0, 0] + y*render3D_projection[0, 1] + z*render3D_projection[0, 2]
+    )
+    v = ℝ[0.5*render3D_resolution] - render3D_scale*(
+        x*render3D_projection[1, 0] + y*render3D_projection[1, 1] + z*render3D_projection[1, 2]
+    )
+    # Splats smaller than a pixel are deposited onto the single pixel
+    # containing their centre.
+    if splat_radius < 1:
+        i = int(v)
+        j = int(u)
+        if 0 <= i < render3D_resolution and 0 <= j < render3D_resolution:
+            transmittance[i, j] *= 1 - α
+        return
+    # Deposit onto all pixels with centres within the splat radius
+    i_min = pairmax(int(v - splat_radius), 0)
+    i_max = pairmin(int(v + splat_radius), render3D_resolution - 1)
+    j_min = pairmax(int(u - splat_radius), 0)
+    j_max = pairmin(int(u + splat_radius), render3D_resolution - 1)
+    for i in range(i_min, i_max + 1):
+        Δv2 = (i + 0.5 - v)**2
+        for j in range(j_min, j_max + 1):
+            if Δv2 + (j + 0.5 - u)**2 <= ℝ[splat_radius**2]:
+                transmittance[i, j] *= 1 - α
+# The orthographic camera used for 3D renders, with the same viewing
+# angles (elevation 30°, azimuth -60°) as the default for 3D axes in
+# Matplotlib. The rows of render3D_projection are the unit vectors
+# pointing rightwards and upwards on the image. The scale (pixels per
+# unit length) is chosen such that the projected box fits within the
+# image, with a small margin.
+cython.declare(render3D_projection='double[:, ::1]', render3D_scale='double')
+render3D_projection = asarray(
+    [
+        [
+            -np.sin(-π/3),
+            +np.cos(-π/3),
+            0,
+        ],
+        [
+            -np.sin(π/6)*np.cos(-π/3),
+            -np.sin(π/6)*np.sin(-π/3),
+            +np.cos(π/6),
+        ],
+    ],
+    dtype=C2np['double'],
+)
+render3D_scale = render3D_resolution/(
+    1.05*boxsize*np.max(np.sum(np.abs(render3D_projection), axis=1))
+)
+
+# Function returning an RGBA image of a single component, given the
+# transmittance buffer and the colour of the component.
+@cython.header(
+    # Arguments
+    transmittance='double[:, ::1]',
+    color='double[::1]',
+    # Locals
+    i='Py_ssize_t',
+    image='float[:, :, ::1]',
+    j='Py_ssize_t',
+    rgb='int',
+    returns='float[:, :, ::1]',
+)
+def get_render3D_layer(transmittance, color):
+    image = empty((render3D_resolution, render3D_resolution, 4), dtype=C2np['float'])
+    for     i in range(render3D_resolution):
+        for j in range(render3D_resolution):
+            for rgb in range(3):
+                image[i, j, rgb] = color[rgb]
+            image[i, j, 3] = 1 - transmittance[i, j]
+    return image
+
+# Function which blends an image into the global render3D_image array
+@cython.header(
+    # Arguments
+    image='float[:, :, ::1]',
+    # Locals
+    alpha_A='float',
+    alpha_B='float',
+    alpha_tot='float',
+    i='int',
+    j='int',
+    rgb='int',
+    rgbα='int',
+    returns='void',
+)
+def blend(image):
+    for     i in range(render3D_resolution):
+        for j in range(render3D_resolution):
+            # Fully transparent pixels should be disregarded
+            alpha_A = image[i, j, 3]
+            if alpha_A != 0:
+                # Combine render3D_image with image by
+                # adding them together, using their alpha values
+                # as weights.
+                alpha_B = render3D_image[i, j, 3]
+                alpha_tot = alpha_A + alpha_B - alpha_A*alpha_B
+                for rgb in range(3):
+                    render3D_image[i, j, rgb] = (
+                        (alpha_A*image[i, j, rgb] + alpha_B*render3D_image[i, j, rgb])
+                        /alpha_tot
+                    )
+                render3D_image[i, j, 3] = alpha_tot
     # Some pixel values in the combined 3D render may have overflown.
     # Clip at saturation value.
     for     i in range(render3D_resolution):
@@ -1734,28 +2206,27 @@ def blend(filenames):
                 if render3D_image[i, j, rgbα] > 1:
                     render3D_image[i, j, rgbα] = 1
 
-# Function which determines the scatter size and α value of points in
-# a 3D figure, given the number of dots N and the collective α for a
-# homogeneous column of such points throughout the box.
+# Function which determines the splat radius (in pixels) and α value of
+# points in a 3D render, given the number of dots N and the collective α
+# for a homogeneous column of such points throughout the box.
 @cython.header(
     # Arguments
     N='Py_ssize_t',
     α_homogeneous='double',
-    fig=object,  # matplotlib.figure.Figure
     # Locals
+    dpi='double',
     scatter_size='double',
     α='double',
     α_min='double',
     returns=tuple,
 )
-def alpha_blend(N, α_homogeneous, fig=None):
-    if fig is None:
-        plt = get_matplotlib().pyplot
-        fig = plt.gcf()
-    # The particle (fluid element) size on the figure.
+def alpha_blend(N, α_homogeneous):
+    # The particle (fluid element) size on the render, in units of
+    # points squared on a figure with the given dpi.
     # The size is chosen such that the particles stand side
     # by side in a homogeneous universe (more or less).
-    scatter_size = 1550*np.prod(fig.get_size_inches())/N**(2./3.)
+    dpi = 100
+    scatter_size = 1550*(render3D_resolution/dpi)**2/N**(2./3.)
     # Determine the α value which ensures that a homogeneous column
     # through the entire box will result in a combined α value
     # of α_homogeneous. Alpha blending is non-linear,
@@ -1764,30 +2235,76 @@ def alpha_blend(N, α_homogeneous, fig=None):
     # I have found that 4/∛N is a good approximation to
     # the α value needed to make the combined α equal to 1.
     α = α_homogeneous*4/cbrt(N)
-    # Alpha values below this small value appear completely invisible,
-    # for whatever reason.
-    α_min = 0.0059
-    # Alpha values lower than α_min are not allowed.
+    # Alpha values below this small value appear completely invisible
+    # in renders. Alpha values lower than α_min are not allowed.
     # Shrink the scatter size to make up for the larger α.
+    α_min = 0.0059
     if α < α_min:
         scatter_size *= α/α_min
         α = α_min
-    return scatter_size, α
+    # Convert the scatter size to a radius in pixels
+    return 0.5*sqrt(scatter_size)*dpi/72, α
 
-# Function for adding background colour to render3D_image
-@cython.header(# Locals
-               alpha='float',
-               i='int',
-               j='int',
-               rgb='int',
-               )
-def add_background():
+# Function for adding background colour to an image
+@cython.header(
+    # Arguments
+    image='float[:, :, ::1]',
+    # Locals
+    alpha='float',
+    i='int',
+    j='int',
+    rgb='int',
+    returns='void',
+)
+def add_background(image):
     for     i in range(render3D_resolution):
         for j in range(render3D_resolution):
-            alpha = render3D_image[i, j, 3]
+            alpha = image[i, j, 3]
             # Add background using "A over B" alpha blending
             for rgb in range(3):
-                render3D_image[i, j, rgb] = (
-                    alpha*render3D_image[i, j, rgb] + (1 - alpha)*render3D_bgcolor[rgb]
+                image[i, j, rgb] = (
+                    alpha*image[i, j, rgb] + (1 - alpha)*render3D_bgcolor[rgb]
                 )
-                render3D_image[i, j, 3] = 1
+            image[i, j, 3] = 1
+
+# Function for saving a (background-added) 3D render to a PNG file,
+# with the cosmic time and scale factor printed on top.
+# This function should only be called by the master process.
+@cython.header(
+    # Arguments
+    image='float[:, :, ::1]',
+    filename=str,
+    # Locals
+    a_str=str,
+    dpi='int',
+    label_spacing='double',
+    t_str=str,
+    text_color=str,
+    returns='void',
+)
+def save_render3D_image(image, filename):
+    plt = get_matplotlib().pyplot
+    dpi = 100  # This only affects the font size relative to the figure
+    fig = plt.figure(figsize=[render3D_resolution/dpi]*2, dpi=dpi)
+    fig.figimage(asarray(image), origin='upper')
+    # Make the text colour black or white,
+    # dependent on the background colour.
+    text_color = ('white' if sum(render3D_bgcolor) < 1 else 'black')
+    # Print the current cosmic time and scale factor on the figure
+    label_spacing = 0.07
+    t_str = (
+        r'$t = {}\, \mathrm{{{}}}$'
+        .format(significant_figures(universals.t, 4, 'tex'), unit_time)
+    )
+    fig.text(
+        label_spacing, label_spacing, t_str,
+        fontsize=16, horizontalalignment='left', color=text_color,
+    )
+    if enable_Hubble:
+        a_str = '$a = {}$'.format(significant_figures(universals.a, 4, 'tex'))
+        fig.text(
+            1 - label_spacing, label_spacing, a_str,
+            fontsize=16, horizontalalignment='right', color=text_color,
+        )
+    fig.savefig(filename, dpi=dpi)
+    plt.close(fig)
@@ -232,6 +232,147 @@ class Spline:
         # Remember the sign change for a > b
         return -ᔑ if sign_flip else ᔑ
 
+    # Method for doing spline evaluation on an array of values
+    @cython.pheader(
+        # Arguments
+        x_in='double[::1]',
+        y_out='double[::1]',
+        # Locals
+        i='Py_ssize_t',
+        x='double',
+        x_arr='double[::1]',
+        y='double',
+        returns='double[::1]',
+    )
+    def eval_array(self, x_in, y_out=None):
+        """The results are stored in y_out, which is allocated
+        if not passed. All values are evaluated in a single loop sharing
+        the interpolation accelerator, which is much faster than
+        repeated calls to eval() as the tabulated values are typically
+        visited in order.
+        """
+        if y_out is None:
+            y_out = empty(x_in.shape[0], dtype=C2np['double'])
+        elif y_out.shape[0] != x_in.shape[0]:
+            abort(
+                f'Spline "{self.name}": '
+                f'eval_array() got input and output arrays of different lengths '
+                f'({x_in.shape[0]} and {y_out.shape[0]})'
+            )
+        # Use SciPy in pure Python and GSL when compiled
+        if not cython.compiled:
+            x_arr = asarray(x_in).copy()
+            for i in range(x_arr.shape[0]):
+                x = log(x_arr[i]) if self.logx else x_arr[i]
+                x_arr[i] = self.in_interval(x, 'interpolate to')
+            y_out[:] = self.spline(x_arr)
+            if self.logy:
+                np.exp(y_out, out=asarray(y_out))
+        else:
+            for i in range(x_in.shape[0]):
+                x = x_in[i]
+                with unswitch:
+                    if self.logx:
+                        x = log(x)
+                x = self.in_interval(x, 'interpolate to')
+                y = gsl_spline_eval(self.spline, x, self.acc)
+                with unswitch:
+                    if self.logy:
+                        y = exp(y)
+                y_out[i] = y
+        return y_out
+
+    # Method for doing spline derivative evaluation
+    # on an array of values.
+    @cython.pheader(
+        # Arguments
+        x_in='double[::1]',
+        ẏ_out='double[::1]',
+        # Locals
+        i='Py_ssize_t',
+        x='double',
+        x_arr='double[::1]',
+        y='double',
+        ẏ='double',
+        returns='double[::1]',
+    )
+    def eval_deriv_array(self, x_in, ẏ_out=None):
+        """The results are stored in ẏ_out, which is allocated
+        if not passed. See eval_array().
+        """
+        if ẏ_out is None:
+            ẏ_out = empty(x_in.shape[0], dtype=C2np['double'])
+        elif ẏ_out.shape[0] != x_in.shape[0]:
+            abort(
+                f'Spline "{self.name}": '
+                f'eval_deriv_array() got input and output arrays of different lengths '
+                f'({x_in.shape[0]} and {ẏ_out.shape[0]})'
+            )
+        # Use SciPy in pure Python and GSL when compiled
+        if not cython.compiled:
+            x_arr = asarray(x_in).copy()
+            for i in range(x_arr.shape[0]):
+                x = log(x_arr[i]) if self.logx else x_arr[i]
+                x_arr[i] = self.in_interval(x, 'differentiate at')
+            ẏ_out[:] = self.spline(x_arr, 1)
+            # Undo the log
+            if self.logy:
+                ẏ_out[:] = asarray(ẏ_out)*np.exp(self.spline(x_arr))
+            if self.logx:
+                ẏ_out[:] = asarray(ẏ_out)/asarray(x_in)
+        else:
+            for i in range(x_in.shape[0]):
+                x = x_in[i]
+                with unswitch:
+                    if self.logx:
+                        x = log(x)
+                x = self.in_interval(x, 'differentiate at')
+                ẏ = gsl_spline_eval_deriv(self.spline, x, self.acc)
+                # Undo the log
+                with unswitch:
+                    if self.logy:
+                        # ∂ₓy(x) = y(x)*∂ₓln(y(x))
+                        y = exp(gsl_spline_eval(self.spline, x, self.acc))
+                        ẏ *= y
+                with unswitch:
+                    if self.logx:
+                        # ∂ₓy(x) = x⁻¹*∂ₗₙ₍ₓ₎y(x)
+                        ẏ /= x_in[i]
+                ẏ_out[i] = ẏ
+        return ẏ_out
+
+    # Method for computing definite integrals over many
+    # intervals [a[i], b[i]] of the splined function.
+    @cython.pheader(
+        # Arguments
+        a='double[::1]',
+        b='double[::1]',
+        ᔑ_out='double[::1]',
+        # Locals
+        i='Py_ssize_t',
+        returns='double[::1]',
+    )
+    def integrate_array(self, a, b, ᔑ_out=None):
+        """The results are stored in ᔑ_out, which is allocated
+        if not passed. See eval_array().
+        """
+        if a.shape[0] != b.shape[0]:
+            abort(
+                f'Spline "{self.name}": '
+                f'integrate_array() got {a.shape[0]} lower but {b.shape[0]} upper limits'
+            )
+        if ᔑ_out is None:
+            ᔑ_out = empty(a.shape[0], dtype=C2np['double'])
+        elif ᔑ_out.shape[0] != a.shape[0]:
+            abort(
+                f'Spline "{self.name}": '
+                f'integrate_array() got limit and output arrays of different lengths '
+                f'({a.shape[0]} and {ᔑ_out.shape[0]})'
+            )
+        for i in range(a.shape[0]):
+            ᔑ_out[i] = self.integrate(a[i], b[i])
+        return ᔑ_out
+
     # Method for checking whether a given number
     # is within the tabulated interval.
     @cython.header(# Arguments
@@ -708,7 +849,7 @@ def scalefactor_integral(key, t_start, t_end, all_components):
         for component in components:
             if component is not None and component.w_eff_type != 'constant':
                 a_tab_spline = component.w_eff_spline.x
-                t_tab_spline = asarray([spline_a_t.eval(a) for a in a_tab_spline])
+                t_tab_spline = spline_a_t.eval_array(a_tab_spline)
                 break
         else:
             a_tab_spline = spline_a_t.x
@@ -2984,3 +2984,11 @@ def lapse(method, receivers, suppliers, ᔑdt, interaction_type, printout):
             masterprint('done')
     elif master:
         abort(f'lapse() was called with the "{method}" method')
+
+# Friends-of-friends linking, used by the halo finder, and pair
+# counting, used for the two-point correlation function. These are not
+# forces and so they affect no variables, and they are never assigned
+# to any component. They are registered so that the short-range
+# machinery (tilings, domain pairings) can be used.
+register('fof', 'pp', affected=())
+register('corrfunc', 'pp', affected=())
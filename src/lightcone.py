@@ -0,0 +1,516 @@
+# This file is part of CO𝘕CEPT, the cosmological 𝘕-body code in Python.
+# Copyright © 2015–2021 Jeppe Mosgaard Dakin.
+#
+# CO𝘕CEPT is free software: You can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# CO𝘕CEPT is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with CO𝘕CEPT. If not, see https://www.gnu.org/licenses/
+#
+# The author of CO𝘕CEPT can be contacted at dakin(at)phys.au.dk
+# The latest version of CO𝘕CEPT is available at
+# https://github.com/jmd-dk/concept/
+
+
+
+# Import everything from the commons module.
+# In the .pyx file, Cython declared variables will also get cimported.
+from commons import *
+
+# Cython imports
+cimport('from integration import cosmic_time, scale_factor, scalefactor_integral')
+
+
+
+# Function for recording particles of a component crossing the past
+# lightcone of the observer during a drift from t_start to t_end.
+# The particles are drifted along straight lines, with the drift of
+# pos[i] given by mom[i]*Δt_over_mass. The lightcone is a sphere
+# around the observer with a comoving radius equal to the comoving
+# distance light travels from the time in question until the time of
+# the observer. A particle crosses the lightcone when its distance to
+# the observer goes from being smaller than this radius at t_start to
+# being larger at t_end. Periodic images of the box are taken into
+# account, out to the comoving distance lightcone_options['chi max'].
+# The crossing positions (relative to the observer), peculiar
+# velocities and scale factors are buffered and flushed to disk once
+# the buffer is full, while the masses are projected onto HEALPix maps
+# if these are enabled.
+@cython.header(
+    # Arguments
+    name=str,
+    pos='double*',
+    mom='double*',
+    N_local='Py_ssize_t',
+    Δt_over_mass='double',
+    mass='double',
+    t_start='double',
+    t_end='double',
+    # Locals
+    a_cross='double',
+    buffer='double[:, ::1]',
+    buffer_N='Py_ssize_t',
+    buffer_size='Py_ssize_t',
+    chi_end='double',
+    chi_max='double',
+    chi_start='double',
+    dim='int',
+    distance_max2='double',
+    distance_min2='double',
+    f_end='double',
+    f_start='double',
+    indexʳ='Py_ssize_t',
+    indexˣ='Py_ssize_t',
+    maps='double[:, ::1]',
+    n_max='Py_ssize_t[::1]',
+    n_min='Py_ssize_t[::1]',
+    nside='Py_ssize_t',
+    nx='Py_ssize_t',
+    ny='Py_ssize_t',
+    nz='Py_ssize_t',
+    observer='double[::1]',
+    offset='double[::1]',
+    offset_x='double',
+    offset_y='double',
+    offset_z='double',
+    r_cross='double',
+    r_end='double',
+    r_max='double',
+    r_min='double',
+    r_start='double',
+    s='double',
+    shell='Py_ssize_t',
+    shells='Py_ssize_t',
+    x_cross='double',
+    x_end='double',
+    x_start='double',
+    y_cross='double',
+    y_end='double',
+    y_start='double',
+    z_cross='double',
+    z_end='double',
+    z_start='double',
+    Δx='double',
+    Δx_max='double',
+    Δy='double',
+    Δz='double',
+    returns='void',
+)
+def record_lightcone_crossings(name, pos, mom, N_local, Δt_over_mass, mass, t_start, t_end):
+    # Comoving radii of the lightcone at the beginning
+    # and at the end of the drift.
+    chi_max = lightcone_options['chi max']
+    chi_start = get_lightcone_distance(t_start)
+    chi_end = get_lightcone_distance(t_end)
+    if chi_start <= 0 or chi_end >= chi_max:
+        return
+    # Only periodic images of the box which intersect with the
+    # spherical shell swept out by the lightcone during the drift
+    # need to be considered. As the particles move during the drift,
+    # the shell is widened by the largest displacement.
+    Δx_max = 0
+    for indexʳ in range(3*N_local):
+        Δx_max = pairmax(Δx_max, abs(mom[indexʳ]))
+    Δx_max *= sqrt(3)*Δt_over_mass
+    r_min = chi_end - Δx_max
+    r_max = pairmin(chi_start, chi_max) + Δx_max
+    observer = asarray(lightcone_options['observer'], dtype=C2np['double'])
+    n_min = empty(3, dtype=C2np['Py_ssize_t'])
+    n_max = empty(3, dtype=C2np['Py_ssize_t'])
+    for dim in range(3):
+        n_min[dim] = int(floor((observer[dim] - r_max)/boxsize))
+        n_max[dim] = int(floor((observer[dim] + r_max)/boxsize))
+    offset = empty(3, dtype=C2np['double'])
+    # Fetch buffer and maps of this component
+    buffer = get_lightcone_buffer(name, mass)
+    buffer_N = lightcone_buffers_N[name]
+    buffer_size = buffer.shape[0]
+    nside = lightcone_options['nside']
+    shells = lightcone_options['map shells']
+    if nside:
+        maps = get_lightcone_maps(name)
+    # Loop over periodic images of the box
+    for nx in range(n_min[0], n_max[0] + 1):
+        for ny in range(n_min[1], n_max[1] + 1):
+            for nz in range(n_min[2], n_max[2] + 1):
+                # Offset of the image relative to the observer
+                offset_x = nx*boxsize - observer[0]
+                offset_y = ny*boxsize - observer[1]
+                offset_z = nz*boxsize - observer[2]
+                # Skip images not intersecting the shell
+                offset[0] = offset_x
+                offset[1] = offset_y
+                offset[2] = offset_z
+                distance_min2 = 0
+                distance_max2 = 0
+                for dim in range(3):
+                    if offset[dim] > 0:
+                        distance_min2 += offset[dim]**2
+                    elif offset[dim] + boxsize < 0:
+                        distance_min2 += (offset[dim] + boxsize)**2
+                    distance_max2 += pairmax(offset[dim]**2, (offset[dim] + boxsize)**2)
+                if distance_min2 > r_max**2 or distance_max2 < r_min**2:
+                    continue
+                # Loop over all particles, recording those crossing
+                # the lightcone within this image.
+                for indexˣ in range(0, 3*N_local, 3):
+                    x_start = pos[indexˣ + 0] + offset_x
+                    y_start = pos[indexˣ + 1] + offset_y
+                    z_start = pos[indexˣ + 2] + offset_z
+                    r_start = sqrt(x_start**2 + y_start**2 + z_start**2)
+                    f_start = r_start - chi_start
+                    if f_start >= 0:
+                        continue
+                    Δx = mom[indexˣ + 0]*Δt_over_mass
+                    Δy = mom[indexˣ + 1]*Δt_over_mass
+                    Δz = mom[indexˣ + 2]*Δt_over_mass
+                    x_end = x_start + Δx
+                    y_end = y_start + Δy
+                    z_end = z_start + Δz
+                    r_end = sqrt(x_end**2 + y_end**2 + z_end**2)
+                    f_end = r_end - chi_end
+                    if f_end < 0:
+                        continue
+                    # The particle crosses the lightcone during this
+                    # drift. Find the crossing by linear interpolation.
+                    s = f_start/(f_start - f_end)
+                    x_cross = x_start + s*Δx
+                    y_cross = y_start + s*Δy
+                    z_cross = z_start + s*Δz
+                    r_cross = sqrt(x_cross**2 + y_cross**2 + z_cross**2)
+                    if r_cross > chi_max:
+                        continue
+                    a_cross = scale_factor(t_start + s*(t_end - t_start))
+                    # Store the crossing, flushing the buffer to disk
+                    # if it is full.
+                    if buffer_N == buffer_size:
+                        lightcone_buffers_N[name] = buffer_N
+                        flush_lightcone_buffer(name)
+                        buffer_N = 0
+                    buffer[buffer_N, 0] = x_cross
+                    buffer[buffer_N, 1] = y_cross
+                    buffer[buffer_N, 2] = z_cross
+                    buffer[buffer_N, 3] = mom[indexˣ + 0]*ℝ[1/mass]/a_cross
+                    buffer[buffer_N, 4] = mom[indexˣ + 1]*ℝ[1/mass]/a_cross
+                    buffer[buffer_N, 5] = mom[indexˣ + 2]*ℝ[1/mass]/a_cross
+                    buffer[buffer_N, 6] = a_cross
+                    buffer_N += 1
+                    # Project the mass onto the map of the shell
+                    with unswitch(4):
+                        if nside:
+                            shell = int(r_cross*ℝ[shells/chi_max])
+                            if shell == shells:
+                                shell -= 1
+                            maps[shell, get_healpix_pixel(nside, x_cross, y_cross, z_cross)] += mass
+    lightcone_buffers_N[name] = buffer_N
+
+# Function returning the comoving radius of the past lightcone
+# of the observer at cosmic time t.
+@cython.header(
+    # Arguments
+    t='double',
+    returns='double',
+)
+def get_lightcone_distance(t):
+    global t_observer
+    if t_observer == -1:
+        if not enable_Hubble:
+            abort('Lightcone outputs require the Hubble expansion to be enabled')
+        t_observer = cosmic_time(lightcone_options['a observer'])
+    if t >= t_observer:
+        return 0
+    return light_speed*scalefactor_integral('a**(-1)', t, t_observer, [])
+# Cosmic time of the observer, used by the above function
+cython.declare(t_observer='double')
+t_observer = -1
+
+# Function returning the lightcone buffer of a component,
+# allocating it if necessary. Each row stores the position (relative to
+# the observer), the peculiar velocity and the scale factor of a
+# particle at the time it crossed the lightcone.
+@cython.header(
+    # Arguments
+    name=str,
+    mass='double',
+    # Locals
+    buffer='double[:, ::1]',
+    returns='double[:, ::1]',
+)
+def get_lightcone_buffer(name, mass):
+    buffer = lightcone_buffers.get(name)
+    if buffer is None:
+        buffer = empty((lightcone_options['buffer size'], 7), dtype=C2np['double'])
+        lightcone_buffers[name] = buffer
+        lightcone_buffers_N[name] = 0
+        lightcone_masses[name] = mass
+    return buffer
+# Global lightcone buffers, their fill levels and the
+# particle masses of the components, used by the above function.
+cython.declare(lightcone_buffers=dict, lightcone_buffers_N=dict, lightcone_masses=dict)
+lightcone_buffers = {}
+lightcone_buffers_N = {}
+lightcone_masses = {}
+
+# Function returning the HEALPix maps of a component,
+# allocating them if necessary.
+@cython.header(
+    # Arguments
+    name=str,
+    # Locals
+    maps='double[:, ::1]',
+    returns='double[:, ::1]',
+)
+def get_lightcone_maps(name):
+    maps = lightcone_maps.get(name)
+    if maps is None:
+        maps = zeros(
+            (lightcone_options['map shells'], 12*lightcone_options['nside']**2),
+            dtype=C2np['double'],
+        )
+        lightcone_maps[name] = maps
+    return maps
+# Global HEALPix maps used by the above function
+cython.declare(lightcone_maps=dict)
+lightcone_maps = {}
+
+# Function returning the index of the HEALPix pixel (in the RING
+# ordering scheme) containing the direction given by the vector
+# (x, y, z), following Górski et al. (2005).
+@cython.header(
+    # Arguments
+    nside='Py_ssize_t',
+    x='double',
+    y='double',
+    z='double',
+    # Locals
+    ip='Py_ssize_t',
+    ir='Py_ssize_t',
+    jm='Py_ssize_t',
+    jp='Py_ssize_t',
+    kshift='Py_ssize_t',
+    r='double',
+    temp1='double',
+    temp2='double',
+    tp='double',
+    tt='double',
+    z_abs='double',
+    returns='Py_ssize_t',
+)
+def get_healpix_pixel(nside, x, y, z):
+    r = sqrt(x**2 + y**2 + z**2)
+    if r == 0:
+        return 0
+    z /= r
+    z_abs = abs(z)
+    # Azimuthal angle in units of π/2, within [0, 4)
+    tt = arctan2(y, x)*ℝ[2/π]
+    if tt < 0:
+        tt += 4
+    if z_abs <= ℝ[2/3]:
+        # Equatorial region
+        temp1 = nside*(0.5 + tt)
+        temp2 = nside*z*0.75
+        jp = int(temp1 - temp2)
+        jm = int(temp1 + temp2)
+        ir = nside + 1 + jp - jm
+        kshift = 1 - (ir & 1)
+        ip = (jp + jm - nside + kshift + 1)//2
+        ip %= 4*nside
+        return 2*nside*(nside - 1) + (ir - 1)*4*nside + ip
+    # Polar caps
+    tp = tt - int(tt)
+    temp1 = nside*sqrt(3*(1 - z_abs))
+    jp = int(tp*temp1)
+    jm = int((1 - tp)*temp1)
+    ir = jp + jm + 1
+    ip = int(tt*ir)
+    ip %= 4*ir
+    if z > 0:
+        return 2*ir*(ir - 1) + ip
+    return 12*nside**2 - 2*ir*(ir + 1) + ip
+
+# Function returning the name of the lightcone file of the local
+# process, or of the file holding the HEALPix maps.
+@cython.pheader(
+    # Arguments
+    kind=str,
+    returns=str,
+)
+def get_lightcone_filename(kind='particles'):
+    dirname = f'{output_dirs["lightcone"]}/{output_bases["lightcone"]}'
+    if kind == 'maps':
+        return f'{dirname}/maps.hdf5'
+    return f'{dirname}/rank_{rank}.hdf5'
+
+# Function for initialising the lightcone output at the beginning of
+# the simulation. Lightcone files left over from a previous run
+# (possibly using a different number of processes) are removed.
+# When restarting from an autosave, the lightcone files are instead
+# kept, with crossings recorded after the time of the autosave removed
+# as these will be recorded anew. The HEALPix maps saved at the time of
+# the autosave are read back in by the master process.
+@cython.pheader(
+    # Arguments
+    restart='bint',
+    # Locals
+    a_maps='double',
+    component_h5=object,  # h5py.Group
+    data=object,  # np.ndarray
+    dataset_name=str,
+    dirname=str,
+    filename=str,
+    filename_maps=str,
+    hdf5_file=object,  # h5py.File
+    mask=object,  # np.ndarray
+    name=str,
+    N_kept='Py_ssize_t',
+    returns='void',
+)
+def init_lightcones(restart=False):
+    if not any(lightcone_select.values()):
+        return
+    if master:
+        dirname = os.path.dirname(get_lightcone_filename())
+        filename_maps = get_lightcone_filename('maps')
+        if not restart:
+            for filename in glob(f'{dirname}/rank_*.hdf5') + [filename_maps]:
+                if os.path.isfile(filename):
+                    os.remove(filename)
+        else:
+            for filename in glob(f'{dirname}/rank_*.hdf5'):
+                with open_hdf5(filename, mode='a') as hdf5_file:
+                    for component_h5 in hdf5_file.get('components', {}).values():
+                        mask = component_h5['a'][...] <= universals.a
+                        N_kept = np.count_nonzero(mask)
+                        if N_kept == mask.shape[0]:
+                            continue
+                        for dataset_name in ('pos', 'vel', 'a'):
+                            data = component_h5[dataset_name][...][mask]
+                            component_h5[dataset_name].resize(N_kept, axis=0)
+                            component_h5[dataset_name][...] = data
+            if lightcone_options['nside'] and os.path.isfile(filename_maps):
+                with open_hdf5(filename_maps, mode='r') as hdf5_file:
+                    a_maps = hdf5_file.attrs['a']
+                    if not isclose(a_maps, universals.a):
+                        masterwarn(
+                            f'The lightcone maps within "{filename_maps}" were saved at '
+                            f'a = {a_maps}, not at the time of the autosave (a = {universals.a}). '
+                            f'The HEALPix maps will be computed from scratch.'
+                        )
+                    else:
+                        for name, component_h5 in hdf5_file.get('components', {}).items():
+                            get_lightcone_maps(name)[...] = component_h5['mass'][...]
+    Barrier()
+
+# Function for flushing the lightcone buffer of a component to the
+# lightcone file of the local process. This is not a collective
+# operation. The file is created at the first flush, after which
+# subsequent flushes append to the datasets.
+@cython.header(
+    # Arguments
+    name=str,
+    # Locals
+    buffer=object,  # np.ndarray
+    buffer_N='Py_ssize_t',
+    component_h5=object,  # h5py.Group
+    dataset_name=str,
+    filename=str,
+    hdf5_file=object,  # h5py.File
+    N_stored='Py_ssize_t',
+    returns='void',
+)
+def flush_lightcone_buffer(name):
+    buffer_N = lightcone_buffers_N.get(name, 0)
+    if buffer_N == 0:
+        return
+    buffer = asarray(lightcone_buffers[name])[:buffer_N]
+    filename = get_lightcone_filename()
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open_hdf5(filename, mode='a', local=True) as hdf5_file:
+        if 'boxsize' not in hdf5_file.attrs:
+            hdf5_file.attrs['unit time'  ] = unit_time
+            hdf5_file.attrs['unit length'] = unit_length
+            hdf5_file.attrs['unit mass'  ] = unit_mass
+            hdf5_file.attrs['boxsize'    ] = boxsize
+            hdf5_file.attrs['observer'   ] = asarray(lightcone_options['observer'])
+            hdf5_file.attrs['a observer' ] = lightcone_options['a observer']
+            hdf5_file.attrs['chi max'    ] = lightcone_options['chi max']
+        component_h5 = hdf5_file.get(f'components/{name}')
+        if component_h5 is None:
+            component_h5 = hdf5_file.create_group(f'components/{name}')
+            component_h5.attrs['mass'] = lightcone_masses[name]
+            component_h5.create_dataset(
+                'pos', (0, 3), dtype=C2np['double'], maxshape=(None, 3), chunks=True,
+            )
+            component_h5.create_dataset(
+                'vel', (0, 3), dtype=C2np['double'], maxshape=(None, 3), chunks=True,
+            )
+            component_h5.create_dataset(
+                'a', (0, ), dtype=C2np['double'], maxshape=(None, ), chunks=True,
+            )
+        N_stored = component_h5['a'].shape[0]
+        for dataset_name in ('pos', 'vel', 'a'):
+            component_h5[dataset_name].resize(N_stored + buffer_N, axis=0)
+        component_h5['pos'][N_stored:, :] = buffer[:, 0:3]
+        component_h5['vel'][N_stored:, :] = buffer[:, 3:6]
+        component_h5['a'  ][N_stored:   ] = buffer[:, 6]
+    lightcone_buffers_N[name] = 0
+
+# Function for saving all lightcone data, meant to be called at
+# autosaves and at the end of the simulation. All buffers are flushed
+# to the lightcone files, while the HEALPix maps of all processes are
+# summed up and written to a separate file by the master process.
+@cython.pheader(
+    # Locals
+    hdf5_file=object,  # h5py.File
+    maps='double[:, ::1]',
+    maps_total=dict,
+    name=str,
+    names=list,
+    returns='void',
+)
+def save_lightcones():
+    names = sorted(set(itertools.chain(
+        *allgather(list(lightcone_buffers) + list(lightcone_maps))
+    )))
+    if not names:
+        return
+    masterprint(f'Saving lightcone data to "{os.path.dirname(get_lightcone_filename())}" ...')
+    for name in names:
+        flush_lightcone_buffer(name)
+    Barrier()
+    if not lightcone_options['nside']:
+        masterprint('done')
+        return
+    # Sum up the HEALPix maps into the master process and save them.
+    # The summation is done into copies, as the local maps are to be
+    # further added to should the simulation continue.
+    maps_total = {}
+    for name in names:
+        maps = asarray(get_lightcone_maps(name)).copy()
+        Reduce(
+            sendbuf=(MPI.IN_PLACE if master else maps),
+            recvbuf=(maps if master else None),
+            op=MPI.SUM,
+        )
+        maps_total[name] = maps
+    if master:
+        with open_hdf5(get_lightcone_filename('maps'), mode='w') as hdf5_file:
+            hdf5_file.attrs['unit length'] = unit_length
+            hdf5_file.attrs['unit mass'  ] = unit_mass
+            hdf5_file.attrs['nside'      ] = lightcone_options['nside']
+            hdf5_file.attrs['ordering'   ] = 'RING'
+            hdf5_file.attrs['shell edges'] = linspace(
+                0, lightcone_options['chi max'], lightcone_options['map shells'] + 1,
+            )
+            hdf5_file.attrs['a'          ] = universals.a
+            for name in names:
+                hdf5_file[f'components/{name}/mass'] = asarray(maps_total[name])
+    masterprint('done')
@@ -40,6 +40,7 @@ cimport(
     '    domain_decompose,                    '
     '    fft,                                 '
     '    fourier_loop,                        '
+    '    free_fftw_slab,                      '
     '    get_fftw_slab,                       '
     '    interpolate_domaingrid_to_particles, '
     '    nullify_modes,                       '
@@ -648,7 +649,12 @@ class CosmoResults:
                     # derivative of H_T in N-body gauge is required.
                     if class_species_present == 'dcdm':
                         self.needed_keys['perturbations'] |= {r'^H_T_prime$'}
-            if not self.load('perturbations'):
+            # Attempt to load the perturbations needed by each process
+            # directly from the dump file. If this fails, the
+            # perturbations are loaded in full by the master process or
+            # obtained from CLASS, after which they are distributed.
+            loaded_lazily = self.load_perturbations_lazily()
+            if not loaded_lazily and not self.load('perturbations'):
                 # Get perturbations from CLASS
                 self._perturbations = self.cosmo.get_perturbations()
                 # The perturbation data is distributed on
@@ -779,55 +785,13 @@ class CosmoResults:
             # As we only need perturbations defined within the
             # simulation timespan, a >= a_begin, we now cut off the
             # lower tail of all perturbations.
-            if master:
-                def find_a_min(universals_a_begin):
-                    for perturbation in self._perturbations:
-                        a_values = perturbation['a']
-                        # Find the index in a_values which corresponds to
-                        # universals.a_begin, using a binary search.
-                        index_lower = 0
-                        index_upper = a_values.shape[0] - 1
-                        a_lower = a_values[index_lower]
-                        a_upper = a_values[index_upper]
-                        if a_lower > universals_a_begin:
-                            msg = (
-                                f'Not all perturbations are defined at '
-                                f'a_begin = {universals_a_begin}.'
-                            )
-                            if class_a_min > 0 and universals_a_begin < class_a_min:
-                                msg += (
-                                    f' Not all perturbations are defined at '
-                                    f'a_begin = {universals_a_begin}. Note that CLASS '
-                                    f'perturbations earlier than a_min = {class_a_min} in '
-                                    f'source/perturbations.c will not be used. If you really want '
-                                    f'perturbations at still earlier times, decrease this a_min '
-                                    f'and recompile CLASS.'
-                                )
-                            elif universals_a_begin < universals.a_begin:
-                                msg += (
-                                    f' It may help to decrease the CLASS parameter '
-                                    f'"perturb_integration_stepsize" and/or '
-                                    f'"perturb_sampling_stepsize".'
-                                )
-                            abort(msg)
-                        index, a_value = 0, -1
-                        while index_upper - index_lower > 1 and a_value != universals_a_begin:
-                            index = (index_lower + index_upper)//2
-                            a_value = a_values[index]
-                            if a_value > universals_a_begin:
-                                index_upper = index
-                            elif a_value < universals_a_begin:
-                                index_lower = index
-                        # Include times slightly earlier
-                        # than absolutely needed.
-                        index -= 3
-                        if index < 0:
-                            index = 0
-                        yield index, a_values[index], perturbation
+            if master and not loaded_lazily:
                 # Find the minimum scale factor value
                 # needed across all k modes.
                 universals_a_begin_min = universals.a_begin
-                for index, universals_a_begin, perturbation in find_a_min(universals_a_begin_min):
+                for index, universals_a_begin, perturbation in self.find_a_min(
+                    self._perturbations, universals_a_begin_min,
+                ):
                     if universals_a_begin < universals_a_begin_min:
                         universals_a_begin_min = universals_a_begin
                 # Remove perturbations earlier than
@@ -835,7 +799,9 @@ class CosmoResults:
                 # as otherwise the array will not be owning the data,
                 # meaning that it cannot be freed by Python's
                 # garbage collection.
-                for index, universals_a_begin, perturbation in find_a_min(universals_a_begin_min):
+                for index, universals_a_begin, perturbation in self.find_a_min(
+                    self._perturbations, universals_a_begin_min,
+                ):
                     for key, val in perturbation.items():
                         perturbation[key] = asarray(val[index:]).copy()
             # The perturbations stored by the master process will now be
@@ -845,26 +811,22 @@ class CosmoResults:
             # can be a waste of memory. First the master process divides
             # the k modes fairly among the processes, so that the memory
             # burden is shared amongst all processes (and hence nodes).
-            n_modes = bcast(len(self._perturbations) if master else None)
-            if n_modes == self.k_magnitudes.size:
+            n_modes = bcast(
+                self.k_magnitudes.size if loaded_lazily
+                else (len(self._perturbations) if master else None)
+            )
+            if loaded_lazily:
+                # Each process already holds its own share
+                # of the perturbations.
+                pass
+            elif n_modes == self.k_magnitudes.size:
                 keys = bcast(tuple(self._perturbations[0].keys()) if master else None)
                 # Let the master divvy up the perturbations
                 if master:
-                    sizes = [np.sum([val.size for val in perturbation.values()])
-                        for perturbation in self._perturbations]
-                    indices = arange(n_modes, dtype=C2np['Py_ssize_t'])[np.argsort(sizes)]
-                    n_surplus = n_modes % nprocs
-                    indices_procs_deque = collections.deque(indices[n_surplus:])
-                    indices_procs = [[] for _ in range(nprocs)]
-                    while indices_procs_deque:
-                        for method in ('pop', 'popleft'):
-                            for indices_proc in indices_procs:
-                                if indices_procs_deque:
-                                    indices_proc.append(getattr(indices_procs_deque, method)())
-                    for index, indices_proc in zip(indices[:n_surplus], reversed(indices_procs)):
-                        indices_proc.append(index)
-                    indices_procs = [asarray(sorted(indices), dtype=C2np['Py_ssize_t'])
-                        for indices in indices_procs]
+                    indices_procs = self.divvy_k_modes([
+                        np.sum([val.size for val in perturbation.values()])
+                        for perturbation in self._perturbations
+                    ])
                     for rank_other, indices in enumerate(indices_procs):
                         if rank_other == rank:
                             continue
@@ -944,6 +906,210 @@ class CosmoResults:
             if 'lapse' in class_species_present_list:
                 self.construct_delta_lapse()
         return self._perturbations
+    # Method for loading the perturbations from the dump file directly
+    # into the processes needing them.
+    def load_perturbations_lazily(self):
+        """Each process reads in only its own share of the k modes, and
+        only the perturbations needed for the species present in the
+        simulation. Where the layout of the file allows it, the data is
+        memory mapped rather than read, so that it is paged in from disk
+        only once accessed. In contrast to the load() method, no
+        perturbation data is ever held by the master process on behalf
+        of other processes, nor communicated between processes.
+        On success, True is returned by all processes, with
+        self._perturbations, self.k_indices and self.k_indices_all set.
+        Otherwise, False is returned by all processes.
+        """
+        if not class_reuse or special_params.get('special') == 'class':
+            return False
+        if self.k_magnitudes is None or self.k_magnitudes.size == 0:
+            return False
+        # Let the master check that the file contains all
+        # needed perturbations at all k modes, and divvy up
+        # the k modes between the processes.
+        keys = indices_procs = None
+        if master and os.path.isfile(self.filename):
+            with open_hdf5(self.filename, mode='r') as hdf5_file:
+                keys = self.get_lazy_perturbation_keys(hdf5_file)
+                if keys:
+                    perturbations_h5 = hdf5_file['perturbations']
+                    indices_procs = self.divvy_k_modes([
+                        len(keys)*perturbations_h5[f'{index}/a'].size
+                        for index in range(self.k_magnitudes.size)
+                    ])
+        keys = bcast(keys)
+        if not keys:
+            return False
+        indices_procs = bcast(indices_procs)
+        self.k_indices = indices_procs[rank]
+        self.k_indices_all = np.argsort(np.concatenate(indices_procs))
+        # Each process now loads its own k modes
+        masterprint(f'Loading CLASS perturbations from "{self.filename}" ...')
+        self._perturbations = []
+        with open_hdf5(self.filename, mode='r', driver='mpio', comm=comm) as hdf5_file:
+            perturbations_h5 = hdf5_file['perturbations']
+            for index in self.k_indices:
+                perturbation_h5 = perturbations_h5[str(index)]
+                self._perturbations.append({
+                    key: self.map_dataset(perturbation_h5[key.replace('/', '__per__')])
+                    for key in keys
+                })
+        # Cut off the lower tail of all perturbations, keeping only
+        # what is needed for the simulation timespan. The minimum scale
+        # factor value needed is found across all k modes of all
+        # processes. As the arrays may be memory mapped, views of these
+        # are kept rather than copies.
+        universals_a_begin_min = universals.a_begin
+        for index, universals_a_begin, perturbation in self.find_a_min(
+            self._perturbations, universals_a_begin_min,
+        ):
+            if universals_a_begin < universals_a_begin_min:
+                universals_a_begin_min = universals_a_begin
+        universals_a_begin_min = allreduce(universals_a_begin_min, op=MPI.MIN)
+        for index, universals_a_begin, perturbation in self.find_a_min(
+            self._perturbations, universals_a_begin_min,
+        ):
+            for key, val in perturbation.items():
+                perturbation[key] = val[index:]
+        masterprint('done')
+        return True
+    # Method returning the keys of the perturbations to load lazily
+    # from the passed (open) dump file, or None if the file does not
+    # contain all needed perturbations at all k modes.
+    def get_lazy_perturbation_keys(self, hdf5_file):
+        # Check that the params in the file match
+        # those of this CosmoResults object.
+        if self.id is not None:
+            for key, val in hdf5_file['params'].attrs.items():
+                if val != self.params.get(key.replace('__per__', '/')):
+                    return None
+        # Check that perturbations at all k modes are present
+        perturbations_h5 = hdf5_file.get('perturbations')
+        if perturbations_h5 is None:
+            return None
+        for index in range(self.k_magnitudes.size):
+            if str(index) not in perturbations_h5:
+                return None
+        # Find the stored perturbations matching the needed keys
+        needed_keys = self.needed_keys['perturbations']
+        keys = [
+            key.replace('__per__', '/')
+            for key in perturbations_h5['0'].keys()
+            if any([key.replace('__per__', '/') == pattern
+                or re.search(pattern, key.replace('__per__', '/'))
+                for pattern in needed_keys
+            ])
+        ]
+        # Check that all needed perturbations are present, where
+        # species specific perturbations other than "delta" are
+        # allowed to be missing, as in the load() method.
+        perturbations_missing = {perturbation_missing
+            for perturbation_missing in needed_keys
+            if not any([key == perturbation_missing or re.search(perturbation_missing, key)
+                for key in keys])
+        }
+        for class_species_present in (universals_dict['class_species_present']
+            .decode().replace('[', r'\[').replace(']', r'\]').split('+')):
+            perturbations_missing -= {
+                rf'^theta_{class_species_present}$',
+                rf'^cs2_{class_species_present}$',
+                rf'^shear_{class_species_present}$',
+            }
+        if perturbations_missing:
+            return None
+        return sorted(keys)
+    # Method returning a read-only view of the data of a
+    # one-dimensional HDF5 dataset.
+    def map_dataset(self, dset):
+        """For datasets stored contiguously and without any filters,
+        the data is memory mapped directly from the file, so that no
+        data is read before it is accessed. Modifications to the
+        returned array are kept in memory only (copy-on-write).
+        Other datasets are read into memory.
+        """
+        offset = None
+        if dset.chunks is None and dset.compression is None:
+            offset = dset.id.get_offset()
+        if offset is None or dset.size == 0:
+            return dset[...]
+        return np.memmap(
+            self.filename,
+            dtype=dset.dtype,
+            mode='c',
+            offset=offset,
+            shape=dset.shape,
+        )
+    # Method for dividing the k modes of the perturbations fairly
+    # among the processes, given the data size of each k mode.
+    # A list of sorted arrays of global k indices is returned,
+    # one for each process.
+    def divvy_k_modes(self, sizes):
+        n_modes = len(sizes)
+        indices = arange(n_modes, dtype=C2np['Py_ssize_t'])[np.argsort(sizes)]
+        n_surplus = n_modes % nprocs
+        indices_procs_deque = collections.deque(indices[n_surplus:])
+        indices_procs = [[] for _ in range(nprocs)]
+        while indices_procs_deque:
+            for method in ('pop', 'popleft'):
+                for indices_proc in indices_procs:
+                    if indices_procs_deque:
+                        indices_proc.append(getattr(indices_procs_deque, method)())
+        for index, indices_proc in zip(indices[:n_surplus], reversed(indices_procs)):
+            indices_proc.append(index)
+        indices_procs = [
+            asarray(sorted(indices), dtype=C2np['Py_ssize_t'])
+            for indices in indices_procs
+        ]
+        return indices_procs
+    # Generator yielding the index into the a values of each of the
+    # passed perturbations (together with the a value itself and the
+    # perturbation) from which the perturbation is needed, i.e. the
+    # index corresponding to (slightly earlier than) the given
+    # universals_a_begin.
+    def find_a_min(self, perturbations, universals_a_begin):
+        for perturbation in perturbations:
+            a_values = perturbation['a']
+            # Find the index in a_values which corresponds to
+            # universals.a_begin, using a binary search.
+            index_lower = 0
+            index_upper = a_values.shape[0] - 1
+            a_lower = a_values[index_lower]
+            a_upper = a_values[index_upper]
+            if a_lower > universals_a_begin:
+                msg = (
+                    f'Not all perturbations are defined at '
+                    f'a_begin = {universals_a_begin}.'
+                )
+                if class_a_min > 0 and universals_a_begin < class_a_min:
+                    msg += (
+                        f' Not all perturbations are defined at '
+                        f'a_begin = {universals_a_begin}. Note that CLASS '
+                        f'perturbations earlier than a_min = {class_a_min} in '
+                        f'source/perturbations.c will not be used. If you really want '
+                        f'perturbations at still earlier times, decrease this a_min '
+                        f'and recompile CLASS.'
+                    )
+                elif universals_a_begin < universals.a_begin:
+                    msg += (
+                        f' It may help to decrease the CLASS parameter '
+                        f'"perturb_integration_stepsize" and/or '
+                        f'"perturb_sampling_stepsize".'
+                    )
+                abort(msg)
+            index, a_value = 0, -1
+            while index_upper - index_lower > 1 and a_value != universals_a_begin:
+                index = (index_lower + index_upper)//2
+                a_value = a_values[index]
+                if a_value > universals_a_begin:
+                    index_upper = index
+                elif a_value < universals_a_begin:
+                    index_lower = index
+            # Include times slightly earlier
+            # than absolutely needed.
+            index -= 3
+            if index < 0:
+                index = 0
+            yield index, a_values[index], perturbation
     # Method which makes sure that everything is loaded
     def load_everything(self, already_loaded=None):
         """If some attribute is already loaded, it can be specified
@@ -1238,7 +1404,7 @@ class CosmoResults:
                 if isinstance(a, (int, float)):
                     values += spline.eval(a)
                 else:
-                    values += asarray([spline.eval(a_i) for a_i in a])
+                    values += asarray(spline.eval_array(asarray(a, dtype=C2np['double'])))
         # Apply unit
         if apply_unit:
             values *= ℝ[3/(8*π*G_Newton)*(light_speed/units.Mpc)**2]
@@ -1259,7 +1425,7 @@ class CosmoResults:
                 if isinstance(a, (int, float)):
                     values += spline.eval(a)
                 else:
-                    values += asarray([spline.eval(a_i) for a_i in a])
+                    values += asarray(spline.eval_array(asarray(a, dtype=C2np['double'])))
         # Apply unit. Note that we define P_bar such that
         # w = c⁻²P_bar/ρ_bar.
         if apply_unit:
@@ -1282,8 +1448,8 @@ class CosmoResults:
                     ρ_bar += ρ_bar_spline.eval(a)
                     P_bar += P_bar_spline.eval(a)
                 else:
-                    ρ_bar += asarray([ρ_bar_spline.eval(a_i) for a_i in a])
-                    P_bar += asarray([P_bar_spline.eval(a_i) for a_i in a])
+                    ρ_bar += asarray(ρ_bar_spline.eval_array(asarray(a, dtype=C2np['double'])))
+                    P_bar += asarray(P_bar_spline.eval_array(asarray(a, dtype=C2np['double'])))
         # As we have done no unit conversion, the ratio P_bar/ρ_bar
         # gives us the unitless w.
         return P_bar/ρ_bar
@@ -1293,6 +1459,11 @@ class CosmoResults:
     def growth_fac_f(self, a):
         spline = self.splines('gr.fac. f')
         return spline.eval(a)
+    # Method for looking up the total matter density parameter
+    # Ωₘ(a) = ρ̄ₘ(a)/ρ̄_crit(a) at some a.
+    @lru_cache()
+    def Ωm(self, a):
+        return self.ρ_bar(a, matter_class_species)/self.ρ_bar(a, 'crit')
     # Method for appending a piece of raw CLASS data to the dump file
     def save(self, element):
         """You should not call this method unless you have good reason
@@ -2603,6 +2774,10 @@ def find_critical_times():
     # Locals
     cosmoresults=object, # CosmoResults
     extra_params=dict,
+    gauge_cached=str,
+    gridsize_cached='Py_ssize_t',
+    gridsize_registered='Py_ssize_t',
+    gridsize_tabulation='Py_ssize_t',
     k_magnitudes='double[::1]',
     k_magnitudes_str=str,
     params_specialized=dict,
@@ -2621,6 +2796,12 @@ def compute_cosmo(gridsize=-1, gauge='synchronous', filename='', class_call_reas
     to do the same CLASS computation over and over again.
     The gridsize argument specify the |k| distribution on which the
     perturbations should be tabulated, as defined by get_k_magnitudes().
+    As the tabulation for a given gridsize covers the k modes of all
+    smaller grids, CosmoResults computed for a larger gridsize are
+    reused for smaller ones. Also, the tabulation is always carried
+    out for at least the largest gridsize registered through
+    register_k_gridsize(), so that CLASS only needs to be run once
+    for all of these grid sizes.
     The gauge of the transfer functions can be specified by
     the gauge argument, which can be any valid CLASS gauge. Note that
     N-body gauge is not implemented in CLASS.
@@ -2646,6 +2827,21 @@ def compute_cosmo(gridsize=-1, gauge='synchronous', filename='', class_call_reas
     cosmoresults = cosmoresults_cache.get((gridsize, gauge))
     if cosmoresults is not None:
         return cosmoresults
+    # If perturbations have already been tabulated for a larger
+    # gridsize, these cover the k modes needed for this gridsize.
+    gridsize_tabulation = gridsize
+    if gridsize != -1:
+        for gridsize_cached, gauge_cached in cosmoresults_cache:
+            if gauge_cached == gauge and gridsize_cached > gridsize_tabulation:
+                gridsize_tabulation = gridsize_cached
+        if gridsize_tabulation != gridsize:
+            cosmoresults = cosmoresults_cache[gridsize_tabulation, gauge]
+            cosmoresults_cache[gridsize, gauge] = cosmoresults
+            return cosmoresults
+        # Tabulate the perturbations for all registered grid sizes
+        for gridsize_registered in k_gridsizes_registered:
+            if gridsize_registered > gridsize_tabulation:
+                gridsize_tabulation = gridsize_registered
     # Determine whether to run CLASS "quickly" or "fully",
     # where only the latter computes the perturbations.
     if gridsize == -1:
@@ -2657,7 +2853,7 @@ def compute_cosmo(gridsize=-1, gauge='synchronous', filename='', class_call_reas
         # A full CLASS computation should be carried out.
         # Array of |k| values at which to tabulate the perturbations,
         # in both float and str representation.
-        k_magnitudes, k_magnitudes_str = get_k_magnitudes(gridsize)
+        k_magnitudes, k_magnitudes_str = get_k_magnitudes(gridsize_tabulation)
         # Specify the extra parameters with which CLASS should be run
         extra_params = {
             'k_output_values': k_magnitudes_str,
@@ -2687,12 +2883,46 @@ def compute_cosmo(gridsize=-1, gauge='synchronous', filename='', class_call_reas
     )
     # Add the CosmoResults object to the cache
     cosmoresults_cache[gridsize, gauge] = cosmoresults
+    cosmoresults_cache[gridsize_tabulation, gauge] = cosmoresults
     return cosmoresults
 # Dict with keys of the form (gridsize, gauge), storing the results
 # of calls to the above function as CosmoResults instances.
 cython.declare(cosmoresults_cache=dict)
 cosmoresults_cache = {}
 
+# Function for registering a grid size on which transfer functions
+# will be needed later on. The k tabulation used for the perturbations
+# computed by compute_cosmo() will then cover this grid size.
+@cython.pheader(
+    # Arguments
+    gridsize='Py_ssize_t',
+    # Locals
+    gauge=str,
+    gridsize_cached='Py_ssize_t',
+    gridsize_tabulated_max='Py_ssize_t',
+)
+def register_k_gridsize(gridsize):
+    # As we ignore the Nyquist points, gridsize >= 4 is needed
+    # for a k tabulation, see get_k_magnitudes().
+    if gridsize < 4:
+        return
+    # Registration has no effect on perturbations which
+    # have already been computed.
+    gridsize_tabulated_max = -1
+    for gridsize_cached, gauge in cosmoresults_cache:
+        if gridsize_cached > gridsize_tabulated_max:
+            gridsize_tabulated_max = gridsize_cached
+    if -1 < gridsize_tabulated_max < gridsize:
+        masterwarn(
+            f'Grid size {gridsize} registered for k tabulation after perturbations '
+            f'have already been tabulated for grid size {gridsize_tabulated_max}. '
+            f'This may lead to an additional CLASS computation.'
+        )
+    k_gridsizes_registered.add(gridsize)
+# Set of grid sizes registered by the above function
+cython.declare(k_gridsizes_registered=set)
+k_gridsizes_registered = set()
+
 # Function for computing transfer functions as function of k
 @cython.pheader(
     # Arguments
@@ -3001,6 +3231,7 @@ k_safety_factor = 2*10**float(-k_str_n_decimals)
     a='double',
     options=dict,
     use_gridˣ='bint',
+    stream=object,  # ConceptSnapshot, GadgetSnapshot or None
     # Locals
     H='double',
     Jⁱ_ptr='double*',
@@ -3038,6 +3269,8 @@ k_safety_factor = 2*10**float(-k_str_n_decimals)
     ki='Py_ssize_t',
     kj='Py_ssize_t',
     kk='Py_ssize_t',
+    lpt_order='int',
+    lpt_slab_info=dict,
     mass='double',
     mom='double*',
     multi_index=object,  # tuple or str
@@ -3070,6 +3303,8 @@ k_safety_factor = 2*10**float(-k_str_n_decimals)
     uⁱ='double[:, :, ::1]',
     w='double',
     w_eff='double',
+    weight_2='double',
+    weight_3='double',
     x_gridpoint='double',
     y_gridpoint='double',
     z_gridpoint='double',
@@ -3078,6 +3313,7 @@ k_safety_factor = 2*10**float(-k_str_n_decimals)
     θ='double',
     ςⁱⱼ_ptr='double*',
     ψⁱ='double[:, :, ::1]',
+    Ωm_a='double',
     ϱ_bar='double',
     ϱ_ptr='double*',
     𝒫_ptr='double*',
@@ -3085,6 +3321,7 @@ k_safety_factor = 2*10**float(-k_str_n_decimals)
 def realize(
     component, variable, transfer_spline, cosmoresults,
     specific_multi_index=None, a=-1, options=None, use_gridˣ=False,
+    stream=None,
 ):
     """This function realises a single variable of a component,
     given the transfer function as a Spline (using |k⃗| in physical units
@@ -3095,7 +3332,9 @@ def realize(
     fluidscalar may be specified. If you want a realisation at a time
     different from the present you may specify an a.
     If a particle component is given, the Zel'dovich approximation is
-    used to distribute the particles and assign momenta.
+    used to distribute the particles and assign momenta, optionally
+    supplemented by second- or third-order Lagrangian perturbation
+    theory (2LPT or 3LPT).
 
     Several options has to be specified to define how the realisation is
     to be carried out. These options are contained in the "options"
@@ -3103,6 +3342,7 @@ def realize(
     options = {
         # Linear realisation options
         'velocities from displacements': False,
+        'LPT': 1,
         # Non-linear realisation options
         'structure'     : 'primordial',
         'compound-order': 'linear',
@@ -3120,6 +3360,13 @@ def realize(
     'velocities from displacements' is True, you should call this
     function once with variable = 1 (momenta), but with a
     transfer_spline for ψⁱ (corresponding to variable 0).
+    The 'LPT' option sets the order of Lagrangian perturbation theory
+    used for particle realisations, with 1 corresponding to the
+    Zel'dovich approximation. For orders 2 and 3, the higher-order
+    displacement fields are constructed from the linear density field
+    of the component (see compute_lpt_sources()) and added to ψⁱ and uⁱ,
+    using the approximate higher-order growth rates
+    f₂ ≈ 2Ωₘ^(6/11) and f₃ ≈ 3Ωₘ^(13/24).
     Another linear option 'back-scaling' might be specified, but it is
     not used by this function.
     Taking Jⁱ as an example of a fluid variable realisation,
@@ -3145,6 +3392,16 @@ def realize(
     For both particle and fluid components it is assumed that the
     passed component is of the correct size beforehand. No resizing
     will take place in this function.
+
+    For particle components, a snapshot opened for streaming (see
+    save_streaming() in the snapshot module) may be passed as stream.
+    The realised particle data is then written directly to this
+    snapshot, one dimension of the local slab at a time, without ever
+    being stored in the component. Here the particles are placed at the
+    lattice points of the (real space) slabs, with any particle shift
+    applied as a phase shift in Fourier space in place of
+    interpolation. The component is then not required to be of the
+    correct size, as it is left untouched.
     """
     if a == -1:
         a = universals.a
@@ -3160,6 +3417,7 @@ def realize(
         # Linear options
         'interpolation': 2,  # CIC
         'velocitiesfromdisplacements': False,
+        'lpt'          : 1,
         # Non-linear options
         'structure'    : 'primordial',
         'compoundorder': 'linear',
@@ -3171,6 +3429,7 @@ def realize(
         if option_key not in {
             'interpolation',
             'velocitiesfromdisplacements',
+            'lpt',
             'backscaling',
             'structure',
             'compoundorder',
@@ -3181,6 +3440,15 @@ def realize(
     if options['compoundorder'] not in {'linear', 'nonlinear'}:
         abort(f'Unrecognised value "{options["compoundorder"]}" for options["compound-order"]')
     options['velocitiesfromdisplacements'] = bool(options['velocitiesfromdisplacements'])
+    if options['lpt'] not in {1, 2, 3}:
+        abort(f'Unrecognised value "{options["lpt"]}" for options["LPT"]; must be 1, 2 or 3')
+    options['lpt'] = int(options['lpt'])
+    if component.representation == 'fluid' and options['lpt'] != 1:
+        abort(
+            f'Lagrangian perturbation theory of order {options["lpt"]} was requested '
+            f'for the realisation of the fluid component {component.name}, '
+            f'but higher-order LPT is only available for particle components'
+        )
     # Get the index of the fluid variable to be realised
     # and print out progress message.
     processed_specific_multi_index = ()
@@ -3269,6 +3537,20 @@ def realize(
                     )
                 )
             )
+    # Streaming of the realised data directly to a snapshot is only
+    # possible for particle components.
+    if stream is not None:
+        if component.representation != 'particles':
+            abort(
+                f'Cannot stream the realisation of the {component.representation} '
+                f'component {component.name} to disk, as streaming is only '
+                f'implemented for particle components'
+            )
+        if options['velocitiesfromdisplacements'] and options['lpt'] > 1:
+            abort(
+                f'Cannot stream the realisation of {component.name} to disk using both '
+                f'"velocities from displacements" and LPT of order {options["lpt"]}'
+            )
     # Determine the grid size of the grid used to do the realisation
     if component.representation == 'particles':
         if not isint(ℝ[cbrt(component.N)]):
@@ -3449,6 +3731,42 @@ def realize(
     slab_ptr      = cython.address(slab          [:, :, :])
     structure_ptr = cython.address(slab_structure[:, :, :])
     deconv_order = interpolation_order*𝔹[particle_shift or interpolation_order > 2]
+    # When streaming, no interpolation takes place and so we should not
+    # deconvolve. Instead, the particle shift is applied directly
+    # in Fourier space.
+    if stream is not None:
+        deconv_order = 0
+    # For higher-order LPT particle realisations, compute the sources of
+    # the higher-order displacement fields. These are shared between the
+    # realisations of the momenta and the positions and so are only
+    # recomputed when needed.
+    lpt_order = options['lpt']
+    weight_2 = weight_3 = 0
+    if lpt_order > 1:
+        lpt_slab_info = {
+            'component': component.name,
+            'a'        : a,
+            'order'    : lpt_order,
+        }
+        if not reuse_slab_structure or lpt_slab_infos.get(gridsize) != lpt_slab_info:
+            compute_lpt_sources(component, slab_structure, cosmoresults, a, lpt_order)
+        lpt_slab_infos[gridsize] = lpt_slab_info
+        # The weights of the second- and third-order contributions,
+        # depending on whether we realise ψⁱ or uⁱ. When realising uⁱ
+        # directly, the higher-order velocities are
+        # uⁱ = aH(f₂ψ⁽²⁾ⁱ + f₃ψ⁽³⁾ⁱ). When realising the momenta from ψⁱ,
+        # the higher-order displacements are weighted by f₂/f and f₃/f
+        # so that the later multiplication by aHf gives the same result.
+        Ωm_a = cosmoresults.Ωm(a)
+        if particle_var_name == 'pos':
+            weight_2 = weight_3 = 1
+        elif options['velocitiesfromdisplacements']:
+            f_growth = cosmoresults.growth_fac_f(a)
+            weight_2 = 2*Ωm_a**(6./11.)/f_growth
+            weight_3 = 3*Ωm_a**(13./24.)/f_growth
+        else:
+            weight_2 = a*H*2*Ωm_a**(6./11.)
+            weight_3 = a*H*3*Ωm_a**(13./24.)
     # Loop over all fluid scalars of the fluid variable
     fluidvar = component.fluidvars[fluid_index]
     for multi_index in (
@@ -3552,6 +3870,13 @@ def realize(
                     k_factor = ℝ[0.5*(index0 == index1)] - (1.5*k_index0*k_index1)/k2
                     slab_ptr[index    ] = ℝ[sqrt_power*k_factor]*structure_ptr[index    ]
                     slab_ptr[index + 1] = ℝ[sqrt_power*k_factor]*structure_ptr[index + 1]
+        # Add the higher-order LPT contributions to ψⁱ or uⁱ
+        if lpt_order > 1:
+            add_lpt_contributions(slab, index0, lpt_order, weight_2, weight_3, deconv_order)
+        # When streaming, shift the realised field to the particle
+        # lattice by applying the corresponding phase shift.
+        if stream is not None and particle_shift:
+            shift_fourier_slab(slab, particle_shift)
         # Ensure nullified Nyquist planes and origin
         nullify_modes(slab, 'nyquist, origin')
         # Fourier transform the slabs to coordinate space.
@@ -3618,11 +3943,6 @@ def realize(
                         ςⁱⱼ_ptr[index] *= ℝ[ϱ_bar*(1 + w)]
             # Continue with the next fluidscalar
             continue
-        # Domain-decompose the realised field stored in the slabs.
-        # This is either the displacement field ψⁱ or the velocity
-        # field uⁱ. Importantly, here we have to use a different
-        # buffer from the one already used by sqrt_power_common.
-        ψⁱ = uⁱ = domain_decompose(slab, 1)
         # Determine and set the mass of the particles
         # if this is still unset.
         if component.mass == -1:
@@ -3631,9 +3951,34 @@ def realize(
         # The current mass is the set mass at a = 1,
         # scaled according to w_eff(a).
         mass = a**(-3*w_eff)*component.mass
+        dim = multi_index[0]
+        # When streaming, write out the particle data from the local
+        # slab directly and continue with the next dimension.
+        if stream is not None:
+            if particle_var_name == 'mom':
+                if options['velocitiesfromdisplacements']:
+                    f_growth = cosmoresults.growth_fac_f(a)
+                    stream_particle_slab(
+                        component, stream, slab, 'mom', dim, a**2*H*f_growth*mass,
+                        particle_shift,
+                    )
+                    # The positions are constructed from
+                    # the same displacement field.
+                    stream_particle_slab(component, stream, slab, 'pos', dim, 1, particle_shift)
+                else:
+                    stream_particle_slab(
+                        component, stream, slab, 'mom', dim, a*mass, particle_shift,
+                    )
+            else:  # particle_var_name == 'pos'
+                stream_particle_slab(component, stream, slab, 'pos', dim, 1, particle_shift)
+            continue
+        # Domain-decompose the realised field stored in the slabs.
+        # This is either the displacement field ψⁱ or the velocity
+        # field uⁱ. Importantly, here we have to use a different
+        # buffer from the one already used by sqrt_power_common.
+        ψⁱ = uⁱ = domain_decompose(slab, 1)
         # Below follows the Zel'dovich approximation
         # for particle components.
-        dim = multi_index[0]
         pos   = component.pos
         posxˣ = component.posxˣ
         posyˣ = component.posyˣ
@@ -3716,14 +4061,534 @@ def realize(
     # their original domain, and so we do need to do an exchange.
     # We can only do this exchange once both the momenta and the
     # positions have been assigned.
-    if component.representation == 'particles' and (
+    # When streaming, the particle data never enter the component.
+    if stream is None and component.representation == 'particles' and (
             particle_var_name == 'pos'
         or (particle_var_name == 'mom' and options['velocitiesfromdisplacements'])
     ):
         exchange(component)
-# Module level variable used by the realize() function
-cython.declare(slab_structure_infos=dict)
+# Module level variables used by the realize() function
+cython.declare(slab_structure_infos=dict, lpt_slab_infos=dict)
 slab_structure_infos = {}
+lpt_slab_infos = {}
+
+# Function for computing the Fourier space sources of the higher-order
+# Lagrangian perturbation theory (LPT) displacement fields,
+# used for 2LPT and 3LPT realisations of particle components.
+@cython.header(
+    # Arguments
+    component='Component',
+    slab_structure='double[:, :, ::1]',
+    cosmoresults=object,  # CosmoResults
+    a='double',
+    lpt_order='int',
+    # Locals
+    c2='double',
+    c3a='double',
+    c3b='double',
+    c3c='double',
+    cosmoresults_δ=object,  # CosmoResults
+    dim0='int',
+    dim1='int',
+    dim_i='int',
+    dim_l='int',
+    dim_m='int',
+    dim_n='int',
+    factor='double',
+    gridsize='Py_ssize_t',
+    hessians=dict,
+    index='Py_ssize_t',
+    k2='Py_ssize_t',
+    k2_max='Py_ssize_t',
+    k_magnitude='double',
+    ki='Py_ssize_t',
+    kj='Py_ssize_t',
+    kk='Py_ssize_t',
+    levi_civita='int',
+    nyquist='Py_ssize_t',
+    slab_2='double[:, :, ::1]',
+    slab_2_ptr='double*',
+    slab_3='double[:, :, ::1]',
+    slab_fourier='double[:, :, ::1]',
+    slab_hessian='double[:, :, ::1]',
+    slab_work='double[:, :, ::1]',
+    slab_δ='double[:, :, ::1]',
+    slab_δ_ptr='double*',
+    slabs_A=list,
+    sqrt_power_δ='double[::1]',
+    structure_ptr='double*',
+    transfer_spline_δ='Spline',
+    θ='double',
+    Ωm_a='double',
+    returns='void',
+)
+def compute_lpt_sources(component, slab_structure, cosmoresults, a, lpt_order):
+    """With the linear displacement field given by
+        ψ⁽¹⁾ⁱ = -∂ⁱφ⁽¹⁾,  ∇²φ⁽¹⁾ = δ⁽¹⁾,
+    the second- and third-order displacement fields are
+        ψ⁽²⁾ⁱ = c₂∂ⁱφ⁽²⁾,
+        ψ⁽³⁾ⁱ = c₃ₐ∂ⁱφ⁽³ᵃ⁾ + c₃ᵦ∂ⁱφ⁽³ᵇ⁾ + c₃꜀(∇×A⁽³⁾)ⁱ,
+    with
+        ∇²φ⁽²⁾  = μ₂[φ⁽¹⁾, φ⁽¹⁾],
+        ∇²φ⁽³ᵃ⁾ = det(∂ᵢ∂ⱼφ⁽¹⁾),
+        ∇²φ⁽³ᵇ⁾ = μ₂[φ⁽¹⁾, φ⁽²⁾],
+        ∇²A⁽³⁾ⁱ = εⁱₗₘ∂ʲ∂ˡφ⁽²⁾∂ⱼ∂ᵐφ⁽¹⁾,
+        μ₂[φ, φ'] = ½[∇²φ∇²φ' - ∂ᵢ∂ⱼφ∂ⁱ∂ʲφ'],
+    and the growth factor ratios
+        c₂  = D₂/D₁²  ≈ -3/7 Ωₘ^(-1/143),
+        c₃ₐ = D₃ₐ/D₁³ ≈ +1/3 Ωₘ^(-4/275),
+        c₃ᵦ = D₃ᵦ/D₁³ ≈ -10/21 Ωₘ^(-269/17875),
+        c₃꜀ = D₃꜀/D₁³ ≈ +1/7.
+    Here δ⁽¹⁾ is the linear density contrast of the component at
+    scale factor a, realised from the primordial structure in
+    slab_structure. Upon return, the slab named 'slab_lpt_2' contains
+    c₂∇²φ⁽²⁾ in Fourier space. For lpt_order = 3, the slab named
+    'slab_lpt_3' further contains c₃ₐ∇²φ⁽³ᵃ⁾ + c₃ᵦ∇²φ⁽³ᵇ⁾ and the slabs
+    named 'slab_lpt_3_A{dim}' contain c₃꜀∇²A⁽³⁾ⁱ, all in Fourier space.
+    """
+    gridsize = slab_structure.shape[1]
+    masterprint(f'Computing {lpt_order}LPT sources of {component.name} ...')
+    # Growth factor ratios
+    Ωm_a = cosmoresults.Ωm(a)
+    c2  = -3./7.*Ωm_a**(-1./143.)
+    c3a = +1./3.*Ωm_a**(-4./275.)
+    c3b = -10./21.*Ωm_a**(-269./17875.)
+    c3c = +1./7.
+    # Populate slab_δ with the linear density contrast
+    # δ⁽¹⁾(k⃗) = T_δ(k)ζ(k)ℛ(k⃗), with T_δ(k) the transfer function
+    # of δ for the component.
+    transfer_spline_δ, cosmoresults_δ = compute_transfer(component, 0, gridsize, a=a)
+    nyquist = gridsize//2
+    k2_max = 3*(nyquist - 1)**2
+    sqrt_power_δ = get_buffer(k2_max + 1, 'lpt')
+    for k2 in range(1, k2_max + 1):
+        k_magnitude = ℝ[2*π/boxsize]*sqrt(k2)
+        sqrt_power_δ[k2] = (
+            transfer_spline_δ.eval(k_magnitude)*ζ(k_magnitude)*ℝ[boxsize**(-1.5)]
+        )
+    sqrt_power_δ[0] = 0
+    slab_δ = get_fftw_slab(gridsize, 'slab_lpt_δ')
+    slab_δ_ptr    = cython.address(slab_δ        [:, :, :])
+    structure_ptr = cython.address(slab_structure[:, :, :])
+    for index, ki, kj, kk, factor, θ in fourier_loop(gridsize, skip_origin=True):
+        k2 = ℤ[ℤ[ℤ[kj**2] + ki**2] + kk**2]
+        slab_δ_ptr[index    ] = sqrt_power_δ[k2]*structure_ptr[index    ]
+        slab_δ_ptr[index + 1] = sqrt_power_δ[k2]*structure_ptr[index + 1]
+    nullify_modes(slab_δ, 'nyquist, origin')
+    # Construct the real space second-order source
+    # μ₂[φ⁽¹⁾, φ⁽¹⁾] = ½(δ⁽¹⁾)² - ½∂ᵢ∂ⱼφ⁽¹⁾∂ⁱ∂ʲφ⁽¹⁾,
+    # making use of ∇²φ⁽¹⁾ = δ⁽¹⁾. For 2LPT each of the six independent
+    # components ∂ᵢ∂ⱼφ⁽¹⁾ are handled one at a time in a single work
+    # slab, while for 3LPT they are all kept around.
+    slab_2 = get_fftw_slab(gridsize, 'slab_lpt_2', nullify=True)
+    slab_work = get_fftw_slab(gridsize, 'slab_lpt_work')
+    compute_lpt_hessian(slab_δ, slab_work, -1, -1)
+    lpt_accumulate(slab_2, 0.5, slab_work, slab_work)
+    hessians = {}
+    for dim0 in range(3):
+        for dim1 in range(dim0, 3):
+            slab_hessian = slab_work
+            if lpt_order > 2:
+                slab_hessian = get_fftw_slab(gridsize, f'slab_lpt_hessian_{dim0}{dim1}')
+                hessians[dim0, dim1] = hessians[dim1, dim0] = slab_hessian
+            compute_lpt_hessian(slab_δ, slab_hessian, dim0, dim1)
+            lpt_accumulate(slab_2, -0.5*(1 + (dim0 != dim1)), slab_hessian, slab_hessian)
+    # Construct the real space third-order sources
+    if lpt_order > 2:
+        # The longitudinal part
+        # c₃ₐdet(∂ᵢ∂ⱼφ⁽¹⁾) + c₃ᵦμ₂[φ⁽¹⁾, φ⁽²⁾], where for now only the
+        # ½c₃ᵦ∇²φ⁽¹⁾∇²φ⁽²⁾ term of μ₂[φ⁽¹⁾, φ⁽²⁾] is added.
+        slab_3 = get_fftw_slab(gridsize, 'slab_lpt_3', nullify=True)
+        lpt_accumulate_determinant(
+            slab_3, c3a,
+            hessians[0, 0], hessians[0, 1], hessians[0, 2],
+            hessians[1, 1], hessians[1, 2], hessians[2, 2],
+        )
+        compute_lpt_hessian(slab_δ, slab_work, -1, -1)
+        lpt_accumulate(slab_3, 0.5*c3b, slab_work, slab_2)
+        # The transverse part
+        slabs_A = [
+            get_fftw_slab(gridsize, f'slab_lpt_3_A{dim_l}', nullify=True)
+            for dim_l in range(3)
+        ]
+    # Transform the second-order source to Fourier space
+    fft(slab_2, 'forward', apply_forward_normalization=True)
+    nullify_modes(slab_2, 'nyquist, origin')
+    # Complete the third-order sources, requiring ∂ᵢ∂ⱼφ⁽²⁾
+    if lpt_order > 2:
+        for dim0 in range(3):
+            for dim1 in range(dim0, 3):
+                compute_lpt_hessian(slab_2, slab_work, dim0, dim1)
+                # Add the remaining -½c₃ᵦ∂ᵢ∂ⱼφ⁽¹⁾∂ⁱ∂ʲφ⁽²⁾
+                # term of μ₂[φ⁽¹⁾, φ⁽²⁾].
+                lpt_accumulate(
+                    slab_3, -0.5*c3b*(1 + (dim0 != dim1)), slab_work, hessians[dim0, dim1],
+                )
+                # Add the contributions to c₃꜀εⁱₗₘ∂ʲ∂ˡφ⁽²⁾∂ⱼ∂ᵐφ⁽¹⁾
+                # from the current ∂ʲ∂ˡφ⁽²⁾ = ∂ˡ∂ʲφ⁽²⁾.
+                for dim_i, dim_m in {(dim0, dim1), (dim1, dim0)}:
+                    for dim_l in range(3):
+                        for dim_n in range(3):
+                            levi_civita = (dim_l - dim_m)*(dim_m - dim_n)*(dim_n - dim_l)//2
+                            if levi_civita == 0:
+                                continue
+                            lpt_accumulate(
+                                slabs_A[dim_l], levi_civita*c3c,
+                                slab_work, hessians[dim_i, dim_n],
+                            )
+        for slab_fourier in [slab_3] + slabs_A:
+            fft(slab_fourier, 'forward', apply_forward_normalization=True)
+            nullify_modes(slab_fourier, 'nyquist, origin')
+    # Apply the growth factor ratio to the second-order source
+    slab_2_ptr = cython.address(slab_2[:, :, :])
+    for index in range(slab_2.shape[0]*slab_2.shape[1]*slab_2.shape[2]):
+        slab_2_ptr[index] *= c2
+    # Free the intermediary slabs. Only the final sources
+    # are kept around, until freed by free_lpt_sources().
+    slab_hessian = slab_work = slab_δ = None
+    hessians.clear()
+    free_fftw_slab(gridsize, 'slab_lpt_δ')
+    free_fftw_slab(gridsize, 'slab_lpt_work')
+    if lpt_order > 2:
+        for dim0 in range(3):
+            for dim1 in range(dim0, 3):
+                free_fftw_slab(gridsize, f'slab_lpt_hessian_{dim0}{dim1}')
+    masterprint('done')
+
+# Function for freeing the slabs holding the higher-order LPT sources
+# computed by compute_lpt_sources(). This should be called once the
+# realisations making use of these sources are done with.
+@cython.pheader(
+    # Locals
+    dim='int',
+    gridsize='Py_ssize_t',
+    lpt_slab_info=dict,
+    returns='void',
+)
+def free_lpt_sources():
+    for gridsize, lpt_slab_info in lpt_slab_infos.items():
+        free_fftw_slab(gridsize, 'slab_lpt_2')
+        if lpt_slab_info['order'] > 2:
+            free_fftw_slab(gridsize, 'slab_lpt_3')
+            for dim in range(3):
+                free_fftw_slab(gridsize, f'slab_lpt_3_A{dim}')
+    lpt_slab_infos.clear()
+
+# Helper function for compute_lpt_sources(), computing the real space
+# ∂ᵢ∂ⱼφ from a Fourier space ∇²φ.
+@cython.header(
+    # Arguments
+    slab_source='double[:, :, ::1]',
+    slab_hessian='double[:, :, ::1]',
+    dim0='int',
+    dim1='int',
+    # Locals
+    factor='double',
+    gridsize='Py_ssize_t',
+    index='Py_ssize_t',
+    k2='Py_ssize_t',
+    k_dim0='Py_ssize_t',
+    k_dim1='Py_ssize_t',
+    k_factor='double',
+    ki='Py_ssize_t',
+    kj='Py_ssize_t',
+    kk='Py_ssize_t',
+    slab_hessian_ptr='double*',
+    slab_source_ptr='double*',
+    θ='double',
+    returns='void',
+)
+def compute_lpt_hessian(slab_source, slab_hessian, dim0, dim1):
+    """The Fourier space ∇²φ is passed as slab_source and the result
+    ∂ᵢ∂ⱼφ (with i = dim0 and j = dim1) is stored in slab_hessian.
+    Using dim0 = dim1 = -1 results in ∇²φ itself being transformed to
+    real space.
+    """
+    gridsize = slab_source.shape[1]
+    slab_source_ptr  = cython.address(slab_source [:, :, :])
+    slab_hessian_ptr = cython.address(slab_hessian[:, :, :])
+    for index, ki, kj, kk, factor, θ in fourier_loop(gridsize, skip_origin=True):
+        # With φ(k⃗) = -∇²φ(k⃗)/k², we have ∂ᵢ∂ⱼφ(k⃗) = kᵢkⱼ/k²∇²φ(k⃗)
+        with unswitch(5):
+            if dim0 == -1:
+                k_factor = 1
+            else:
+                k2 = ℤ[ℤ[ℤ[kj**2] + ki**2] + kk**2]
+                k_dim0 = (
+                      (-𝔹[dim0 == 0] & ki)
+                    | (-𝔹[dim0 == 1] & kj)
+                    | (-𝔹[dim0 == 2] & kk)
+                )
+                k_dim1 = (
+                      (-𝔹[dim1 == 0] & ki)
+                    | (-𝔹[dim1 == 1] & kj)
+                    | (-𝔹[dim1 == 2] & kk)
+                )
+                k_factor = float(k_dim0*k_dim1)/k2
+        slab_hessian_ptr[index    ] = k_factor*slab_source_ptr[index    ]
+        slab_hessian_ptr[index + 1] = k_factor*slab_source_ptr[index + 1]
+    nullify_modes(slab_hessian, 'nyquist, origin')
+    fft(slab_hessian, 'backward')
+
+# Helper function for compute_lpt_sources(), carrying out
+# slab_accumulator += factor*slab_0*slab_1 in real space.
+@cython.header(
+    # Arguments
+    slab_accumulator='double[:, :, ::1]',
+    factor='double',
+    slab_0='double[:, :, ::1]',
+    slab_1='double[:, :, ::1]',
+    # Locals
+    index='Py_ssize_t',
+    slab_0_ptr='double*',
+    slab_1_ptr='double*',
+    slab_accumulator_ptr='double*',
+    returns='void',
+)
+def lpt_accumulate(slab_accumulator, factor, slab_0, slab_1):
+    slab_accumulator_ptr = cython.address(slab_accumulator[:, :, :])
+    slab_0_ptr           = cython.address(slab_0          [:, :, :])
+    slab_1_ptr           = cython.address(slab_1          [:, :, :])
+    for index in range(slab_accumulator.shape[0]*slab_accumulator.shape[1]*slab_accumulator.shape[2]):
+        slab_accumulator_ptr[index] += factor*slab_0_ptr[index]*slab_1_ptr[index]
+
+# Helper function for compute_lpt_sources(), carrying out
+# slab_accumulator += factor*det(∂ᵢ∂ⱼφ) in real space,
+# given the six independent components of ∂ᵢ∂ⱼφ.
+@cython.header(
+    # Arguments
+    slab_accumulator='double[:, :, ::1]',
+    factor='double',
+    slab_xx='double[:, :, ::1]',
+    slab_xy='double[:, :, ::1]',
+    slab_xz='double[:, :, ::1]',
+    slab_yy='double[:, :, ::1]',
+    slab_yz='double[:, :, ::1]',
+    slab_zz='double[:, :, ::1]',
+    # Locals
+    index='Py_ssize_t',
+    slab_accumulator_ptr='double*',
+    φxx='double*',
+    φxy='double*',
+    φxz='double*',
+    φyy='double*',
+    φyz='double*',
+    φzz='double*',
+    returns='void',
+)
+def lpt_accumulate_determinant(
+    slab_accumulator, factor, slab_xx, slab_xy, slab_xz, slab_yy, slab_yz, slab_zz,
+):
+    slab_accumulator_ptr = cython.address(slab_accumulator[:, :, :])
+    φxx = cython.address(slab_xx[:, :, :])
+    φxy = cython.address(slab_xy[:, :, :])
+    φxz = cython.address(slab_xz[:, :, :])
+    φyy = cython.address(slab_yy[:, :, :])
+    φyz = cython.address(slab_yz[:, :, :])
+    φzz = cython.address(slab_zz[:, :, :])
+    for index in range(slab_accumulator.shape[0]*slab_accumulator.shape[1]*slab_accumulator.shape[2]):
+        slab_accumulator_ptr[index] += factor*(
+            + φxx[index]*(φyy[index]*φzz[index] - φyz[index]**2)
+            - φxy[index]*(φxy[index]*φzz[index] - φyz[index]*φxz[index])
+            + φxz[index]*(φxy[index]*φyz[index] - φyy[index]*φxz[index])
+        )
+
+# Function for adding the higher-order LPT contributions to the
+# particle displacement field ψⁱ or velocity field uⁱ currently stored
+# in Fourier space in the passed slab. The sources must already have
+# been computed by compute_lpt_sources(). The second-order contribution
+# is weighted by weight_2 and the third-order contributions
+# by weight_3.
+@cython.header(
+    # Arguments
+    slab='double[:, :, ::1]',
+    dim='int',
+    lpt_order='int',
+    weight_2='double',
+    weight_3='double',
+    deconv_order='int',
+    # Locals
+    factor='double',
+    g='double',
+    gridsize='Py_ssize_t',
+    index='Py_ssize_t',
+    k2='Py_ssize_t',
+    k_dim='Py_ssize_t',
+    k_dim_m='Py_ssize_t',
+    k_dim_n='Py_ssize_t',
+    ki='Py_ssize_t',
+    kj='Py_ssize_t',
+    kk='Py_ssize_t',
+    slab_2_ptr='double*',
+    slab_3_ptr='double*',
+    slab_A_m_ptr='double*',
+    slab_A_n_ptr='double*',
+    slab_ptr='double*',
+    source_im='double',
+    source_re='double',
+    θ='double',
+    returns='void',
+)
+def add_lpt_contributions(slab, dim, lpt_order, weight_2, weight_3, deconv_order):
+    gridsize = slab.shape[1]
+    slab_ptr = cython.address(slab[:, :, :])
+    slab_2_ptr = cython.address(get_fftw_slab(gridsize, 'slab_lpt_2')[:, :, :])
+    slab_3_ptr = slab_A_m_ptr = slab_A_n_ptr = slab_2_ptr
+    if lpt_order > 2:
+        # The transverse contribution to the dim'th component is
+        # (k⃗×A⃗)ⁱ = kᵐAⁿ - kⁿAᵐ, with (i, m, n) a cyclic
+        # permutation of (0, 1, 2).
+        slab_3_ptr = cython.address(get_fftw_slab(gridsize, 'slab_lpt_3')[:, :, :])
+        slab_A_m_ptr = cython.address(
+            get_fftw_slab(gridsize, f'slab_lpt_3_A{(dim + 1)%3}')[:, :, :]
+        )
+        slab_A_n_ptr = cython.address(
+            get_fftw_slab(gridsize, f'slab_lpt_3_A{(dim + 2)%3}')[:, :, :]
+        )
+    for index, ki, kj, kk, factor, θ in fourier_loop(
+        gridsize, skip_origin=True, deconv_order=deconv_order,
+    ):
+        k2 = ℤ[ℤ[ℤ[kj**2] + ki**2] + kk**2]
+        k_dim = (
+              (-𝔹[dim == 0] & ki)
+            | (-𝔹[dim == 1] & kj)
+            | (-𝔹[dim == 2] & kk)
+        )
+        # The longitudinal contributions to the displacement are
+        # c∂ⁱφ(k⃗) = -ickⁱ/k²∇²φ(k⃗), with the growth factor ratios
+        # c already included in the stored sources.
+        source_re = weight_2*slab_2_ptr[index    ]
+        source_im = weight_2*slab_2_ptr[index + 1]
+        with unswitch(5):
+            if lpt_order > 2:
+                source_re += weight_3*slab_3_ptr[index    ]
+                source_im += weight_3*slab_3_ptr[index + 1]
+        source_re *= k_dim
+        source_im *= k_dim
+        # The transverse contribution to the displacement is
+        # c(∇×A⃗)ⁱ(k⃗) = -ic(k⃗×∇²A⃗)ⁱ/k²
+        with unswitch(5):
+            if lpt_order > 2:
+                k_dim_m = (
+                      (-𝔹[dim == 2] & ki)
+                    | (-𝔹[dim == 0] & kj)
+                    | (-𝔹[dim == 1] & kk)
+                )
+                k_dim_n = (
+                      (-𝔹[dim == 1] & ki)
+                    | (-𝔹[dim == 2] & kj)
+                    | (-𝔹[dim == 0] & kk)
+                )
+                source_re += weight_3*(
+                    k_dim_m*slab_A_n_ptr[index    ] - k_dim_n*slab_A_m_ptr[index    ]
+                )
+                source_im += weight_3*(
+                    k_dim_m*slab_A_n_ptr[index + 1] - k_dim_n*slab_A_m_ptr[index + 1]
+                )
+        # Add -i(...)/k² (in physical units) to the slab,
+        # including deconvolution.
+        g = ℝ[-boxsize/(2*π)]*factor/k2
+        slab_ptr[index    ] += -g*source_im
+        slab_ptr[index + 1] += +g*source_re
+
+# Function for applying a phase shift to a Fourier space slab,
+# corresponding to a real space shift of the field by the given
+# fraction of a grid cell along all three dimensions.
+@cython.header(
+    # Arguments
+    slab='double[:, :, ::1]',
+    shift='double',
+    # Locals
+    cosθ='double',
+    factor='double',
+    gridsize='Py_ssize_t',
+    im='double',
+    index='Py_ssize_t',
+    ki='Py_ssize_t',
+    kj='Py_ssize_t',
+    kk='Py_ssize_t',
+    re='double',
+    sinθ='double',
+    slab_ptr='double*',
+    θ='double',
+    θ_shift='double',
+    returns='void',
+)
+def shift_fourier_slab(slab, shift):
+    """After transforming back to real space, the value at grid point
+    i⃗ will be that of the unshifted field at i⃗ + shift, i.e. the
+    slab is multiplied by exp(ik⃗·shift⃗) with k⃗ in grid units.
+    """
+    gridsize = slab.shape[1]
+    slab_ptr = cython.address(slab[:, :, :])
+    for index, ki, kj, kk, factor, θ in fourier_loop(gridsize, skip_origin=True):
+        θ_shift = ℝ[2*π/gridsize*shift]*(ki + kj + kk)
+        cosθ = cos(θ_shift)
+        sinθ = sin(θ_shift)
+        re = slab_ptr[index    ]
+        im = slab_ptr[index + 1]
+        slab_ptr[index    ] = re*cosθ - im*sinθ
+        slab_ptr[index + 1] = re*sinθ + im*cosθ
+
+# Function for writing out the particle data given by a realised field
+# in the local real space slab to a snapshot opened for streaming.
+@cython.header(
+    # Arguments
+    component='Component',
+    stream=object,  # ConceptSnapshot or GadgetSnapshot
+    slab='double[:, :, ::1]',
+    var_name=str,
+    dim='int',
+    factor='double',
+    particle_shift='double',
+    # Locals
+    data='double[::1]',
+    data_ptr='double*',
+    gridsize='Py_ssize_t',
+    i='Py_ssize_t',
+    index='Py_ssize_t',
+    j='Py_ssize_t',
+    k='Py_ssize_t',
+    lattice_index='Py_ssize_t',
+    size='Py_ssize_t',
+    value='double',
+    returns='void',
+)
+def stream_particle_slab(component, stream, slab, var_name, dim, factor, particle_shift):
+    """The slab should contain the realised displacement field ψⁱ or
+    velocity field uⁱ in real space, for the dim'th dimension. For
+    var_name = 'pos', the displacements are added to the particle
+    lattice positions, while for var_name = 'mom', the momenta are
+    obtained by multiplying the field by the given factor. The particles
+    within the local slab are stored contiguously on disk, ordered
+    as the slab itself.
+    """
+    gridsize = slab.shape[1]
+    size = slab.shape[0]*gridsize*gridsize
+    data = get_buffer(size, 'stream')
+    data_ptr = cython.address(data[:])
+    index = 0
+    for i in range(slab.shape[0]):
+        for j in range(gridsize):
+            for k in range(gridsize):
+                value = slab[i, j, k]
+                with unswitch(3):
+                    if var_name == 'pos':
+                        lattice_index = (
+                              (-𝔹[dim == 0] & (ℤ[slab.shape[0]*rank] + i))
+                            | (-𝔹[dim == 1] & j)
+                            | (-𝔹[dim == 2] & k)
+                        )
+                        value = mod(
+                            (ℝ[0.5*cell_centered + particle_shift] + lattice_index)
+                                *ℝ[boxsize/gridsize] + value,
+                            boxsize,
+                        )
+                    else:  # var_name == 'mom'
+                        value *= factor
+                data_ptr[index] = value
+                index += 1
+    stream.stream_write(component, var_name, dim, size*rank, data)
 
 # Function that populates the passed slab decomposed grid
 # with primordial noise ℛ(k⃗).
@@ -25,9 +25,22 @@
 from commons import *
 
 # Cython imports
-cimport('from analysis import measure, powerspec')
+cimport(
+    'from analysis import            '
+    '    corrfunc,                   '
+    '    get_powerspec_declarations, '
+    '    get_powerspec_density_keys, '
+    '    halos,                      '
+    '    hmf,                        '
+    '    measure,                    '
+    '    powerspec,                  '
+)
 cimport('from communication import domain_subdivisions')
-cimport('from graphics import render2D, render3D')
+cimport(
+    'from graphics import                                      '
+    '    close_render2D_videos, get_render2D_declarations,     '
+    '    init_render2D_videos, render2D, render3D,             '
+)
 cimport(
     'from integration import   '
     '    cosmic_time,          '
@@ -36,7 +49,13 @@ cimport(
     '    scale_factor,         '
     '    scalefactor_integral, '
 )
-cimport('from snapshot import get_initial_conditions, save')
+cimport('from lightcone import init_lightcones, save_lightcones')
+cimport('from mesh import get_density_key, plan_shared_density_slabs')
+cimport(
+    'from snapshot import get_initial_conditions, move_snapshot, remove_snapshot, '
+    '    save, save_streaming, wait_for_snapshots, '
+    '    checkpoint_references, set_checkpoint_reference'
+)
 cimport('from utilities import delegate')
 
 # Pure Python imports
@@ -49,6 +68,7 @@ import interactions
 @cython.header(
     # Locals
     a='double',
+    autosave_filename_load=str,
     autosave_time='double',
     bottleneck=str,
     component='Component',
@@ -107,7 +127,13 @@ def timeloop():
         Δt_begin_autosave,
         Δt_autosave,
         output_filenames_autosave,
+        autosave_filename_load,
     ) = check_autosave()
+    # Realise the initial conditions directly into a snapshot on disk
+    # if so requested, in which case no simulation is carried out.
+    if initial_time_step == 0 and initial_conditions_streaming:
+        stream_initial_conditions()
+        return
     # Load initial conditions or an autosaved snapshot
     if initial_time_step == 0:
         # Get the initial components.
@@ -117,10 +143,15 @@ def timeloop():
     else:
         # Load autosaved snapshot as the initial conditions.
         masterprint('Setting up simulation from autosaved snapshot ...')
-        components = get_initial_conditions(autosave_filename)
+        components = get_initial_conditions(autosave_filename_load)
     if not components:
         masterprint('done')
         return
+    # Remove lightcone files from previous runs, or continue the
+    # lightcone and the 2D render videos when restarting
+    # from an autosave.
+    init_lightcones(initial_time_step > 0)
+    init_render2D_videos(initial_time_step > 0)
     # Get the dump times and the output filename patterns
     dump_times, output_filenames = prepare_for_output(
         components,
@@ -158,6 +189,8 @@ def timeloop():
         dump_times.pop(0)
         # Return now if all dumps lie at the initial time
         if len(dump_times) == 0:
+            wait_for_snapshots()
+            close_render2D_videos()
             return
     # Set initial time step size
     static_timestepping_func = prepare_static_timestepping()
@@ -453,6 +486,9 @@ def timeloop():
                     recompute_Δt_max = False
                     continue
     # All dumps completed; end of main time loop
+    wait_for_snapshots()
+    save_lightcones()
+    close_render2D_videos()
     print_timestep_footer(components)
     print_timestep_heading(time_step, Δt, bottleneck, components, end=True)
     # Remove dumped autosave, if any
@@ -1400,7 +1436,7 @@ def driftkick_short(components, Δt, sync_time):
         # Drift all particle components and return
         for component in particle_components:
             masterprint(f'Drifting {component.name} ...')
-            component.drift(ᔑdt)
+            component.drift(ᔑdt, t_start=t_start, t_end=t_end)
             masterprint('done')
         return
     # We have short-range interactions.
@@ -1472,7 +1508,7 @@ def driftkick_short(components, Δt, sync_time):
         if t_end > t_start:
             ᔑdt = get_time_step_integrals(t_start, t_end, particle_components)
             for component in particle_components:
-                component.drift(ᔑdt)
+                component.drift(ᔑdt, t_start=t_start, t_end=t_end)
                 # Reset lowest active rung, as process exchange of
                 # particles after drifting may alter the lowest
                 # populated rung.
@@ -1664,12 +1700,17 @@ def initialize_rung_populations(components, Δt):
     # Locals
     act=str,
     any_activations='bint',
+    do_powerspec='bint',
+    do_render2D='bint',
     filename=str,
     time_param=str,
     time_value='double',
     returns='bint',
 )
 def dump(components, output_filenames, dump_time, Δt=0):
+    # Any previous snapshot still being written in the background
+    # must be completed before new output is produced.
+    wait_for_snapshots()
     time_param = dump_time.time_param
     time_value = {'t': dump_time.t, 'a': dump_time.a}[time_param]
     any_activations = False
@@ -1684,9 +1725,35 @@ def dump(components, output_filenames, dump_time, Δt=0):
         filename = output_filenames['snapshot'].format(time_param, time_value)
         if time_param == 't':
             filename += unit_time
-        save(components, filename)
+        save(components, filename, asynchronous=snapshot_async)
+    # Dump halo catalogues
+    if time_value in halos_times[time_param]:
+        filename = output_filenames['halos'].format(time_param, time_value)
+        if time_param == 't':
+            filename += unit_time
+        halos(components, filename)
+    # Dump halo mass functions
+    if time_value in hmf_times[time_param]:
+        filename = output_filenames['hmf'].format(time_param, time_value)
+        if time_param == 't':
+            filename += unit_time
+        hmf(components, filename)
+    # Dump two-point correlation functions
+    if time_value in corrfunc_times[time_param]:
+        filename = output_filenames['corrfunc'].format(time_param, time_value)
+        if time_param == 't':
+            filename += unit_time
+        corrfunc(components, filename)
+    # Plan the sharing of densities between the power spectra
+    # (including cross power spectra and bispectra) and 2D renders,
+    # so that each distinct density is only interpolated and
+    # Fourier transformed once.
+    do_powerspec = (time_value in powerspec_times[time_param])
+    do_render2D = (time_value in render2D_times[time_param])
+    if do_powerspec or do_render2D:
+        plan_shared_density_slabs(get_density_keys(components, do_powerspec, do_render2D))
     # Dump power spectrum
-    if time_value in powerspec_times[time_param]:
+    if do_powerspec:
         filename = output_filenames['powerspec'].format(time_param, time_value)
         if time_param == 't':
             filename += unit_time
@@ -1698,11 +1765,13 @@ def dump(components, output_filenames, dump_time, Δt=0):
             filename += unit_time
         render3D(components, filename)
     # Dump render2D
-    if time_value in render2D_times[time_param]:
+    if do_render2D:
         filename = output_filenames['render2D'].format(time_param, time_value)
         if time_param == 't':
             filename += unit_time
         render2D(components, filename)
+    # Release any shared densities
+    plan_shared_density_slabs([])
     # Activate or terminate components after dumps
     for act in 𝕆[life_output_order[life_output_order.index('dump')+1:]]:
         if time_value in activation_termination_times[time_param]:
@@ -1711,6 +1780,109 @@ def dump(components, output_filenames, dump_time, Δt=0):
             )
     return any_activations
 
+# Function returning the keys of the densities needed for the power
+# spectra and/or 2D renders, see plan_shared_density_slabs().
+@cython.header(
+    # Arguments
+    components=list,
+    do_powerspec='bint',
+    do_render2D='bint',
+    # Locals
+    component='Component',
+    declaration=object,  # PowerspecDeclaration or Render2DDeclaration
+    keys=list,
+    returns=list,
+)
+def get_density_keys(components, do_powerspec, do_render2D):
+    keys = []
+    if do_powerspec:
+        for declaration in get_powerspec_declarations(components):
+            keys += get_powerspec_density_keys(declaration)
+    if do_render2D:
+        for declaration in get_render2D_declarations(components):
+            # Directly deposited 2D renders do not need the density
+            if declaration.direct_deposit and all([
+                component.representation == 'particles'
+                for component in declaration.components
+            ]):
+                continue
+            keys.append(get_density_key(
+                declaration.components,
+                [component.render2D_upstream_gridsize for component in declaration.components],
+                declaration.gridsize,
+                declaration.interpolation,
+                declaration.deconvolve,
+                declaration.interlace,
+            ))
+    return keys
+
+# Function for generating initial conditions and streaming them
+# directly to a snapshot on disk, bypassing the simulation.
+@cython.header(
+    # Locals
+    components=list,
+    dump_time=object,  # collections.namedtuple
+    dump_times=list,
+    filename=str,
+    initial_conditions_list=list,
+    output_filenames=dict,
+    output_kind=str,
+    output_times_kind=dict,
+    time_param=str,
+    time_value='double',
+    returns='void',
+)
+def stream_initial_conditions():
+    # Only initial conditions to be realised may be streamed
+    if isinstance(initial_conditions, (str, dict)):
+        initial_conditions_list = [initial_conditions]
+    else:
+        initial_conditions_list = list(initial_conditions)
+    if not all([
+        isinstance(specifications, dict) for specifications in initial_conditions_list
+    ]):
+        abort(
+            'Initial conditions streaming is only possible when all '
+            'initial_conditions are specifications of components to be realised'
+        )
+    # Instantiate the components without realising them
+    masterprint('Setting up initial conditions ...')
+    components = get_initial_conditions(do_realization=False)
+    masterprint('done')
+    if not components:
+        return
+    # Only a single snapshot output at the initial time is allowed
+    dump_times, output_filenames = prepare_for_output(components)
+    dump_time = dump_times[0]
+    time_param = dump_time.time_param
+    time_value = {'t': dump_time.t, 'a': dump_time.a}[time_param]
+    if (
+        len(dump_times) > 1
+        or time_value not in snapshot_times[time_param]
+        or not np.isclose(
+            time_value, {'t': universals.t, 'a': universals.a}[time_param], rtol=1e-6, atol=0,
+        )
+    ):
+        abort(
+            'Initial conditions streaming requires a single snapshot output '
+            'at the initial time and no further output'
+        )
+    for output_kind, output_times_kind in {
+        'power spectrum': powerspec_times,
+        '2D render': render2D_times,
+        '3D render': render3D_times,
+        'halo catalogue': halos_times,
+        'halo mass function': hmf_times,
+        'correlation function': corrfunc_times,
+    }.items():
+        if time_value in output_times_kind[time_param]:
+            abort(f'Cannot produce a {output_kind} when streaming the initial conditions')
+    # Realise the components directly into the snapshot
+    filename = output_filenames['snapshot'].format(time_param, time_value)
+    if time_param == 't':
+        filename += unit_time
+    save_streaming(components, filename)
+
 # Function for terminating an existing component
 # or activating a new one.
 @cython.header(
@@ -1818,16 +1990,57 @@ def activate_terminate(components, a, Δt, act='activate terminate'):
     # Locals
     autosave_auxiliary_filename_new=str,
     autosave_auxiliary_filename_old=str,
+    autosave_delta_filename_new=str,
+    autosave_delta_filename_old=str,
     autosave_filename_new=str,
     autosave_filename_old=str,
+    component='Component',
+    delta='bint',
     lines=list,
+    names=set,
     returns='void',
 )
 def autosave(components, time_step, Δt_begin, Δt, output_filenames):
-    masterprint('Autosaving ...')
+    """Every autosave_deltas + 1 autosaves, a full snapshot is saved.
+    In between, only a delta snapshot is saved, storing the
+    displacements (in low precision) and momenta of the particles
+    relative to the full snapshot. This requires the same particle
+    components to be present as at the time of the full autosave.
+    Fluid components are saved in full within delta snapshots.
+    """
+    global autosave_deltas_count
+    # Any snapshot still being written in the background
+    # must be completed before autosaving.
+    wait_for_snapshots()
+    # Save the lightcone data recorded so far, so that the lightcone
+    # can be continued when restarting from this autosave. Crossings
+    # recorded after the autosave are removed upon restarting.
+    save_lightcones()
+    # Determine whether to save a delta or a full autosave
+    names = {
+        component.name
+        for component in components
+        if component.representation == 'particles'
+    }
+    delta = (
+        autosave_deltas_count < autosave_deltas
+        and len(names) > 0
+        and names == set(checkpoint_references)
+        and all([
+            component.N == checkpoint_references[component.name]['N']
+            for component in components
+            if component.name in names
+        ])
+    )
+    if delta:
+        masterprint('Autosaving (delta) ...')
+    else:
+        masterprint('Autosaving ...')
     # Temporary file names
     autosave_filename_old = autosave_filename.removesuffix('.hdf5') + '_old.hdf5'
     autosave_filename_new = autosave_filename.removesuffix('.hdf5') + '_new.hdf5'
+    autosave_delta_filename_old = autosave_delta_filename.removesuffix('.hdf5') + '_old.hdf5'
+    autosave_delta_filename_new = autosave_delta_filename.removesuffix('.hdf5') + '_new.hdf5'
     autosave_auxiliary_filename_old = f'{autosave_auxiliary_filename}_old'
     autosave_auxiliary_filename_new = f'{autosave_auxiliary_filename}_new'
     # Save auxiliary file containing information
@@ -1844,6 +2057,11 @@ def autosave(components, time_step, Δt_begin, Δt, output_filenames):
             f'# The autosaved snapshot file was saved to',
             f'# "{autosave_filename}"',
         ]
+        if delta:
+            lines += [
+                f'# with the delta snapshot file saved to',
+                f'# "{autosave_delta_filename}"',
+            ]
         # Present time
         lines.append('')
         lines.append(f'# The autosave happened at time')
@@ -1874,6 +2092,12 @@ def autosave(components, time_step, Δt_begin, Δt, output_filenames):
             f'# The output filename patterns was',
             f'output_filenames = {repr(output_filenames)}',
         ]
+        # Whether the delta snapshot is to be used
+        lines.append('')
+        lines += [
+            f'# Whether the state is given by the delta snapshot',
+            f'delta = {bool(delta)}',
+        ]
         # Write out auxiliary file
         with open_file(
             autosave_auxiliary_filename_new,
@@ -1883,7 +2107,13 @@ def autosave(components, time_step, Δt_begin, Δt, output_filenames):
     Barrier()
     # Save CO𝘕CEPT snapshot. Include all components regardless
     # of the snapshot_select['save'] user parameter.
-    save(components, autosave_filename_new, snapshot_type='concept', save_all_components=True)
+    if delta:
+        save(
+            components, autosave_delta_filename_new,
+            snapshot_type='concept', save_all_components=True, delta=True,
+        )
+    else:
+        save(components, autosave_filename_new, snapshot_type='concept', save_all_components=True)
     # Cleanup, always keeping a set of autosave files intact
     if master:
         # Rename old versions of the autosave files
@@ -1892,8 +2122,14 @@ def autosave(components, time_step, Δt_begin, Δt, output_filenames):
                 autosave_auxiliary_filename,
                 autosave_auxiliary_filename_old,
             )
-        if os.path.isfile(autosave_filename):
-            os.replace(
+        if delta:
+            if os.path.isfile(autosave_delta_filename):
+                os.replace(
+                    autosave_delta_filename,
+                    autosave_delta_filename_old,
+                )
+        elif os.path.isfile(autosave_filename):
+            move_snapshot(
                 autosave_filename,
                 autosave_filename_old,
             )
@@ -1903,26 +2139,49 @@ def autosave(components, time_step, Δt_begin, Δt, output_filenames):
                 autosave_auxiliary_filename_new,
                 autosave_auxiliary_filename,
             )
-        if os.path.isfile(autosave_filename_new):
+        if os.path.isfile(autosave_delta_filename_new):
             os.replace(
+                autosave_delta_filename_new,
+                autosave_delta_filename,
+            )
+        if os.path.isfile(autosave_filename_new):
+            move_snapshot(
                 autosave_filename_new,
                 autosave_filename,
             )
-        # Remove old versions of the autosave files
+        # Remove old versions of the autosave files, as well as any
+        # delta snapshot referring to a replaced full snapshot.
         if os.path.isfile(autosave_auxiliary_filename_old):
             os.remove(autosave_auxiliary_filename_old)
-        if os.path.isfile(autosave_filename_old):
-            os.remove(autosave_filename_old)
+        if os.path.isfile(autosave_delta_filename_old):
+            os.remove(autosave_delta_filename_old)
+        if not delta and os.path.isfile(autosave_delta_filename):
+            os.remove(autosave_delta_filename)
+        remove_snapshot(autosave_filename_old)
+    # Let the full autosave be the reference of subsequent delta
+    # autosaves. As the particles have not been moved since they were
+    # saved, their order within the snapshot is known.
+    if delta:
+        autosave_deltas_count += 1
+    elif autosave_deltas > 0:
+        Barrier()
+        set_checkpoint_reference(components, autosave_filename)
+        autosave_deltas_count = 0
     masterprint('done')
+# Number of delta autosaves since the last full autosave
+cython.declare(autosave_deltas_count='Py_ssize_t')
+autosave_deltas_count = 0
 
 # Function checking for the existence of an autosaved snapshot and
 # auxiliary file belonging to this run. If so, the auxiliary file will
-# be read and its contents will be returned. The universal time will
+# be read and its contents will be returned, along with the filename
+# of the autosaved snapshot to load. The universal time will
 # also be set.
 @cython.header(
     # Locals
     auxiliary=dict,
     content=str,
+    filename=str,
     output_filenames=dict,
     time_step='Py_ssize_t',
     use_autosave='bint',
@@ -1939,6 +2198,7 @@ def check_autosave():
         Δt_begin = -1
         Δt = -1
         output_filenames = {}
+        filename = autosave_filename
         # Having autosave_interval == 0 disables loading of autosaves
         use_autosave = (autosave_interval > 0)
         # Check existence of autosave files
@@ -1974,6 +2234,18 @@ def check_autosave():
                     f'Failed to parse autosaved auxiliary file "{autosave_auxiliary_filename}". '
                     f'This autosave will be ignored.',
                 )
+        # Load the delta snapshot (referring to the full snapshot)
+        # if this was the latest autosave.
+        if use_autosave and auxiliary.get('delta', False):
+            if os.path.isfile(autosave_delta_filename):
+                filename = autosave_delta_filename
+            else:
+                masterwarn(
+                    f'Autosaved auxiliary file "{autosave_auxiliary_filename}" refers to delta '
+                    f'snapshot "{autosave_delta_filename}", which does not exist. '
+                    f'This autosave will be ignored.'
+                )
+                use_autosave = False
         if use_autosave:
             time_step = auxiliary['time_step']
             t = auxiliary['t']
@@ -1983,14 +2255,14 @@ def check_autosave():
             Δt = auxiliary[unicode('Δt')]
             output_filenames = auxiliary['output_filenames']
         # Broadcast results
-        bcast((t, a, time_step, Δt_begin, Δt, output_filenames))
+        bcast((t, a, time_step, Δt_begin, Δt, output_filenames, filename))
     else:
-        t, a, time_step, Δt_begin, Δt, output_filenames = bcast()
+        t, a, time_step, Δt_begin, Δt, output_filenames, filename = bcast()
     # Apply starting time
     universals.time_step = time_step
     universals.t = t
     universals.a = a
-    return time_step, Δt_begin, Δt, output_filenames
+    return time_step, Δt_begin, Δt, output_filenames, filename
 
 # Function which prints out basic information
 # about the current time step.
@@ -2448,6 +2720,7 @@ if jobid != -1:
         # Set paths to autosaved snapshot and auxiliary file
         autosave_subdir = f'{autosave_dir}/{os.path.basename(param)}'
         autosave_filename = f'{autosave_subdir}/snapshot.hdf5'
+        autosave_delta_filename = f'{autosave_subdir}/delta.hdf5'
         autosave_auxiliary_filename = f'{autosave_subdir}/auxiliary'
         # Run the time loop
         timeloop()
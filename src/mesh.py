@@ -350,6 +350,7 @@ def interpolate_domaingrid_to_particles(grid, component, variable, dim, order, f
     output_space=str,
     do_ghost_communication='bint',
     # Locals
+    chunk_index='Py_ssize_t',
     component='Component',
     fft_factor='double',
     fluid_components=list,
@@ -484,10 +485,13 @@ def interpolate_upstream(
                     nullify=True,
                 )
                 for component in particle_components:
-                    interpolate_particles(
-                        component, gridsize_upstream, grid_upstream, quantity, order, ᔑdt,
-                        shift, fft_factor, do_ghost_communication=False,
-                    )
+                    # The particle data may be read in one chunk
+                    # at a time, see Component.iterate_chunks().
+                    for chunk_index in component.iterate_chunks(exchange_particles=True):
+                        interpolate_particles(
+                            component, gridsize_upstream, grid_upstream, quantity, order, ᔑdt,
+                            shift, fft_factor, do_ghost_communication=False,
+                        )
                 communicate_ghosts(grid_upstream, '+=')
                 # Transform the upstream grid to Fourier space,
                 # perform deconvolution and interlacing and add
@@ -587,6 +591,107 @@ def add_upstream_to_global_slabs(
         copy_modes(slab_upstream, slab_global, deconv_order, interlace_flag, operation)
     return slab_global
 
+# Function for planning which global Fourier slabs of the physical
+# density ρ are to be shared between several outputs,
+# see interpolate_density().
+@cython.pheader(
+    # Arguments
+    keys=list,
+    # Locals
+    key=tuple,
+    uses='Py_ssize_t',
+    returns='void',
+)
+def plan_shared_density_slabs(keys):
+    """The passed keys should be obtained from get_density_key(), one
+    for each upcoming call to interpolate_density(). Keys occurring
+    more than once correspond to densities which will be computed only
+    once, with a copy kept in memory until its last use. Calling this
+    function with an empty list releases all kept densities.
+    """
+    shared_density_slabs.clear()
+    shared_density_uses.clear()
+    for key in keys:
+        shared_density_uses[key] = shared_density_uses.get(key, 0) + 1
+    for key, uses in shared_density_uses.copy().items():
+        if uses < 2:
+            shared_density_uses.pop(key)
+# Copies of shared Fourier space densities
+# and their number of remaining uses.
+cython.declare(shared_density_slabs=dict, shared_density_uses=dict)
+shared_density_slabs = {}
+shared_density_uses = {}
+
+# Function returning the key identifying a global Fourier space density
+@cython.pheader(
+    # Arguments
+    components=list,
+    gridsizes_upstream=list,
+    gridsize_global='Py_ssize_t',
+    order='int',
+    deconvolve='bint',
+    interlace='bint',
+    returns=tuple,
+)
+def get_density_key(components, gridsizes_upstream, gridsize_global, order, deconvolve, interlace):
+    return (
+        tuple(components),
+        tuple(gridsizes_upstream),
+        gridsize_global,
+        order,
+        deconvolve,
+        interlace,
+    )
+
+# Function for interpolating the physical density ρ of components onto
+# global Fourier slabs, sharing the result between outputs
+# as planned by plan_shared_density_slabs().
+@cython.pheader(
+    # Arguments
+    components=list,
+    gridsizes_upstream=list,
+    gridsize_global='Py_ssize_t',
+    order='int',
+    deconvolve='bint',
+    interlace='bint',
+    # Locals
+    key=tuple,
+    slab='double[:, :, ::1]',
+    slab_shared=object,  # np.ndarray
+    uses='Py_ssize_t',
+    returns='double[:, :, ::1]',
+)
+def interpolate_density(
+    components, gridsizes_upstream, gridsize_global, order, deconvolve, interlace,
+):
+    """The arguments are as for interpolate_upstream(). The returned
+    global slabs are always the default global slabs of the given
+    grid size and so they may be freely mutated by the caller, e.g.
+    by transforming them to real space.
+    """
+    key = get_density_key(
+        components, gridsizes_upstream, gridsize_global, order, deconvolve, interlace,
+    )
+    uses = shared_density_uses.get(key, 0)
+    slab_shared = shared_density_slabs.get(key)
+    if slab_shared is None:
+        slab = interpolate_upstream(
+            components, gridsizes_upstream, gridsize_global, 'ρ', order,
+            deconvolve=deconvolve, interlace=interlace, output_space='Fourier',
+        )
+        if uses > 1:
+            shared_density_slabs[key] = asarray(slab).copy()
+    else:
+        slab = get_fftw_slab(gridsize_global)
+        asarray(slab)[...] = slab_shared
+    # Release the kept density after its last use
+    if uses > 1:
+        shared_density_uses[key] = uses - 1
+    elif uses == 1:
+        shared_density_uses.pop(key)
+        shared_density_slabs.pop(key, None)
+    return slab
+
 # Function for grouping components according to
 # associated grid sizes and their representation.
 def group_components(components, gridsizes, gridsizes_order=(), split_representations=True):
@@ -3142,6 +3247,10 @@ def fft_normalize(slab):
 def free_fftw_slab(gridsize, buffer_name):
     # Fetch the slab from the slab cache and remove it
     slab = slabs.pop((gridsize, buffer_name))
+    # In pure Python mode, the slab is a NumPy array
+    # without any associated FFTW plans.
+    if not cython.compiled:
+        return
     # Grab pointer to the slab
     slab_ptr = cython.address(slab[:, :, :])
     # Look up the index of the FFTW plans for the passed slab
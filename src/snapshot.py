@@ -30,12 +30,15 @@ cimport('from communication import partition,                   '
         '                          domain_subdivisions,         '
         '                          exchange,                    '
         '                          smart_mpi,                   '
+        '                          which_domain,                '
         )
-cimport('from mesh import domain_decompose, get_fftw_slab, slab_decompose')
+cimport('from linear import register_k_gridsize')
 cimport('from species import Component, FluidScalar, update_species_present')
 
 # Pure Python imports
+import queue
 import struct
+import threading
 
 
 
@@ -84,6 +87,9 @@ class ConceptSnapshot:
         public dict params
         public list components
         public dict units
+        object stream_file
+        public set components_domain_local
+        public str filename
         """
         # Dict containing all the parameters of the snapshot
         self.params = {}
@@ -91,37 +97,92 @@ class ConceptSnapshot:
         self.components = []
         # Dict containing the base units in str format
         self.units = {}
+        # HDF5 file opened for streaming, see stream_open()
+        self.stream_file = None
+        # Names of loaded components with particles already residing
+        # on the processes governing their domains, see load().
+        self.components_domain_local = set()
+        # Name of the file from which the snapshot was loaded
+        self.filename = ''
 
     # Method that saves the snapshot to an hdf5 file
     @cython.pheader(
         # Argument
         filename=str,
+        asynchronous='bint',
+        delta='bint',
         # Locals
         N='Py_ssize_t',
         N_lin='double',
+        N_domains=object,  # np.ndarray
         N_local='Py_ssize_t',
         N_str=str,
+        bits='int',
         component='Component',
+        data=object,  # np.ndarray
+        data_mv3='double[:, ::1]',
+        domain_component_h5=object,  # h5py.Group
+        domain_file=object,  # h5py.File
+        domain_local='bint',
+        domains_h5=object,  # h5py.Group
+        dset=object,  # h5py.Dataset
         end_local='Py_ssize_t',
+        extents=object,  # np.ndarray
+        file_space=object,  # h5py.h5s.SpaceID
         fluidscalar='FluidScalar',
+        grid=object,  # np.ndarray
+        offset=object,  # Python int or None
         indices=object,  # int or tuple
         index='Py_ssize_t',
         multi_index=object,  # tuple or str
         name=object,  # str or int
         plural=str,
+        selection_file=tuple,
+        selection_grid=tuple,
         shape=tuple,
-        slab='double[:, :, ::1]',
-        slab_end='Py_ssize_t',
-        slab_start='Py_ssize_t',
         start_local='Py_ssize_t',
+        var_name=str,
+        write_filename=str,
+        write_jobs=list,
         returns=str,
     )
-    def save(self, filename):
+    def save(self, filename, asynchronous=False, delta=False):
+        """If asynchronous is True, the particle data is copied to
+        staging buffers and written to the file in the background, after
+        the file with all meta data has been closed. This requires the
+        particle datasets to be stored contiguously (no compression),
+        as their location within the file is then known in advance.
+        Call wait_for_snapshots() to ensure that the snapshot is
+        complete on disk.
+        If the snapshot_domain_local parameter is True, each process
+        writes its particle data to its own domain file, with the
+        snapshot file itself acting as an index, see load().
+        If delta is True, the particle data is saved as displacements
+        relative to the particles of the last full autosave, which the
+        snapshot then refers to, see save_delta(). Such delta snapshots
+        are neither domain local nor written asynchronously.
+        """
+        import h5py
         # Attach missing extension to filename
         if not filename.endswith('.hdf5'):
             filename += '.hdf5'
         # Print out message
         masterprint(f'Saving snapshot "{filename}" ...')
+        write_jobs = []
+        write_filename = filename
+        # Open the domain file of this process, first removing
+        # any domain files from a previous snapshot.
+        domain_local = (snapshot_domain_local and not delta)
+        domain_file = None
+        if domain_local:
+            if master:
+                if os.path.isdir(get_domain_dirname(filename)):
+                    shutil.rmtree(get_domain_dirname(filename))
+                os.makedirs(get_domain_dirname(filename))
+            Barrier()
+            write_filename = get_domain_filename(filename, rank)
+            domain_file = open_hdf5(write_filename, mode='w', local=True)
+            domain_file.attrs['domain subdivisions'] = asarray(domain_subdivisions)
         with open_hdf5(filename, mode='w', driver='mpio', comm=comm) as hdf5_file:
             # Save used base units
             hdf5_file.attrs['unit time'  ] = self.units['time']
@@ -153,14 +214,94 @@ class ConceptSnapshot:
                     # Save particle attributes
                     component_h5.attrs['mass'] = correct_float(component.mass)
                     component_h5.attrs['N'] = N
+                    if delta:
+                        # Save the particle data as displacements
+                        # relative to the last full autosave.
+                        self.save_delta(component, component_h5, filename)
+                        hdf5_file.flush()
+                        Barrier()
+                        masterprint('done')
+                        continue
                     # Get local indices of the particle data
                     start_local = int(np.sum(smart_mpi(N_local, mpifun='allgather')[:rank]))
                     end_local = start_local + component.N_local
-                    # Save particle data
-                    pos_h5 = component_h5.create_dataset('pos', (N, 3), dtype=C2np['double'])
-                    mom_h5 = component_h5.create_dataset('mom', (N, 3), dtype=C2np['double'])
-                    pos_h5[start_local:end_local, :] = component.pos_mv3[:N_local, :]
-                    mom_h5[start_local:end_local, :] = component.mom_mv3[:N_local, :]
+                    # When domain local, record the number of
+                    # particles and their extent (in units of the box)
+                    # within each domain. The particle data itself goes
+                    # to the domain file of this process.
+                    if domain_local:
+                        N_domains = asarray(
+                            smart_mpi(N_local, mpifun='allgather'), dtype=C2np['Py_ssize_t'],
+                        )
+                        extents = asarray(
+                            allgather(self.get_extent(component)), dtype=C2np['double'],
+                        )
+                        domains_h5 = component_h5.create_group('domains')
+                        domains_h5.attrs['domain subdivisions'] = asarray(domain_subdivisions)
+                        domains_h5.create_dataset('N', N_domains.shape, dtype=N_domains.dtype)
+                        domains_h5.create_dataset('extents', extents.shape, dtype=extents.dtype)
+                        if master:
+                            domains_h5['N'][...] = N_domains
+                            domains_h5['extents'][...] = extents
+                        if concept_snapshot_params['pos quantisation']:
+                            domains_h5.attrs['quantisation bits'] = (
+                                concept_snapshot_params['pos quantisation']
+                            )
+                        domain_component_h5 = domain_file.create_group(
+                            f'components/{component.name}'
+                        )
+                        start_local, end_local = 0, N_local
+                    # Save particle data, converted to the data type
+                    # of the datasets. Filtered (chunked) datasets
+                    # need to be written collectively, unless
+                    # written to a domain file.
+                    for var_name, data_mv3 in zip(
+                        ('pos', 'mom'), (component.pos_mv3, component.mom_mv3),
+                    ):
+                        if domain_local:
+                            dset = self.create_particle_dataset(
+                                domain_component_h5, var_name, N_local,
+                            )
+                        else:
+                            dset = self.create_particle_dataset(component_h5, var_name, N)
+                        if dset.shape[0] == 0:
+                            continue
+                        data = asarray(data_mv3[:N_local, :])
+                        bits = dset.attrs.get('quantisation bits', 0)
+                        if bits:
+                            data = self.quantise_positions(data, bits, dset.dtype)
+                        elif dset.dtype != data.dtype:
+                            data = data.astype(dset.dtype)
+                        offset = -1
+                        if asynchronous and dset.chunks is None:
+                            offset = dset.id.get_offset()
+                            if offset is None:
+                                offset = -1
+                        if offset != -1:
+                            # Stage a copy of the local data for
+                            # writing in the background.
+                            if data.base is not None:
+                                data = data.copy()
+                            write_jobs.append(
+                                (offset + start_local*3*data.dtype.itemsize, data)
+                            )
+                        elif dset.chunks is None or domain_local:
+                            dset[start_local:end_local, :] = data
+                        elif N_local == 0:
+                            # As h5py skips writes of empty selections,
+                            # processes without any particles have to
+                            # take part in the collective write
+                            # through the low-level interface.
+                            file_space = dset.id.get_space()
+                            file_space.select_none()
+                            with dset.collective:
+                                dset.id.write(
+                                    h5py.h5s.create_simple((0, 3)), file_space, data,
+                                    dxpl=dset._dxpl,
+                                )
+                        else:
+                            with dset.collective:
+                                dset[start_local:end_local, :] = data
                 elif component.representation == 'fluid':
                     # Write out progress message
                     masterprint(
@@ -188,22 +329,21 @@ class ConceptSnapshot:
                                 shape,
                                 dtype=C2np['double'],
                             )
-                            # The global fluid scalar grid is of course
-                            # stored contiguously on disk. Generally
-                            # though, a single process does not store a
-                            # contiguous part of this global grid,
-                            # as it is domain decomposed rather than
-                            # slab decomposed. Here we communicate the
-                            # fluid scalar to slabs before saving to
-                            # disk, improving performance enormously.
-                            slab = slab_decompose(fluidscalar.grid_mv)
-                            slab_start = slab.shape[0]*rank
-                            slab_end = slab_start + slab.shape[0]
-                            fluidscalar_h5[
-                                slab_start:slab_end,
-                                :,
-                                :,
-                            ] = slab[:, :, :component.gridsize]
+                            # Each process writes its domain of the
+                            # fluid scalar directly to the corresponding
+                            # hyperslab of the global grid on disk,
+                            # using collective I/O. This avoids
+                            # redistributing the grid to slabs.
+                            grid = asarray(fluidscalar.grid_mv)
+                            for selection_grid, selection_file in (
+                                self.iterate_fluidscalar_chunks(fluidscalar)
+                            ):
+                                with fluidscalar_h5.collective:
+                                    fluidscalar_h5.write_direct(
+                                        grid,
+                                        source_sel=selection_grid,
+                                        dest_sel=selection_file,
+                                    )
                     # Create additional names (hard links) for the fluid
                     # groups and data sets. The names from
                     # component.fluid_names will be used, except for
@@ -239,11 +379,307 @@ class ConceptSnapshot:
                 hdf5_file.flush()
                 Barrier()
                 masterprint('done')
+        # Close the domain file and let the master assemble the
+        # particle data of all domain files into virtual datasets
+        # within the snapshot file.
+        if domain_local:
+            domain_file.close()
+            Barrier()
+            if master:
+                link_domain_files(filename)
+        # Write out staged particle data in the background. All meta
+        # data is on disk at this point, as the file has been closed.
+        if asynchronous:
+            Barrier()
+            snapshot_writers.append(start_snapshot_writer(write_filename, write_jobs))
         # Done saving the snapshot
         masterprint('done')
         # Return the filename of the saved file
         return filename
 
+    # Method for saving the particle data of the passed component as
+    # displacements relative to the particles of the last full autosave.
+    @cython.header(
+        # Arguments
+        component='Component',
+        component_h5=object,  # h5py.Group
+        filename=str,
+        # Locals
+        N_own='Py_ssize_t',
+        displacement=object,  # np.ndarray
+        dset=object,  # h5py.Dataset
+        dtype=object,
+        ids=object,  # np.ndarray
+        mom=object,  # np.ndarray
+        mom_own=object,  # np.ndarray
+        pos=object,  # np.ndarray
+        pos_own=object,  # np.ndarray
+        reference=dict,
+        start_own='Py_ssize_t',
+        unit='double',
+        returns='void',
+    )
+    def save_delta(self, component, component_h5, filename):
+        """The particle data is first redistributed among the processes
+        according to the particle IDs, so that each process ends up with
+        the particles for which it holds the reference positions, see
+        set_checkpoint_reference(). The displacements are then quantised
+        using autosave_delta_bits bits and saved together with the full
+        momenta, both in the order of the particles within the
+        referenced full autosave.
+        """
+        reference = checkpoint_references[component.name]
+        ids = asarray(component.ids_mv[:component.N_local])
+        ids, pos, mom = redistribute_particle_data(
+            np.searchsorted(reference['starts'], ids, side='right') - 1,
+            [
+                ids,
+                asarray(component.pos_mv3[:component.N_local]),
+                asarray(component.mom_mv3[:component.N_local]),
+            ],
+        )
+        start_own = reference['starts'][rank]
+        N_own = reference['pos'].shape[0]
+        if ids.shape[0] != N_own:
+            abort(
+                f'Received {ids.shape[0]} {component.name} particles for the delta autosave '
+                f'but expected {N_own}'
+            )
+        pos_own = empty((N_own, 3), dtype=C2np['double'])
+        mom_own = empty((N_own, 3), dtype=C2np['double'])
+        pos_own[ids - start_own] = pos
+        mom_own[ids - start_own] = mom
+        # Compute the displacements, taking the periodicity
+        # of the box into account, and quantise them.
+        displacement = pos_own - reference['pos']
+        displacement -= boxsize*np.round(displacement/boxsize)
+        unit = allreduce(
+            (np.max(np.abs(displacement)) if N_own > 0 else 0.0),
+            op=MPI.MAX,
+        )/(2**(autosave_delta_bits - 1) - 1)
+        if unit == 0:
+            unit = 1
+        dtype = {8: np.int8, 16: np.int16, 32: np.int32}[autosave_delta_bits]
+        displacement = np.round(displacement/unit).astype(dtype)
+        # Save the displacements and momenta
+        component_h5.attrs['reference'] = os.path.relpath(
+            reference['filename'], os.path.dirname(filename),
+        )
+        dset = component_h5.create_dataset('displacement', (component.N, 3), dtype=dtype)
+        dset.attrs['unit'] = unit
+        if N_own > 0:
+            dset[start_own:(start_own + N_own), :] = displacement
+        dset = component_h5.create_dataset('mom', (component.N, 3), dtype=C2np['double'])
+        if N_own > 0:
+            dset[start_own:(start_own + N_own), :] = mom_own
+
+    # Method for creating a particle dataset within the passed
+    # component group, with the storage layout and data type given by
+    # the concept_snapshot_params user parameter.
+    @cython.pheader(
+        # Arguments
+        component_h5=object,  # h5py.Group
+        var_name=str,
+        N='Py_ssize_t',
+        # Locals
+        bits='int',
+        compression=object,  # str or None
+        dtype=object,
+        hdf5plugin=object,  # module
+        kwargs=dict,
+        returns=object,  # h5py.Dataset
+    )
+    def create_particle_dataset(self, component_h5, var_name, N):
+        # Determine the data type, with quantised positions stored
+        # using the smallest sufficient unsigned integer type.
+        dtype = C2np['double']
+        if concept_snapshot_params['dataformat'][var_name] == 32:
+            dtype = C2np['float']
+        bits = 0
+        if var_name == 'pos':
+            bits = concept_snapshot_params['pos quantisation']
+        if bits:
+            for dtype in (np.uint8, np.uint16, np.uint32):
+                if bits <= 8*np.dtype(dtype).itemsize:
+                    break
+        # Chunk and filter the dataset if compression is requested
+        kwargs = {}
+        compression = concept_snapshot_params['compression']
+        if compression is not None and N > 0:
+            kwargs['chunks'] = (np.min((concept_snapshot_params['chunk size'], N)), 3)
+            kwargs['shuffle'] = concept_snapshot_params['shuffle']
+            if compression == 'gzip':
+                kwargs['compression'] = 'gzip'
+                kwargs['compression_opts'] = concept_snapshot_params['compression level']
+            elif compression == 'lzf':
+                kwargs['compression'] = 'lzf'
+            else:
+                # The LZ4 and Zstandard filters are available
+                # through the hdf5plugin package.
+                try:
+                    import hdf5plugin
+                except ImportError:
+                    abort(
+                        f'The "{compression}" compression of {self.name} snapshots '
+                        f'requires the hdf5plugin Python package'
+                    )
+                if compression == 'lz4':
+                    kwargs |= dict(hdf5plugin.LZ4())
+                elif compression == 'zstd':
+                    kwargs |= dict(
+                        hdf5plugin.Zstd(clevel=concept_snapshot_params['compression level'])
+                    )
+        dset = component_h5.create_dataset(var_name, (N, 3), dtype=dtype, **kwargs)
+        if bits:
+            dset.attrs['quantisation bits'] = bits
+        return dset
+
+    # Method for quantising positions into unsigned integers
+    # with the given number of bits, uniformly covering the box.
+    @cython.pheader(
+        # Arguments
+        pos=object,  # np.ndarray
+        bits='int',
+        dtype=object,
+        returns=object,  # np.ndarray
+    )
+    def quantise_positions(self, pos, bits, dtype):
+        """The box is divided into 2**bits cells along each dimension,
+        with positions stored as the integer cell index. Upon loading,
+        positions are placed at the cell centres, so that the maximum
+        error in each coordinate is half a cell width.
+        """
+        return np.clip(
+            np.floor(pos*(2**bits/self.params['boxsize'])),
+            0,
+            2**bits - 1,
+        ).astype(dtype)
+
+    # Method returning the lower and upper corner of the bounding box
+    # of the local particles of the passed component,
+    # in units of the box size.
+    @cython.pheader(
+        # Arguments
+        component='Component',
+        # Locals
+        pos=object,  # np.ndarray
+        returns=tuple,
+    )
+    def get_extent(self, component):
+        """Positions are wrapped around the periodic box prior to
+        computing the extent. If no local particles exist, the returned
+        bounding box is empty, having its lower corner above
+        its upper corner.
+        """
+        if component.N_local == 0:
+            return ((1, 1, 1), (0, 0, 0))
+        pos = np.mod(
+            asarray(component.pos_mv3[:component.N_local, :]), self.params['boxsize'],
+        )*(1/self.params['boxsize'])
+        return (tuple(np.min(pos, axis=0)), tuple(np.max(pos, axis=0)))
+
+    # Generator yielding selections for transferring the local domain
+    # of a fluid scalar grid to and from the global grid on disk.
+    def iterate_fluidscalar_chunks(self, fluidscalar):
+        """Each yielded pair consists of a selection into the local grid
+        (which includes ghost points) and the corresponding hyperslab
+        selection within the global grid on disk. The domain is split
+        into chunks along its first dimension, keeping each transfer
+        below the size limit imposed by MPI. As all domains are of equal
+        shape, every process receives the same number of chunks,
+        allowing for collective I/O.
+        """
+        shape = asarray(fluidscalar.grid_noghosts).shape
+        start_i = domain_layout_local_indices[0]*shape[0]
+        start_j = domain_layout_local_indices[1]*shape[1]
+        start_k = domain_layout_local_indices[2]*shape[2]
+        chunk_size = pairmax(1, self.chunk_size_max//8//(shape[1]*shape[2]))
+        for index_i in range(0, shape[0], chunk_size):
+            size_i = pairmin(chunk_size, shape[0] - index_i)
+            yield (
+                np.s_[
+                    nghosts + index_i:nghosts + index_i + size_i,
+                    nghosts:nghosts + shape[1],
+                    nghosts:nghosts + shape[2],
+                ],
+                np.s_[
+                    start_i + index_i:start_i + index_i + size_i,
+                    start_j:start_j + shape[1],
+                    start_k:start_k + shape[2],
+                ],
+            )
+
+    # Method for opening a snapshot file on disk for streaming of
+    # particle data, used by the save_streaming() function. All meta
+    # data is written, while the particle datasets are created empty.
+    @cython.pheader(
+        # Argument
+        filename=str,
+        # Locals
+        component='Component',
+        component_h5=object,  # h5py.Group
+        returns=str,
+    )
+    def stream_open(self, filename):
+        # Attach missing extension to filename
+        if not filename.endswith('.hdf5'):
+            filename += '.hdf5'
+        self.stream_file = open_hdf5(filename, mode='w', driver='mpio', comm=comm)
+        # Save used base units
+        self.stream_file.attrs['unit time'  ] = self.units['time']
+        self.stream_file.attrs['unit length'] = self.units['length']
+        self.stream_file.attrs['unit mass'  ] = self.units['mass']
+        # Save global attributes
+        self.stream_file.attrs['H0']            = correct_float(self.params['H0'])
+        self.stream_file.attrs['a']             = correct_float(self.params['a'])
+        self.stream_file.attrs['boxsize']       = correct_float(self.params['boxsize'])
+        self.stream_file.attrs[unicode('Ωb')]   = correct_float(self.params['Ωb'])
+        self.stream_file.attrs[unicode('Ωcdm')] = correct_float(self.params['Ωcdm'])
+        # Create the (empty) particle datasets
+        for component in self.components:
+            if component.representation != 'particles':
+                abort(
+                    f'Cannot stream the {component.representation} component '
+                    f'{component.name} to a {self.name} snapshot'
+                )
+            component_h5 = self.stream_file.create_group(f'components/{component.name}')
+            component_h5.attrs['species'] = component.species
+            component_h5.attrs['mass'] = correct_float(component.mass)
+            component_h5.attrs['N'] = component.N
+            component_h5.create_dataset('pos', (component.N, 3), dtype=C2np['double'])
+            component_h5.create_dataset('mom', (component.N, 3), dtype=C2np['double'])
+        return filename
+
+    # Method for writing a contiguous part of a single dimension
+    # of either the positions or momenta of a component to the
+    # snapshot opened for streaming. With dim = -1, the passed data
+    # contains all three dimensions, flattened.
+    @cython.pheader(
+        # Arguments
+        component='Component',
+        var_name=str,
+        dim='int',
+        start='Py_ssize_t',
+        data='double[::1]',
+    )
+    def stream_write(self, component, var_name, dim, start, data):
+        if dim == -1:
+            self.stream_file[f'components/{component.name}/{var_name}'][
+                start:(start + data.shape[0]//3), :
+            ] = asarray(data).reshape((data.shape[0]//3, 3))
+            return
+        self.stream_file[f'components/{component.name}/{var_name}'][
+            start:(start + data.shape[0]), dim
+        ] = asarray(data)
+
+    # Method for closing the snapshot file opened for streaming
+    @cython.pheader()
+    def stream_close(self):
+        self.stream_file.flush()
+        self.stream_file.close()
+        self.stream_file = None
+        Barrier()
+
     # Method for loading in a CO𝘕CEPT snapshot from disk
     @cython.pheader(
         # Argument
@@ -255,9 +691,12 @@ class ConceptSnapshot:
         N_local='Py_ssize_t',
         N_str=str,
         arr=object,  # np.ndarray
+        bits='int',
         boltzmann_order='Py_ssize_t',
-        chunk_size='Py_ssize_t',
         component='Component',
+        components_selected=list,
+        displacement=object,  # np.ndarray or None
+        displacement_unit='double',
         domain_size_i='Py_ssize_t',
         domain_size_j='Py_ssize_t',
         domain_size_k='Py_ssize_t',
@@ -265,10 +704,6 @@ class ConceptSnapshot:
         grid='double*',
         gridsize='Py_ssize_t',
         index='Py_ssize_t',
-        index_i='Py_ssize_t',
-        index_i_file='Py_ssize_t',
-        indexᵖ='Py_ssize_t',
-        indexᵖ_file='Py_ssize_t',
         indexʳ='Py_ssize_t',
         mass='double',
         mom='double*',
@@ -276,10 +711,13 @@ class ConceptSnapshot:
         name=str,
         plural=str,
         pos='double*',
+        quantisation_unit='double',
         representation=str,
+        same_decomposition='bint',
+        selection=dict,
+        selection_file=tuple,
+        selection_grid=tuple,
         size='Py_ssize_t',
-        slab='double[:, :, ::1]',
-        slab_start='Py_ssize_t',
         snapshot_unit_length='double',
         snapshot_unit_mass='double',
         snapshot_unit_time='double',
@@ -295,7 +733,9 @@ class ConceptSnapshot:
             masterprint(f'Loading parameters of snapshot "{filename}" ...')
         else:
             masterprint(f'Loading snapshot "{filename}" ...')
+        self.filename = filename
         # Load all components
+        components_selected = []
         with open_hdf5(filename, mode='r', driver='mpio', comm=comm) as hdf5_file:
             # Load used base units
             self.units['time']   = hdf5_file.attrs['unit time']
@@ -348,6 +788,12 @@ class ConceptSnapshot:
                     # Done loading component attributes
                     if only_params:
                         continue
+                    # Components subject to a load selection
+                    # are read in further down.
+                    selection = is_selected(component, snapshot_load_selection)
+                    if selection:
+                        components_selected.append((component, selection))
+                        continue
                     N_lin = cbrt(N)
                     if N > 1 and isint(N_lin):
                         N_str = str(int(round(N_lin))) + '³'
@@ -355,46 +801,104 @@ class ConceptSnapshot:
                         N_str = str(N)
                     plural = ('s' if N > 1 else '')
                     masterprint(f'Reading in {name} ({N_str} {species}) particle{plural} ...')
-                    # Extract HDF5 datasets
-                    pos_h5 = component_h5['pos']
-                    mom_h5 = component_h5['mom']
-                    # Compute a fair distribution of
-                    # particle data to the processes.
-                    start_local, N_local = partition(N)
-                    # Make sure that the particle data arrays
-                    # have the correct size.
-                    component.N_local = N_local
-                    component.resize(N_local)
-                    # Read particle data directly into
-                    # the particle data arrays.
-                    if N_local > 0:
-                        for dset, arr in [
-                            (pos_h5, asarray(component.pos_mv3)),
-                            (mom_h5, asarray(component.mom_mv3)),
-                        ]:
-                            # Load in using chunks
-                            chunk_size = np.min((N_local, ℤ[self.chunk_size_max//8//3]))
-                            for indexᵖ in range(0, N_local, chunk_size):
-                                if indexᵖ + chunk_size > N_local:
-                                    chunk_size = N_local - indexᵖ
-                                indexᵖ_file = start_local + indexᵖ
-                                dset.read_direct(
-                                    arr,
-                                    source_sel=np.s_[indexᵖ_file:(indexᵖ_file + chunk_size), :],
-                                    dest_sel=np.s_[indexᵖ:(indexᵖ + chunk_size), :],
+                    displacement = None
+                    if 'domains' in component_h5:
+                        # Read in the domain files overlapping
+                        # with the local domain.
+                        same_decomposition = self.read_domain_files(
+                            component, component_h5, filename,
+                        )
+                        N_local = component.N_local
+                        bits = component_h5['domains'].attrs.get('quantisation bits', 0)
+                    elif 'displacement' in component_h5:
+                        # Delta snapshot. Read in the positions of the
+                        # referenced full snapshot as well as the
+                        # displacements and momenta, all of which are
+                        # stored in the same order.
+                        start_local, N_local = partition(N)
+                        component.N_local = N_local
+                        component.resize(N_local)
+                        with open_hdf5(
+                            os.path.join(
+                                os.path.dirname(filename), component_h5.attrs['reference'],
+                            ),
+                            mode='r', driver='mpio', comm=comm,
+                        ) as reference_file:
+                            pos_h5 = reference_file[f'components/{name}/pos']
+                            bits = pos_h5.attrs.get('quantisation bits', 0)
+                            if N_local > 0:
+                                self.read_particle_data(
+                                    pos_h5, asarray(component.pos_mv3), start_local, 0, N_local,
                                 )
+                        displacement_h5 = component_h5['displacement']
+                        displacement = displacement_h5[start_local:(start_local + N_local), :]
+                        displacement_unit = displacement_h5.attrs['unit']*snapshot_unit_length
+                        if N_local > 0:
+                            self.read_particle_data(
+                                component_h5['mom'], asarray(component.mom_mv3),
+                                start_local, 0, N_local,
+                            )
+                    else:
+                        # Extract HDF5 datasets
+                        pos_h5 = component_h5['pos']
+                        mom_h5 = component_h5['mom']
+                        bits = pos_h5.attrs.get('quantisation bits', 0)
+                        # Compute a fair distribution of
+                        # particle data to the processes.
+                        start_local, N_local = partition(N)
+                        # Make sure that the particle data arrays
+                        # have the correct size.
+                        component.N_local = N_local
+                        component.resize(N_local)
+                        # Read particle data directly into
+                        # the particle data arrays.
+                        if N_local > 0:
+                            for dset, arr in [
+                                (pos_h5, asarray(component.pos_mv3)),
+                                (mom_h5, asarray(component.mom_mv3)),
+                            ]:
+                                self.read_particle_data(dset, arr, start_local, 0, N_local)
+                    if N_local > 0:
                         # If the snapshot and the current run uses
                         # different systems of units, multiply the
                         # positions and momenta by the snapshot units.
+                        # Quantised positions are decoded to the cell
+                        # centres, using the box size of the snapshot
+                        # in the current units.
                         pos = component.pos
                         mom = component.mom
-                        if snapshot_unit_length != 1:
+                        if bits:
+                            quantisation_unit = self.params['boxsize']/2**bits
+                            for indexʳ in range(3*N_local):
+                                pos[indexʳ] = (pos[indexʳ] + 0.5)*quantisation_unit
+                        elif snapshot_unit_length != 1:
                             for indexʳ in range(3*N_local):
                                 pos[indexʳ] *= snapshot_unit_length
                         unit = snapshot_unit_length/snapshot_unit_time*snapshot_unit_mass
                         if unit != 1:
                             for indexʳ in range(3*N_local):
                                 mom[indexʳ] *= unit
+                    # Add the displacements of delta snapshots to the
+                    # reference positions, the latter rounded to single
+                    # precision as when the delta snapshot was saved.
+                    if displacement is not None:
+                        arr = asarray(component.pos_mv3[:N_local])
+                        arr[...] = arr.astype(C2np['float'])
+                        arr += displacement*displacement_unit
+                        arr[...] = np.mod(arr, self.params['boxsize'])
+                    # Particles read from domain files with a different
+                    # domain decomposition contain particles not
+                    # belonging to the local domain, which are then
+                    # removed. With the same domain decomposition, the
+                    # particles are all local unless they have moved
+                    # since they were saved.
+                    if 'domains' in component_h5:
+                        if same_decomposition:
+                            if allreduce(self.filter_domain(component, False), op=MPI.SUM) == 0:
+                                self.components_domain_local.add(name)
+                        else:
+                            self.filter_domain(component, True)
+                            self.components_domain_local.add(name)
                     # Done reading in particle component
                     masterprint('done')
                 elif representation == 'fluid':
@@ -436,32 +940,23 @@ class ConceptSnapshot:
                         fluidvar_h5 = component_h5[f'fluidvar_{index}']
                         for multi_index in fluidvar.multi_indices:
                             fluidscalar_h5 = fluidvar_h5[f'fluidscalar_{multi_index}']
-                            slab = get_fftw_slab(gridsize)
-                            slab_start = slab.shape[0]*rank
-                            # Load in using chunks. Large chunks are
-                            # fine as no temporary buffer is used. The
-                            # maximum possible chunk size is limited
-                            # by MPI, though.
-                            chunk_size = np.min((
-                                ℤ[slab.shape[0]],
-                                ℤ[self.chunk_size_max//8//gridsize**2],
-                            ))
-                            if chunk_size == 0:
-                                masterwarn('The input seems surprisingly large and may not be read in correctly')
-                                chunk_size = 1
-                            arr = asarray(slab)
-                            for index_i in range(0, ℤ[slab.shape[0]], chunk_size):
-                                if index_i + chunk_size > ℤ[slab.shape[0]]:
-                                    chunk_size = ℤ[slab.shape[0]] - index_i
-                                index_i_file = slab_start + index_i
-                                fluidscalar_h5.read_direct(
-                                    arr,
-                                    source_sel=np.s_[index_i_file:(index_i_file + chunk_size), :, :],
-                                    dest_sel=np.s_[index_i:(index_i + chunk_size), :, :gridsize],
-                                )
-                            # Communicate the slabs directly to the
-                            # domain decomposed fluid grids.
-                            domain_decompose(slab, component.fluidvars[index][multi_index].grid_mv)
+                            fluidscalar = fluidvar[multi_index]
+                            # Each process reads its domain of the
+                            # fluid scalar directly from the
+                            # corresponding hyperslab of the global
+                            # grid on disk, using collective I/O.
+                            # Large chunks are fine as no temporary
+                            # buffer is used.
+                            arr = asarray(fluidscalar.grid_mv)
+                            for selection_grid, selection_file in (
+                                self.iterate_fluidscalar_chunks(fluidscalar)
+                            ):
+                                with fluidscalar_h5.collective:
+                                    fluidscalar_h5.read_direct(
+                                        arr,
+                                        source_sel=selection_file,
+                                        dest_sel=selection_grid,
+                                    )
                     # If the snapshot and the current run uses different
                     # systems of units, multiply the fluid data
                     # by the snapshot units.
@@ -483,9 +978,229 @@ class ConceptSnapshot:
                     abort(
                         f'Does not know how to load {name} with representation "{representation}"'
                     )
+        # Read in the components subject to a load selection chunk by
+        # chunk, now that the snapshot file is closed.
+        for component, selection in components_selected:
+            load_selected_particles(self, component, selection)
         # Done loading the snapshot
         masterprint('done')
 
+    # Generator yielding the particle data of the passed component in
+    # chunks, read directly from the snapshot file on disk.
+    def iterate_particles(self, component, chunk_size=2**20):
+        """The snapshot should have been loaded with only_params=True,
+        in which case no particle data is held in memory. The particles
+        are divided between the processes, with each process receiving
+        its share as chunks of at most chunk_size particles. Each chunk
+        is a tuple of the index of the first particle in the chunk
+        (among all particles of the component), the positions and the
+        momenta, the latter two given as arrays of shape (n, 3) in the
+        current unit system. The processes read independently of each
+        other, so that this generator does not need to be exhausted
+        in lockstep.
+        """
+        snapshot_unit_length = eval_unit(self.units['length'])
+        unit_mom = (
+            snapshot_unit_length/eval_unit(self.units['time'])*eval_unit(self.units['mass'])
+        )
+        # Determine the (parts of) files to read. For domain local
+        # snapshots, the domain files are shared out between
+        # the processes.
+        with open_hdf5(self.filename, mode='r', local=True) as hdf5_file:
+            component_h5 = hdf5_file[f'components/{component.name}']
+            if 'displacement' in component_h5:
+                abort(
+                    f'Cannot iterate over the {component.name} particles of '
+                    f'delta snapshot "{self.filename}"'
+                )
+            if 'domains' in component_h5:
+                N_domains = component_h5['domains/N'][...]
+                sources = [
+                    (
+                        get_domain_filename(self.filename, domain),
+                        0,
+                        N_domains[domain],
+                        np.sum(N_domains[:domain]),
+                    )
+                    for domain in range(rank, N_domains.shape[0], nprocs)
+                ]
+            else:
+                start, size = partition(component.N)
+                sources = [(self.filename, start, size, start)]
+        for filename, start, size, index_global in sources:
+            if size == 0:
+                continue
+            with open_hdf5(filename, mode='r', local=True) as hdf5_file:
+                pos_h5 = hdf5_file[f'components/{component.name}/pos']
+                mom_h5 = hdf5_file[f'components/{component.name}/mom']
+                bits = pos_h5.attrs.get('quantisation bits', 0)
+                for index in range(start, start + size, chunk_size):
+                    index_end = np.min((index + chunk_size, start + size))
+                    pos = asarray(pos_h5[index:index_end, :], dtype=C2np['double'])
+                    mom = asarray(mom_h5[index:index_end, :], dtype=C2np['double'])
+                    if bits:
+                        pos = (pos + 0.5)*(self.params['boxsize']/2**bits)
+                    elif snapshot_unit_length != 1:
+                        pos *= snapshot_unit_length
+                    if unit_mom != 1:
+                        mom *= unit_mom
+                    yield index_global + index - start, pos, mom
+
+    # Method for reading particle data from the passed dataset
+    # into the passed array, using chunks.
+    @cython.header(
+        # Arguments
+        dset=object,  # h5py.Dataset
+        arr=object,  # np.ndarray
+        index_file='Py_ssize_t',
+        index_arr='Py_ssize_t',
+        size='Py_ssize_t',
+        # Locals
+        chunk_size='Py_ssize_t',
+        indexᵖ='Py_ssize_t',
+        indexᵖ_file='Py_ssize_t',
+        returns='void',
+    )
+    def read_particle_data(self, dset, arr, index_file, index_arr, size):
+        chunk_size = np.min((size, ℤ[self.chunk_size_max//8//3]))
+        for indexᵖ in range(0, size, chunk_size):
+            if indexᵖ + chunk_size > size:
+                chunk_size = size - indexᵖ
+            indexᵖ_file = index_file + indexᵖ
+            dset.read_direct(
+                arr,
+                source_sel=np.s_[indexᵖ_file:(indexᵖ_file + chunk_size), :],
+                dest_sel=np.s_[
+                    (index_arr + indexᵖ):(index_arr + indexᵖ + chunk_size), :
+                ],
+            )
+
+    # Method for reading in the particle data of the passed component
+    # from the domain files of a domain local snapshot.
+    @cython.header(
+        # Arguments
+        component='Component',
+        component_h5=object,  # h5py.Group
+        filename=str,
+        # Locals
+        N_domain='Py_ssize_t',
+        N_domains=object,  # np.ndarray
+        N_local='Py_ssize_t',
+        arr=object,  # np.ndarray
+        domain='Py_ssize_t',
+        domain_file=object,  # h5py.File
+        domains=list,
+        extents=object,  # np.ndarray
+        indexᵖ='Py_ssize_t',
+        lower=object,  # np.ndarray
+        same_decomposition='bint',
+        upper=object,  # np.ndarray
+        var_name=str,
+        returns='bint',
+    )
+    def read_domain_files(self, component, component_h5, filename):
+        """When the snapshot was saved using the same domain
+        decomposition as is currently in use, each process reads in
+        only its own domain file. Otherwise, each process reads in all
+        domain files containing particles within the extent of its
+        domain. In both cases, no exchange of particles between the
+        processes is required. The return value specifies whether the
+        domain decompositions are the same.
+        """
+        N_domains = component_h5['domains/N'][...]
+        extents = component_h5['domains/extents'][...]
+        same_decomposition = (
+            N_domains.shape[0] == nprocs
+            and np.all(
+                component_h5['domains'].attrs['domain subdivisions']
+                == asarray(domain_subdivisions)
+            )
+        )
+        if same_decomposition:
+            domains = [rank]
+        else:
+            # The extent of the local domain, in units of the box
+            lower = asarray(domain_layout_local_indices)/asarray(domain_subdivisions)
+            upper = (asarray(domain_layout_local_indices) + 1)/asarray(domain_subdivisions)
+            domains = [
+                domain
+                for domain in range(N_domains.shape[0])
+                if N_domains[domain] > 0
+                    and np.all(extents[domain, 0] <= upper)
+                    and np.all(extents[domain, 1] >= lower)
+            ]
+        # Make sure that the particle data arrays have the correct size
+        N_local = np.sum(N_domains[domains], dtype=C2np['Py_ssize_t'])
+        component.N_local = N_local
+        component.resize(N_local)
+        # Read particle data directly into the particle data arrays,
+        # one domain file after the other.
+        indexᵖ = 0
+        for domain in domains:
+            N_domain = N_domains[domain]
+            if N_domain == 0:
+                continue
+            with open_hdf5(
+                get_domain_filename(filename, domain), mode='r', local=True,
+            ) as domain_file:
+                for var_name, arr in [
+                    ('pos', asarray(component.pos_mv3)),
+                    ('mom', asarray(component.mom_mv3)),
+                ]:
+                    self.read_particle_data(
+                        domain_file[f'components/{component.name}/{var_name}'],
+                        arr, 0, indexᵖ, N_domain,
+                    )
+            indexᵖ += N_domain
+        return same_decomposition
+
+    # Method for counting and optionally removing the local particles
+    # of the passed component not belonging to the local domain.
+    @cython.header(
+        # Arguments
+        component='Component',
+        remove='bint',
+        # Locals
+        dim='int',
+        indexʳ='Py_ssize_t',
+        indexʳ_kept='Py_ssize_t',
+        indexᵖ='Py_ssize_t',
+        mom='double*',
+        n_foreign='Py_ssize_t',
+        n_kept='Py_ssize_t',
+        pos='double*',
+        x='double',
+        y='double',
+        z='double',
+        returns='Py_ssize_t',
+    )
+    def filter_domain(self, component, remove):
+        """Particle positions are taken to be wrapped around the
+        periodic box, as they will be by out_of_bounds_check().
+        """
+        pos = component.pos
+        mom = component.mom
+        n_foreign = 0
+        n_kept = 0
+        for indexᵖ in range(component.N_local):
+            indexʳ = 3*indexᵖ
+            x = mod(pos[indexʳ + 0], boxsize)
+            y = mod(pos[indexʳ + 1], boxsize)
+            z = mod(pos[indexʳ + 2], boxsize)
+            if which_domain(x, y, z) != rank:
+                n_foreign += 1
+                continue
+            with unswitch:
+                if remove:
+                    indexʳ_kept = 3*n_kept
+                    for dim in range(3):
+                        pos[indexʳ_kept + dim] = pos[indexʳ + dim]
+                        mom[indexʳ_kept + dim] = mom[indexʳ + dim]
+            n_kept += 1
+        if remove:
+            component.N_local = n_kept
+        return n_foreign
+
     # This method populate the snapshot with component data
     # and additional parameters.
     def populate(self, components, params=None):
@@ -667,10 +1382,14 @@ class GadgetSnapshot:
         file. The sublists contain the number of particles in the file
         for each type, with non-existing components excluded.
         The num_local is a list specifying the number of particles local
-        to the process, for each particle type. The return value is a
-        list in the same format as num_particles_files, but with values
-        being the number of particles to write/read
-        for the local process.
+        to the process, for each particle type. The first return value
+        is a list in the same format as num_particles_files, but with
+        values being the number of particles to write/read
+        for the local process. The second return value is of the same
+        format, with values being the number of particles of each type
+        within each file which are written/read by processes of lower
+        rank. Knowing these, each process can find its part of each file
+        without coordinating with the other processes.
         """
         num_particles_files = deepcopy(num_particles_files)
         num_files = len(num_particles_files)
@@ -681,7 +1400,10 @@ class GadgetSnapshot:
         # Determine number of particles of each type
         # to write/read to/from each file.
         num_io_files = [[0]*num_components for i in range(num_files)]
-        for num_particle_file, num_io_file in zip(num_particles_files, num_io_files):
+        num_skip_files = [[0]*num_components for i in range(num_files)]
+        for num_particle_file, num_io_file, num_skip_file in zip(
+            num_particles_files, num_io_files, num_skip_files,
+        ):
             for j, num_particle in enumerate(num_particle_file):
                 for rank_io in range(nprocs):
                     num_io = num_locals[rank_io][j]
@@ -692,11 +1414,13 @@ class GadgetSnapshot:
                     num_particle -= num_io
                     num_particle_file[j] = num_particle
                     num_locals[rank_io][j] -= num_io
-                    if rank_io == rank:
+                    if rank_io < rank:
+                        num_skip_file[j] += num_io
+                    elif rank_io == rank:
                         num_io_file[j] = num_io
                     if num_particle_file[j] == 0:
                         break
-        return num_io_files
+        return num_io_files, num_skip_files
 
     # Initialisation method
     @cython.header
@@ -716,6 +1440,12 @@ class GadgetSnapshot:
         object block_names
         Component misnamed_halo_component
         Py_ssize_t current_block_size
+        str stream_filename
+        dict stream_blocks
+        dict stream_buffers
+        public list filenames
+        list num_particles_files
+        Py_ssize_t offset_header
         """
         # Dict containing all the parameters of the snapshot
         self.params = {}
@@ -738,6 +1468,17 @@ class GadgetSnapshot:
         self.misnamed_halo_component = None
         # Size of the current block in bytes, when writing
         self.current_block_size = -1
+        # File name, block information and buffers of partially
+        # received data used when streaming, see stream_open().
+        self.stream_filename = ''
+        self.stream_blocks = {}
+        self.stream_buffers = {}
+        # File names, particle numbers of each type within each file
+        # and the size of the header of the loaded snapshot,
+        # see iterate_particles().
+        self.filenames = []
+        self.num_particles_files = []
+        self.offset_header = -1
         # Check on low level type sizes
         for fmt, size in self.sizes.items():
             size_expected = {'s': 1, 'i': 4, 'I': 4, 'Q': 8, 'f': 4, 'd': 8}.get(fmt)
@@ -827,6 +1568,8 @@ class GadgetSnapshot:
         i='Py_ssize_t',
         id_counter='Py_ssize_t',
         id_counters='Py_ssize_t[::1]',
+        id_counters_files=list,
+        index_chunk='Py_ssize_t',
         indexᵖ='Py_ssize_t',
         indexᵖ_bgn='Py_ssize_t',
         indexᵖ_end='Py_ssize_t',
@@ -835,14 +1578,18 @@ class GadgetSnapshot:
         msg=str,
         msg_list=list,
         num_files='Py_ssize_t',
-        num_particle_file_tot='Py_ssize_t',
         num_particles_file_tot='Py_ssize_t[::1]',
+        num_particles_files_tot=list,
+        num_skip='Py_ssize_t',
+        num_skip_file=list,
+        num_skip_files=list,
         num_write_file=list,
         num_write_files=list,
         num_write_max='Py_ssize_t',
         num_write='Py_ssize_t',
+        offsets_file=dict,
+        offsets_files=list,
         plural=str,
-        rank_writer='int',
         singleprec_needed='bint',
         size_write='Py_ssize_t',
         unit='double',
@@ -853,7 +1600,7 @@ class GadgetSnapshot:
         # Set the GADGET SnapFormat based on user parameters
         self.snapformat = gadget_snapshot_params['snapformat']
         # Divvy up the particles between the files and processes
-        num_write_files = self.divvy()
+        num_write_files, num_skip_files = self.divvy()
         num_files = len(num_write_files)
         # If the snapshot is to be saved over several files,
         # create a directory for storing these.
@@ -915,117 +1662,131 @@ class GadgetSnapshot:
         for j in range(1, len(self.components)):
             id_counter += self.components[j - 1].N
             id_counters[j] = id_counter
-        # Write out each file in turn
+        # Initialise each file with the HEAD block, followed by all of
+        # the data blocks with space reserved for their contents. This
+        # work is carried out by the master process, which also records
+        # the offset of each data block within each file. The particle
+        # ID's at the beginning of each file are recorded as well.
+        num_particles_files_tot = []
+        offsets_files = []
+        id_counters_files = []
         for i, num_write_file in enumerate(num_write_files):
             if num_files == 1:
                 filename_i = filename
             else:
-                masterprint(f'Writing snapshot file {i}/{num_files - 1} ...')
                 filename_i = f'{filename}/{output_bases["snapshot"]}.{i}'
-            # Initialise the file with the HEAD block
             self.write_header(filename_i, num_write_file)
             # The number of particles of each type to be written
             # to this file by all processes.
-            num_particles_file_tot = reduce(
+            num_particles_file_tot = allreduce(
                 asarray(num_write_file, dtype=C2np['Py_ssize_t']),
                 op=MPI.SUM,
             )
-            # Write out the data blocks
+            num_particles_files_tot.append(asarray(num_particles_file_tot).copy())
+            id_counters_files.append(asarray(id_counters).copy())
+            for j in range(num_particles_file_tot.shape[0]):
+                id_counters[j] += num_particles_file_tot[j]
+            offsets_file = {}
             for block_name, block in blocks.items():
-                data_components = block.get('data')
-                unit_components = block.get('unit')
-                block_type = block['type']
-                block_fmt = block_type[len(block_type) - 1]
-                # Begin block
+                block_size = np.sum(num_particles_file_tot)*struct.calcsize(block['type'])
+                self.write_block_bgn(filename_i, block_size, block_name)
                 if master:
-                    block_size = np.sum(num_particles_file_tot)*struct.calcsize(block_type)
-                    self.write_block_bgn(filename_i, block_size, block_name)
-                # Write out the block contents
-                if block_name in {'POS', 'VEL'}:
-                    # Iterate over each component
-                    for j, (num_write, data, unit) in enumerate(
-                        zip(num_write_file, data_components, unit_components)
-                    ):
-                        size_write = 3*num_write
-                        chunk_size = np.min((size_write, ℤ[self.chunk_size_max//8]))
-                        # Write the block in serial,
-                        # one process at a time.
-                        for rank_writer in range(nprocs):
-                            Barrier()
-                            if rank != rank_writer:
-                                continue
-                            if num_write == 0:
-                                continue
-                            # Write out data in chunks
-                            with open_file(filename_i, mode='ab') as f:
-                                for indexʳ in range(0, size_write, chunk_size):
-                                    if indexʳ + chunk_size > size_write:
-                                        chunk_size = size_write - indexʳ
-                                    chunk = data[indexʳ:(indexʳ + chunk_size)]
-                                    chunk_ptr = cython.address(chunk[:])
-                                    # Copy chunk while applying unit
-                                    # conversion, then write this copy
-                                    # to the file. For positions,
-                                    # safeguard against
-                                    # round-off errors.
-                                    if 𝔹[block_fmt == 'f']:
-                                        for index_chunk in range(chunk_size):
-                                            data_value_singleprec = chunk_ptr[index_chunk]*ℝ[1/unit]
-                                            with unswitch(4):
-                                                if block_name == 'POS':
-                                                    if data_value_singleprec >= boxsize_gadget_singleprec:
-                                                        data_value_singleprec -= boxsize_gadget_singleprec
-                                            chunk_singleprec_ptr[index_chunk] = data_value_singleprec
-                                        asarray(chunk_singleprec[:chunk_size]).tofile(f)
-                                    elif 𝔹[block_fmt == 'd']:
-                                        for index_chunk in range(chunk_size):
-                                            data_value_doubleprec = chunk_ptr[index_chunk]*ℝ[1/unit]
-                                            with unswitch(4):
-                                                if block_name == 'POS':
-                                                    if data_value_doubleprec >= boxsize_gadget_doubleprec:
-                                                        data_value_doubleprec -= boxsize_gadget_doubleprec
-                                            chunk_doubleprec_ptr[index_chunk] = data_value_doubleprec
-                                        asarray(chunk_doubleprec[:chunk_size]).tofile(f)
-                                    else:
-                                        abort(
-                                            f'Block format "{block_fmt}" not implemented '
-                                            f'for block "{block_name}"'
-                                        )
+                    offsets_file[block_name] = os.path.getsize(filename_i)
+                    with open_file(filename_i, mode='r+b') as f:
+                        f.truncate(offsets_file[block_name] + block_size)
+                self.write_block_end(filename_i)
+            offsets_files.append(offsets_file)
+        offsets_files = bcast(offsets_files if master else None)
+        # Write out the data blocks of all files, with all processes
+        # writing their part of each block in parallel.
+        for i, (num_write_file, num_skip_file) in enumerate(
+            zip(num_write_files, num_skip_files)
+        ):
+            if np.sum(num_write_file) == 0:
+                continue
+            if num_files == 1:
+                filename_i = filename
+            else:
+                filename_i = f'{filename}/{output_bases["snapshot"]}.{i}'
+            with open_file(filename_i, mode='r+b') as f:
+                for block_name, block in blocks.items():
+                    data_components = block.get('data')
+                    unit_components = block.get('unit')
+                    block_type = block['type']
+                    block_fmt = block_type[len(block_type) - 1]
+                    for j, (num_write, num_skip) in enumerate(zip(num_write_file, num_skip_file)):
+                        if num_write == 0:
+                            continue
+                        # Seek to the part of the block belonging to
+                        # this process. Particles of earlier components
+                        # and of earlier processes precede this part.
+                        f.seek(
+                            offsets_files[i][block_name]
+                            + struct.calcsize(block_type)*(
+                                np.sum(num_particles_files_tot[i][:j]) + num_skip
+                            )
+                        )
+                        # Write out the block contents
+                        if block_name in {'POS', 'VEL'}:
+                            data = data_components[j]
+                            unit = unit_components[j]
+                            size_write = 3*num_write
+                            chunk_size = np.min((size_write, ℤ[self.chunk_size_max//8]))
+                            for indexʳ in range(0, size_write, chunk_size):
+                                if indexʳ + chunk_size > size_write:
+                                    chunk_size = size_write - indexʳ
+                                chunk = data[indexʳ:(indexʳ + chunk_size)]
+                                chunk_ptr = cython.address(chunk[:])
+                                # Copy chunk while applying unit
+                                # conversion, then write this copy
+                                # to the file. For positions,
+                                # safeguard against round-off errors.
+                                if 𝔹[block_fmt == 'f']:
+                                    for index_chunk in range(chunk_size):
+                                        data_value_singleprec = chunk_ptr[index_chunk]*ℝ[1/unit]
+                                        with unswitch(3):
+                                            if block_name == 'POS':
+                                                if data_value_singleprec >= boxsize_gadget_singleprec:
+                                                    data_value_singleprec -= boxsize_gadget_singleprec
+                                        chunk_singleprec_ptr[index_chunk] = data_value_singleprec
+                                    asarray(chunk_singleprec[:chunk_size]).tofile(f)
+                                elif 𝔹[block_fmt == 'd']:
+                                    for index_chunk in range(chunk_size):
+                                        data_value_doubleprec = chunk_ptr[index_chunk]*ℝ[1/unit]
+                                        with unswitch(3):
+                                            if block_name == 'POS':
+                                                if data_value_doubleprec >= boxsize_gadget_doubleprec:
+                                                    data_value_doubleprec -= boxsize_gadget_doubleprec
+                                        chunk_doubleprec_ptr[index_chunk] = data_value_doubleprec
+                                    asarray(chunk_doubleprec[:chunk_size]).tofile(f)
+                                else:
+                                    abort(
+                                        f'Block format "{block_fmt}" not implemented '
+                                        f'for block "{block_name}"'
+                                    )
                             # Crop the now written data
                             # away from the memory view.
                             data_components[j] = data[size_write:]
-                elif block_name == 'ID':
-                    # We generate the particles ID's on the fly.
-                    # As these do not correspond to actual data,
-                    # they can be handled by a single process.
-                    if master:
-                        for j, num_particle_file_tot in enumerate(num_particles_file_tot):
-                            if num_particle_file_tot == 0:
-                                continue
-                            # Get and update ID counters
-                            id_counter = id_counters[j]
-                            id_counters[j] += num_particle_file_tot
-                            # Generate and write the ID's
-                            chunk_size = np.min((num_particle_file_tot, ℤ[self.chunk_size_max//8]))
-                            indexᵖ_bgn = id_counter
-                            indexᵖ_end = id_counter + num_particle_file_tot
-                            with open_file(filename_i, mode='ab') as f:
-                                for indexᵖ in range(indexᵖ_bgn, indexᵖ_end, chunk_size):
-                                    if indexᵖ + chunk_size > indexᵖ_end:
-                                        chunk_size = indexᵖ_end - indexᵖ
-                                    arange(
-                                        indexᵖ,
-                                        indexᵖ + chunk_size,
-                                        dtype=𝕆[C2np[self.fmts[block_fmt]]],
-                                    ).tofile(f)
-                else:
-                    abort(f'Does not know how to write {self.name} block "{block_name}"')
-                # End block
-                Barrier()
-                self.write_block_end(filename_i)
-            # Done saving this snapshot file
-            if num_files > 1:
-                masterprint('done')
+                        elif block_name == 'ID':
+                            # We generate the particles ID's on the fly,
+                            # continuing from the ID's written by
+                            # processes of lower rank.
+                            chunk_size = np.min((num_write, ℤ[self.chunk_size_max//8]))
+                            indexᵖ_bgn = id_counters_files[i][j] + num_skip
+                            indexᵖ_end = indexᵖ_bgn + num_write
+                            for indexᵖ in range(indexᵖ_bgn, indexᵖ_end, chunk_size):
+                                if indexᵖ + chunk_size > indexᵖ_end:
+                                    chunk_size = indexᵖ_end - indexᵖ
+                                arange(
+                                    indexᵖ,
+                                    indexᵖ + chunk_size,
+                                    dtype=𝕆[C2np[self.fmts[block_fmt]]],
+                                ).tofile(f)
+                        else:
+                            abort(f'Does not know how to write {self.name} block "{block_name}"')
+        # Let all the processes catch up,
+        # ensuring that all files are closed.
+        Barrier()
         # Finalise progress messages
         masterprint('done')
         masterprint('done')
@@ -1034,10 +1795,177 @@ class GadgetSnapshot:
         # this will be a directory.
         return filename
 
+    # Method for opening a GADGET snapshot file on disk for streaming of
+    # particle data, used by the save_streaming() function. The header
+    # and the ID block are written, while space is reserved for the
+    # POS and VEL blocks.
+    @cython.pheader(
+        # Arguments
+        filename=str,
+        # Locals
+        block=dict,
+        block_fmt=str,
+        block_name=str,
+        block_size='Py_ssize_t',
+        blocks=dict,
+        chunk_size='Py_ssize_t',
+        indexᵖ='Py_ssize_t',
+        num_particles_tot='Py_ssize_t',
+        offset='Py_ssize_t',
+        returns=str,
+    )
+    def stream_open(self, filename):
+        # Set the GADGET SnapFormat based on user parameters
+        self.snapformat = gadget_snapshot_params['snapformat']
+        # Streaming of snapshots distributed over
+        # multiple files is not implemented.
+        if self.get_num_files() > 1:
+            abort(
+                f'Cannot stream {self.name} snapshot "{filename}" as it would need to be '
+                f'distributed over several files'
+            )
+        if master and os.path.isdir(filename):
+            abort(
+                f'Refuses to replace directory "{filename}" with snapshot. '
+                f'Remove this directory or select different snapshot '
+                f'output directory or base name.'
+            )
+        # Initialise the file with the HEAD block
+        self.write_header(
+            filename, [(component.N if master else 0) for component in self.components],
+        )
+        # Write out the remaining blocks, with the POS and VEL blocks
+        # containing only zeros for now.
+        blocks = self.get_blocks_info('save')
+        num_particles_tot = np.sum([component.N for component in self.components])
+        self.stream_filename = filename
+        self.stream_blocks = {}
+        self.stream_buffers = {}
+        for block_name, block in blocks.items():
+            block_fmt = block['type'][len(block['type']) - 1]
+            block_size = num_particles_tot*struct.calcsize(block['type'])
+            self.write_block_bgn(filename, block_size, block_name)
+            offset = 0
+            if master:
+                offset = os.path.getsize(filename)
+                with open_file(filename, mode='r+b') as f:
+                    if block_name == 'ID':
+                        # Generate the ID's consecutively
+                        f.seek(offset)
+                        chunk_size = np.min((num_particles_tot, ℤ[self.chunk_size_max//8]))
+                        for indexᵖ in range(0, num_particles_tot, chunk_size):
+                            if indexᵖ + chunk_size > num_particles_tot:
+                                chunk_size = num_particles_tot - indexᵖ
+                            arange(
+                                indexᵖ,
+                                indexᵖ + chunk_size,
+                                dtype=𝕆[C2np[self.fmts[block_fmt]]],
+                            ).tofile(f)
+                    else:
+                        f.truncate(offset + block_size)
+            self.write_block_end(filename)
+            self.stream_blocks[block_name] = {
+                'offset': bcast(offset),
+                'fmt'   : block_fmt,
+                'unit'  : block.get('unit'),
+            }
+        Barrier()
+        return filename
+
+    # Method for writing a contiguous part of a single dimension
+    # of either the positions or momenta of a component to the
+    # snapshot opened for streaming. With dim = -1, the passed data
+    # contains all three dimensions, flattened. As the dimensions are
+    # interleaved on disk, single dimensions are gathered up in a local
+    # buffer, with the contiguous part of the block written to the file
+    # once all three dimensions have been received. Each process thus
+    # writes its own region of the file exactly once.
+    @cython.pheader(
+        # Arguments
+        component='Component',
+        var_name=str,
+        dim='int',
+        start='Py_ssize_t',
+        data='double[::1]',
+        # Locals
+        block=dict,
+        block_name=str,
+        boxsize_gadget=object,  # np.float32 or np.float64
+        buffer=dict,
+        dtype=object,
+        index='Py_ssize_t',
+        j='Py_ssize_t',
+        key=tuple,
+        size='Py_ssize_t',
+        values=object,  # np.ndarray
+    )
+    def stream_write(self, component, var_name, dim, start, data):
+        j = self.components.index(component)
+        block_name = {'pos': 'POS', 'mom': 'VEL'}[var_name]
+        block = self.stream_blocks[block_name]
+        dtype = C2np[self.fmts[block['fmt']]]
+        # Apply unit conversion
+        values = (asarray(data)*(1/block['unit'][j])).astype(dtype)
+        # For positions, safeguard against round-off errors
+        if block_name == 'POS':
+            boxsize_gadget = dtype(self.header['BoxSize'])
+            values[values >= boxsize_gadget] -= boxsize_gadget
+        size = data.shape[0]
+        if dim == -1:
+            size //= 3
+            values = values.reshape((size, 3))
+        else:
+            # Store the single dimension in the buffer
+            key = (j, block_name, start)
+            buffer = self.stream_buffers.get(key)
+            if buffer is None:
+                buffer = self.stream_buffers[key] = {
+                    'values': empty((size, 3), dtype=dtype),
+                    'dims'  : set(),
+                }
+            if buffer['values'].shape[0] != size or dim in buffer['dims']:
+                abort(
+                    f'Inconsistent streaming of {var_name} of {component.name} '
+                    f'to {self.name} snapshot "{self.stream_filename}"'
+                )
+            buffer['values'][:, dim] = values
+            buffer['dims'].add(dim)
+            if len(buffer['dims']) < 3:
+                return
+            values = buffer['values']
+            self.stream_buffers.pop(key)
+        # Particles of earlier components precede
+        # this component within the block.
+        index = start + np.sum(
+            [component_other.N for component_other in self.components[:j]],
+            dtype=C2np['Py_ssize_t'],
+        )
+        # Write the contiguous part of the block
+        with open_file(self.stream_filename, mode='r+b') as f:
+            f.seek(block['offset'] + 3*self.sizes[block['fmt']]*index)
+            values.tofile(f)
+
+    # Method for closing the snapshot file opened for streaming
+    @cython.pheader()
+    def stream_close(self):
+        if self.stream_buffers:
+            abort(
+                f'Not all dimensions were streamed to {self.name} '
+                f'snapshot "{self.stream_filename}"'
+            )
+        Barrier()
+        self.stream_filename = ''
+        self.stream_blocks = {}
+        self.stream_buffers = {}
+
     # Method for divvying up the particles of each processes
     # between the files to be written.
     def divvy(self, return_num_files=False):
-        """If return_num_files is True, the method will return early
+        """The number of particles of each type to write to each file
+        by the local process is returned, together with the number of
+        particles of each type to be written to each file by processes
+        of lower rank, see distribute().
+        If return_num_files is True, the method will return early
         with just the number of files.
         """
         # Total number of particles across all files
@@ -1098,6 +2026,25 @@ class GadgetSnapshot:
         # the maximum possible number of particles.
         num_particle_files = get_num_particle_files(self.num_particles_file_max)
         num_files = len(num_particle_files)
+        # The user may request a larger number of files
+        # through the NumFiles header field.
+        for key, val in gadget_snapshot_params['header'].items():
+            if key.lower().replace(' ', '').replace('-', '').replace('_', '') != 'numfiles':
+                continue
+            num_files_requested = int(val)
+            if num_files_requested <= num_files:
+                break
+            num_particles_file_max = num_particles_tot//num_files_requested
+            num_particles_file_max += (
+                num_particles_file_max*num_files_requested < num_particles_tot
+            )
+            if len(get_num_particle_files(num_particles_file_max)) != num_files_requested:
+                abort(
+                    f'Cannot distribute {num_particles_tot} particles evenly '
+                    f'over {num_files_requested} {self.name} snapshot files'
+                )
+            num_files = num_files_requested
+            break
         # The number of files is now finally determined
         if return_num_files:
             return num_files
@@ -1125,11 +2072,11 @@ class GadgetSnapshot:
         ):
             abort(f'Something went wrong divvying up the particles')
         # Distribute particles within the files across the processes
-        num_write_files = self.distribute(
+        num_write_files, num_skip_files = self.distribute(
             num_particle_files,
             [component.N_local for component in self.components],
         )
-        return num_write_files
+        return num_write_files, num_skip_files
 
     # Method returning information about required file blocks
     def get_blocks_info(self, io):
@@ -1383,7 +2330,7 @@ class GadgetSnapshot:
         block_size='Py_ssize_t',
         block_type=str,
         blocks=dict,
-        blocks_required=set,
+        blocks_files=dict,
         bytes_per_particle='int',
         bytes_per_particle_dim='int',
         check='int',
@@ -1396,12 +2343,12 @@ class GadgetSnapshot:
         chunk_singleprec_ptr='float*',
         chunk_size='Py_ssize_t',
         component='Component',
+        components_selected=dict,
         components_skipped_names=list,
         data='double[::1]',
         data_components=list,
         data_value='double',
         dtype=object,
-        end_of_file='bint',
         filename_candidate=str,
         filename_glob=str,
         filename_i=str,
@@ -1432,11 +2379,14 @@ class GadgetSnapshot:
         num_read='Py_ssize_t',
         num_read_file=list,
         num_read_files=list,
+        num_skip='Py_ssize_t',
+        num_skip_file=list,
+        num_skip_files=list,
         offset='Py_ssize_t',
         offset_header='Py_ssize_t',
-        offset_nextblock='Py_ssize_t',
         plural=str,
         representation=str,
+        selection=dict,
         size_read='Py_ssize_t',
         species=object,  # str or None
         unit='double',
@@ -1552,6 +2502,9 @@ class GadgetSnapshot:
         offset_header       = bcast(offset_header       if master else None)
         num_particles_files = bcast(num_particles_files if master else None)
         num_files = len(filenames)
+        self.filenames = filenames
+        self.num_particles_files = deepcopy(num_particles_files)
+        self.offset_header = offset_header
         # Check whether the particle count matches the header record
         num_particles_components = list(
             asarray(num_particles_files, dtype=C2np['Py_ssize_t']).sum(axis=0)
@@ -1629,10 +2582,26 @@ class GadgetSnapshot:
             ]
             masterprint('done')
             return
+        # Read in the components subject to a load selection chunk by
+        # chunk. These are then left out when reading in the remaining
+        # components below, using None as a placeholder.
+        components_selected = {}
+        for j, component in enumerate(self.components):
+            if component is None:
+                continue
+            selection = is_selected(component, snapshot_load_selection)
+            if selection:
+                load_selected_particles(self, component, selection)
+                components_selected[j] = component
+        for j in components_selected:
+            self.components[j] = None
         # If no components are to be read, return now
-        if len(self.components) == len(components_skipped_names):
-            msg = ', '.join([name for name in components_skipped_names])
-            masterprint(f'Skipping {msg}')
+        if all([component is None for component in self.components]):
+            if components_skipped_names:
+                msg = ', '.join([name for name in components_skipped_names])
+                masterprint(f'Skipping {msg}')
+            for j, component in components_selected.items():
+                self.components[j] = component
             self.components = [
                 component
                 for component in self.components
@@ -1650,7 +2619,7 @@ class GadgetSnapshot:
             num_particle_files = num_particles_files[i]
             num_particles_files[i] = [num_particle_files[j] for j in j_populated]
         # Distribute particles within the files across the processes
-        num_read_files = self.distribute(num_particles_files, num_local)
+        num_read_files, num_skip_files = self.distribute(num_particles_files, num_local)
         # Progress message
         msg_list = []
         for component in self.components:
@@ -1680,169 +2649,131 @@ class GadgetSnapshot:
                 component.resize(N_local)
         # Get information about the blocks to be read in
         blocks = self.get_blocks_info('load')
-        # Read in each file in turn
-        for i, filename_i in enumerate(filenames):
-            if num_files > 1:
-                masterprint(f'Reading snapshot file {i}/{num_files - 1} ...')
+        # Locate the required blocks within each file. The files are
+        # scanned in parallel, with each process taking every nprocs'th
+        # file. The results are then shared among all processes.
+        blocks_files = {}
+        for i in range(rank, num_files, nprocs):
+            blocks_files[i] = self.locate_blocks(
+                filenames[i], offset_header, blocks, np.sum(num_particles_files[i]),
+            )
+        blocks_files = {
+            i: blocks_file
+            for blocks_files_proc in allgather(blocks_files)
+            for i, blocks_file in blocks_files_proc.items()
+        }
+        # Read in the data blocks of all files, with all processes
+        # reading their part of each block in parallel. The file offset
+        # of each part is known from the number of particles read in by
+        # processes of lower rank.
+        for i, (num_read_file, num_skip_file) in enumerate(zip(num_read_files, num_skip_files)):
+            if np.sum(num_read_file) == 0:
+                continue
+            filename_i = filenames[i]
             num_particles_file = np.sum(num_particles_files[i])
-            num_read_file = num_read_files[i]
-            # Iterate over required blocks. The order is not important
-            # and will be determined from the file. All files should
-            # contain all of the required blocks.
-            offset_nextblock = offset_header
-            blocks_required = set(blocks.keys())
-            end_of_file = False
-            if self.snapformat == 1:
-                # For SnapFormat 1 the block names are left out of the
-                # snapshot, but they occur in a specific order.
-                # The header block has already been read in.
-                self.block_names = iter(self.get_blocks_info('names'))
-                next(self.block_names)
-            while True:
-                # Find next required block
-                if rank == 0:
-                    with open_file(filename_i, mode='rb') as f:
-                        while True:
-                            # Seek to next block
-                            offset_nextblock, block_size, block_name = (
-                                self.read_block_bgn(f, offset_nextblock)
+            with open_file(filename_i, mode='rb') as f:
+                for block_name, (offset, block_size) in blocks_files[i].items():
+                    block = blocks[block_name]
+                    data_components = block.get('data')
+                    unit_components = block.get('unit')
+                    block_type = block['type']
+                    # Figure out the size of the data type
+                    # used by this block.
+                    bytes_per_particle = block_size//num_particles_file
+                    ndim = int(re.search(r'^\d+', block_type).group())
+                    bytes_per_particle_dim = bytes_per_particle//ndim
+                    if bytes_per_particle_dim*ndim != bytes_per_particle:
+                        abort(
+                            f'Block "{block_name}" stores {ndim}-dimensional data '
+                            f'but contains {bytes_per_particle} bytes per particle, '
+                            f'which is not divisible by {ndim}.'
+                        )
+                    # Iterate over all components. The block is
+                    # organised so that all data belonging to a given
+                    # component is provided consecutively.
+                    if block_name in {'POS', 'VEL'}:
+                        if bytes_per_particle_dim == 4:
+                            # Single-precision floating point format
+                            dtype = C2np['float']
+                        elif bytes_per_particle_dim == 8:
+                            # Double-precision floating point format
+                            dtype = C2np['double']
+                        else:
+                            abort(
+                                f'No data format with a size of {bytes_per_particle_dim} bytes '
+                                f'implemented for block "{block_name}"'
                             )
-                            if offset_nextblock == -1:
-                                end_of_file = True
-                                break
-                            if block_name not in blocks:
-                                masterprint(f'Skipping block "{block_name}"')
-                                continue
-                            if block_name not in blocks_required:
-                                masterwarn(f'Skipping repeated block "{block_name}"')
+                        for j, (num_read, num_skip, component, data, unit) in enumerate(
+                            zip(
+                                num_read_file, num_skip_file, self.components,
+                                data_components, unit_components,
+                            )
+                        ):
+                            if component is None or num_read == 0:
                                 continue
-                            if block_size%num_particles_file:
-                                abort(
-                                    f'File {filename_i} contains {num_particles_file} particles '
-                                    f'but its "{block_name}" block has a size of {block_size} '
-                                    f'bytes, which does not divide the particle number.'
+                            size_read = 3*num_read
+                            # Seek to the part of the block belonging
+                            # to this process. Particles of earlier
+                            # components and of earlier processes
+                            # precede this part.
+                            f.seek(
+                                offset + bytes_per_particle*(
+                                    np.sum(num_particles_files[i][:j]) + num_skip
                                 )
-                            # Arrived at required block
-                            offset = f.tell()
-                            break
-                    bcast(end_of_file)
-                    if end_of_file:
-                        if blocks_required:
-                            plural = ('s' if len(blocks_required) > 1 else '')
-                            abort(
-                                f'Could not find required block{plural}',
-                                ', '.join([f'"{block_name}"' for block_name in blocks_required]),
                             )
-                        break
-                    bcast((block_name, block_size))
-                else:
-                    end_of_file = bcast()
-                    if end_of_file:
-                        break
-                    block_name, block_size = bcast()
-                blocks_required.remove(block_name)
-                block = blocks[block_name]
-                data_components = block.get('data')
-                unit_components = block.get('unit')
-                block_type = block['type']
-                # Figure out the size of the data type
-                # used by this block.
-                bytes_per_particle = block_size//num_particles_file
-                ndim = int(re.search(r'^\d+', block_type).group())
-                bytes_per_particle_dim = bytes_per_particle//ndim
-                if bytes_per_particle_dim*ndim != bytes_per_particle:
-                    abort(
-                        f'Block "{block_name}" stores {ndim}-dimensional data '
-                        f'but contains {bytes_per_particle} bytes per particle, '
-                        f'which is not divisible by {ndim}.'
-                    )
-                # Iterate over all components. The block is organised
-                # so that all data belonging to a given component
-                # is provided consecutively.
-                if block_name in {'POS', 'VEL'}:
-                    if bytes_per_particle_dim == 4:
-                        # Single-precision floating point format
-                        dtype = C2np['float']
-                    elif bytes_per_particle_dim == 8:
-                        # Double-precision floating point format
-                        dtype = C2np['double']
-                    else:
-                        abort(
-                            f'No data format with a size of {bytes_per_particle_dim} bytes '
-                            f'implemented for block "{block_name}"'
-                        )
-                    for j, (num_read, component, data, unit) in enumerate(
-                        zip(num_read_file, self.components, data_components, unit_components)
-                    ):
-                        size_read = 3*num_read
-                        # Get file offset from previous process
-                        if rank > 0 or (nprocs > 1 and j > 0):
-                            offset = recv(source=mod(rank - 1, nprocs))
-                        # Read in block data
-                        if component is not None and num_read > 0:
-                            with open_file(filename_i, mode='rb') as f:
-                                # Seek to where the previous
-                                # process left off.
-                                f.seek(offset)
-                                # Read in using chunks
-                                chunk_size = np.min((size_read, ℤ[self.chunk_size_max//8]))
-                                for indexʳ in range(0, size_read, chunk_size):
-                                    if indexʳ + chunk_size > size_read:
-                                        chunk_size = size_read - indexʳ
-                                    chunk = data[indexʳ:(indexʳ + chunk_size)]
-                                    chunk_ptr = cython.address(chunk[:])
-                                    # Read in chunk, then copy it to
-                                    # double precision chunk while
-                                    # applying unit conversion. In the
-                                    # case of positions, safeguard
-                                    # against round-off errors.
-                                    chunk_arr = np.fromfile(
-                                        f,
-                                        dtype=dtype,
-                                        count=chunk_size,
-                                    )
-                                    if chunk_arr.shape[0] < chunk_size:
-                                        abort(f'Ran out of bytes in block "{block_name}"')
-                                    if 𝔹[dtype is C2np['float']]:
-                                        chunk_singleprec = chunk_arr
-                                        chunk_singleprec_ptr = cython.address(chunk_singleprec[:])
-                                    else:  # dtype is C2np['double']:
-                                        chunk_doubleprec = chunk_arr
-                                        chunk_doubleprec_ptr = cython.address(chunk_doubleprec[:])
-                                    # Copy single-precision chunk
-                                    # into chunk while applying
-                                    # unit conversion.
-                                    for index_chunk in range(chunk_size):
-                                        with unswitch(1):
-                                            if 𝔹[dtype is C2np['float']]:
-                                                data_value = chunk_singleprec_ptr[index_chunk]*unit
-                                            else:  # dtype is C2np['double']
-                                                data_value = chunk_doubleprec_ptr[index_chunk]*unit
-                                        # In the case of positions,
-                                        # safeguard against
-                                        # round-off errors.
-                                        with unswitch(3):
-                                            if block_name == 'POS':
-                                                if data_value >= boxsize:
-                                                    data_value -= boxsize
-                                        chunk_ptr[index_chunk] = data_value
+                            # Read in using chunks
+                            chunk_size = np.min((size_read, ℤ[self.chunk_size_max//8]))
+                            for indexʳ in range(0, size_read, chunk_size):
+                                if indexʳ + chunk_size > size_read:
+                                    chunk_size = size_read - indexʳ
+                                chunk = data[indexʳ:(indexʳ + chunk_size)]
+                                chunk_ptr = cython.address(chunk[:])
+                                # Read in chunk, then copy it to
+                                # double precision chunk while
+                                # applying unit conversion. In the
+                                # case of positions, safeguard
+                                # against round-off errors.
+                                chunk_arr = np.fromfile(
+                                    f,
+                                    dtype=dtype,
+                                    count=chunk_size,
+                                )
+                                if chunk_arr.shape[0] < chunk_size:
+                                    abort(f'Ran out of bytes in block "{block_name}"')
+                                if 𝔹[dtype is C2np['float']]:
+                                    chunk_singleprec = chunk_arr
+                                    chunk_singleprec_ptr = cython.address(chunk_singleprec[:])
+                                else:  # dtype is C2np['double']:
+                                    chunk_doubleprec = chunk_arr
+                                    chunk_doubleprec_ptr = cython.address(chunk_doubleprec[:])
+                                # Copy single-precision chunk
+                                # into chunk while applying
+                                # unit conversion.
+                                for index_chunk in range(chunk_size):
+                                    with unswitch(1):
+                                        if 𝔹[dtype is C2np['float']]:
+                                            data_value = chunk_singleprec_ptr[index_chunk]*unit
+                                        else:  # dtype is C2np['double']
+                                            data_value = chunk_doubleprec_ptr[index_chunk]*unit
+                                    # In the case of positions,
+                                    # safeguard against
+                                    # round-off errors.
+                                    with unswitch(3):
+                                        if block_name == 'POS':
+                                            if data_value >= boxsize:
+                                                data_value -= boxsize
+                                    chunk_ptr[index_chunk] = data_value
                             # Crop the populated part of the data
                             # away from the memory view.
                             data_components[j] = data[size_read:]
-                        # Update offset, to be used by the next process
-                        offset += size_read*dtype().itemsize
-                        # Inform the next process about the file offset
-                        if rank < nprocs - 1 or (nprocs > 1 and j < len(self.components) - 1):
-                            send(offset, dest=mod(rank + 1, nprocs))
-                else:
-                    abort(f'Does not know how to read {self.name} block "{block_name}"')
-                # Let all the processes catch up,
-                # ensuring that the file is closed.
-                Barrier()
-            # Done loading this snapshot file
-            if len(filenames) > 1:
-                masterprint('done')
+                    else:
+                        abort(f'Does not know how to read {self.name} block "{block_name}"')
+        # Let all the processes catch up,
+        # ensuring that all files are closed.
+        Barrier()
         # Done loading entire snapshot
+        for j, component in components_selected.items():
+            self.components[j] = component
         self.components = [
             component
             for component in self.components
@@ -1851,6 +2782,124 @@ class GadgetSnapshot:
         masterprint('done')
         masterprint('done')
 
+    # Generator yielding the particle data of the passed component in
+    # chunks, read directly from the snapshot file(s) on disk.
+    def iterate_particles(self, component, chunk_size=2**20):
+        """The snapshot should have been loaded with only_params=True,
+        in which case no particle data is held in memory. The particles
+        are divided between the processes, with each process receiving
+        its share as chunks of at most chunk_size particles. Each chunk
+        is a tuple of the index of the first particle in the chunk
+        (among all particles of the component), the positions and the
+        momenta, the latter two given as arrays of shape (n, 3) in the
+        current unit system. The blocks are memory mapped, so that only
+        the chunks currently in use are read from disk. The processes
+        read independently of each other, so that this generator does
+        not need to be exhausted in lockstep.
+        """
+        j = self.get_component_index(component)
+        blocks = self.get_blocks_info('load')
+        units = {
+            block_name: block['unit'][self.components.index(component)]
+            for block_name, block in blocks.items()
+        }
+        start_local, N_local = partition(component.N)
+        # Iterate over the files, keeping track of the index of the
+        # first particle of this type within each file.
+        index_file = 0
+        for filename, num_particles_file in zip(self.filenames, self.num_particles_files):
+            index_bgn = np.max((start_local, index_file))
+            index_end = np.min((start_local + N_local, index_file + num_particles_file[j]))
+            if index_bgn >= index_end:
+                index_file += num_particles_file[j]
+                continue
+            # Map the part of the POS and VEL blocks
+            # belonging to this process.
+            data_files = {}
+            for block_name, (offset, block_size) in self.locate_blocks(
+                filename, self.offset_header, blocks, np.sum(num_particles_file),
+                verbose=False,
+            ).items():
+                bytes_per_particle = block_size//np.sum(num_particles_file)
+                if bytes_per_particle == 3*4:
+                    dtype = C2np['float']
+                elif bytes_per_particle == 3*8:
+                    dtype = C2np['double']
+                else:
+                    abort(
+                        f'No data format with a size of {bytes_per_particle} bytes per '
+                        f'particle implemented for block "{block_name}"'
+                    )
+                data_files[block_name] = np.memmap(
+                    filename,
+                    dtype=dtype,
+                    mode='r',
+                    offset=offset + bytes_per_particle*(
+                        np.sum(num_particles_file[:j]) + index_bgn - index_file
+                    ),
+                    shape=(index_end - index_bgn, 3),
+                )
+            index_file += num_particles_file[j]
+            # Yield the data in chunks, applying unit conversion and
+            # safeguarding against round-off errors for the positions.
+            for index in range(0, index_end - index_bgn, chunk_size):
+                pos = asarray(
+                    data_files['POS'][index:(index + chunk_size)], dtype=C2np['double'],
+                )*units['POS']
+                mom = asarray(
+                    data_files['VEL'][index:(index + chunk_size)], dtype=C2np['double'],
+                )*units['VEL']
+                pos[pos >= boxsize] -= boxsize
+                yield index_bgn + index, pos, mom
+
+    # Method for locating the required blocks within a GADGET
+    # snapshot file, returning a dict mapping block names to
+    # file offsets and block sizes.
+    def locate_blocks(self, filename, offset_header, blocks, num_particles_file, verbose=True):
+        """This method is called non-collectively, with different
+        processes locating the blocks within different files.
+        Skipped blocks are reported if verbose is True.
+        """
+        blocks_file = {}
+        if num_particles_file == 0:
+            return blocks_file
+        if self.snapformat == 1:
+            # For SnapFormat 1 the block names are left out of the
+            # snapshot, but they occur in a specific order.
+            # The header block has already been read in.
+            self.block_names = iter(self.get_blocks_info('names'))
+            next(self.block_names)
+        offset_nextblock = offset_header
+        with open_file(filename, mode='rb') as f:
+            while len(blocks_file) < len(blocks):
+                # Seek to next block
+                offset_nextblock, block_size, block_name = (
+                    self.read_block_bgn(f, offset_nextblock)
+                )
+                if offset_nextblock == -1:
+                    blocks_missing = set(blocks.keys()) - set(blocks_file.keys())
+                    plural = ('s' if len(blocks_missing) > 1 else '')
+                    abort(
+                        f'Could not find required block{plural} in {filename}:',
+                        ', '.join([f'"{block_name}"' for block_name in blocks_missing]),
+                    )
+                if block_name not in blocks:
+                    if verbose:
+                        masterprint(f'Skipping block "{block_name}"')
+                    continue
+                if block_name in blocks_file:
+                    warn(f'Skipping repeated block "{block_name}" in {filename}')
+                    continue
+                if block_size%num_particles_file:
+                    abort(
+                        f'File {filename} contains {num_particles_file} particles '
+                        f'but its "{block_name}" block has a size of {block_size} '
+                        f'bytes, which does not divide the particle number.'
+                    )
+                # Arrived at required block
+                blocks_file[block_name] = (f.tell(), block_size)
+        return blocks_file
+
     # Method for reading in the initial HEAD block
     # of a GADGET snapshot file.
     def read_header(self, f):
@@ -2165,7 +3214,8 @@ class GadgetSnapshot:
 )
 def save(
     one_or_more_components, filename,
-    params=None, snapshot_type=snapshot_type, save_all_components=False,
+    params=None, snapshot_type=snapshot_type, save_all_components=False, asynchronous=False,
+    delta=False,
 ):
     """The type of snapshot to be saved may be given as the
     snapshot_type argument. If not given, it defaults to the value
@@ -2176,6 +3226,11 @@ def save(
     the snapshot_select user parameter. If you wish to overrule this
     and force every component to be included,
     set save_all_components to True.
+    If asynchronous is True, CO𝘕CEPT snapshots will have their particle
+    data written to disk in the background, see ConceptSnapshot.save().
+    For other snapshot types, this has no effect.
+    If delta is True, a CO𝘕CEPT delta snapshot is saved, referring to
+    the last full autosave, see ConceptSnapshot.save().
     """
     if not filename:
         abort('An empty filename was passed to snapshot.save()')
@@ -2216,8 +3271,554 @@ def save(
     # Save the snapshot to disk.
     # The (maybe altered) filename is returned,
     # which should also be the return value of this function.
+    if delta:
+        if not isinstance(snapshot, ConceptSnapshot):
+            abort(f'Cannot save {snapshot.name} snapshot as a delta snapshot')
+        return snapshot.save(filename, delta=True)
+    if asynchronous and isinstance(snapshot, ConceptSnapshot):
+        return snapshot.save(filename, asynchronous=True)
     return snapshot.save(filename)
 
+# Function for starting a background thread writing the passed chunks
+# of data to the given file at the given byte offsets. The returned
+# thread is already started.
+def start_snapshot_writer(filename, write_jobs):
+    def write():
+        # Write data in chunks, releasing the GIL
+        # while each chunk is written.
+        chunk_size = ConceptSnapshot.chunk_size_max//8
+        with open_file(filename, mode='r+b') as f:
+            for offset, data in write_jobs:
+                data = data.reshape(-1)
+                f.seek(offset)
+                for index in range(0, data.shape[0], chunk_size):
+                    data[index:(index + chunk_size)].tofile(f)
+    thread = threading.Thread(target=write, name=f'snapshot writer ({filename})', daemon=True)
+    thread.start()
+    return thread
+
+# Function for waiting until all snapshots written in the background
+# have been completely written to disk. This must be called
+# by all processes.
+@cython.pheader(
+    # Locals
+    thread=object,  # threading.Thread
+)
+def wait_for_snapshots():
+    if not snapshot_writers:
+        return
+    if any(allgather(any([thread.is_alive() for thread in snapshot_writers]))):
+        masterprint('Waiting for asynchronous snapshot output ...')
+        for thread in snapshot_writers:
+            thread.join()
+        Barrier()
+        masterprint('done')
+    else:
+        for thread in snapshot_writers:
+            thread.join()
+        Barrier()
+    snapshot_writers.clear()
+# List of threads writing snapshots in the background
+cython.declare(snapshot_writers=list)
+snapshot_writers = []
+
+# Functions returning the directory of the domain files of a domain
+# local CO𝘕CEPT snapshot, as well as the name of a given domain file.
+@cython.pheader(filename=str, returns=str)
+def get_domain_dirname(filename):
+    return filename.removesuffix('.hdf5') + '_domains'
+@cython.pheader(filename=str, domain='Py_ssize_t', returns=str)
+def get_domain_filename(filename, domain):
+    return f'{get_domain_dirname(filename)}/domain_{domain}.hdf5'
+
+# Function for creating virtual datasets in the passed domain local
+# CO𝘕CEPT snapshot, mapping to the particle data in the domain files.
+# This makes the snapshot readable as a regular CO𝘕CEPT snapshot
+# by external tools. Only the master process should call this function.
+@cython.pheader(
+    # Arguments
+    filename=str,
+    # Locals
+    N_domain='Py_ssize_t',
+    N_domains=object,  # np.ndarray
+    bits='int',
+    component_h5=object,  # h5py.Group
+    domain='Py_ssize_t',
+    dtype=object,
+    index='Py_ssize_t',
+    layout=object,  # h5py.VirtualLayout
+    name=str,
+    var_name=str,
+)
+def link_domain_files(filename):
+    import h5py
+    with open_hdf5(filename, mode='r+') as hdf5_file:
+        for name, component_h5 in hdf5_file['components'].items():
+            if 'domains' not in component_h5:
+                continue
+            N_domains = component_h5['domains/N'][...]
+            for var_name in ('pos', 'mom'):
+                with open_hdf5(get_domain_filename(filename, 0), mode='r') as domain_file:
+                    dtype = domain_file[f'components/{name}/{var_name}'].dtype
+                layout = h5py.VirtualLayout(shape=(component_h5.attrs['N'], 3), dtype=dtype)
+                index = 0
+                for domain, N_domain in enumerate(N_domains):
+                    if N_domain == 0:
+                        continue
+                    # The domain files are referred to relative to
+                    # the directory of the snapshot.
+                    layout[index:(index + N_domain), :] = h5py.VirtualSource(
+                        os.path.relpath(
+                            get_domain_filename(filename, domain), os.path.dirname(filename),
+                        ),
+                        f'components/{name}/{var_name}',
+                        shape=(N_domain, 3),
+                    )
+                    index += N_domain
+                if var_name in component_h5:
+                    del component_h5[var_name]
+                component_h5.create_virtual_dataset(var_name, layout)
+                bits = component_h5['domains'].attrs.get('quantisation bits', 0)
+                if var_name == 'pos' and bits:
+                    component_h5[var_name].attrs['quantisation bits'] = bits
+
+# Function for moving a CO𝘕CEPT snapshot, including the domain files
+# if the snapshot is domain local. Any existing snapshot at the
+# destination is overwritten. Only the master process should call
+# this function.
+@cython.pheader(
+    # Arguments
+    filename_src=str,
+    filename_dst=str,
+)
+def move_snapshot(filename_src, filename_dst):
+    remove_snapshot(filename_dst)
+    os.replace(filename_src, filename_dst)
+    if os.path.isdir(get_domain_dirname(filename_src)):
+        os.replace(get_domain_dirname(filename_src), get_domain_dirname(filename_dst))
+        # Relink the virtual datasets to the moved domain files
+        link_domain_files(filename_dst)
+
+# Function for removing a CO𝘕CEPT snapshot, including the domain files
+# if the snapshot is domain local. Only the master process should call
+# this function.
+@cython.pheader(
+    # Arguments
+    filename=str,
+)
+def remove_snapshot(filename):
+    if os.path.isfile(filename):
+        os.remove(filename)
+    if os.path.isdir(get_domain_dirname(filename)):
+        shutil.rmtree(get_domain_dirname(filename))
+
+# Function for assigning IDs to the particles of the passed components
+# according to their order within the just saved full snapshot given
+# by filename, which then becomes the reference for delta snapshots.
+@cython.pheader(
+    # Arguments
+    components=list,
+    filename=str,
+    # Locals
+    N_local='Py_ssize_t',
+    N_own='Py_ssize_t',
+    component='Component',
+    ids=object,  # np.ndarray
+    pos=object,  # np.ndarray
+    pos_own=object,  # np.ndarray
+    start_local='Py_ssize_t',
+    start_own='Py_ssize_t',
+    starts=object,  # np.ndarray
+    returns='void',
+)
+def set_checkpoint_reference(components, filename):
+    """The particle IDs are given by the index of the particles within
+    the snapshot, i.e. the local particles of the processes in order of
+    their rank. Each process further keeps the positions of the
+    particles within a contiguous range of IDs (as given by
+    partition()) in single precision, these being the reference
+    positions for the displacements of delta snapshots.
+    Only components using IDs are considered.
+    """
+    checkpoint_references.clear()
+    for component in components:
+        if not component.use_ids:
+            continue
+        N_local = component.N_local
+        start_local = int(np.sum(smart_mpi(N_local, mpifun='allgather')[:rank]))
+        ids = asarray(component.ids_mv[:N_local])
+        ids[:] = np.arange(start_local, start_local + N_local)
+        start_own, N_own = partition(component.N)
+        starts = asarray(allgather(start_own) + [component.N], dtype=C2np['Py_ssize_t'])
+        ids, pos = redistribute_particle_data(
+            np.searchsorted(starts, ids, side='right') - 1,
+            [ids, asarray(component.pos_mv3[:N_local])],
+        )
+        pos_own = empty((N_own, 3), dtype=C2np['float'])
+        pos_own[ids - start_own] = pos
+        checkpoint_references[component.name] = {
+            'filename': filename,
+            'N'       : component.N,
+            'starts'  : starts,
+            'pos'     : pos_own,
+        }
+# Dict mapping component names to the reference data
+# set by set_checkpoint_reference().
+cython.declare(checkpoint_references=dict)
+checkpoint_references = {}
+
+# Function for sending the passed per-particle data to the processes
+# given by dest (one rank for each particle).
+@cython.pheader(
+    # Arguments
+    dest=object,  # np.ndarray
+    arrs=list,
+    # Locals
+    arr=object,  # np.ndarray
+    arr_recv=object,  # np.ndarray
+    arr_send=object,  # np.ndarray
+    arrs_recv=list,
+    counts_recv=object,  # np.ndarray
+    counts_send=object,  # np.ndarray
+    indices_recv=object,  # np.ndarray
+    indices_send=object,  # np.ndarray
+    order=object,  # np.ndarray
+    rank_recv='int',
+    rank_send='int',
+    ℓ='int',
+    returns=list,
+)
+def redistribute_particle_data(dest, arrs):
+    """The first dimension of each array in arrs runs over the
+    particles. The received data is returned as a list of arrays,
+    ordered by the rank of the sending process.
+    """
+    order = np.argsort(dest, kind='stable')
+    counts_send = np.bincount(dest, minlength=nprocs)
+    counts_recv = asarray(allgather(counts_send), dtype=C2np['Py_ssize_t'])[:, rank]
+    indices_send = np.concatenate(([0], np.cumsum(counts_send)))
+    indices_recv = np.concatenate(([0], np.cumsum(counts_recv)))
+    arrs_recv = []
+    for arr in arrs:
+        arr_send = np.ascontiguousarray(arr[order])
+        arr_recv = empty((indices_recv[nprocs], ) + arr.shape[1:], dtype=arr.dtype)
+        for ℓ in range(nprocs):
+            rank_send = mod(rank + ℓ, nprocs)
+            rank_recv = mod(rank - ℓ, nprocs)
+            Sendrecv(
+                arr_send[indices_send[rank_send]:indices_send[rank_send + 1]],
+                dest=rank_send,
+                recvbuf=arr_recv[indices_recv[rank_recv]:indices_recv[rank_recv + 1]],
+                source=rank_recv,
+            )
+        arrs_recv.append(arr_recv)
+    return arrs_recv
+
+# Function that realises the passed particle components directly
+# into a snapshot on disk, without ever storing the particle data
+# in memory.
+@cython.pheader(
+    # Argument
+    components=list,
+    filename=str,
+    params=dict,
+    snapshot_type=str,
+    # Locals
+    component='Component',
+    snapshot=object,  # Any implemented snapshot type
+    returns=str,
+)
+def save_streaming(components, filename, params=None, snapshot_type=snapshot_type):
+    """The passed components should be instantiated but not realised,
+    as obtained from get_initial_conditions() with
+    do_realization=False. Each component is then realised with the
+    resulting particle data written directly to the snapshot, one slab
+    and one dimension at a time. The peak memory consumption is thus
+    set by the slabs used for the realisation rather than by the
+    particle data. Only particle components are supported.
+    """
+    if not filename:
+        abort('An empty filename was passed to snapshot.save_streaming()')
+    if not components:
+        abort('snapshot.save_streaming() called with no components')
+    for component in components:
+        if component.representation != 'particles':
+            abort(
+                f'Cannot stream the {component.representation} component {component.name} '
+                f'to disk, as only particle components can be streamed'
+            )
+        # Set the particle mass, which is needed
+        # for the snapshot meta data.
+        if component.mass == -1:
+            # For species with varying mass, this is the mass at a = 1
+            component.mass = component.ϱ_bar*boxsize**3/component.N
+    # Instantiate snapshot of the appropriate type
+    # and populate it with the meta data.
+    snapshot = eval(snapshot_type.capitalize() + 'Snapshot()')
+    snapshot.populate(components, params)
+    # Make sure that the directory of the snapshot exists
+    if master:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    Barrier()
+    # Realise the components directly into the snapshot
+    masterprint(f'Streaming {snapshot.name} snapshot "{filename}" ...')
+    filename = snapshot.stream_open(filename)
+    for component in snapshot.components:
+        component.realize(stream=snapshot)
+    snapshot.stream_close()
+    masterprint('done')
+    # Return the (maybe altered) filename
+    return filename
+
+# Function for checking whether the particle data of the passed
+# snapshot (loaded with only_params=True) can be read in chunks
+# through its iterate_particles() method.
+@cython.pheader(
+    # Argument
+    snapshot=object,  # Any implemented snapshot type
+    # Locals
+    component='Component',
+    returns='bint',
+)
+def is_iterable(snapshot):
+    # Only particle components without a load selection
+    # can be iterated over.
+    for component in snapshot.components:
+        if component.representation != 'particles':
+            return False
+        if is_selected(component, snapshot_load_selection):
+            return False
+    # The particles of delta snapshots are stored as displacements
+    # relative to a referenced snapshot and so cannot be iterated over.
+    if isinstance(snapshot, ConceptSnapshot):
+        with open_hdf5(snapshot.filename, mode='r', local=True) as hdf5_file:
+            for component in snapshot.components:
+                if 'displacement' in hdf5_file[f'components/{component.name}']:
+                    return False
+    return True
+
+# Function for checking whether the passed snapshot (loaded with
+# only_params=True) can be streamed into a snapshot of the given type
+# by convert_streaming(), with the passed component attribute edits.
+@cython.pheader(
+    # Argument
+    snapshot_src=object,  # Any implemented snapshot type
+    params=dict,
+    snapshot_type=str,
+    attributes=dict,
+    # Locals
+    attributes_component=dict,
+    num_files='Py_ssize_t',
+    snapshot=object,  # Any implemented snapshot type
+    returns='bint',
+)
+def is_streamable(snapshot_src, params=None, snapshot_type=snapshot_type, attributes=None):
+    # The particle data of the source snapshot
+    # has to be readable in chunks.
+    if not is_iterable(snapshot_src):
+        return False
+    # Only edits of the name, species and mass of the components can be
+    # applied while streaming, as other edits (e.g. conversion to a
+    # fluid) require the component to be held in memory.
+    if attributes:
+        for attributes_component in attributes.values():
+            if not set(attributes_component) <= {'name', 'species', 'mass'}:
+                return False
+    # Streaming into GADGET snapshots is only implemented
+    # for snapshots consisting of a single file.
+    if snapshot_type == 'gadget':
+        snapshot = GadgetSnapshot()
+        snapshot.populate(snapshot_src.components, params)
+        num_files = snapshot.get_num_files()
+        if num_files > 1:
+            masterwarn(
+                f'The {snapshot.name} snapshot will be distributed over {num_files} files '
+                f'and so cannot be streamed. The particle data will be read into '
+                f'memory in full.'
+            )
+            return False
+    return True
+
+# Function which converts the passed snapshot (loaded with
+# only_params=True) to a snapshot of the given type, streaming the
+# particle data through memory in chunks.
+@cython.pheader(
+    # Argument
+    snapshot_src=object,  # Any implemented snapshot type
+    filename=str,
+    params=dict,
+    snapshot_type=str,
+    attributes=dict,
+    # Locals
+    attributes_component=dict,
+    component='Component',
+    component_src='Component',
+    components_src=dict,
+    index='Py_ssize_t',
+    mom=object,  # np.ndarray
+    pos=object,  # np.ndarray
+    snapshot=object,  # Any implemented snapshot type
+    returns=str,
+)
+def convert_streaming(
+    snapshot_src, filename, params=None, snapshot_type=snapshot_type, attributes=None,
+):
+    """Each process reads chunks of its share of the particles from the
+    source snapshot and writes them to the new snapshot, with the
+    reading of the next chunk (in a background thread) overlapping with
+    the writing of the current one. The memory consumption is thus
+    bounded by a few chunks, regardless of the size of the snapshot.
+    The passed attributes map component names to dicts of edits of
+    their name, species and mass. Each chunk is read through the
+    original component and written through the edited component,
+    which for GADGET snapshots applies a changed mass to the velocities.
+    Use is_streamable() to check whether the conversion is possible.
+    """
+    if attributes is None:
+        attributes = {}
+    # Create the components of the new snapshot, with the passed
+    # attribute edits applied, mapped to the original components.
+    components_src = {}
+    for component_src in snapshot_src.components:
+        attributes_component = attributes.get(component_src.name, {})
+        if not attributes_component:
+            components_src[component_src] = component_src
+            continue
+        component = Component(
+            str(attributes_component.get('name', component_src.name)),
+            str(attributes_component.get('species', component_src.species)),
+            N=component_src.N,
+            mass=float(attributes_component.get('mass', component_src.mass)),
+        )
+        components_src[component] = component_src
+    # Instantiate snapshot of the appropriate type
+    # and populate it with the meta data.
+    snapshot = eval(snapshot_type.capitalize() + 'Snapshot()')
+    snapshot.populate(list(components_src), params)
+    # Make sure that the directory of the snapshot exists
+    if master:
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    Barrier()
+    # Stream the particle data from the source snapshot
+    # into the new snapshot.
+    masterprint(f'Streaming {snapshot.name} snapshot "{filename}" ...')
+    filename = snapshot.stream_open(filename)
+    for component in snapshot.components:
+        masterprint(f'Writing out {component.name} ...')
+        component_src = components_src[component]
+        for index, pos, mom in prefetch(snapshot_src.iterate_particles(component_src)):
+            snapshot.stream_write(component, 'pos', -1, index, pos.reshape(-1))
+            snapshot.stream_write(component, 'mom', -1, index, mom.reshape(-1))
+        masterprint('done')
+    snapshot.stream_close()
+    masterprint('done')
+    # Return the (maybe altered) filename
+    return filename
+
+# Generator wrapping the passed iterator, with items produced ahead of
+# time by a background thread and buffered in a queue of the given
+# maximum size. Exceptions raised in the background thread
+# are reraised when reached.
+def prefetch(iterator, size=2):
+    def produce():
+        try:
+            for item in iterator:
+                items.put((True, item))
+        except BaseException as e:
+            items.put((False, e))
+            return
+        items.put((False, None))
+    items = queue.Queue(maxsize=size)
+    thread = threading.Thread(target=produce, name='prefetcher', daemon=True)
+    thread.start()
+    while True:
+        is_item, item = items.get()
+        if not is_item:
+            break
+        yield item
+    thread.join()
+    if item is not None:
+        raise item
+
+# Function for reading in the particles of the passed component
+# matching the passed load selection.
+@cython.pheader(
+    # Arguments
+    snapshot=object,  # Any implemented snapshot type
+    component='Component',
+    selection=dict,
+    # Locals
+    N_local='Py_ssize_t',
+    center=object,  # np.ndarray
+    distance=object,  # np.ndarray
+    fraction='double',
+    hashes=object,  # np.ndarray
+    index='Py_ssize_t',
+    lower=object,  # np.ndarray
+    mask=object,  # np.ndarray
+    mom=object,  # np.ndarray
+    pos=object,  # np.ndarray
+    radius='double',
+    size='Py_ssize_t',
+    snapshot_boxsize='double',
+    upper=object,  # np.ndarray
+    returns='void',
+)
+def load_selected_particles(snapshot, component, selection):
+    """The particle data is read in chunk by chunk through the
+    iterate_particles() method of the snapshot, with only the
+    particles matching the selection (see the snapshot_load_selection
+    user parameter) kept, so that unselected particles are never held
+    in memory in full. The selected particles are not distributed
+    according to the domain decomposition.
+    """
+    masterprint(f'Reading in selection of {component.name} particles ...')
+    snapshot_boxsize = snapshot.params['boxsize']
+    fraction = float(selection.get('fraction', 1))
+    if not 0 < fraction <= 1:
+        abort(f'Cannot read in a fraction {fraction} of the {component.name} particles')
+    if 'region' in selection:
+        lower, upper = asarray(selection['region'], dtype=C2np['double'])
+    if 'center' in selection:
+        center = asarray(selection['center'], dtype=C2np['double'])
+        radius = float(selection['radius'])
+    component.N_local = 0
+    for index, pos, mom in snapshot.iterate_particles(component):
+        mask = np.ones(pos.shape[0], dtype=bool)
+        if fraction < 1:
+            # Hash the indices of the particles within the snapshot
+            # using the SplitMix64 finaliser, mapping the hashes
+            # to uniform values in [0, 1).
+            hashes = np.arange(index, index + pos.shape[0], dtype=np.uint64)
+            hashes += np.uint64(0x9E3779B97F4A7C15)
+            hashes = (hashes ^ (hashes >> np.uint64(30)))*np.uint64(0xBF58476D1CE4E5B9)
+            hashes = (hashes ^ (hashes >> np.uint64(27)))*np.uint64(0x94D049BB133111EB)
+            hashes ^= hashes >> np.uint64(31)
+            mask &= (hashes >> np.uint64(11))*2.0**(-53) < fraction
+        if 'region' in selection:
+            mask &= np.all((pos >= lower) & (pos < upper), axis=1)
+        if 'center' in selection:
+            distance = pos - center
+            distance -= snapshot_boxsize*np.round(distance/snapshot_boxsize)
+            mask &= np.sum(distance**2, axis=1) <= radius**2
+        size = np.count_nonzero(mask)
+        if size == 0:
+            continue
+        # Append the selected particles to the component
+        N_local = component.N_local
+        if component.N_allocated < N_local + size:
+            component.resize(N_local + size)
+        asarray(component.pos_mv3)[N_local:(N_local + size)] = pos[mask]
+        asarray(component.mom_mv3)[N_local:(N_local + size)] = mom[mask]
+        component.N_local = N_local + size
+    component.N = allreduce(component.N_local, op=MPI.SUM)
+    # Scale up the mass and momenta of the particles
+    # so that the (average) total mass is preserved.
+    if fraction < 1:
+        component.mass /= fraction
+        asarray(component.mom_mv)[:3*component.N_local] *= 1/fraction
+    masterprint('done')
+
 # Function that loads a snapshot file.
 # The type of snapshot can be any of the implemented.
 # Note that since we want this function to be
@@ -2251,6 +3852,10 @@ def load(
     containing both parameters (.params) and components (.components),
     just as when only_params is False. These components will have
     correctly specified attributes, but no actual component data.
+    When do_exchange is False, particles are not exchanged to the
+    processes governing their domains, and the ghost points of fluid
+    grids are left unpopulated. This suffices when the data is only to
+    be written out again, as done by the convert utility.
     """
     # If no snapshot should be loaded, return immediately
     if not filename:
@@ -2282,8 +3887,13 @@ def load(
     # Scatter particles to the correct domain-specific process.
     # Also communicate ghost points of fluid variables.
     if not only_params and do_exchange:
-        # Do exchanges for all components
+        # Do exchanges for all components, except for those read in
+        # from domain files with the particles already distributed
+        # according to the domain decomposition.
         for component in snapshot.components:
+            if isinstance(snapshot, ConceptSnapshot):
+                if component.name in snapshot.components_domain_local:
+                    continue
             exchange(component, progress_msg=True)
         # Communicate the ghost points of all fluid variables
         # in fluid components.
@@ -2502,8 +4112,13 @@ def out_of_bounds_check(component, snapshot_boxsize=-1):
     # Locals
     component='Component',
     components=list,
+    dict_method=dict,
+    force=str,
+    gridsize='Py_ssize_t',
+    gridsizes=object,  # PotentialGridsizesComponent
     initial_condition_specifications=list,
     initial_conditions_list=list,
+    method=str,
     n_components_from_snapshot='Py_ssize_t',
     name=str,
     path_or_specifications=object,  # str or dict
@@ -2555,6 +4170,35 @@ def get_initial_conditions(initial_conditions_touse=None, do_realization=True):
     # Populate universals_dict['species_present']
     # and universals_dict['class_species_present'].
     update_species_present(components)
+    # Register the grid sizes on which the components instantiated from
+    # initial condition specifications are to be realised, so that the
+    # perturbations needed for all of them are obtained through a
+    # single CLASS computation.
+    for component in components[n_components_from_snapshot:]:
+        if component.representation == 'particles':
+            register_k_gridsize(int(round(cbrt(component.N))))
+        elif component.representation == 'fluid':
+            register_k_gridsize(component.gridsize)
+    # Also register the sizes of the meshes onto which the components
+    # are interpolated later on, as perturbations may be needed on
+    # these as well (e.g. for linear power spectra and components).
+    for component in components:
+        register_k_gridsize(component.powerspec_upstream_gridsize)
+        register_k_gridsize(component.render2D_upstream_gridsize)
+        register_k_gridsize(
+            is_selected(component, powerspec_options['global gridsize'], default=-1)
+        )
+        register_k_gridsize(
+            is_selected(component, render2D_options['global gridsize'], default=-1)
+        )
+        for dict_method in component.potential_gridsizes.values():
+            for gridsizes in dict_method.values():
+                for gridsize in gridsizes:
+                    register_k_gridsize(gridsize)
+        for force, method in component.forces.items():
+            register_k_gridsize(
+                potential_options['gridsize']['global'].get(force, {}).get(method, -1)
+            )
     # Realise all components instantiated from
     # initial condition specifications.
     if do_realization:
@@ -38,9 +38,11 @@ cimport('from fluid import maccormack, maccormack_internal_sources, '
 cimport('from integration import Spline, cosmic_time, scale_factor, ȧ')
 cimport(
     'from linear import                            '
-    '    compute_cosmo, compute_transfer, realize, '
+    '    compute_cosmo, compute_transfer,          '
+    '    free_lpt_sources, realize,                '
     '    species_canonical, species_registered,    '
 )
+cimport('from lightcone import record_lightcone_crossings')
 
 
 
@@ -982,6 +984,12 @@ class Component:
         signed char[::1] rung_indices_mv
         signed char* rung_indices_jumped
         signed char[::1] rung_indices_jumped_mv
+        # Particle IDs
+        public bint use_ids
+        Py_ssize_t* ids
+        public Py_ssize_t[::1] ids_mv
+        # Source of particle data to be read in chunks
+        public object chunk_source
         # Dict used for storing Tiling instances
         public dict tilings
         public object n_interactions  # collections.defaultdict
@@ -1312,6 +1320,7 @@ class Component:
             'velocitiesfromdisplacements': realization_options_all.get(
                 'velocitiesfromdisplacements', False,
             ),
+            'lpt': realization_options_all.get('lpt', 1),
             # Non-linear realisation options
             'structure'    : realization_options_all.get('structure', 'nonlinear'),
             'compoundorder': realization_options_all.get('compoundorder', 'nonlinear'),
@@ -1342,6 +1351,7 @@ class Component:
                     'interpolation',
                     'backscaling',
                     'velocitiesfromdisplacements',
+                    'lpt',
                     # Non-linear realisation options
                     'structure',
                     'compoundorder',
@@ -1356,11 +1366,22 @@ class Component:
             for realization_options_varname in realization_options.values():
                 del realization_options_varname['structure']
                 del realization_options_varname['compoundorder']
+            # Only first-, second- and third-order
+            # Lagrangian perturbation theory is implemented.
+            for realization_options_varname in realization_options.values():
+                if realization_options_varname['lpt'] not in {1, 2, 3}:
+                    abort(
+                        f'Realization option "LPT" = {realization_options_varname["lpt"]} '
+                        f'(specified for {self.name}) not understood. '
+                        f'Only 1, 2 and 3 are implemented.'
+                    )
+                realization_options_varname['lpt'] = int(realization_options_varname['lpt'])
         elif self.representation == 'fluid':
-            # The 'interpolation' option does not make sense
+            # The 'interpolation' and 'LPT' options do not make sense
             # for fluid variables.
             for realization_options_varname in realization_options.values():
                 del realization_options_varname['interpolation']
+                del realization_options_varname['lpt']
             # None of the non-linear realisation options
             # makes sense for ϱ.
             for realization_options_varname in (
@@ -1534,6 +1555,23 @@ class Component:
         for indexᵖ in range(self.N_local):
             self.rung_indices_jumped[indexᵖ] = 0
         self.rung_indices_jumped_mv = cast(self.rung_indices_jumped, 'signed char[:self.N_local]')
+        # Particle IDs, used for referring to the particles of the last
+        # full autosave when writing delta autosaves. They are only
+        # kept track of (through exchanges) when delta autosaves
+        # are enabled.
+        self.use_ids = bool(
+            self.representation == 'particles'
+            and autosave_interval > 0
+            and autosave_deltas > 0
+        )
+        self.ids = malloc(self.N_local*sizeof('Py_ssize_t'))
+        self.ids_mv = cast(self.ids, 'Py_ssize_t[:self.N_local]')
+        for indexᵖ in range(self.N_local):
+            self.ids[indexᵖ] = -1
+        # Callable returning an iterator over chunks of the local
+        # particle data, used when the particle data is not to be held
+        # in memory all at once, see iterate_chunks().
+        self.chunk_source = None
         # Dict used for storing Tiling instances
         self.tilings = {}
         # Fluid attributes
@@ -2033,6 +2071,11 @@ class Component:
                         'signed char[:self.N_allocated]',
                     )
                     self.rung_indices_jumped_mv[size_old:size] = 0  # no jumps
+                # Reallocate particle IDs
+                if self.use_ids:
+                    self.ids = realloc(self.ids, self.N_allocated*sizeof('Py_ssize_t'))
+                    self.ids_mv = cast(self.ids, 'Py_ssize_t[:self.N_allocated]')
+                    self.ids_mv[size_old:size] = -1  # new particles have no ID
         elif self.representation == 'fluid':
             shape_noghosts = tuple(any2list(size_or_shape_noghosts))
             if len(shape_noghosts) == 1:
@@ -2070,6 +2113,7 @@ class Component:
         gauge='N-body',
         options=None,
         use_gridˣ=False,
+        stream=None,
     ):
         """This method will realise a given fluid/particle variable from
         a given transfer function. Any existing data for the variable
@@ -2103,6 +2147,10 @@ class Component:
         The use_gridˣ argument is passed on to linear.realise and
         determines whether the unstarred or starred grids should be used
         when doing the realisation.
+        For particle components, a snapshot opened for streaming may be
+        passed as stream, in which case the realised particle data is
+        written directly to this snapshot rather than being stored
+        in the component (see linear.realise).
         """
         if a == -1:
             a = universals.a
@@ -2130,8 +2178,11 @@ class Component:
                     f'with N = {self.N}, as N is not a cubic number.'
                 )
             gridsize = int(round(ℝ[cbrt(self.N)]))
-            self.N_local = self.N//nprocs
-            self.resize(self.N_local)
+            # When streaming the realisation to disk,
+            # no particle data is stored in the component.
+            if stream is None:
+                self.N_local = self.N//nprocs
+                self.resize(self.N_local)
         elif self.representation == 'fluid':
             gridsize = self.gridsize
             shape = tuple([gridsize//domain_subdivisions[dim] for dim in range(3)])
@@ -2211,6 +2262,12 @@ class Component:
                     options['interpolation'] = interpolation_orders[
                         options['interpolation'].upper()
                     ]
+            # The 'LPT' option
+            if self.representation == 'particles':
+                options.setdefault(
+                    'lpt',
+                    self.realization_options[('pos', 'mom')[variable]]['lpt'],
+                )
             # The 'velocities from displacements' option.
             if (self.representation == 'particles'
                 and 'velocitiesfromdisplacements' not in options
@@ -2319,10 +2376,15 @@ class Component:
                 a,
                 options,
                 use_gridˣ,
+                stream,
             )
             # Reset transfer_spline to None so that a transfer
             # function will be computed for the next variable.
             transfer_spline = None
+        # Free the higher-order LPT sources (if any),
+        # now that all variables have been realised.
+        if self.representation == 'particles':
+            free_lpt_sources()
 
     # Method for realising a linear fluid scalar
     def realize_if_linear(
@@ -2464,15 +2526,19 @@ class Component:
         # Arguments
         ᔑdt=dict,
         a_next='double',
+        t_start='double',
+        t_end='double',
         # Locals
         indexʳ='Py_ssize_t',
+        mass_eff='double',
         mom='double*',
         pos='double*',
         rk_order='int',
         scheme=str,
+        w_eff='double',
         Δt_over_mass='double',
     )
-    def drift(self, ᔑdt, a_next=-1):
+    def drift(self, ᔑdt, a_next=-1, t_start=-1, t_end=-1):
         if self.representation == 'particles':
             # The factor a**(3*w_eff) is included below to account for
             # decaying particles, for which the mass is given by
@@ -2484,10 +2550,19 @@ class Component:
             # being drifted, as the factor inside the momentum is only
             # applied once for every base time step (i.e. it is
             # considered a long-range "force" / source term).
-            Δt_over_mass = ᔑdt['a**(-2)']*universals.a**(3*self.w_eff(a=universals.a))/self.mass
-            # Update positions, taking care of toroidal boundaries
+            w_eff = self.w_eff(a=universals.a)
+            Δt_over_mass = ᔑdt['a**(-2)']*universals.a**(3*w_eff)/self.mass
             pos = self.pos
             mom = self.mom
+            # Record particles crossing the lightcone during the drift.
+            # This requires the time interval of the drift to be known.
+            if t_start != -1 and t_end > t_start and is_selected(self, lightcone_select):
+                mass_eff = universals.a**(-3*w_eff)*self.mass
+                record_lightcone_crossings(
+                    self.name, pos, mom, self.N_local,
+                    Δt_over_mass, mass_eff, t_start, t_end,
+                )
+            # Update positions, taking care of toroidal boundaries
             for indexʳ in range(3*self.N_local):
                 pos[indexʳ] = mod(pos[indexʳ] + mom[indexʳ]*Δt_over_mass, boxsize)
             # Some particles may have drifted out of the local domain.
@@ -2914,6 +2989,7 @@ class Component:
         dim='int',
         dim_quantity='Py_ssize_t',
         highest_populated_rung='signed char',
+        ids='Py_ssize_t*',
         indexᵖ='Py_ssize_t',
         indexʳ='Py_ssize_t',
         indexˣ='Py_ssize_t',
@@ -2942,6 +3018,8 @@ class Component:
         tiling_location='double[::1]',
         tiling_plural=str,
         tiling_names=object,  # list, collections.Counter, str
+        tmp_ids='Py_ssize_t*',
+        tmp_ids_mv='Py_ssize_t[::1]',
         tmp_rung_indices='signed char*',
         tmp_rung_indices_mv='signed char[::1]',
         tmp_quantity='double*',
@@ -2958,9 +3036,9 @@ class Component:
         tiling.sort()
         # When a subtiling_name is supplied, this signals an in-memory
         # sorting of the pos and mom data arrays of the particles,
-        # as well as of the rung indices. The final memory order will
-        # match that of the particle visiting order when iterating over
-        # the tiles and subtiles.
+        # as well as of the rung indices and IDs. The final memory order
+        # will match that of the particle visiting order when iterating
+        # over the tiles and subtiles.
         if not subtiling_name:
             return
         tiling_names = gather(tiling_name)
@@ -3008,7 +3086,9 @@ class Component:
         # This is because the iteration depends on the positions through
         # subtiling.sort(). Likewise, the rung indices should be sorted
         # during the second iteration, not the first, as these are
-        # similarly used by subtiling.sort().
+        # similarly used by subtiling.sort(). The particle IDs (if used)
+        # are sorted together with the rung indices, using a separate
+        # temporary buffer.
         tmp_quantity = self.Δmom
         rung_indices        = self.rung_indices
         rung_indices_jumped = self.rung_indices_jumped
@@ -3016,6 +3096,9 @@ class Component:
             rung_indices_arr.resize(self.N_local, refcheck=False)
         tmp_rung_indices_mv = rung_indices_arr
         tmp_rung_indices = cython.address(tmp_rung_indices_mv[:])
+        ids = self.ids
+        tmp_ids_mv = empty(self.N_local if self.use_ids else 1, dtype=C2np['Py_ssize_t'])
+        tmp_ids = cython.address(tmp_ids_mv[:])
         for quantity in range(2):
             if quantity == 0:
                 data_quantity = self.mom
@@ -3058,6 +3141,9 @@ class Component:
                             with unswitch(4):
                                 if self.use_rungs and quantity == 1:
                                     tmp_rung_indices[count] = rung_indices[indexᵖ]
+                            with unswitch(4):
+                                if self.use_ids and quantity == 1:
+                                    tmp_ids[count] = ids[indexᵖ]
                             count += 1
             # Copy the sorted data back into the data arrays
             for indexʳ in range(3*self.N_local):
@@ -3067,6 +3153,9 @@ class Component:
                     rung_index = tmp_rung_indices[indexᵖ]
                     rung_indices       [indexᵖ] = rung_index
                     rung_indices_jumped[indexᵖ] = rung_index  # no jump
+            if self.use_ids and quantity == 1:
+                for indexᵖ in range(self.N_local):
+                    ids[indexᵖ] = tmp_ids[indexᵖ]
         # Finally we need to re-sort the tiling
         tiling.sort()
         masterprint('done')
@@ -3825,6 +3914,55 @@ class Component:
             index = indices
             return self.fluidvars[index]
 
+    # Generator for looping over the local particle data in chunks,
+    # with the component populated by each chunk in turn.
+    def iterate_chunks(self, exchange_particles=False):
+        """Normally, all of the local particle data resides in memory,
+        in which case this makes up the only chunk. If a chunk_source is
+        set, the particle data is instead read in one chunk at a time,
+        each replacing the previous one. The chunk_source should be a
+        callable returning an iterator over (index, pos, mom) tuples,
+        as e.g. produced by the iterate_particles() method of snapshots.
+        If exchange_particles is True, each chunk is exchanged so that
+        the particles end up on the processes governing their domains.
+        As this is collective, processes which run out of chunks then
+        keep participating with empty chunks until all are done.
+        The index of the chunk is yielded.
+        """
+        if self.chunk_source is None:
+            yield 0
+            return
+        chunks = self.chunk_source()
+        chunk_index = 0
+        while True:
+            chunk = next(chunks, None)
+            if exchange_particles:
+                if not allreduce(chunk is not None, op=MPI.LOR):
+                    break
+            elif chunk is None:
+                break
+            self.N_local = 0
+            if chunk is not None:
+                index, pos, mom = chunk
+                self.N_local = pos.shape[0]
+                if self.N_allocated < self.N_local:
+                    self.resize(self.N_local)
+                asarray(self.pos_mv3[:self.N_local])[...] = pos
+                asarray(self.mom_mv3[:self.N_local])[...] = mom
+            if self.use_rungs:
+                self.rung_indices_mv[:self.N_local] = 0
+                self.rung_indices_jumped_mv[:self.N_local] = 0
+                self.set_rungs_N()
+            if exchange_particles:
+                exchange(self)
+            yield chunk_index
+            chunk_index += 1
+        # Leave the component without any particle data,
+        # as after loading with only_params=True.
+        self.N_local = 0
+        if self.use_rungs:
+            self.set_rungs_N()
+
     # Generator for looping over all
     # scalar fluid grids within the component.
     def iterate_fluidscalars(self, include_disguised_scalar=True, include_additional_dofs=True):
@@ -4077,6 +4215,7 @@ class Component:
         free(self.rungs_N)
         free(self.rung_indices)
         free(self.rung_indices_jumped)
+        free(self.ids)
 
     # String representation
     def __repr__(self):
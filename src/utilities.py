@@ -41,7 +41,15 @@ cimport(
     '    transferfunctions_registered,    '
 )
 cimport('from mesh import convert_particles_to_fluid')
-cimport('from snapshot import compare_parameters, get_snapshot_type, snapshot_extensions')
+cimport(
+    'from snapshot import                       '
+    '    compare_parameters,                    '
+    '    convert_streaming,                     '
+    '    get_snapshot_type,                     '
+    '    is_iterable,                           '
+    '    is_streamable,                         '
+    '    snapshot_extensions,                   '
+)
 cimport('import species')
 cimport('from snapshot import get_initial_conditions, load, save')
 
@@ -93,6 +101,7 @@ def allow_similarly_named_components():
                 params=dict,
                 attribute_str=str,
                 attributes=object,  # collections.defaultdict
+                attributes_component=dict,
                 attribute=str,
                 key=str,
                 value=object,  # double, str or NoneType
@@ -103,6 +112,7 @@ def allow_similarly_named_components():
                 original_mass='double',
                 original_representation=str,
                 rel_tol='double',
+                streaming='bint',
                 unit_str=str,
                 σmom_fluid='double[::1]',
                 σmom_particles='double[::1]',
@@ -146,13 +156,29 @@ def convert():
             params[key] = value
     # The filename of the snapshot to read in
     snapshot_filename = special_params['snapshot_filename']
-    # Read snapshot on disk into the requested type
+    # Read in the meta data of the snapshot on disk. If the snapshot
+    # only contains particles and at most the names, species and masses
+    # of the components are to be changed, the particle data is
+    # streamed from the original snapshot into the converted snapshot
+    # in chunks, without ever loading it in full, with the edits applied
+    # to each chunk. Otherwise, the snapshot is read in full into the
+    # requested type.
     snapshot = load(
         snapshot_filename,
         compare_params=False,  # Postpone parameter comparison
-        do_exchange=False,     # Exchanges happen later, if needed
-        as_if=snapshot_type,
+        only_params=True,
     )
+    streaming = is_streamable(snapshot, params, snapshot_type, dict(attributes))
+    if not streaming:
+        # The ghost points of fluid grids are not populated when
+        # skipping the exchanges, which is fine as the fluid grids
+        # are only written out again.
+        snapshot = load(
+            snapshot_filename,
+            compare_params=False,  # Postpone parameter comparison
+            do_exchange=False,     # Exchanges happen later, if needed
+            as_if=snapshot_type,
+        )
     # Some of the functions used later use the value of universals.a.
     # Set this equal to the scale factor value in the snapshot.
     # In the end of this function, the original value of
@@ -182,13 +208,11 @@ def convert():
                     f'The following attributes are specified for {name}, '
                     f'which does not exist:\n{attributes[name]}'
                 )
-    # Overwrite parameters in the snapshot with those from the
-    # parameter file (those which are currently loaded as globals).
-    # If parameters are passed directly, these should take precedence
-    # over those from the parameter file.
-    snapshot.populate(snapshot.components, params)
-    # Edit individual components if component attributes are passed
-    for component in snapshot.components:
+    # Edit individual components if component attributes are passed.
+    # When streaming, the edits are instead applied by
+    # convert_streaming(), as the original components
+    # are needed for reading the particle data.
+    for component in ([] if streaming else snapshot.components):
         # The (original) name of this component
         name = component.name
         # Backup of original representation and mass
@@ -327,6 +351,15 @@ def convert():
                          )
         elif original_representation == 'fluid' and component.representation == 'particles':
             abort('Cannot convert fluid to particles')
+    # Overwrite parameters in the snapshot with those from the
+    # parameter file (those which are currently loaded as globals).
+    # If parameters are passed directly, these should take precedence
+    # over those from the parameter file. This is done after the edits
+    # of the components, as these enter the meta data of the snapshot
+    # (e.g. the masses in the GADGET header). When streaming, this is
+    # instead done for the converted snapshot by convert_streaming().
+    if not streaming:
+        snapshot.populate(snapshot.components, params)
     # Remove original file extension
     # (the correct extension will be added by the save function).
     converted_snapshot_filename = snapshot_filename
@@ -339,7 +372,13 @@ def convert():
     # signalling that this is the output of the conversion.
     converted_snapshot_filename += '_converted'
     # Save the converted snapshot
-    snapshot.save(converted_snapshot_filename)
+    if streaming:
+        with allow_similarly_named_components():
+            convert_streaming(
+                snapshot, converted_snapshot_filename, params, snapshot_type, dict(attributes),
+            )
+    else:
+        snapshot.save(converted_snapshot_filename)
     # Reassign the original value of universals.a
     universals.a = a
 
@@ -435,6 +474,26 @@ def locate_snapshots(
             warn(msg)
     return bcast(snapshot_filenames)
 
+# Function for loading the snapshot with the given filename, postponing
+# the parameter comparison. If possible, the particle data is not read
+# in. Instead, it is read in chunks from disk whenever needed,
+# see Component.iterate_chunks().
+@cython.pheader(
+    # Arguments
+    snapshot_filename=str,
+    # Locals
+    component='Component',
+    snapshot=object,  # Any implemented snapshot type
+    returns=object,  # Any implemented snapshot type
+)
+def load_chunked(snapshot_filename):
+    snapshot = load(snapshot_filename, compare_params=False, only_params=True)
+    if not is_iterable(snapshot):
+        return load(snapshot_filename, compare_params=False)
+    for component in snapshot.components:
+        component.chunk_source = functools.partial(snapshot.iterate_particles, component)
+    return snapshot
+
 # Function that produces a power spectrum of the file
 # specified by the special_params['snapshot_filename'] parameter.
 @cython.pheader(
@@ -451,8 +510,9 @@ def powerspec():
     init_time()
     # Extract the snapshot filename
     snapshot_filename = special_params['snapshot_filename']
-    # Read in the snapshot, postponing the parameter comparison
-    snapshot = load(snapshot_filename, compare_params=False)
+    # Read in the snapshot, postponing the parameter comparison.
+    # Particle data is read in chunks when needed.
+    snapshot = load_chunked(snapshot_filename)
     # Set universal scale factor and cosmic time and to match
     # that of the snapshot.
     universals.a = snapshot.params['a']
@@ -494,8 +554,9 @@ def render3D():
     init_time()
     # Extract the snapshot filename
     snapshot_filename = special_params['snapshot_filename']
-    # Read in the snapshot, postponing the parameter comparison
-    snapshot = load(snapshot_filename, compare_params=False)
+    # Read in the snapshot, postponing the parameter comparison.
+    # Particle data is read in chunks when needed.
+    snapshot = load_chunked(snapshot_filename)
     # Set universal scale factor and cosmic time and to match
     # that of the snapshot.
     universals.a = snapshot.params['a']
@@ -523,8 +584,7 @@ def render3D():
     if output_filename == snapshot_filename:
         output_filename = '{}/render3D_{}'.format(output_dir, basename)
     # Render the snapshot
-    graphics.render3D(snapshot.components, output_filename,
-                    True, '.renders3D_{}'.format(basename))
+    graphics.render3D(snapshot.components, output_filename)
 
 # Function for printing all informations within a snapshot
 @cython.pheader(
@@ -544,6 +604,7 @@ def render3D():
     snapshot_filename=str,
     snapshot_filenames=list,
     snapshot_type=str,
+    stream_stats='bint',
     unit='double',
     value='double',
     Σmom='double[::1]',
@@ -562,14 +623,26 @@ def info():
     )
     # Print out information about each snapshot
     for snapshot_filename in snapshot_filenames:
-        # Load parameters from the snapshot
+        # Load parameters from the snapshot. Statistics of particle
+        # components are computed by iterating over the particle data
+        # on disk, while fluid components need to be read in.
         with allow_similarly_named_components():
             snapshot = load(
                 snapshot_filename,
                 compare_params=False,
-                only_params=(not special_params['stats']),
+                only_params=True,
                 do_exchange=False,
             )
+            stream_stats = not any([
+                component.representation == 'fluid'
+                for component in snapshot.components
+            ])
+            if special_params['stats'] and not stream_stats:
+                snapshot = load(
+                    snapshot_filename,
+                    compare_params=False,
+                    do_exchange=False,
+                )
         params = snapshot.params
         snapshot_type = get_snapshot_type(snapshot_filename)
         # If a parameter file should be generated from the snapshot,
@@ -773,7 +846,10 @@ def info():
                 masterprint('{:<16} {}'.format('w', eos_info), indent=4)
             # Component statistics
             if special_params['stats']:
-                Σmom, σmom = measure(component, 'momentum')
+                if stream_stats:
+                    Σmom, σmom = measure_particle_momenta(snapshot, component)
+                else:
+                    Σmom, σmom = measure(component, 'momentum')
                 masterprint('{:<16} [{}, {}, {}] {}'.format('momentum sum',
                                                             *significant_figures(asarray(Σmom)/units.m_sun,
                                                                                  6,
@@ -791,6 +867,35 @@ def info():
         # End of information
         masterprint('')
 
+# Function computing the total momentum and the momentum spread
+# of a particle component, equivalent to measure(component, 'momentum')
+# but iterating over the particle data on disk rather than in memory.
+@cython.header(
+    # Arguments
+    snapshot=object,  # Any implemented snapshot type
+    component='Component',
+    # Locals
+    index='Py_ssize_t',
+    mom=object,  # np.ndarray
+    pos=object,  # np.ndarray
+    Σmom='double[::1]',
+    Σmom2='double[::1]',
+    σ2mom=object,  # np.ndarray
+    returns=tuple,
+)
+def measure_particle_momenta(snapshot, component):
+    Σmom = zeros(3, dtype=C2np['double'])
+    Σmom2 = zeros(3, dtype=C2np['double'])
+    for index, pos, mom in snapshot.iterate_particles(component):
+        asarray(Σmom)[:] += np.sum(mom, axis=0)
+        asarray(Σmom2)[:] += np.sum(mom**2, axis=0)
+    Σmom = allreduce(asarray(Σmom), op=MPI.SUM)
+    Σmom2 = allreduce(asarray(Σmom2), op=MPI.SUM)
+    # Negative (about -machine_ϵ) σ² can happen due to round-off errors
+    σ2mom = asarray(Σmom2)/component.N - (asarray(Σmom)/component.N)**2
+    σ2mom[σ2mom < 0] = 0
+    return Σmom, np.sqrt(σ2mom)
+
 # Function that saves the processed CLASS background
 # and perturbations to an hdf5 file.
 @cython.pheader(
@@ -0,0 +1,91 @@
+# Imports from the CO𝘕CEPT code
+from commons import *
+from analysis import corrfunc, count_pairs, find_halos, hmf
+from communication import exchange, partition
+from species import Component
+
+# Further imports
+import json
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in benchmark specifications
+sizes             = user_params['_sizes']
+clusters_fraction = user_params['_clusters_fraction']
+clusters_N        = user_params['_clusters_N']
+clusters_radius   = user_params['_clusters_radius']
+repeats           = user_params['_repeats']
+
+# Function for timing a collective operation,
+# returning the best time out of a number of repeats.
+def measure(func, repeats=repeats):
+    time_best = ထ
+    for repeat in range(repeats):
+        Barrier()
+        t0 = time()
+        func()
+        Barrier()
+        time_best = pairmin(time_best, bcast(time() - t0))
+    return time_best
+
+# Carry out the benchmarks
+if master:
+    os.makedirs(f'{this_dir}/output', exist_ok=True)
+results = []
+random_generator = np.random.default_rng(random_seed + rank)
+cluster_centers = bcast(
+    np.random.default_rng(random_seed).random((clusters_N, 3))*boxsize
+    if master else None
+)
+for size in sizes:
+    masterprint(f'Benchmarking halo statistics with N = {size}³ ...')
+    # Create particle component, each process generating its share of
+    # the particles. A fraction of the particles are placed within
+    # Gaussian clusters, with the remaining being uniformly distributed.
+    N = size**3
+    N_local = partition(N)[1]
+    N_clustered = int(round(clusters_fraction*N_local))
+    pos = random_generator.random((N_local, 3))*boxsize
+    pos[:N_clustered] = np.mod(
+        cluster_centers[random_generator.integers(clusters_N, size=N_clustered)]
+        + random_generator.normal(scale=clusters_radius, size=(N_clustered, 3)),
+        boxsize,
+    )
+    component = Component('matter', 'matter', N=N, mass=ρ_mbar*boxsize**3/N)
+    for axis, dim in enumerate('xyz'):
+        component.populate(pos[:, axis].copy(), f'pos{dim}')
+        component.populate(zeros(N_local, dtype=C2np['double']), f'mom{dim}')
+    exchange(component)
+    # Time a single output of each kind, including the halo finding
+    # and pair counting as well as the setup of the tilings.
+    filename = f'{this_dir}/output/{{}}_{size}'
+    time_hmf = measure(lambda: hmf([component], filename.format('hmf')), repeats=1)
+    time_corrfunc = measure(
+        lambda: corrfunc([component], filename.format('corrfunc')), repeats=1,
+    )
+    # Time the halo finding and the pair counting on their own
+    time_halos = measure(lambda: find_halos(component))
+    time_pairs = measure(lambda: count_pairs(component))
+    masterprint('done')
+    result = {
+        'N'            : N,
+        'nprocs'       : nprocs,
+        'time halos'   : time_halos,
+        'time pairs'   : time_pairs,
+        'time hmf'     : time_hmf,
+        'time corrfunc': time_corrfunc,
+    }
+    results.append(result)
+    masterprint(
+        f'    halos: {time_halos:.3g} s, pairs: {time_pairs:.3g} s, '
+        f'halo mass function output: {time_hmf:.3g} s, '
+        f'correlation function output: {time_corrfunc:.3g} s'
+    )
+
+# Append the results to the results file as JSON lines
+if master:
+    with open(f'{this_dir}/output/results.jsonl', 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
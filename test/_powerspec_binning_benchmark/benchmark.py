@@ -0,0 +1,103 @@
+# Imports from the CO𝘕CEPT code
+from commons import *
+from analysis import get_powerspec_bins, tally_power
+from mesh import get_fftw_slab
+
+# Further imports
+import json
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in benchmark specifications
+gridsizes    = user_params['_gridsizes']
+n_components = user_params['_n_components']
+repeats      = user_params['_repeats']
+k_max        = powerspec_options['k_max']['default']
+binsize      = powerspec_options['binsize']['default']
+
+# Function for timing a collective operation,
+# returning the best time out of a number of repeats.
+def measure(func):
+    time_best = ထ
+    for repeat in range(repeats):
+        Barrier()
+        t0 = time()
+        func()
+        Barrier()
+        time_best = pairmin(time_best, bcast(time() - t0))
+    return time_best
+
+# Carry out the benchmarks
+results = []
+random_generator = np.random.default_rng(random_seed + rank)
+for gridsize in gridsizes:
+    masterprint(f'Benchmarking power spectrum binning with grid size {gridsize} ...')
+    # Construct the bins, including the bin indices of the slab elements
+    Barrier()
+    t0 = time()
+    k2_max, k_bin_indices, k_bin_centers, n_modes, n_modes_max, slab_bin_indices = (
+        get_powerspec_bins(gridsize, k_max, binsize)
+    )
+    Barrier()
+    time_bins = bcast(time() - t0)
+    n_bins = bcast(k_bin_centers.shape[0] if master else None)
+    n_modes_total = allreduce(int(np.sum(asarray(slab_bin_indices) != -1)), op=MPI.SUM)
+    if master and n_modes_total != np.sum(n_modes):
+        abort(
+            f'The slab bin indices cover {n_modes_total} modes, '
+            f'but the bins contain {np.sum(n_modes)} modes'
+        )
+    # Populate slabs with random values
+    slab = get_fftw_slab(gridsize)
+    asarray(slab)[...] = random_generator.random(slab.shape)
+    slabs = [slab] + [
+        random_generator.random(slab.shape)
+        for component_index in range(1, n_components)
+    ]
+    # Auto power
+    power = zeros(n_bins, dtype=C2np['double'])
+    time_auto = measure(lambda: tally_power(slab_bin_indices, slab, [slab], [power]))
+    # Cross power with all slabs, in a single sweep
+    # as well as in one sweep per slab.
+    powers_single = zeros((n_components, n_bins), dtype=C2np['double'])
+    powers_separate = zeros((n_components, n_bins), dtype=C2np['double'])
+    time_single = measure(
+        lambda: tally_power(slab_bin_indices, slab, slabs, list(powers_single))
+    )
+    time_separate = measure(
+        lambda: [
+            tally_power(slab_bin_indices, slab, [slab_other], [power_other])
+            for slab_other, power_other in zip(slabs, powers_separate)
+        ]
+    )
+    if not np.allclose(powers_single, powers_separate, rtol=1e-12, atol=0):
+        abort('Cross power tallied in a single sweep differs from that of separate sweeps')
+    masterprint('done')
+    result = {
+        'gridsize'     : gridsize,
+        'nprocs'       : nprocs,
+        'bins'         : n_bins,
+        'modes'        : n_modes_total,
+        'components'   : n_components,
+        'time bins'    : time_bins,
+        'time auto'    : time_auto,
+        'time single'  : time_single,
+        'time separate': time_separate,
+    }
+    results.append(result)
+    masterprint(
+        f'    bins: {time_bins:.3g} s, '
+        f'auto: {time_auto:.3g} s ({n_modes_total/time_auto:.3g} modes/s), '
+        f'cross ×{n_components}: {time_single:.3g} s single sweep, '
+        f'{time_separate:.3g} s separate sweeps'
+    )
+    slabs = None
+
+# Append the results to the results file as JSON lines
+if master:
+    os.makedirs(f'{this_dir}/output', exist_ok=True)
+    with open(f'{this_dir}/output/results.jsonl', 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
@@ -0,0 +1,70 @@
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange, partition
+from snapshot import save
+from species import Component
+import utilities
+
+# Further imports
+import json
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in benchmark specifications
+sizes   = user_params['_sizes']
+repeats = user_params['_repeats']
+
+# Function for timing a collective operation,
+# returning the best time out of a number of repeats.
+def measure(func, repeats=repeats):
+    time_best = ထ
+    for repeat in range(repeats):
+        Barrier()
+        t0 = time()
+        func()
+        Barrier()
+        time_best = pairmin(time_best, bcast(time() - t0))
+    return time_best
+
+# Carry out the benchmarks
+if master:
+    os.makedirs(f'{this_dir}/output', exist_ok=True)
+results = []
+random_generator = np.random.default_rng(random_seed + rank)
+for size in sizes:
+    masterprint(f'Benchmarking 3D render with N = {size}³ ...')
+    # Create particle component, each process generating its share of
+    # the particles, and save it to a snapshot.
+    N = size**3
+    N_local = partition(N)[1]
+    pos = random_generator.random((N_local, 3))*boxsize
+    component = Component('matter', 'matter', N=N, mass=ρ_mbar*boxsize**3/N)
+    for axis, dim in enumerate('xyz'):
+        component.populate(pos[:, axis].copy(), f'pos{dim}')
+        component.populate(zeros(N_local, dtype=C2np['double']), f'mom{dim}')
+    exchange(component)
+    snapshot_filename = save(
+        component, f'{this_dir}/output/snapshot_{size}.hdf5', save_all_components=True,
+    )
+    # Time the render3D utility on the snapshot,
+    # including the reading of the particle data.
+    special_params['snapshot_filename'] = snapshot_filename
+    with utilities.allow_similarly_named_components():
+        time_render3D = measure(utilities.render3D)
+    masterprint('done')
+    result = {
+        'N'            : N,
+        'nprocs'       : nprocs,
+        'resolution'   : render3D_resolution,
+        'time render3D': time_render3D,
+    }
+    results.append(result)
+    masterprint(f'    render3D: {time_render3D:.3g} s')
+
+# Append the results to the results file as JSON lines
+if master:
+    with open(f'{this_dir}/output/results.jsonl', 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
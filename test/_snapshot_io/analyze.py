@@ -0,0 +1,85 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+
+# Further imports
+import json
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Function for reading in benchmark results from a JSON lines file,
+# keyed by the benchmark configuration.
+def read_results(filename):
+    results = {}
+    with open(filename) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            key = tuple(result[name] for name in ('format', 'variant', 'N', 'nprocs'))
+            results[key] = result
+    return results
+
+# Function returning a string representation of a particle number
+def get_N_str(N):
+    N_lin = cbrt(N)
+    if isint(N_lin):
+        return f'{int(round(N_lin))}³'
+    return str(N)
+
+# Read in the results of this run
+results = read_results(f'{this_dir}/output/results.jsonl')
+
+# Print out the results, together with the parallel scaling
+# of the bandwidths relative to the lowest number of processes.
+masterprint('Snapshot I/O benchmarks:')
+nprocs_min = {}
+for (fmt, variant, N, n), result in results.items():
+    nprocs_min[fmt, variant, N] = pairmin(nprocs_min.get((fmt, variant, N), n), n)
+for key, result in results.items():
+    fmt, variant, N, n = key
+    result_ref = results[fmt, variant, N, nprocs_min[fmt, variant, N]]
+    scaling = {
+        operation: result[f'bandwidth {operation}']/result_ref[f'bandwidth {operation}']
+        for operation in ('save', 'load')
+    }
+    N_str = get_N_str(N)
+    masterprint(
+        f'    {fmt:<8}{variant:<14}N = {N_str:<6}nprocs = {n:<3}: '
+        f'save {result["bandwidth save"]/2**20:8.1f} MB/s (×{scaling["save"]:.2f}, '
+        f'{result["peak memory save"]/2**20:.0f} MB), '
+        f'load {result["bandwidth load"]/2**20:8.1f} MB/s (×{scaling["load"]:.2f}, '
+        f'{result["peak memory load"]/2**20:.0f} MB)'
+    )
+
+# Compare against reference results if available
+filename_reference = f'{this_dir}/reference.jsonl'
+if os.path.isfile(filename_reference):
+    results_reference = read_results(filename_reference)
+    tolerance = user_params['_tolerance']
+    regressions = []
+    for key, result in results.items():
+        result_reference = results_reference.get(key)
+        if result_reference is None:
+            continue
+        for operation in ('save', 'load'):
+            ratio = (
+                result[f'bandwidth {operation}']/result_reference[f'bandwidth {operation}']
+            )
+            if ratio < tolerance:
+                fmt, variant, N, n = key
+                regressions.append(
+                    f'{fmt} ({variant}) {operation}, N = {get_N_str(N)}, '
+                    f'nprocs = {n}: {ratio:.2f} of reference bandwidth'
+                )
+    if regressions:
+        abort('Snapshot I/O regressions detected:\n' + '\n'.join(regressions))
+else:
+    masterprint(
+        f'No reference results found. To check future runs for '
+        f'regressions, copy "{this_dir}/output/results.jsonl" '
+        f'to "{filename_reference}".'
+    )
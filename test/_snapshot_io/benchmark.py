@@ -0,0 +1,153 @@
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange, partition
+from species import Component
+from snapshot import load, save
+
+# Further imports
+import json, threading
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in benchmark specifications
+benchmark = user_params['_benchmark']
+sizes     = user_params['_sizes']
+num_files = user_params['_num_files']
+repeats   = user_params['_repeats']
+if benchmark == 'concept':
+    variants = {('domain local' if snapshot_domain_local else 'collective'): {}}
+elif benchmark == 'gadget':
+    variants = {
+        f'{n} file{"s"*(n > 1)}': {'NumFiles': n}
+        for n in num_files
+    }
+else:
+    abort(f'Unknown snapshot format "{benchmark}" to benchmark')
+
+# Class for measuring the peak memory usage of the local process during
+# a block of code, relative to the memory usage just before the block.
+# The resident set size is sampled from a background thread.
+class MemoryMonitor:
+    interval = 1e-3
+    def __enter__(self):
+        self.baseline = self.peak = self.get_rss()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        return self
+    def __exit__(self, *exc_info):
+        self.running = False
+        self.thread.join()
+        self.peak = pairmax(self.peak, self.get_rss())
+    def sample(self):
+        while self.running:
+            self.peak = pairmax(self.peak, self.get_rss())
+            sleep(self.interval)
+    @property
+    def usage(self):
+        return self.peak - self.baseline
+    @staticmethod
+    def get_rss():
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+
+# Function returning all paths on disk making up a snapshot, including
+# any domain files or files within a snapshot directory.
+def get_snapshot_paths(filename):
+    basename = filename.removesuffix('.hdf5')
+    return glob(basename) + glob(f'{basename}.*') + glob(f'{basename}_domains')
+
+# Function returning the total size in bytes of a snapshot on disk
+def get_snapshot_size(filename):
+    size = 0
+    for path in get_snapshot_paths(filename):
+        if not os.path.isdir(path):
+            size += os.path.getsize(path)
+            continue
+        for dirpath, dirnames, basenames in os.walk(path):
+            for basename in basenames:
+                size += os.path.getsize(os.path.join(dirpath, basename))
+    return size
+
+# Function for timing a collective operation,
+# also measuring its peak memory usage.
+def measure(func):
+    Barrier()
+    with MemoryMonitor() as memory_monitor:
+        t0 = time()
+        result = func()
+        Barrier()
+        time_elapsed = time() - t0
+    memory = allreduce(memory_monitor.usage, op=MPI.MAX)
+    return result, bcast(time_elapsed), memory
+
+# Carry out the benchmarks
+results = []
+for size in sizes:
+    # Create particle component, each process
+    # generating its share of the particles.
+    N = size**3
+    N_local = partition(N)[1]
+    mass = ρ_mbar*boxsize**3/N
+    component = Component('matter', 'matter', N=N, mass=mass)
+    random_generator = np.random.default_rng(random_seed + rank)
+    for dim in 'xyz':
+        component.populate(random_generator.random(N_local)*boxsize, f'pos{dim}')
+        component.populate(
+            random_generator.normal(scale=1e+2*units.km/units.s, size=N_local)*mass,
+            f'mom{dim}',
+        )
+    exchange(component)
+    for variant, header in variants.items():
+        gadget_snapshot_params['header'] = header
+        filename = f'{this_dir}/output/{benchmark}_{size}'
+        result = {
+            'format'   : benchmark,
+            'variant'  : variant,
+            'N'        : N,
+            'nprocs'   : nprocs,
+            'num_files': header.get('NumFiles', 1),
+        }
+        time_save = time_load = ထ
+        memory_save = memory_load = 0
+        for repeat in range(repeats):
+            filename, time_elapsed, memory = measure(
+                lambda: save(
+                    component, filename,
+                    snapshot_type=benchmark, save_all_components=True,
+                )
+            )
+            time_save = pairmin(time_save, time_elapsed)
+            memory_save = pairmax(memory_save, memory)
+            snapshot, time_elapsed, memory = measure(
+                lambda: load(filename, compare_params=False)
+            )
+            time_load = pairmin(time_load, time_elapsed)
+            memory_load = pairmax(memory_load, memory)
+            snapshot = None
+        size_snapshot = bcast(get_snapshot_size(filename) if master else None)
+        result |= {
+            'size'            : size_snapshot,
+            'time save'       : time_save,
+            'time load'       : time_load,
+            'bandwidth save'  : size_snapshot/time_save,
+            'bandwidth load'  : size_snapshot/time_load,
+            'peak memory save': memory_save,
+            'peak memory load': memory_load,
+        }
+        results.append(result)
+        if master:
+            for path in get_snapshot_paths(filename):
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+        Barrier()
+
+# Append the results to the results file as JSON lines
+if master:
+    with open(f'{this_dir}/output/results.jsonl', 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
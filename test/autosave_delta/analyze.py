@@ -0,0 +1,56 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# The autosave should have been removed by the restarted simulation
+autosave_subdir = f'{autosave_dir}/{os.path.basename(param)}'
+if os.path.exists(autosave_subdir):
+    abort(f'Autosave "{autosave_subdir}" not removed by the restarted simulation')
+
+# Load the snapshot dumped right after restarting from the delta
+# autosave. This snapshot only exists if the output filename patterns
+# of the auxiliary autosave file were used.
+filenames = glob(f'{this_dir}/output/restart_nprocs={nprocs}_*')
+if not filenames:
+    abort(f'No snapshot dumped by the simulation restarted using {nprocs} processes')
+component = load(filenames[0], compare_params=False).components[0]
+pos_restart = np.concatenate(allgather(asarray(component.pos_mv3[:component.N_local])))
+mom_restart = np.concatenate(allgather(asarray(component.mom_mv3[:component.N_local])))
+
+# Compare with the particle data at the time of the delta autosave,
+# identifying the particles through their momenta. The momenta are
+# stored in full within delta autosaves, while the positions are stored
+# as displacements quantised in units of the given unit, with which the
+# positions should then agree.
+if master:
+    autosave = np.load(f'{this_dir}/output/autosave_nprocs={nprocs}.npz')
+    pos, mom, unit = autosave['pos'], autosave['mom'], float(autosave['unit'])
+    if pos_restart.shape != pos.shape:
+        abort(
+            f'{pos_restart.shape[0]} particles read in after restarting, '
+            f'but {pos.shape[0]} were autosaved'
+        )
+    order = np.lexsort(mom.T)
+    order_restart = np.lexsort(mom_restart.T)
+    if not np.all(mom_restart[order_restart] == mom[order]):
+        abort('Particle momenta after restarting do not match those of the delta autosave')
+    distance = pos_restart[order_restart] - pos[order]
+    distance -= boxsize*np.round(distance/boxsize)
+    if np.max(np.abs(distance)) > unit:
+        abort(
+            f'Particle positions after restarting are off by up to '
+            f'{np.max(np.abs(distance))} {unit_length}, exceeding the quantisation unit '
+            f'of {unit} {unit_length}'
+        )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,101 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange
+from integration import init_time
+from snapshot import load, save, set_checkpoint_reference
+
+# Further imports
+import h5py
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size = user_params['_size']
+
+# Function returning the given particle data of all processes,
+# in order of the processes.
+def gather_particle_data(component, var_name):
+    return np.concatenate(allgather(
+        asarray(getattr(component, var_name)[:component.N_local])
+    ))
+
+# Paths to the autosave files, as used when restarting
+# a simulation using this parameter file.
+autosave_subdir = f'{autosave_dir}/{os.path.basename(param)}'
+autosave_filename = f'{autosave_subdir}/snapshot.hdf5'
+autosave_delta_filename = f'{autosave_subdir}/delta.hdf5'
+autosave_auxiliary_filename = f'{autosave_subdir}/auxiliary'
+if master:
+    os.makedirs(autosave_subdir, exist_ok=True)
+Barrier()
+
+# Load the initial conditions and save them as a full autosave,
+# which then becomes the reference for delta autosaves.
+# The particle IDs are given by the order within this snapshot.
+masterprint('Autosaving initial conditions ...')
+init_time()
+filename_ic = glob(f'{this_dir}/output/ic*')[0]
+component = load(filename_ic, compare_params=False).components[0]
+save(component, autosave_filename, snapshot_type='concept', save_all_components=True)
+set_checkpoint_reference([component], autosave_filename)
+mom_full = gather_particle_data(component, 'mom_mv3')
+
+# Displace the particles by (at most a few) inter-particle distances,
+# using a displacement given by their momenta. The momenta are left
+# unchanged, allowing us to identify the particles after restarting.
+spacing = boxsize/size
+mom_rms = sqrt(np.mean(mom_full**2))
+pos = asarray(component.pos_mv3[:component.N_local])
+pos += 0.2*spacing*asarray(component.mom_mv3[:component.N_local])/mom_rms
+pos[...] = np.mod(pos, boxsize)
+exchange(component)
+
+# Reorder the particles in memory according to the short-range tiling,
+# as is done during the time loop when particle_reordering is enabled.
+component.rung_indices_mv[:component.N_local] = 0
+component.rung_indices_jumped_mv[:component.N_local] = 0
+component.set_rungs_N()
+component.tile_sort('gravity (tiles)', 'gravity (subtiles)')
+
+# Check that the particle IDs still refer to the particles
+# within the full autosave.
+ids = gather_particle_data(component, 'ids_mv')
+mom = gather_particle_data(component, 'mom_mv3')
+if not np.all(np.sort(ids) == np.arange(component.N)):
+    abort('The particle IDs are not a permutation of the particle indices')
+if not np.all(mom == mom_full[ids]):
+    abort('The particle IDs do not match the particles of the full autosave')
+
+# Save a delta autosave together with the auxiliary file,
+# specifying that the restarted simulation should dump a snapshot
+# right away. The time step sizes are then never used.
+save(
+    component, autosave_delta_filename,
+    snapshot_type='concept', save_all_components=True, delta=True,
+)
+output_filenames = {'snapshot': f'{this_dir}/output/restart_nprocs={nprocs}_{{}}={{:.2f}}'}
+if master:
+    lines = [
+        f't = {universals.t:.16e}',
+        f'a = {universals.a:.16e}',
+        f'time_step = 1',
+        f'{unicode("Δt")} = {1e-3*universals.t:.16e}',
+        f'{unicode("Δt_begin")} = {1e-3*universals.t:.16e}',
+        f'output_filenames = {repr(output_filenames)}',
+        f'delta = True',
+    ]
+    with open_file(autosave_auxiliary_filename, mode='w', encoding='utf-8') as auxiliary_file:
+        print('\n'.join(lines), file=auxiliary_file)
+masterprint('done')
+
+# Store the particle data as they should be after restarting,
+# together with the quantisation unit of the displacements.
+pos = gather_particle_data(component, 'pos_mv3')
+if master:
+    with h5py.File(autosave_delta_filename, mode='r') as hdf5_file:
+        unit = hdf5_file[f'components/{component.name}/displacement'].attrs['unit']
+    np.savez(f'{this_dir}/output/autosave_nprocs={nprocs}.npz', pos=pos, mom=mom, unit=unit)
@@ -0,0 +1,70 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+gridsize = user_params['_gridsize']
+A        = user_params['_A']
+f        = user_params['_f']
+filename = f'{this_dir}/powerspec_snapshot'
+
+# The cross power spectrum between the Gaussian field and its copy
+# should match the auto power spectrum of the Gaussian field.
+k, power = np.loadtxt(filename, usecols=(0, 2), unpack=True)
+k_cross, power_cross = np.loadtxt(
+    f'{filename}_cross_gaussian_gaussian-copy', usecols=(0, 2), unpack=True,
+)
+if not np.allclose(k_cross, k, rtol=1e-6, atol=0):
+    abort('The cross and auto power spectra are tabulated at different k')
+if not np.allclose(power_cross, power, rtol=1e-6, atol=0):
+    abort('The cross power spectrum of a field with itself differs from its auto power spectrum')
+
+# Function for reading in the number of triangles and the reduced
+# bispectrum of the given component, skipping triplets of shells
+# without any closed triangles.
+def load_bispec(name):
+    n_triangles, bispec_reduced = np.loadtxt(
+        f'{filename}_bispec_{name}', usecols=(3, 5), unpack=True,
+    )
+    mask = ~np.isnan(bispec_reduced)
+    if not np.any(mask):
+        abort(f'No bispectrum computed for the {name} field')
+    return n_triangles[mask], bispec_reduced[mask]
+
+# The bispectrum of the Gaussian field should vanish. For white noise
+# with power P, the variance of the estimated bispectrum within a
+# triplet of shells is s*V*P³/n_triangles, with V the box volume and
+# s ≤ 6 a symmetry factor. As P = A²*V/gridsize³, this results in a
+# standard deviation of the reduced bispectrum
+#   Q = B/(P₁P₂ + P₂P₃ + P₃P₁)
+# of at most sqrt(6*gridsize³/n_triangles)/(3*A).
+n_triangles, bispec_reduced = load_bispec('gaussian')
+σ = sqrt(6*gridsize**3/n_triangles)/(3*A)
+if np.any(np.abs(bispec_reduced) > 5*σ):
+    abort(
+        f'The reduced bispectrum of the Gaussian field deviates from 0 by up to '
+        f'{np.max(np.abs(bispec_reduced)/σ):.1f}σ'
+    )
+
+# For the white noise field δ = A(g + f(g² - 1)), the bispectrum is
+# constant and given by the third cumulant κ₃ = A³(6f + 8f³) of the
+# field, B = κ₃(V/gridsize³)², with the power given by the
+# variance κ₂ = A²(1 + 2f²), P = κ₂V/gridsize³. The reduced bispectrum
+# is then Q = κ₃/(3κ₂²).
+n_triangles, bispec_reduced = load_bispec('quadratic')
+bispec_reduced_expected = (6*f + 8*f**3)/(3*A*(1 + 2*f**2)**2)
+bispec_reduced_mean = np.sum(n_triangles*bispec_reduced)/np.sum(n_triangles)
+if not isclose(bispec_reduced_mean, bispec_reduced_expected, rel_tol=0.25):
+    abort(
+        f'The reduced bispectrum of the quadratic non-Gaussian field is '
+        f'{bispec_reduced_mean} on average, but expected {bispec_reduced_expected}'
+    )
+
+# Done analysing
+masterprint('done')
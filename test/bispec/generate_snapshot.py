@@ -0,0 +1,30 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from species import Component
+from snapshot import save
+
+# Create fluids with density contrasts given by a Gaussian white noise
+# field g, a copy of this field and the quadratic non-Gaussian field
+# g + f(g² - 1).
+gridsize = user_params['_gridsize']
+A        = user_params['_A']
+f        = user_params['_f']
+random_generator = np.random.default_rng(random_seed)
+g = random_generator.standard_normal([gridsize]*3)
+δs = {
+    'gaussian'     : g,
+    'gaussian copy': g,
+    'quadratic'    : g + f*(g**2 - 1),
+}
+components = []
+for name, δ in δs.items():
+    component = Component(name, 'matter', gridsize=gridsize, boltzmann_order=1)
+    component.populate(ρ_mbar*(1 + A*δ), 'ϱ')
+    for multi_index in component.J.multi_indices:
+        component.populate(zeros([gridsize]*3, dtype=float), 'J', multi_index)
+    components.append(component)
+
+# Save snapshot
+save(components, initial_conditions)
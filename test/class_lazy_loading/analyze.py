@@ -0,0 +1,81 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from linear import CosmoResults, compute_cosmo
+from snapshot import get_initial_conditions
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size = user_params['_size']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# Instantiate the component without realising it, registering the
+# CLASS species present. Then obtain the perturbations, either from
+# CLASS or from an existing dump, making sure that the dump exists.
+component = get_initial_conditions(do_realization=False)[0]
+cosmoresults = compute_cosmo(size, class_call_reason='for the dump')
+cosmoresults.perturbations
+Barrier()
+if not os.path.isfile(cosmoresults.filename):
+    abort(f'CLASS dump "{cosmoresults.filename}" not found')
+
+# Function loading the perturbations from the dump anew,
+# lazily or eagerly. The k indices of the local perturbations are
+# returned together with the perturbations themselves.
+def load_perturbations(lazily):
+    cosmoresults_loaded = CosmoResults(cosmoresults.params, cosmoresults.k_magnitudes)
+    loaded_lazily = []
+    def load_perturbations_lazily():
+        loaded_lazily.append(
+            lazily and CosmoResults.load_perturbations_lazily(cosmoresults_loaded)
+        )
+        return loaded_lazily[-1]
+    cosmoresults_loaded.load_perturbations_lazily = load_perturbations_lazily
+    perturbations = cosmoresults_loaded.perturbations
+    if loaded_lazily != [lazily]:
+        abort(f'Perturbations loaded lazily = {loaded_lazily}, but expected [{lazily}]')
+    return asarray(cosmoresults_loaded.k_indices).copy(), perturbations
+
+# Compare the lazily loaded perturbations with the eagerly loaded
+# perturbations. Only the perturbations needed for the species present
+# are loaded lazily, while all perturbations in the dump are loaded
+# eagerly. Each process may further hold different k modes in the two
+# cases, and so the perturbations are gathered on the master process
+# prior to the comparison.
+perturbations_all = {}
+for lazily in (False, True):
+    k_indices, perturbations = load_perturbations(lazily)
+    perturbations_all[lazily] = {}
+    for k_indices_proc, perturbations_proc in allgather((
+        k_indices,
+        [{key: np.array(val) for key, val in perturbation.items()} for perturbation in perturbations],
+    )):
+        for index, perturbation in zip(k_indices_proc, perturbations_proc):
+            if index in perturbations_all[lazily]:
+                abort(f'k mode {index} loaded {"lazily" if lazily else "eagerly"} more than once')
+            perturbations_all[lazily][index] = perturbation
+if master:
+    if set(perturbations_all[True]) != set(range(asarray(cosmoresults.k_magnitudes).size)):
+        abort('Not all k modes loaded lazily')
+    for index, perturbation_lazy in perturbations_all[True].items():
+        perturbation_eager = perturbations_all[False].get(index)
+        if perturbation_eager is None:
+            abort(f'k mode {index} loaded lazily but not eagerly')
+        for key, val_lazy in perturbation_lazy.items():
+            val_eager = perturbation_eager.get(key)
+            if val_eager is None:
+                abort(f'Perturbation "{key}" at k mode {index} loaded lazily but not eagerly')
+            if not np.array_equal(val_lazy, val_eager):
+                abort(
+                    f'Perturbation "{key}" at k mode {index} differs '
+                    f'between lazy and eager loading'
+                )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,113 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# The component attribute edits applied when converting
+# to GADGET and back to CO𝘕CEPT snapshots, as in the run script
+attributes = {
+    'gadget': {
+        'matter': {
+            'name': 'GADGET halo',
+            'mass': 2e+10*units.m_sun,
+        },
+    },
+    'concept': {
+        'GADGET halo': {
+            'name'   : 'dark matter',
+            'species': 'cold dark matter',
+            'mass'   : 3e+10*units.m_sun,
+        },
+    },
+}
+
+# Function carrying out the conversion of the passed snapshot to the
+# given snapshot type with the snapshot held in memory in full,
+# as done by the convert utility when not streaming.
+def convert_in_memory(filename, snapshot_type_converted, filename_converted):
+    snapshot = load(
+        filename,
+        compare_params=False,
+        do_exchange=False,
+        as_if=snapshot_type_converted,
+    )
+    universals.a = snapshot.params['a']
+    for component in snapshot.components:
+        for key, val in attributes[snapshot_type_converted].get(component.name, {}).items():
+            setattr(component, key, val)
+    snapshot.populate(snapshot.components)
+    return snapshot.save(filename_converted)
+
+# Compare the snapshots converted through streaming with those
+# converted in memory. With the snapshots loaded using a single
+# process and without exchanges, the particle order is that on disk.
+abs_tol = 1e-12
+for n in (1, 2):
+    for snapshot_type_converted, filename_src, filename_streamed in (
+        (
+            'gadget',
+            f'{this_dir}/output/snapshot.hdf5',
+            f'{this_dir}/output/gadget_nprocs={n}',
+        ),
+        (
+            'concept',
+            f'{this_dir}/output/gadget_nprocs={n}',
+            f'{this_dir}/output/concept_nprocs={n}.hdf5',
+        ),
+    ):
+        filename_in_memory = convert_in_memory(
+            filename_src,
+            snapshot_type_converted,
+            f'{this_dir}/output/{snapshot_type_converted}_nprocs={n}_in_memory',
+        )
+        snapshot_in_memory = load(filename_in_memory, compare_params=False, do_exchange=False)
+        snapshot_streamed = load(filename_streamed, compare_params=False, do_exchange=False)
+        if len(snapshot_streamed.components) != len(snapshot_in_memory.components):
+            abort(
+                f'Streamed conversion "{filename_streamed}" contains '
+                f'{len(snapshot_streamed.components)} components, but '
+                f'{len(snapshot_in_memory.components)} were expected'
+            )
+        for component_streamed, component_in_memory in zip(
+            snapshot_streamed.components, snapshot_in_memory.components,
+        ):
+            for attribute in ('name', 'species', 'N'):
+                if getattr(component_streamed, attribute) != getattr(component_in_memory, attribute):
+                    abort(
+                        f'Streamed conversion "{filename_streamed}" contains a component with '
+                        f'{attribute} {getattr(component_streamed, attribute)}, but '
+                        f'{getattr(component_in_memory, attribute)} was expected'
+                    )
+            if not isclose(component_streamed.mass, component_in_memory.mass, rel_tol=1e-12):
+                abort(
+                    f'Streamed conversion "{filename_streamed}" contains a component of mass '
+                    f'{component_streamed.mass} {unit_mass}, but '
+                    f'{component_in_memory.mass} {unit_mass} was expected'
+                )
+            pos_streamed = asarray(component_streamed.pos_mv3[:component_streamed.N_local])
+            mom_streamed = asarray(component_streamed.mom_mv3[:component_streamed.N_local])
+            pos = asarray(component_in_memory.pos_mv3[:component_in_memory.N_local])
+            mom = asarray(component_in_memory.mom_mv3[:component_in_memory.N_local])
+            Δpos = pos_streamed - pos
+            Δpos -= boxsize*np.round(Δpos/boxsize)
+            if np.max(np.abs(Δpos))/boxsize > abs_tol:
+                abort(
+                    f'Particle positions of streamed conversion "{filename_streamed}" '
+                    f'disagree with those of the conversion carried out in memory'
+                )
+            if np.max(np.abs(mom_streamed - mom)) > abs_tol*sqrt(mean(mom**2)):
+                abort(
+                    f'Particle momenta of streamed conversion "{filename_streamed}" '
+                    f'disagree with those of the conversion carried out in memory'
+                )
+
+# Done analysing
+masterprint('done')
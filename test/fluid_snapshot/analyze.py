@@ -0,0 +1,69 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import domain_layout_local_indices, domain_subdivisions
+from snapshot import load, save
+from species import Component
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+gridsize = user_params['_gridsize']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# Generate the global fluid grids, which are the same regardless of the
+# number of processes, one for each fluid scalar that is saved.
+boltzmann_order = 1
+component = Component('matter', 'matter', gridsize=gridsize, boltzmann_order=boltzmann_order)
+random_generator = np.random.default_rng(random_seed)
+grids = {}
+for index, fluidvar in enumerate(component.fluidvars[:boltzmann_order + 1]):
+    for multi_index in fluidvar.multi_indices:
+        grids[index, multi_index] = (
+            (index == 0) + 0.1*random_generator.standard_normal([gridsize]*3)
+        )
+
+# The local domain of the global grids, with and without ghost points
+shape_local = asarray(gridsize//asarray(domain_subdivisions), dtype=C2np['Py_ssize_t'])
+start_local = asarray(domain_layout_local_indices)*shape_local
+domain = tuple([
+    slice(start, start + size) for start, size in zip(start_local, shape_local)
+])
+domain_ghosts = tuple([
+    slice(start, start + size + 2*nghosts) for start, size in zip(start_local, shape_local)
+])
+
+# Save the fluid component
+for (index, multi_index), grid in grids.items():
+    component.populate(grid[domain].copy(), index, multi_index)
+filename = save(
+    component, f'{this_dir}/output/snapshot_nprocs={nprocs}.hdf5', save_all_components=True,
+)
+
+# Read in the snapshot saved using this number of processes as well as
+# the snapshot saved using a single process, comparing the fluid grids
+# read in by each process with the local domain of the saved grids.
+# The ghost points should be populated as well.
+for filename in sorted({filename, f'{this_dir}/output/snapshot_nprocs=1.hdf5'}):
+    snapshot = load(filename, compare_params=False)
+    component_loaded = snapshot.components[0]
+    if component_loaded.representation != 'fluid':
+        abort(f'Component read in from "{filename}" is not a fluid component')
+    for (index, multi_index), grid in grids.items():
+        fluidscalar = component_loaded.fluidvars[index][multi_index]
+        grid_local = asarray(fluidscalar.grid_mv)
+        grid_local_expected = np.pad(grid, nghosts, mode='wrap')[domain_ghosts]
+        if not np.array_equal(grid_local, grid_local_expected):
+            abort(
+                f'Fluid scalar {multi_index} of fluid variable {index} read in from '
+                f'"{filename}" by process {rank} out of {nprocs} does not match '
+                f'the saved fluid scalar'
+            )
+
+# Done analysing
+masterprint('done')
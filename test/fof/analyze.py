@@ -0,0 +1,119 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from analysis import find_halos, get_halo_components, get_linking_length
+from communication import exchange, partition
+from species import Component
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size              = user_params['_size']
+clusters_fraction = user_params['_clusters_fraction']
+clusters_N        = user_params['_clusters_N']
+clusters_radius   = user_params['_clusters_radius']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# Generate the particles, with a fraction of them placed within
+# Gaussian clusters and the remaining uniformly distributed.
+# The particles are the same regardless of the number of processes.
+N = size**3
+N_clustered = int(round(clusters_fraction*N))
+random_generator = np.random.default_rng(random_seed)
+cluster_centers = random_generator.random((clusters_N, 3))*boxsize
+pos = random_generator.random((N, 3))*boxsize
+pos[:N_clustered] = np.mod(
+    cluster_centers[random_generator.integers(clusters_N, size=N_clustered)]
+    + random_generator.normal(scale=clusters_radius, size=(N_clustered, 3)),
+    boxsize,
+)
+mass = ρ_mbar*boxsize**3/N
+mom = random_generator.normal(scale=1e+2*units.km/units.s, size=(N, 3))*mass
+component = Component('matter', 'matter', N=N, mass=mass)
+start_local, N_local = partition(N)
+for axis, dim in enumerate('xyz'):
+    component.populate(pos[start_local:start_local + N_local, axis].copy(), f'pos{dim}')
+    component.populate(mom[start_local:start_local + N_local, axis].copy(), f'mom{dim}')
+exchange(component)
+
+# Function finding the halos through brute-force linking of all
+# particle pairs, using a union-find structure
+def find_halos_brute(linking_length):
+    parent = arange(N)
+    def find_root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for i in range(N - 1):
+        Δpos = pos[i + 1:] - pos[i]
+        Δpos -= boxsize*np.round(Δpos/boxsize)
+        for j in i + 1 + np.where(np.sum(Δpos**2, axis=1) <= linking_length**2)[0]:
+            root_i, root_j = find_root(i), find_root(j)
+            if root_i != root_j:
+                parent[pairmax(root_i, root_j)] = pairmin(root_i, root_j)
+    roots = asarray([find_root(i) for i in range(N)])
+    catalogue = []
+    for root in np.unique(roots):
+        members = np.where(roots == root)[0]
+        count = members.shape[0]
+        if count < halo_options['min members']:
+            continue
+        Δpos = pos[members] - pos[root]
+        Δpos -= boxsize*np.round(Δpos/boxsize)
+        catalogue.append([
+            count*mass,
+            count,
+            *np.mod(pos[root] + np.mean(Δpos, axis=0), boxsize),
+            *(np.sum(mom[members], axis=0)/(universals.a*mass*count)),
+        ])
+    return asarray(catalogue).reshape(-1, 8)
+
+# Find the halos, after setting up the friends-of-friends tile size.
+# The catalogue is only available on the master process.
+get_halo_components([component], hmf_select)
+catalogue = asarray(find_halos(component))
+
+# Compare the halo catalogue to that found through brute-force
+# linking, matching up the halos by position.
+if master:
+    catalogue_brute = find_halos_brute(get_linking_length(component))
+    if catalogue.shape[0] != catalogue_brute.shape[0]:
+        abort(
+            f'Found {catalogue.shape[0]} halos, but brute-force linking '
+            f'results in {catalogue_brute.shape[0]} halos'
+        )
+    if catalogue.shape[0] == 0:
+        abort('No halos found')
+    if not np.all(np.diff(catalogue[:, 1]) <= 0):
+        abort('Halos not sorted according to decreasing member count')
+    velocity_scale = np.max(np.abs(catalogue_brute[:, 5:]))
+    for halo_brute in catalogue_brute:
+        distance = catalogue[:, 2:5] - halo_brute[2:5]
+        distance -= boxsize*np.round(distance/boxsize)
+        halo = catalogue[np.argmin(np.sum(distance**2, axis=1))]
+        if halo[1] != halo_brute[1] or not isclose(halo[0], halo_brute[0]):
+            abort(
+                f'Halo at {halo_brute[2:5]} {unit_length} has {int(halo[1])} members, '
+                f'but brute-force linking results in {int(halo_brute[1])} members'
+            )
+        distance = halo[2:5] - halo_brute[2:5]
+        distance -= boxsize*np.round(distance/boxsize)
+        if np.max(np.abs(distance)) > 1e-9*boxsize:
+            abort(
+                f'Halo at {halo[2:5]} {unit_length} should be located at '
+                f'{halo_brute[2:5]} {unit_length}'
+            )
+        if not np.allclose(halo[5:], halo_brute[5:], rtol=0, atol=1e-9*velocity_scale):
+            abort(
+                f'Halo at {halo[2:5]} {unit_length} has velocity {halo[5:]} '
+                f'but should have {halo_brute[5:]}'
+            )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,74 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange, partition
+from snapshot import load, save
+from species import Component
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size      = user_params['_size']
+num_files = user_params['_num_files']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# Generate the particles, which are the same
+# regardless of the number of processes.
+N = size**3
+random_generator = np.random.default_rng(random_seed)
+pos = random_generator.random((N, 3))*boxsize
+mass = ρ_mbar*boxsize**3/N
+mom = random_generator.normal(scale=1e+2*units.km/units.s, size=(N, 3))*mass
+
+# Save the particles to a GADGET snapshot distributed over
+# multiple files.
+component = Component('matter', 'matter', N=N, mass=mass)
+start_local, N_local = partition(N)
+for axis, dim in enumerate('xyz'):
+    component.populate(pos[start_local:start_local + N_local, axis].copy(), f'pos{dim}')
+    component.populate(mom[start_local:start_local + N_local, axis].copy(), f'mom{dim}')
+exchange(component)
+filename = save(
+    component, f'{this_dir}/output/snapshot_nprocs={nprocs}',
+    snapshot_type='gadget', save_all_components=True,
+)
+if master:
+    filenames = glob(f'{filename}/{output_bases["snapshot"]}.*')
+    if len(filenames) != num_files:
+        abort(
+            f'GADGET snapshot "{filename}" saved using {nprocs} processes consists of '
+            f'{len(filenames)} files, but {num_files} were expected'
+        )
+
+# Read in the snapshot saved using this number of processes as well as
+# the snapshot saved using a single process, comparing the particles
+# read in by all processes with the saved particles.
+for filename in sorted({filename, f'{this_dir}/output/snapshot_nprocs=1'}):
+    snapshot = load(filename, compare_params=False)
+    component = snapshot.components[0]
+    pos_loaded = np.concatenate(allgather(asarray(component.pos_mv3[:component.N_local]).copy()))
+    mom_loaded = np.concatenate(allgather(asarray(component.mom_mv3[:component.N_local]).copy()))
+    if not master:
+        continue
+    if pos_loaded.shape[0] != N:
+        abort(f'Read in {pos_loaded.shape[0]} particles from "{filename}", but {N} were saved')
+    order = np.lexsort(pos.T)
+    order_loaded = np.lexsort(pos_loaded.T)
+    if not np.allclose(pos_loaded[order_loaded], pos[order], rtol=0, atol=1e-12*boxsize):
+        abort(
+            f'Particle positions read in from "{filename}" using {nprocs} processes '
+            f'do not match those saved'
+        )
+    if not np.allclose(mom_loaded[order_loaded], mom[order], rtol=1e-12, atol=0):
+        abort(
+            f'Particle momenta read in from "{filename}" using {nprocs} processes '
+            f'do not match those saved'
+        )
+
+# Done analysing
+masterprint('done')
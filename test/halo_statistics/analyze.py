@@ -0,0 +1,105 @@
+# Imports from the CO𝘕CEPT code
+from commons import *
+from analysis import corrfunc, find_halos, hmf
+from communication import exchange, partition
+from species import Component
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+sizes             = user_params['_sizes']
+clusters_fraction = user_params['_clusters_fraction']
+clusters_N        = user_params['_clusters_N']
+clusters_radius   = user_params['_clusters_radius']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+if master:
+    os.makedirs(f'{this_dir}/output', exist_ok=True)
+random_generator = np.random.default_rng(random_seed + rank)
+cluster_centers = bcast(
+    np.random.default_rng(random_seed).random((clusters_N, 3))*boxsize
+    if master else None
+)
+for size in sizes:
+    # Create particle component, each process generating its share of
+    # the particles. A fraction of the particles are placed within
+    # Gaussian clusters, with the remaining being uniformly distributed.
+    N = size**3
+    N_local = partition(N)[1]
+    N_clustered = int(round(clusters_fraction*N_local))
+    pos = random_generator.random((N_local, 3))*boxsize
+    pos[:N_clustered] = np.mod(
+        cluster_centers[random_generator.integers(clusters_N, size=N_clustered)]
+        + random_generator.normal(scale=clusters_radius, size=(N_clustered, 3)),
+        boxsize,
+    )
+    component = Component('matter', 'matter', N=N, mass=ρ_mbar*boxsize**3/N)
+    for axis, dim in enumerate('xyz'):
+        component.populate(pos[:, axis].copy(), f'pos{dim}')
+        component.populate(zeros(N_local, dtype=C2np['double']), f'mom{dim}')
+    exchange(component)
+    # Check that the halo mass function is consistent
+    # with the halo catalogue.
+    filename = f'{this_dir}/output/{{}}_nprocs={nprocs}_{size}'
+    hmf([component], filename.format('hmf'))
+    catalogue = asarray(find_halos(component))
+    if master:
+        if catalogue.shape[0] == 0:
+            abort(f'No halos found (N = {size}³)')
+        mass_function = np.loadtxt(f'{filename.format("hmf")}_matter', ndmin=2)
+        mass_min = halo_options['min members']*component.mass
+        mass_edges = mass_min*10**(
+            arange(mass_function.shape[0] + 1)/halo_options['bins per decade']
+        )
+        counts = np.histogram(catalogue[:, 0], bins=mass_edges)[0]
+        if np.sum(counts) != catalogue.shape[0]:
+            abort(f'Halo mass function does not cover all halos (N = {size}³)')
+        if not np.all(mass_function[:, 1] == counts):
+            abort(f'Halo counts of the halo mass function are wrong (N = {size}³)')
+        if not np.allclose(
+            mass_function[:, 2], counts*halo_options['bins per decade']/boxsize**3,
+            rtol=1e-5, atol=0,
+        ):
+            abort(f'Differential halo mass function is wrong (N = {size}³)')
+        if not np.allclose(
+            mass_function[:, 3], np.cumsum(counts[::-1])[::-1]/boxsize**3,
+            rtol=1e-5, atol=0,
+        ):
+            abort(f'Cumulative halo mass function is wrong (N = {size}³)')
+    # Check that the correlation function of uniformly distributed
+    # particles vanishes. For a fixed number of particles in a periodic
+    # box, the pair counts within a separation bin are (close to)
+    # Poisson distributed with mean RR, the expected number of pairs,
+    # and so ξ has a standard deviation of 1/sqrt(RR). Bins with only
+    # a few expected pairs are left out, as the Poisson distribution is
+    # far from Gaussian here.
+    component_poisson = Component('matter', 'matter', N=N, mass=ρ_mbar*boxsize**3/N)
+    pos = random_generator.random((N_local, 3))*boxsize
+    for axis, dim in enumerate('xyz'):
+        component_poisson.populate(pos[:, axis].copy(), f'pos{dim}')
+        component_poisson.populate(zeros(N_local, dtype=C2np['double']), f'mom{dim}')
+    exchange(component_poisson)
+    corrfunc([component_poisson], filename.format('corrfunc_poisson'))
+    if master:
+        ξ = np.loadtxt(f'{filename.format("corrfunc_poisson")}_matter', usecols=2)
+        r_edges = np.logspace(
+            log10(corrfunc_options['rmin']),
+            log10(corrfunc_options['rmax']),
+            corrfunc_options['bins'] + 1,
+        )
+        pairs_random = 0.5*N*(N - 1)*(4*π/3)*np.diff(r_edges**3)/boxsize**3
+        mask = (pairs_random > 10)
+        if not np.any(mask):
+            abort('Too few particle pairs expected for checking the correlation function')
+        if np.any(np.abs(ξ[mask]) > 5/np.sqrt(pairs_random[mask])):
+            abort(
+                f'Correlation function of uniformly distributed particles deviates '
+                f'from 0 by up to {np.max(np.abs(ξ[mask])*np.sqrt(pairs_random[mask])):.1f}σ '
+                f'(N = {size}³)'
+            )
+
+# Done analysing
+masterprint('done')
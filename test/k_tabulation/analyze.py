@@ -0,0 +1,71 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from linear import compute_cosmo, compute_transfer, get_k_magnitudes
+from snapshot import get_initial_conditions
+import linear
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size = user_params['_size']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Keep track of the CLASS computations of perturbations
+class_calls = []
+call_class = linear.call_class
+def call_class_counting(params, *args, **kwargs):
+    if 'k_output_values' in params:
+        class_calls.append(params)
+    return call_class(params, *args, **kwargs)
+linear.call_class = call_class_counting
+
+# Instantiate the component without realising it,
+# registering its mesh grid sizes.
+component = get_initial_conditions(do_realization=False)[0]
+gridsize_realization = size
+gridsizes_mesh = {
+    'power spectrum': 2*size,
+    '2D render'     : 3*size,
+    'potential'     : 4*size,
+}
+
+# The perturbations needed for the realisation should be tabulated
+# for the largest of the registered grid sizes.
+cosmoresults = compute_cosmo(gridsize_realization, class_call_reason='for the realisation')
+k_magnitudes_expected = get_k_magnitudes(np.max(list(gridsizes_mesh.values())))[0]
+if not np.array_equal(asarray(cosmoresults.k_magnitudes), asarray(k_magnitudes_expected)):
+    abort(
+        f'Perturbations for the realisation grid size {gridsize_realization} are tabulated '
+        f'up to k = {np.max(cosmoresults.k_magnitudes)} {unit_length}⁻¹, but should be '
+        f'tabulated up to k = {np.max(k_magnitudes_expected)} {unit_length}⁻¹ '
+        f'in order to cover all mesh grid sizes {gridsizes_mesh}'
+    )
+
+# Obtain transfer functions on the realisation grid size as well as
+# on the (larger) mesh grid sizes and a smaller grid size. These should
+# all make use of the same CosmoResults and so of a single
+# CLASS computation.
+for name, gridsize in {
+    'realisation': gridsize_realization,
+    **gridsizes_mesh,
+    'smaller': gridsize_realization//2,
+}.items():
+    transfer_spline, cosmoresults_gridsize = compute_transfer(
+        component, 0, gridsize, a=a_begin,
+    )
+    if cosmoresults_gridsize is not cosmoresults:
+        abort(
+            f'Perturbations for the {name} grid size {gridsize} '
+            f'not obtained from the cached CosmoResults'
+        )
+if len(class_calls) != 1:
+    abort(f'CLASS was called {len(class_calls)} times to compute perturbations, but expected 1')
+
+# Done analysing
+masterprint('done')
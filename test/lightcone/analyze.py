@@ -0,0 +1,184 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from integration import cosmic_time, init_time, scale_factor
+from lightcone import (
+    get_lightcone_distance, get_lightcone_filename, get_lightcone_maps,
+    init_lightcones, record_lightcone_crossings, save_lightcones,
+)
+
+# Further imports
+import h5py
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+a_start = user_params['_a_start']
+a_end   = user_params['_a_end']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+init_time()
+init_lightcones()
+t_start = cosmic_time(a_start)
+t_end = cosmic_time(a_end)
+chi_start = get_lightcone_distance(t_start)
+chi_end = get_lightcone_distance(t_end)
+Δchi = chi_start - chi_end
+nside = lightcone_options['nside']
+observer = asarray(lightcone_options['observer'])
+
+# Function returning the direction of the centre of a HEALPix pixel
+# (in the RING ordering scheme), following Górski et al. (2005).
+def get_healpix_direction(pixel):
+    n_cap = 2*nside*(nside - 1)
+    if pixel < n_cap:
+        # North polar cap
+        ring = (1 + int(sqrt(1 + 2*pixel)))//2
+        φ = (pixel + 1 - 2*ring*(ring - 1) - 0.5)*π/(2*ring)
+        z = 1 - ring**2/(3*nside**2)
+    elif pixel < 12*nside**2 - n_cap:
+        # Equatorial region
+        ring = (pixel - n_cap)//(4*nside) + nside
+        shift = 1 if (ring + nside)%2 else 0.5
+        φ = ((pixel - n_cap)%(4*nside) + 1 - shift)*π/(2*nside)
+        z = (2*nside - ring)*2/(3*nside)
+    else:
+        # South polar cap
+        pixel_south = 12*nside**2 - pixel
+        ring = (1 + int(sqrt(2*pixel_south - 1)))//2
+        φ = (4*ring + 1 - (pixel_south - 2*ring*(ring - 1)) - 0.5)*π/(2*ring)
+        z = ring**2/(3*nside**2) - 1
+    return asarray([sqrt(1 - z**2)*cos(φ), sqrt(1 - z**2)*sin(φ), z])
+
+# The particles, each specified by a HEALPix pixel in the direction
+# of which the particle is located, its initial distance to the
+# observer and its (radial) displacement during the drift, with the
+# latter two given relative to the lightcone. The first particles
+# cross the lightcone while the last ones do not.
+particles = [
+    # pixel, distance, displacement
+    (  0, chi_end + 0.50*Δchi,  0.0*Δchi),
+    (  7, chi_end + 0.20*Δchi, +0.3*Δchi),
+    ( 30, chi_end + 0.90*Δchi, -0.5*Δchi),
+    (100, chi_end + 0.05*Δchi, +0.1*Δchi),
+    (170, chi_end + 0.99*Δchi,  0.0*Δchi),
+    (191, chi_end + 0.60*Δchi, -0.2*Δchi),
+    ( 50, chi_end - 0.10*Δchi,  0.0*Δchi),
+    ( 60, chi_end + 1.10*Δchi,  0.0*Δchi),
+    ( 80, chi_end + 1.10*Δchi, -0.5*Δchi),
+]
+particles_crossing_N = 6
+
+# Function returning the scale factor at which a particle crosses the
+# lightcone, with the particle moving uniformly in time during the
+# drift. The crossing is found through bisection.
+def get_crossing(distance, displacement):
+    def f(t):
+        return (
+            distance + (t - t_start)/(t_end - t_start)*displacement
+            - get_lightcone_distance(t)
+        )
+    t_lower, t_upper = t_start, t_end
+    for i in range(100):
+        t = 0.5*(t_lower + t_upper)
+        if f(t) < 0:
+            t_lower = t
+        else:
+            t_upper = t
+    return scale_factor(0.5*(t_lower + t_upper))
+
+# Record the crossings during a drift from t_start to t_end,
+# with the particles distributed over the processes. The displacement
+# of each particle is given by its momentum, as Δt_over_mass = 1/mass.
+mass = 1
+pos = []
+mom = []
+for i, (pixel, distance, displacement) in enumerate(particles):
+    if i%nprocs != rank:
+        continue
+    direction = get_healpix_direction(pixel)
+    pos += list(observer + distance*direction)
+    mom += list(mass*displacement*direction)
+pos = asarray(pos, dtype=C2np['double'])
+mom = asarray(mom, dtype=C2np['double'])
+record_lightcone_crossings(
+    'matter', pos, mom, pos.shape[0]//3, 1/mass, mass, t_start, t_end,
+)
+
+# Save the lightcone data at a time midway through the drift,
+# as though autosaving.
+universals.a = 0.5*(a_start + a_end)
+save_lightcones()
+
+# Check the recorded crossings
+if master:
+    pos, vel, a = [], [], []
+    for filename in sorted(glob(f'{os.path.dirname(get_lightcone_filename())}/rank_*.hdf5')):
+        with h5py.File(filename, mode='r') as hdf5_file:
+            component_h5 = hdf5_file['components/matter']
+            pos.append(component_h5['pos'][...])
+            vel.append(component_h5['vel'][...])
+            a.append(component_h5['a'][...])
+    pos = np.concatenate(pos)
+    vel = np.concatenate(vel)
+    a = np.concatenate(a)
+    if a.shape[0] != particles_crossing_N:
+        abort(f'Recorded {a.shape[0]} crossings but expected {particles_crossing_N}')
+    directions = asarray([get_healpix_direction(particle[0]) for particle in particles])
+    for pos_i, vel_i, a_i in zip(pos, vel, a):
+        distance_cross = sqrt(np.sum(pos_i**2))
+        i = np.argmax(directions @ (pos_i/distance_cross))
+        pixel, distance, displacement = particles[i]
+        if i >= particles_crossing_N:
+            abort(f'Crossing recorded for particle {i}, which does not cross the lightcone')
+        if not np.allclose(pos_i/distance_cross, directions[i], rtol=0, atol=1e-9):
+            abort(f'Crossing of particle {i} recorded in the wrong direction')
+        # With the lightcone distance interpolated linearly in time
+        # across the drift, the crossing times are only approximate.
+        a_cross = get_crossing(distance, displacement)
+        if abs(a_i - a_cross) > 0.01*(a_end - a_start):
+            abort(f'Particle {i} recorded crossing at a = {a_i} but expected a = {a_cross}')
+        if abs(distance_cross - get_lightcone_distance(cosmic_time(a_i))) > 0.01*Δchi:
+            abort(
+                f'Particle {i} recorded at a distance of {distance_cross} {unit_length} '
+                f'from the observer, but the lightcone is at '
+                f'{get_lightcone_distance(cosmic_time(a_i))} {unit_length}'
+            )
+        if not np.allclose(vel_i, displacement*directions[i]/a_i, rtol=1e-12, atol=0):
+            abort(f'Wrong velocity recorded for particle {i}')
+    # Check the HEALPix maps
+    with h5py.File(get_lightcone_filename('maps'), mode='r') as hdf5_file:
+        maps = hdf5_file['components/matter/mass'][...]
+    maps_expected = zeros((1, 12*nside**2), dtype=C2np['double'])
+    for pixel, distance, displacement in particles[:particles_crossing_N]:
+        maps_expected[0, pixel] += mass
+    if not np.all(maps == maps_expected):
+        abort(
+            f'Mass found within HEALPix pixels {np.where(maps[0])[0]}, '
+            f'but expected pixels {np.where(maps_expected[0])[0]}'
+        )
+
+# Continue the lightcone as when restarting from the above save.
+# Crossings recorded after this time should be removed,
+# while the HEALPix maps should be read back in.
+init_lightcones(restart=True)
+if master:
+    a_restart = []
+    for filename in sorted(glob(f'{os.path.dirname(get_lightcone_filename())}/rank_*.hdf5')):
+        with h5py.File(filename, mode='r') as hdf5_file:
+            a_restart.append(hdf5_file['components/matter/a'][...])
+    a_restart = np.concatenate(a_restart)
+    if a_restart.shape[0] != np.sum(a <= universals.a) or np.any(a_restart > universals.a):
+        abort(
+            f'{a_restart.shape[0]} crossings remain after restarting at a = {universals.a}, '
+            f'but expected {np.sum(a <= universals.a)}'
+        )
+    if not np.all(asarray(get_lightcone_maps('matter')) == maps_expected):
+        abort('HEALPix maps not read back in when restarting')
+
+# Done analysing
+masterprint('done')
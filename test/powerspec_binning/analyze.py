@@ -0,0 +1,86 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from analysis import get_powerspec_bins, tally_power
+from mesh import fourier_loop, get_fftw_slab
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+gridsizes    = user_params['_gridsizes']
+n_components = user_params['_n_components']
+k_max        = powerspec_options['k_max']['default']
+binsize      = powerspec_options['binsize']['default']
+
+# Function tallying up the (cross) power between two slabs
+# by looping over the slab using fourier_loop().
+def tally_power_fourier_loop(gridsize, k2_max, k_bin_indices, slab, slab_other, power):
+    slab_flat = asarray(slab).reshape(-1)
+    slab_other_flat = asarray(slab_other).reshape(-1)
+    for index, ki, kj, kk, factor, θ in fourier_loop(
+        gridsize,
+        sparse=True,
+        skip_origin=True,
+        k2_max=k2_max,
+    ):
+        k2 = ki**2 + kj**2 + kk**2
+        power[k_bin_indices[k2]] += (
+              slab_flat[index    ]*slab_other_flat[index    ]
+            + slab_flat[index + 1]*slab_other_flat[index + 1]
+        )
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+random_generator = np.random.default_rng(random_seed + rank)
+for gridsize in gridsizes:
+    # Construct the bins, including the bin indices of the slab elements
+    k2_max, k_bin_indices, k_bin_centers, n_modes, n_modes_max, slab_bin_indices = (
+        get_powerspec_bins(gridsize, k_max, binsize)
+    )
+    n_bins = bcast(k_bin_centers.shape[0] if master else None)
+    n_modes_total = allreduce(int(np.sum(asarray(slab_bin_indices) != -1)), op=MPI.SUM)
+    if master and n_modes_total != np.sum(n_modes):
+        abort(
+            f'The slab bin indices cover {n_modes_total} modes, '
+            f'but the bins contain {np.sum(n_modes)} modes (grid size {gridsize})'
+        )
+    # Populate slabs with random values
+    slab = get_fftw_slab(gridsize)
+    asarray(slab)[...] = random_generator.random(slab.shape)
+    slabs = [slab] + [
+        random_generator.random(slab.shape)
+        for component_index in range(1, n_components)
+    ]
+    # Tally up the auto power and the cross power with all slabs
+    # in a single sweep, as well as by looping over the slab
+    # for each other slab.
+    power = zeros(n_bins, dtype=C2np['double'])
+    tally_power(slab_bin_indices, slab, [slab], [power])
+    powers = zeros((n_components, n_bins), dtype=C2np['double'])
+    tally_power(slab_bin_indices, slab, slabs, list(powers))
+    powers_fourier_loop = zeros((n_components, n_bins), dtype=C2np['double'])
+    for slab_other, power_fourier_loop in zip(slabs, powers_fourier_loop):
+        tally_power_fourier_loop(
+            gridsize, k2_max, k_bin_indices, slab, slab_other, power_fourier_loop,
+        )
+    for arr in (power, powers, powers_fourier_loop):
+        Reduce(
+            sendbuf=(MPI.IN_PLACE if master else arr),
+            recvbuf=(arr          if master else None),
+            op=MPI.SUM,
+        )
+    if not master:
+        continue
+    if not np.allclose(powers, powers_fourier_loop, rtol=1e-12, atol=0):
+        abort(f'Power tallied using the slab bin indices is wrong (grid size {gridsize})')
+    if not np.all(power == powers[0]):
+        abort(
+            f'Auto power tallied on its own differs from that tallied '
+            f'together with cross power (grid size {gridsize})'
+        )
+
+# Done analysing
+masterprint('done')
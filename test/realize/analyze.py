@@ -2,6 +2,7 @@
 
 # Imports from the CO𝘕CEPT code
 from commons import *
+from snapshot import load
 plt = get_matplotlib().pyplot
 
 # Import CLASS
@@ -90,5 +91,97 @@ for kind in ('particles', 'fluid'):
                 f'See "{fig_file}" for a visualization.'
             )
 
+# Read in the particle positions realised using first-, second- and
+# third-order LPT. As all realisations are carried out using a single
+# process, the particle order is the same within all snapshots.
+positions_lpt = {}
+for fname in sorted(glob(f'{this_dir}/output_lpt/snapshot*')):
+    lpt = int(re.search('lpt=(.*)_a=', fname).group(1))
+    snapshot = load(fname, compare_params=False)
+    component = snapshot.components[0]
+    a = snapshot.params['a']
+    boxsize_lpt = snapshot.params['boxsize']
+    positions_lpt[a, lpt] = asarray(component.pos_mv3[:component.N_local]).copy()
+a_values = sorted({a for a, lpt in positions_lpt})
+
+# The n'th-order displacement grows as D⁽¹⁾ⁿ, with D⁽¹⁾ the linear
+# growth factor. The root mean square of the n'th-order correction
+# x⁽ⁿ⁾ - x⁽ⁿ⁻¹⁾ to the positions should then be much smaller than the
+# (n - 1)'th-order correction, and should scale as the n'th power of
+# the growth factor. We estimate the growth factor ratio between the
+# two times from the scaling of the second-order corrections, and
+# check that this agrees with that of matter domination, D⁽¹⁾ ∝ a,
+# and that the third-order corrections scale consistently with this.
+def get_rms_correction(a, lpt):
+    Δx = positions_lpt[a, lpt] - positions_lpt[a, lpt - 1]
+    Δx -= boxsize_lpt*np.round(Δx/boxsize_lpt)
+    return sqrt(mean(np.sum(Δx**2, axis=1)))
+corrections = {
+    lpt: asarray([get_rms_correction(a, lpt) for a in a_values])
+    for lpt in (2, 3)
+}
+a_ratio = a_values[1]/a_values[0]
+D_ratio = sqrt(corrections[2][1]/corrections[2][0])
+rel_tol = 0.05
+if not all(corrections[3] < 0.1*corrections[2]):
+    abort(
+        f'The third-order LPT corrections to the particle positions '
+        f'are not small compared to the second-order corrections'
+    )
+if not isclose(D_ratio, a_ratio, rel_tol=rel_tol):
+    abort(
+        f'The second-order LPT corrections to the particle positions '
+        f'scale as a^{2*log(D_ratio)/log(a_ratio):.3f}, '
+        f'but should scale (approximately) as a^2'
+    )
+if not isclose(corrections[3][1]/corrections[3][0], D_ratio**3, rel_tol=rel_tol):
+    abort(
+        f'The third-order LPT corrections to the particle positions '
+        f'scale as D^{log(corrections[3][1]/corrections[3][0])/log(D_ratio):.3f} '
+        f'with D the linear growth factor, but should scale as D^3'
+    )
+
+# Compare the streamed initial conditions with those realised in
+# memory. The particle order differs between the two, so we sort the
+# particles according to their (nearest) lattice site. Since the same
+# slabs are used for both realisations, the particle data should
+# agree to within floating-point precision.
+def get_sorted_particle_data(fname):
+    snapshot = load(fname, compare_params=False)
+    component = snapshot.components[0]
+    boxsize_streaming = snapshot.params['boxsize']
+    pos = asarray(component.pos_mv3[:component.N_local]).copy()
+    mom = asarray(component.mom_mv3[:component.N_local]).copy()
+    gridsize = int(round(cbrt(component.N)))
+    lattice_indices = np.mod(
+        np.round(pos/(boxsize_streaming/gridsize) - 0.5*cell_centered).astype(int),
+        gridsize,
+    )
+    order = np.argsort(
+        (lattice_indices[:, 0]*gridsize + lattice_indices[:, 1])*gridsize
+        + lattice_indices[:, 2]
+    )
+    return boxsize_streaming, pos[order], mom[order]
+abs_tol = 1e-9
+for fname in sorted(glob(f'{this_dir}/output_streaming/snapshot*streaming=False*')):
+    snapshot_type = re.search('snapshot_(.*)_nprocs', fname).group(1)
+    n = int(re.search('nprocs=(.*)_streaming', fname).group(1))
+    boxsize_streaming, pos, mom = get_sorted_particle_data(fname)
+    boxsize_streaming, pos_streamed, mom_streamed = get_sorted_particle_data(
+        fname.replace('streaming=False', 'streaming=True')
+    )
+    Δpos = pos_streamed - pos
+    Δpos -= boxsize_streaming*np.round(Δpos/boxsize_streaming)
+    if np.max(np.abs(Δpos))/boxsize_streaming > abs_tol:
+        abort(
+            f'Particle positions of initial conditions streamed to {snapshot_type} '
+            f'snapshot using {n} processes disagree with those realised in memory'
+        )
+    if np.max(np.abs(mom_streamed - mom)) > abs_tol*sqrt(mean(mom**2)):
+        abort(
+            f'Particle momenta of initial conditions streamed to {snapshot_type} '
+            f'snapshot using {n} processes disagree with those realised in memory'
+        )
+
 # Done analysing
 masterprint('done')
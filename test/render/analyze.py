@@ -23,6 +23,22 @@ render3D_1 = plt.imread(render3D_1_path)
 if not np.all(render3D_0 == render3D_1):
     abort('The 3D renders "{}" and "{}" are not identical!'.format(render3D_0, render3D_1))
 
+# The 3D renders produced using 1 and 4 processes should agree, up to
+# round-off errors from compositing the partial renders of the processes
+# in different orders, which may at most change the colour values of
+# the images by a single level.
+render3D_nprocs = {
+    n: plt.imread(f'{this_dir}/output/render3D_snapshot_nprocs={n}.png')
+    for n in (1, 4)
+}
+if not np.allclose(render3D_nprocs[1], render3D_nprocs[4], rtol=0, atol=1.001/255):
+    abort(
+        'The 3D renders "{}" and "{}" produced using 1 and 4 processes differ!'.format(
+            f'{this_dir}/output/render3D_snapshot_nprocs=1.png',
+            f'{this_dir}/output/render3D_snapshot_nprocs=4.png',
+        )
+    )
+
 # The dimensions of the images should be as stated in
 # render3D.param_0 and render3D.param_1.
 for r, p, param_i in zip(
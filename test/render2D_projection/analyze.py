@@ -0,0 +1,123 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange, partition
+from graphics import (
+    Render2DDeclaration, compute_render2D, project_render2D, project_render2D_fourier,
+)
+from mesh import domain_decompose, fft, interpolate_density
+from species import Component
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size     = user_params['_size']
+gridsize = user_params['_gridsize']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# The thin extents used for directly deposited 2D renders, in units of
+# the cell size. These include extents at both ends of the box,
+# to which particles contribute across the periodic boundary, as well
+# as an extent not aligned with the grid.
+cellsize = boxsize/gridsize
+extents = [(0, 2.5), (gridsize - 2, gridsize), (0.4*gridsize + 0.3, 0.4*gridsize + 3.7)]
+
+# Create particle component, with the particles
+# being the same regardless of the number of processes. Besides
+# uniformly distributed particles, further particles are placed within
+# a few cells of the boundaries of the extents, along all dimensions.
+N_uniform = size**3
+random_generator = np.random.default_rng(random_seed)
+pos = random_generator.random((N_uniform, 3))*boxsize
+boundaries = np.unique(np.array(extents))
+pos_boundaries = np.mod(
+    (
+        boundaries[random_generator.integers(boundaries.size, size=(N_uniform//4, 3))]
+        + random_generator.uniform(-2, 2, size=(N_uniform//4, 3))
+    )*cellsize,
+    boxsize,
+)
+pos = np.concatenate((pos, pos_boundaries))
+N = pos.shape[0]
+component = Component('matter', 'matter', N=N, mass=ρ_mbar*boxsize**3/N)
+start_local, N_local = partition(N)
+for axis, dim in enumerate('xyz'):
+    component.populate(pos[start_local:start_local + N_local, axis].copy(), f'pos{dim}')
+    component.populate(zeros(N_local, dtype=C2np['double']), f'mom{dim}')
+exchange(component)
+components = [component]
+
+# Compare full-depth projections obtained from the plane of the
+# Fourier space density through the origin with those obtained by
+# summing the real space density through the entire box.
+rel_tol = 1e-9
+for axis in 'xyz':
+    slab = interpolate_density(components, [gridsize], gridsize, 4, True, True)
+    projection_fourier = project_render2D_fourier(
+        slab, zeros((gridsize, gridsize), dtype=C2np['double']), axis,
+    )
+    fft(slab, 'backward')
+    grid = domain_decompose(slab, 'grid_global', do_ghost_communication=False)
+    projection_real = project_render2D(
+        grid, zeros((gridsize, gridsize), dtype=C2np['double']), axis, (0, boxsize),
+    )
+    if not master:
+        continue
+    projection_fourier = asarray(projection_fourier)
+    projection_real = asarray(projection_real)
+    if not np.allclose(
+        projection_fourier, projection_real,
+        rtol=rel_tol, atol=rel_tol*np.max(np.abs(projection_real)),
+    ):
+        abort(
+            f'Full-depth projection along the {axis}-axis obtained from the Fourier plane '
+            f'disagrees with that obtained in real space, with a maximum relative deviation of '
+            f'{np.max(np.abs(projection_fourier - projection_real))/np.max(np.abs(projection_real))}'
+        )
+
+# Compare 2D renders over thin extents obtained by depositing the
+# particles directly onto the 2D projection with those obtained by
+# projecting the 3D density, for each interpolation order.
+for order in range(1, 5):
+    for axis in 'xyz':
+        for extent in extents:
+            extent = (extent[0]*cellsize, extent[1]*cellsize)
+            projections = {}
+            for direct_deposit in (False, True):
+                declaration = Render2DDeclaration(
+                    components=components,
+                    gridsize=gridsize,
+                    interpolation=order,
+                    deconvolve=False,
+                    interlace=False,
+                    direct_deposit=direct_deposit,
+                    axis=axis,
+                    extent=extent,
+                    projections={'data': zeros((gridsize, gridsize), dtype=C2np['double'])},
+                )
+                compute_render2D(declaration)
+                projections[direct_deposit] = asarray(declaration.projections['data'])
+            if not master:
+                continue
+            projection, projection_deposited = projections[False], projections[True]
+            if not np.any(projection_deposited):
+                abort(f'No particles deposited onto 2D render over extent {extent} {unit_length}')
+            if not np.allclose(
+                projection_deposited, projection,
+                rtol=rel_tol, atol=rel_tol*np.max(np.abs(projection)),
+            ):
+                abort(
+                    f'2D render along the {axis}-axis over extent {extent} {unit_length} '
+                    f'with particles deposited directly using interpolation order {order} '
+                    f'disagrees with that obtained by projecting the 3D density, '
+                    f'with a maximum relative deviation of '
+                    f'{np.max(np.abs(projection_deposited - projection))/np.max(np.abs(projection))}'
+                )
+
+# Done analysing
+masterprint('done')
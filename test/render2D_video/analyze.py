@@ -0,0 +1,82 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+
+# Further imports
+import h5py
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+a_video = asarray(user_params['_a_video'])
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Read in the 2D render data of each output time,
+# which are the raw frames of the video.
+projections = []
+for filename in glob(f'{this_dir}/output/render2D_a=*.hdf5'):
+    with h5py.File(filename, mode='r') as hdf5_file:
+        projections.append((hdf5_file.attrs['a'], hdf5_file['data'][...]))
+projections = [projection for a, projection in sorted(projections, key=(lambda t: t[0]))]
+
+# Read in the video
+filename = f'{this_dir}/output/render2D_video.hdf5'
+with h5py.File(filename, mode='r') as hdf5_file:
+    frames = hdf5_file['frames'][...]
+    scaling = hdf5_file['scaling'][...]
+    a = hdf5_file['a'][...]
+    t = hdf5_file['t'][...]
+
+# Check the number of frames, their type and the time of each
+if frames.dtype != np.uint8:
+    abort(f'Video frames stored as {frames.dtype} but expected uint8')
+if len(projections) != a_video.shape[0]:
+    abort(f'Found {len(projections)} 2D render data files but expected {a_video.shape[0]}')
+gridsize = projections[0].shape[0]
+if frames.shape != (a_video.shape[0], gridsize, gridsize):
+    abort(
+        f'Video frames have shape {frames.shape} but expected '
+        f'{(a_video.shape[0], gridsize, gridsize)}'
+    )
+if scaling.shape != (a_video.shape[0], 5):
+    abort(f'Video scaling has shape {scaling.shape} but expected {(a_video.shape[0], 5)}')
+if not np.allclose(a, a_video, rtol=1e-6, atol=0) or not np.all(np.diff(t) > 0):
+    abort(f'Video frames stored at a = {a} but expected a = {a_video}')
+
+# Check the scaling parameters [vmin_raw, vmax_raw, exponent, vmin, vmax]
+# of each frame. The raw values are the minimum and maximum of the
+# 2D render data, smoothed over consecutive frames.
+smoothing = 0.5
+scaling_raw = asarray([np.min(projections[0]), np.max(projections[0])])
+for i, projection in enumerate(projections):
+    if i > 0:
+        scaling_raw = (
+            smoothing*scaling[i - 1, :2]
+            + (1 - smoothing)*asarray([np.min(projection), np.max(projection)])
+        )
+    if not np.allclose(scaling[i, :2], scaling_raw, rtol=1e-12, atol=0):
+        abort(f'Raw scaling of video frame {i} is {scaling[i, :2]} but expected {scaling_raw}')
+    exponent, vmin, vmax = scaling[i, 2:]
+    if not (0 < exponent and 0 <= vmin <= vmax <= 1):
+        abort(f'Enhancement of video frame {i} is invalid: {scaling[i, 2:]}')
+
+# Check the frames by recomputing them from the 2D render data,
+# using the stored scaling parameters.
+for i, projection in enumerate(projections):
+    exponent, vmin, vmax = scaling[i, 2:]
+    frame = np.clip((projection - scaling[i, 0])/(scaling[i, 1] - scaling[i, 0]), 0, 1)
+    frame = np.clip(frame**exponent, vmin, vmax)
+    if vmax > vmin:
+        frame = (frame - vmin)/(vmax - vmin)
+    if np.max(np.abs(frames[i].astype(int) - np.round(frame*255))) > 1:
+        abort(f'Video frame {i} does not match the 2D render data')
+if np.all(frames == frames[0]):
+    abort('All video frames are identical')
+
+# Done analysing
+masterprint('done')
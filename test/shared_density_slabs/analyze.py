@@ -0,0 +1,106 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from analysis import get_powerspec_declarations, get_powerspec_density_keys, powerspec
+from communication import exchange, partition
+from graphics import get_render2D_declarations, render2D
+from mesh import get_density_key, plan_shared_density_slabs
+from species import Component
+import mesh
+
+# Further imports
+import h5py
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size = user_params['_size']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+if master:
+    os.makedirs(f'{this_dir}/output', exist_ok=True)
+
+# Keep track of the number of density interpolations
+interpolations = []
+interpolate_upstream = mesh.interpolate_upstream
+def interpolate_upstream_counting(*args, **kwargs):
+    interpolations.append(args)
+    return interpolate_upstream(*args, **kwargs)
+mesh.interpolate_upstream = interpolate_upstream_counting
+
+# Create particle component
+N = size**3
+random_generator = np.random.default_rng(random_seed)
+pos = random_generator.random((N, 3))*boxsize
+component = Component('matter', 'matter', N=N, mass=ρ_mbar*boxsize**3/N)
+start_local, N_local = partition(N)
+for axis, dim in enumerate('xyz'):
+    component.populate(pos[start_local:start_local + N_local, axis].copy(), f'pos{dim}')
+    component.populate(zeros(N_local, dtype=C2np['double']), f'mom{dim}')
+exchange(component)
+components = [component]
+
+# The keys of the densities needed for the power spectrum and the
+# 2D render, as obtained when dumping both at the same time.
+# These should be identical.
+keys = []
+for declaration in get_powerspec_declarations(components):
+    keys += get_powerspec_density_keys(declaration)
+for declaration in get_render2D_declarations(components):
+    keys.append(get_density_key(
+        declaration.components,
+        [component.render2D_upstream_gridsize for component in declaration.components],
+        declaration.gridsize,
+        declaration.interpolation,
+        declaration.deconvolve,
+        declaration.interlace,
+    ))
+if len(keys) != 2 or keys[0] != keys[1]:
+    abort(f'Expected a single density to be shared, but got the density keys {keys}')
+
+# Compute the power spectrum and the 2D render,
+# with and without sharing the density.
+filename = f'{this_dir}/output/{{}}_nprocs={nprocs}_shared={{}}'
+for shared in (False, True):
+    interpolations.clear()
+    plan_shared_density_slabs(keys if shared else [])
+    powerspec(components, filename.format('powerspec', shared))
+    if shared:
+        # The density should be kept for the 2D render
+        if mesh.shared_density_uses != {keys[0]: 1} or set(mesh.shared_density_slabs) != {keys[0]}:
+            abort('Shared density not kept after its first use')
+    render2D(components, filename.format('render2D', shared))
+    # The shared density should be released after its last use
+    if mesh.shared_density_uses or mesh.shared_density_slabs:
+        abort(f'Shared density not released after its last use (shared = {shared})')
+    n_interpolations_expected = (1 if shared else 2)
+    if len(interpolations) != n_interpolations_expected:
+        abort(
+            f'The density was interpolated {len(interpolations)} times (shared = {shared}), '
+            f'but expected {n_interpolations_expected}'
+        )
+plan_shared_density_slabs([])
+
+# Compare the power spectra and 2D renders
+# computed with and without sharing the density.
+if master:
+    power, power_shared = [
+        np.loadtxt(filename.format('powerspec', shared))
+        for shared in (False, True)
+    ]
+    if not np.array_equal(power, power_shared):
+        abort('Power spectra computed with and without sharing the density differ')
+    projections = {}
+    for shared in (False, True):
+        with h5py.File(f'{filename.format("render2D", shared)}.hdf5', mode='r') as hdf5_file:
+            projections[shared] = hdf5_file['data'][...]
+    projection, projection_shared = projections[False], projections[True]
+    if not np.array_equal(projection, projection_shared):
+        abort('2D renders computed with and without sharing the density differ')
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,79 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange, partition
+from snapshot import save, wait_for_snapshots
+from species import Component
+import snapshot
+
+# Further imports
+import h5py
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size = user_params['_size']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# Create particle component
+N = size**3
+random_generator = np.random.default_rng(random_seed)
+pos = random_generator.random((N, 3))*boxsize
+mass = ρ_mbar*boxsize**3/N
+mom = random_generator.normal(scale=1e+2*units.km/units.s, size=(N, 3))*mass
+component = Component('matter', 'matter', N=N, mass=mass)
+start_local, N_local = partition(N)
+for axis, dim in enumerate('xyz'):
+    component.populate(pos[start_local:start_local + N_local, axis].copy(), f'pos{dim}')
+    component.populate(mom[start_local:start_local + N_local, axis].copy(), f'mom{dim}')
+exchange(component)
+
+# Save the particles synchronously as well as asynchronously
+filename = f'{this_dir}/output/snapshot_nprocs={nprocs}_{{}}.hdf5'
+filename_synchronous = save(
+    component, filename.format('synchronous'), save_all_components=True,
+)
+filename_asynchronous = save(
+    component, filename.format('asynchronous'), save_all_components=True, asynchronous=True,
+)
+if not snapshot.snapshot_writers:
+    abort('No particle data staged for writing in the background')
+
+# Keep modifying the particle data while the snapshot
+# is being written in the background.
+for i in range(10):
+    pos_local = asarray(component.pos_mv3[:component.N_local])
+    mom_local = asarray(component.mom_mv3[:component.N_local])
+    pos_local[...] = np.mod(pos_local + 0.01*boxsize, boxsize)
+    mom_local *= -1.1
+    exchange(component)
+
+# Wait for the asynchronous output to complete
+wait_for_snapshots()
+if snapshot.snapshot_writers:
+    abort('Snapshot writers still registered after waiting for snapshots')
+
+# The asynchronously saved snapshot should be identical
+# to the synchronously saved snapshot.
+if master:
+    with (
+        h5py.File(filename_synchronous, mode='r') as hdf5_file_synchronous,
+        h5py.File(filename_asynchronous, mode='r') as hdf5_file_asynchronous,
+    ):
+        for var_name in ('pos', 'mom'):
+            data_synchronous = hdf5_file_synchronous[f'components/matter/{var_name}'][...]
+            data_asynchronous = hdf5_file_asynchronous[f'components/matter/{var_name}'][...]
+            if not np.array_equal(data_asynchronous, data_synchronous):
+                abort(
+                    f'Particle data "{var_name}" of asynchronously saved snapshot '
+                    f'"{filename_asynchronous}" differs from that of synchronously saved '
+                    f'snapshot "{filename_synchronous}"'
+                )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,75 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load, save
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Storage layouts to test, together with the relative tolerance
+# on the momenta and the absolute tolerance on the positions
+# (in units of the box size) of the read-back data.
+layouts = {
+    'uncompressed': ({}, 0, 0),
+    'gzip': ({'compression': 'gzip'}, 0, 0),
+    'lzf': ({'compression': 'lzf'}, 0, 0),
+    'single precision': ({'dataformat': {'pos': 32, 'mom': 32}}, 1e-6, 1e-6),
+    'quantised (21 bits) + gzip': (
+        {'compression': 'gzip', 'dataformat': {'mom': 32}, 'pos quantisation': 21},
+        1e-6, 0.5**21,
+    ),
+    'quantised (16 bits) + lzf': (
+        {'compression': 'lzf', 'dataformat': {'mom': 32}, 'pos quantisation': 16},
+        1e-6, 0.5**16,
+    ),
+}
+try:
+    import hdf5plugin
+    layouts['quantised (21 bits) + zstd'] = (
+        {'compression': 'zstd', 'dataformat': {'mom': 32}, 'pos quantisation': 21},
+        1e-6, 0.5**21,
+    )
+except ImportError:
+    masterwarn('The hdf5plugin package is not available, so Zstandard compression is not tested')
+
+# Load the reference snapshot
+filename_reference = glob(f'{this_dir}/output/reference*')[0]
+component_reference = load(filename_reference, compare_params=False).components[0]
+pos_reference = asarray(component_reference.pos_mv3[:component_reference.N_local]).copy()
+mom_reference = asarray(component_reference.mom_mv3[:component_reference.N_local]).copy()
+size_reference = os.path.getsize(filename_reference)
+
+# Save and load the snapshot using each layout
+concept_snapshot_params_original = concept_snapshot_params.copy()
+timings = {}
+for layout, (params, rel_tol_mom, abs_tol_pos) in layouts.items():
+    concept_snapshot_params.clear()
+    concept_snapshot_params.update(concept_snapshot_params_original)
+    params = params.copy()
+    params['dataformat'] = concept_snapshot_params['dataformat'] | params.get('dataformat', {})
+    concept_snapshot_params.update(params)
+    filename = f'{this_dir}/output/{layout.replace(" ", "_")}.hdf5'
+    t0 = time()
+    save(component_reference, filename, snapshot_type='concept', save_all_components=True)
+    time_write = time() - t0
+    t0 = time()
+    component = load(filename, compare_params=False).components[0]
+    time_read = time() - t0
+    timings[layout] = (time_write, time_read, os.path.getsize(filename))
+    # Compare the read-back data with the original
+    pos = asarray(component.pos_mv3[:component.N_local])
+    mom = asarray(component.mom_mv3[:component.N_local])
+    if np.max(np.abs(pos - pos_reference)) > (abs_tol_pos + 1e-12)*boxsize:
+        abort(f'Positions read back from the "{layout}" snapshot are too inaccurate')
+    if not np.allclose(mom, mom_reference, rel_tol_mom, 1e-12*np.max(np.abs(mom_reference))):
+        abort(f'Momenta read back from the "{layout}" snapshot are too inaccurate')
+
+# Print out the timings and file sizes
+masterprint('Snapshot layout benchmarks:')
+for layout, (time_write, time_read, size) in timings.items():
+    masterprint(
+        f'    {layout:<28}: write {time_write:.3f} s, read {time_read:.3f} s, '
+        f'size {size/2**20:.1f} MB ({size/size_reference:.2f} of reference)'
+    )
@@ -0,0 +1,63 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load, save
+from species import Component
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data with an empty process ...')
+
+# Function returning the particle data of all processes,
+# sorted according to the positions.
+def gather_particle_data(component):
+    pos = np.concatenate(allgather(asarray(component.pos_mv3[:component.N_local])))
+    mom = np.concatenate(allgather(asarray(component.mom_mv3[:component.N_local])))
+    order = np.lexsort(pos.T)
+    return pos[order], mom[order]
+
+# Load the reference snapshot and place all of its particles
+# on the master process, leaving the other processes empty.
+filename_reference = glob(f'{this_dir}/output/reference*')[0]
+component_reference = load(filename_reference, compare_params=False).components[0]
+pos_reference, mom_reference = gather_particle_data(component_reference)
+component = Component(
+    'matter', 'matter', N=component_reference.N, mass=component_reference.mass,
+)
+for dim in range(3):
+    for var_name, data in zip(('pos', 'mom'), (pos_reference, mom_reference)):
+        component.populate(
+            (data[:, dim].copy() if master else empty(0, dtype=C2np['double'])),
+            f'{var_name}{"xyz"[dim]}',
+        )
+
+# Save and load the snapshot using both a contiguous and a compressed
+# (chunked) layout, the latter of which is written collectively.
+concept_snapshot_params_original = concept_snapshot_params.copy()
+for layout, params in {
+    'uncompressed': {},
+    'gzip': {'compression': 'gzip'},
+}.items():
+    concept_snapshot_params.clear()
+    concept_snapshot_params.update(concept_snapshot_params_original)
+    concept_snapshot_params.update(params)
+    filename = f'{this_dir}/output/empty_process_{layout}.hdf5'
+    save(component, filename, snapshot_type='concept', save_all_components=True)
+    pos, mom = gather_particle_data(load(filename, compare_params=False).components[0])
+    if pos.shape != pos_reference.shape:
+        abort(
+            f'{pos.shape[0]} particles read back from the "{layout}" snapshot '
+            f'saved with an empty process, but {pos_reference.shape[0]} were saved'
+        )
+    if not np.all(pos == pos_reference) or not np.all(mom == mom_reference):
+        abort(
+            f'Particle data read back from the "{layout}" snapshot '
+            f'saved with an empty process differ from the original'
+        )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,93 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange, partition, which_domain
+from snapshot import get_domain_filename, load, save
+from species import Component
+
+# Further imports
+import h5py
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+mode = user_params['_mode']
+size = user_params['_size']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ({mode}) ...')
+
+# Generate the particles, which are the same
+# regardless of the number of processes.
+N = size**3
+random_generator = np.random.default_rng(random_seed)
+pos = random_generator.random((N, 3))*boxsize
+mass = ρ_mbar*boxsize**3/N
+mom = random_generator.normal(scale=1e+2*units.km/units.s, size=(N, 3))*mass
+filename = f'{this_dir}/output/snapshot.hdf5'
+
+# Function saving the particles to a domain local snapshot
+def save_particles():
+    component = Component('matter', 'matter', N=N, mass=mass)
+    start_local, N_local = partition(N)
+    for axis, dim in enumerate('xyz'):
+        component.populate(pos[start_local:start_local + N_local, axis].copy(), f'pos{dim}')
+        component.populate(mom[start_local:start_local + N_local, axis].copy(), f'mom{dim}')
+    exchange(component)
+    save(component, filename, save_all_components=True)
+
+# Function reading in the domain local snapshot and checking the
+# particles. No particles should be exchanged after reading in the
+# snapshot, regardless of the number of processes.
+def load_particles():
+    snapshot = load(filename, compare_params=False)
+    component = snapshot.components[0]
+    if component.name not in snapshot.components_domain_local:
+        abort(f'Particles exchanged after reading in domain local snapshot using {nprocs} processes')
+    pos_local = asarray(component.pos_mv3[:component.N_local]).copy()
+    mom_local = asarray(component.mom_mv3[:component.N_local]).copy()
+    for indexᵖ, (x, y, z) in enumerate(pos_local):
+        if which_domain(x, y, z) != rank:
+            abort(
+                f'Particle {indexᵖ} read in by process {rank} is located at ({x}, {y}, {z}) '
+                f'{unit_length}, outside of the domain of this process'
+            )
+    # When reading in using the same domain decomposition as when saving,
+    # each process should read in exactly the particles of its own domain
+    # file, in order.
+    with open_hdf5(filename, mode='r', local=True) as hdf5_file:
+        N_domains = hdf5_file['components/matter/domains/N'][...]
+    if N_domains.shape[0] == nprocs:
+        with open_hdf5(get_domain_filename(filename, rank), mode='r', local=True) as domain_file:
+            pos_domain = domain_file['components/matter/pos'][...]
+            mom_domain = domain_file['components/matter/mom'][...]
+        if not (np.array_equal(pos_local, pos_domain) and np.array_equal(mom_local, mom_domain)):
+            abort(
+                f'Process {rank} did not read in just the particles of its own domain file, '
+                f'despite the domain decomposition being the same as when saving'
+            )
+    # Compare the particles read in by all processes
+    # with the saved particles.
+    pos_loaded = np.concatenate(allgather(pos_local))
+    mom_loaded = np.concatenate(allgather(mom_local))
+    if master:
+        if pos_loaded.shape[0] != N:
+            abort(f'Read in {pos_loaded.shape[0]} particles, but {N} were saved')
+        order = np.lexsort(pos.T)
+        order_loaded = np.lexsort(pos_loaded.T)
+        if not np.allclose(pos_loaded[order_loaded], pos[order], rtol=0, atol=1e-12*boxsize):
+            abort(f'Particle positions read in using {nprocs} processes do not match those saved')
+        if not np.allclose(mom_loaded[order_loaded], mom[order], rtol=1e-12, atol=0):
+            abort(f'Particle momenta read in using {nprocs} processes do not match those saved')
+
+# Save or load the particles
+if mode == 'save':
+    save_particles()
+else:
+    load_particles()
+
+# Done analysing
+masterprint('done')
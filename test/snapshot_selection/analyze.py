@@ -0,0 +1,126 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from snapshot import load
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data ...')
+
+# Function returning the particle data of all processes
+def gather_particle_data(component):
+    pos = np.concatenate(allgather(asarray(component.pos_mv3[:component.N_local])))
+    mom = np.concatenate(allgather(asarray(component.mom_mv3[:component.N_local])))
+    return pos, mom
+
+# Read in selections of the reference snapshots of each type
+for snapshot_type, filename in {
+    'concept': f'{this_dir}/output/reference.hdf5',
+    'gadget' : f'{this_dir}/output/reference_gadget',
+}.items():
+    # Load the full reference snapshot
+    snapshot_load_selection.clear()
+    component_reference = load(filename, compare_params=False).components[0]
+    pos_reference, mom_reference = gather_particle_data(component_reference)
+    mass_reference = component_reference.mass
+    N_reference = component_reference.N
+    velocities_reference = {
+        tuple(pos): mom/mass_reference
+        for pos, mom in zip(pos_reference, mom_reference)
+    }
+
+    # The selections to test, together with masks over the reference
+    # particles specifying which particles should be selected.
+    # For the sub-sampling, the selected particles are random,
+    # and so only their number is known statistically.
+    center = asarray([0.1, 0.5, 0.9])*boxsize
+    radius = 0.2*boxsize
+    distance = pos_reference - center
+    distance -= boxsize*np.round(distance/boxsize)
+    selections = {
+        'fraction': ({'fraction': 1/8}, None),
+        'region': (
+            {'region': [(0.1*boxsize, 0, 0.25*boxsize), (0.6*boxsize, 0.5*boxsize, boxsize)]},
+            np.all(
+                (pos_reference >= asarray((0.1*boxsize, 0, 0.25*boxsize)))
+                & (pos_reference < asarray((0.6*boxsize, 0.5*boxsize, boxsize))),
+                axis=1,
+            ),
+        ),
+        'sphere': (
+            {'center': center, 'radius': radius},
+            np.sum(distance**2, axis=1) <= radius**2,
+        ),
+    }
+
+    # Read in each selection and compare it with the reference
+    for name, (selection, mask) in selections.items():
+        description = f'{name.capitalize()} selection ({snapshot_type})'
+        snapshot_load_selection.clear()
+        snapshot_load_selection[component_reference.name] = selection
+        component = load(filename, compare_params=False).components[0]
+        pos, mom = gather_particle_data(component)
+        fraction = selection.get('fraction', 1)
+        # Check the number of selected particles
+        if pos.shape[0] != component.N:
+            abort(
+                f'{description}: {pos.shape[0]} particles read in, '
+                f'but the component has N = {component.N}'
+            )
+        if mask is None:
+            # The number of selected particles follows
+            # a binomial distribution.
+            σ_N = sqrt(N_reference*fraction*(1 - fraction))
+            if abs(component.N - fraction*N_reference) > 5*σ_N:
+                abort(
+                    f'{description}: {component.N} particles read in, '
+                    f'but expected about {fraction*N_reference:.0f}'
+                )
+        else:
+            if component.N != np.count_nonzero(mask):
+                abort(
+                    f'{description}: {component.N} particles read in, '
+                    f'but expected {np.count_nonzero(mask)}'
+                )
+            if not np.all(
+                pos[np.lexsort(pos.T)] == pos_reference[mask][np.lexsort(pos_reference[mask].T)]
+            ):
+                abort(f'{description}: Wrong particles read in')
+        # Check that the total mass is conserved (on average)
+        # and that the velocities are unchanged.
+        if not isclose(component.mass, mass_reference/fraction):
+            abort(
+                f'{description}: Particle mass is {component.mass}, '
+                f'but expected {mass_reference/fraction}'
+            )
+        if mask is None and abs(component.N*component.mass/(N_reference*mass_reference) - 1) > (
+            5*σ_N/(fraction*N_reference)
+        ):
+            abort(f'{description}: Total mass not conserved')
+        for pos_i, mom_i in zip(pos, mom):
+            velocity_reference = velocities_reference.get(tuple(pos_i))
+            if velocity_reference is None:
+                abort(f'{description}: Particle not present in the full snapshot')
+            if not np.allclose(mom_i/component.mass, velocity_reference, rtol=1e-12, atol=0):
+                abort(f'{description}: Particle velocities changed')
+        # The sub-sampled particles are chosen based on their index within
+        # the snapshot, and so they should not depend on the number of
+        # processes. Compare with the sub-sampling obtained using a single
+        # process, written to disk by the first run.
+        if mask is None and master:
+            pos_sorted = pos[np.lexsort(pos.T)]
+            np.save(f'{this_dir}/output/{name}_{snapshot_type}_nprocs={nprocs}.npy', pos_sorted)
+            if nprocs > 1 and not np.array_equal(
+                pos_sorted, np.load(f'{this_dir}/output/{name}_{snapshot_type}_nprocs=1.npy')
+            ):
+                abort(
+                    f'{description}: Particles read in '
+                    f'using {nprocs} processes differ from those read in using 1 process'
+                )
+
+# Done analysing
+masterprint('done')
@@ -0,0 +1,84 @@
+# Imports from the CO𝘕CEPT code
+from commons import *
+from integration import Spline
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# As this non-compiled code should work regardless of whether
+# the main CO𝘕CEPT code is compiled or not, we need to flood
+# this name space with names from commons explicitly, as
+# 'from commons import *' does not import C level variables.
+commons_flood()
+
+# Relative tolerance used when comparing the array
+# and scalar spline results.
+rel_tol = 1e-12
+
+# Function returning the time it takes to call func,
+# together with the result.
+def timed(func):
+    t0 = time()
+    result = asarray(func())
+    return time() - t0, result
+
+# Transfer function like workload: a BBKS transfer function tabulated
+# at logarithmically spaced k and splined in log-log space, evaluated
+# at the (sorted) |k| of a grid.
+k_min, k_max = 1e-4, 1e+1
+k_tabulated = logspace(log10(k_min), log10(k_max), user_params['_size_tabulated'])
+q = k_tabulated/0.2
+transfer_tabulated = (
+    log(1 + 2.34*q)/(2.34*q)
+    *(1 + 3.89*q + (16.1*q)**2 + (5.46*q)**3 + (6.71*q)**4)**(-0.25)
+)
+spline_transfer = Spline(k_tabulated, transfer_tabulated, 'transfer', logx=True, logy=True)
+k_eval = np.sort(np.random.default_rng(0).uniform(
+    1.01*k_min, 0.99*k_max, user_params['_size_eval'],
+))
+# Background like workload: a(t) for matter domination, evaluated
+# and integrated over consecutive time steps.
+t_tabulated = linspace(0.01, 1, user_params['_size_tabulated'])
+a_tabulated = t_tabulated**(2/3)
+spline_background = Spline(t_tabulated, a_tabulated, 'a(t)')
+t_steps = linspace(0.02, 0.99, user_params['_size_integrate'] + 1)
+t_start, t_end = t_steps[:-1].copy(), t_steps[1:].copy()
+
+# Run the benchmarks
+masterprint(f'Benchmarking {this_test} ...')
+benchmarks = {
+    'eval': (
+        lambda: [spline_transfer.eval(k) for k in k_eval],
+        lambda: spline_transfer.eval_array(k_eval),
+    ),
+    'eval_deriv': (
+        lambda: [spline_transfer.eval_deriv(k) for k in k_eval],
+        lambda: spline_transfer.eval_deriv_array(k_eval),
+    ),
+    'integrate': (
+        lambda: [spline_background.integrate(t0, t1) for t0, t1 in zip(t_start, t_end)],
+        lambda: spline_background.integrate_array(t_start, t_end),
+    ),
+}
+timings = {}
+for method, (func_scalar, func_array) in benchmarks.items():
+    time_scalar, result_scalar = timed(func_scalar)
+    time_array , result_array  = timed(func_array)
+    if not np.allclose(result_array, result_scalar, rel_tol, 0):
+        abort(
+            f'The array and scalar versions of Spline.{method}() disagree, '
+            f'with a maximum relative difference of '
+            f'{np.max(np.abs(result_array/result_scalar - 1))}'
+        )
+    timings[method] = (time_scalar, time_array)
+masterprint('done')
+
+# Print out the timings
+compiled = not user_params['_pure_python']
+masterprint(f'Spline timings ({"compiled" if compiled else "pure Python"}):')
+for method, (time_scalar, time_array) in timings.items():
+    masterprint(
+        f'    {method:<10}: scalar {time_scalar:.3e} s, array {time_array:.3e} s '
+        f'(speedup {time_scalar/time_array:.1f}×)'
+    )
@@ -0,0 +1,133 @@
+# This file has to be run in pure Python mode!
+
+# Imports from the CO𝘕CEPT code
+from commons import *
+from communication import exchange, partition
+from snapshot import ConceptSnapshot, GadgetSnapshot, save
+from species import Component
+import utilities
+plt = get_matplotlib().pyplot
+
+# Further imports
+import contextlib, io
+
+# Absolute path and name of this test
+this_dir  = os.path.dirname(os.path.realpath(__file__))
+this_test = os.path.basename(os.path.dirname(this_dir))
+
+# Read in test specifications
+size       = user_params['_size']
+chunk_size = user_params['_chunk_size']
+
+# Begin analysis
+masterprint(f'Analysing {this_test} data using {nprocs} processes ...')
+
+# Save particles to both a CO𝘕CEPT and a GADGET snapshot
+N = size**3
+if partition(N)[1] <= chunk_size:
+    abort(f'The chunk size {chunk_size} is not smaller than the number of local particles')
+random_generator = np.random.default_rng(random_seed)
+pos = random_generator.random((N, 3))*boxsize
+mass = ρ_mbar*boxsize**3/N
+mom = random_generator.normal(scale=1e+2*units.km/units.s, size=(N, 3))*mass
+component = Component('matter', 'matter', N=N, mass=mass)
+start_local, N_local = partition(N)
+for axis, dim in enumerate('xyz'):
+    component.populate(pos[start_local:start_local + N_local, axis].copy(), f'pos{dim}')
+    component.populate(mom[start_local:start_local + N_local, axis].copy(), f'mom{dim}')
+exchange(component)
+snapshot_filenames = {
+    snapshot_type: save(
+        component, f'{this_dir}/output/snapshot_{snapshot_type}',
+        snapshot_type=snapshot_type, save_all_components=True,
+    )
+    for snapshot_type in ('concept', 'gadget')
+}
+
+# Control whether the utilities read the particle data in chunks.
+# When chunked, the particle data is iterated over in chunks of the
+# given chunk size, with the starting indices of the chunks recorded.
+# Otherwise, the powerspec and render3D utilities read in the snapshots
+# in full, while the info utility iterates over the particle data
+# using the default chunk size, which exceeds the number of particles.
+chunked = False
+chunks = []
+is_iterable = utilities.is_iterable
+utilities.is_iterable = lambda snapshot: chunked and is_iterable(snapshot)
+def read_in_chunks(snapshot_class):
+    iterate_particles = snapshot_class.iterate_particles
+    def iterate_particles_chunked(self, component, chunk_size=2**20):
+        if chunked:
+            chunk_size = user_params['_chunk_size']
+        for chunk in iterate_particles(self, component, chunk_size):
+            chunks.append(chunk[0])
+            yield chunk
+    snapshot_class.iterate_particles = iterate_particles_chunked
+for snapshot_class in (ConceptSnapshot, GadgetSnapshot):
+    read_in_chunks(snapshot_class)
+
+# Run the utilities on both snapshots, with and without chunking
+output_info = {}
+for snapshot_type, snapshot_filename in snapshot_filenames.items():
+    basename = os.path.basename(snapshot_filename).removesuffix('.hdf5')
+    for chunked in (False, True):
+        chunks.clear()
+        special_params['snapshot_filename'] = snapshot_filename
+        special_params['paths'] = [snapshot_filename]
+        special_params['stats'] = True
+        with utilities.allow_similarly_named_components():
+            utilities.powerspec()
+            utilities.render3D()
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                utilities.info()
+        # Keep only the printed information about the snapshot,
+        # leaving out the timed progress messages of the loading.
+        output_info[snapshot_type, chunked] = stdout.getvalue().partition('Information about')[2]
+        if chunked and allreduce(len(chunks), op=MPI.MIN) < 2:
+            abort(f'Particle data of {snapshot_type} snapshot not read in chunks')
+        if master:
+            os.rename(
+                f'{this_dir}/output/powerspec_{basename}',
+                f'{this_dir}/output/powerspec_{basename}_nprocs={nprocs}_chunked={chunked}',
+            )
+            os.rename(
+                f'{this_dir}/output/render3D_{basename}.png',
+                f'{this_dir}/output/render3D_{basename}_nprocs={nprocs}_chunked={chunked}.png',
+            )
+
+# Compare the outputs with and without chunking. As the particles are
+# distributed differently among the processes, the outputs may differ
+# slightly due to round-off errors.
+rel_tol = 1e-12
+if master:
+    for snapshot_type, snapshot_filename in snapshot_filenames.items():
+        basename = os.path.basename(snapshot_filename).removesuffix('.hdf5')
+        filename = f'{this_dir}/output/{{}}_{basename}_nprocs={nprocs}_chunked={{}}'
+        power, power_chunked = [
+            np.loadtxt(filename.format('powerspec', chunked))
+            for chunked in (False, True)
+        ]
+        if not np.allclose(power_chunked, power, rtol=rel_tol, atol=0):
+            abort(
+                f'Power spectra of {snapshot_type} snapshot computed '
+                f'with and without chunking differ'
+            )
+        render3D, render3D_chunked = [
+            plt.imread(f'{filename.format("render3D", chunked)}.png')
+            for chunked in (False, True)
+        ]
+        if not np.allclose(render3D_chunked, render3D, rtol=0, atol=1/255):
+            abort(
+                f'3D renders of {snapshot_type} snapshot produced '
+                f'with and without chunking differ'
+            )
+        if output_info[snapshot_type, True] != output_info[snapshot_type, False]:
+            abort(
+                f'Information about {snapshot_type} snapshot printed '
+                f'with and without chunking differ:\n'
+                f'{output_info[snapshot_type, False]}\n'
+                f'{output_info[snapshot_type, True]}'
+            )
+
+# Done analysing
+masterprint('done')